@@ -0,0 +1,89 @@
+"""
+Run CEF message loop in an asyncio event loop, bind a coroutine
+function to javascript and await a javascript callback in Python.
+Requires Python 3.5+.
+"""
+
+import asyncio
+
+from cefpython3 import cefpython as cef
+from cefpython3 import aio
+
+g_htmlcode = """
+<!doctype html>
+<html>
+<head>
+    <style>
+    body, html {
+        font-family: Arial;
+        font-size: 11pt;
+    }
+    </style>
+    <script>
+    function print(msg) {
+        document.getElementById("console").innerHTML += msg+"<br>";
+    }
+    function js_function() {
+        py_sleep(1.0, function(error, result) {
+            print("Value returned from Python coroutine: <b>"+result+"</b>");
+            py_ask(function(question) {
+                print("Question asked by Python: <b>"+question+"</b>");
+                return 42;
+            }, function(error, result) {
+                print("Python got the answer: <b>"+result+"</b>");
+            });
+        });
+    }
+    </script>
+</head>
+<body>
+    <h1>asyncio</h1>
+    <div id=console></div>
+</body>
+</html>
+"""
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    aio.initialize()
+    browser = cef.CreateBrowserSync(url=cef.GetDataUrl(g_htmlcode),
+                                    window_title="asyncio")
+    browser.SetClientHandler(LoadHandler())
+    browser.SetClientHandler(LifespanHandler(loop))
+    bindings = cef.JavascriptBindings()
+    aio.bind_coroutine(bindings, "py_sleep", py_sleep)
+    aio.bind_coroutine(bindings, "py_ask", py_ask)
+    browser.SetJavascriptBindings(bindings)
+    loop.run_forever()
+    del browser
+    aio.shutdown()
+
+
+async def py_sleep(seconds):
+    await asyncio.sleep(seconds)
+    return "Slept for %s seconds" % seconds
+
+
+async def py_ask(js_callback):
+    answer = await aio.call(js_callback, "What is the answer?",
+                            timeout_ms=5000)
+    print("Value returned from Javascript: %s" % answer)
+    return answer
+
+
+class LoadHandler(object):
+    def OnLoadEnd(self, browser, **_):
+        browser.ExecuteFunction("js_function")
+
+
+class LifespanHandler(object):
+    def __init__(self, loop):
+        self.loop = loop
+
+    def OnBeforeClose(self, **_):
+        self.loop.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -152,6 +152,7 @@ cdef void RemovePyBrowser(int browserId) except *:
         del pyBrowser
         del g_pyBrowsers[browserId]
         g_unreferenced_browsers.append(browserId)
+        UpdateResponseFilterCallback()
     else:
         # noinspection PyUnresolvedReferences
         Debug("RemovePyBrowser() FAILED: browser not found, id = %s" \
@@ -248,7 +249,8 @@ cdef class PyBrowser:
                     "OnQuotaRequest", "OnProtocolExecution",
                     "GetResourceHandler",
                     "OnBeforeBrowse", "OnRendererProcessTerminated",
-                    "OnPluginCrashed", "CanGetCookies", "CanSetCookie"]
+                    "OnPluginCrashed", "CanGetCookies", "CanSetCookie",
+                    "GetResourceResponseFilter"]
             # RequestContextHandler
             self.allowedClientCallbacks += ["GetCookieManager"]
             # LoadHandler
@@ -280,6 +282,8 @@ cdef class PyBrowser:
             raise Exception("Browser.SetClientCallback() failed: unknown "
                             "callback: %s" % name)
         self.clientCallbacks[name] = callback
+        if name == "GetResourceResponseFilter":
+            UpdateResponseFilterCallback()
 
     cpdef py_void SetClientHandler(self, object clientHandler):
         if not hasattr(clientHandler, "__class__"):
@@ -302,6 +306,7 @@ cdef class PyBrowser:
 
     cpdef py_void SetClientCallbacksDict(self, dict clientCallbacks):
         self.clientCallbacks = clientCallbacks
+        UpdateResponseFilterCallback()
 
     cpdef dict GetClientCallbacksDict(self):
         return self.clientCallbacks
@@ -418,6 +423,11 @@ cdef class PyBrowser:
         self.GetCefBrowserHost().get().Find(searchId, cefSearchText,
                 bool(forward), bool(matchCase), bool(findNext))
 
+    cpdef Channel GetChannel(self, py_string name, dict options=None):
+        assert IsThread(TID_UI), (
+                "Browser.GetChannel() may only be called on the UI thread")
+        return GetOrCreateChannel(self, name, options)
+
     cpdef PyFrame GetFocusedFrame(self):
         assert IsThread(TID_UI), (
                 "Browser.GetFocusedFrame() may only be called on UI thread")
@@ -460,6 +470,14 @@ cdef class PyBrowser:
     cpdef int GetIdentifier(self) except *:
         return self.GetCefBrowser().get().GetIdentifier()
 
+    cpdef Future GetJavascriptCallbackStats(self):
+        assert IsThread(TID_UI), (
+                "Browser.GetJavascriptCallbackStats() may only be called"
+                " on the UI thread")
+        ReleaseJavascriptCallbacks()
+        return SendMessageWithReply(self, 0, "GetJavascriptCallbackStats",
+                                    [], 0)
+
     cpdef PyFrame GetMainFrame(self):
         return GetPyFrame(self.GetCefBrowser().get().GetMainFrame())
 
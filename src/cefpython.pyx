@@ -181,6 +181,8 @@ from cpython cimport PyLong_FromVoidPtr
 # noinspection PyUnresolvedReferences
 from cpython cimport bool as py_bool
 # noinspection PyUnresolvedReferences
+from cpython.bytes cimport PyBytes_FromStringAndSize, PyBytes_AS_STRING
+# noinspection PyUnresolvedReferences
 from libcpp cimport bool as cpp_bool
 # noinspection PyUnresolvedReferences
 from libcpp.map cimport map as cpp_map
@@ -198,6 +200,10 @@ from wstring cimport wstring as cpp_wstring
 from libc.string cimport strlen
 # noinspection PyUnresolvedReferences
 from libc.string cimport memcpy
+# noinspection PyUnresolvedReferences
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
+# noinspection PyUnresolvedReferences
+from cython.view cimport array as cython_array
 # preincrement and dereference must be "as" otherwise not seen.
 # noinspection PyUnresolvedReferences
 from cython.operator cimport preincrement as preinc, dereference as deref
@@ -249,8 +255,8 @@ cdef extern from *:
 # cannot cimport *, that would cause name conflicts with constants
 # noinspection PyUnresolvedReferences
 from cef_types cimport (
-    CefSettings, CefBrowserSettings, CefRect, CefSize, CefPoint,
-    CefKeyEvent, CefMouseEvent, CefScreenInfo,
+    CefSettings, CefBrowserSettings, CefRequestContextSettings,
+    CefRect, CefSize, CefPoint, CefKeyEvent, CefMouseEvent, CefScreenInfo,
     PathKey, PK_DIR_EXE, PK_DIR_MODULE,
     int32, uint32, int64, uint64,
     cef_log_severity_t,
@@ -283,11 +289,23 @@ from cef_string_visitor cimport *
 # noinspection PyUnresolvedReferences
 cimport cef_cookie_manager_namespace
 from cookie_visitor cimport *
+from cookie_batch cimport *
+from cookie_cache cimport *
 from string_visitor cimport *
 from cef_callback cimport *
 from cef_response cimport *
 from cef_resource_handler cimport *
 from resource_handler cimport *
+from native_resource cimport *
+from resource_router cimport *
+from resource_cache cimport *
+from request_filter cimport *
+from header_rules cimport *
+from cookie_policy cimport *
+from cef_scheme cimport *
+from scheme_handler_factory cimport *
+from cef_response_filter cimport *
+from response_filter cimport *
 from cef_urlrequest cimport *
 from web_request_client cimport *
 from cef_command_line cimport *
@@ -354,21 +372,33 @@ ELIF UNAME_SYSNAME == "Darwin":
     include "window_utils_mac.pyx"
 
 include "task.pyx"
+include "future.pyx"
 include "javascript_bindings.pyx"
 include "virtual_keys.pyx"
 include "window_info.pyx"
 include "process_message_utils.pyx"
 include "javascript_callback.pyx"
 include "python_callback.pyx"
+include "channel.pyx"
 include "web_plugin_info.pyx"
 include "request.pyx"
 include "cookie.pyx"
+include "cookie_cache.pyx"
 include "string_visitor.pyx"
 include "network_error.pyx"
 include "paint_buffer.pyx"
 include "callback.pyx"
 include "response.pyx"
+include "native_resource.pyx"
+include "resource_router.pyx"
+include "resource_cache.pyx"
+include "request_filter.pyx"
+include "header_rules.pyx"
+include "cookie_policy.pyx"
+include "response_filter.pyx"
 include "web_request.pyx"
+include "web_request_pool.pyx"
+include "request_context_pool.pyx"
 include "command_line.pyx"
 include "app.pyx"
 include "drag_data.pyx"
@@ -390,6 +420,8 @@ include "handlers/request_handler.pyx"
 include "handlers/v8context_handler.pyx"
 include "handlers/v8function_handler.pyx"
 
+include "scheme_handler.pyx"
+
 # -----------------------------------------------------------------------------
 # Utility functions to provide settings to the C++ browser process code.
 
@@ -462,6 +494,13 @@ def Initialize(applicationSettings=None, commandLineSwitches=None, **kwargs):
     for kwarg in kwargs:
         raise Exception("Invalid argument: "+kwarg)
 
+    # Custom schemes are validated before any global state is changed,
+    # so that Initialize() can be called again with fixed settings.
+    cdef str custom_schemes_switch = ""
+    if application_settings and "custom_schemes" in application_settings:
+        custom_schemes_switch = GetCustomSchemesSwitch(
+                application_settings["custom_schemes"])
+
     if command_line_switches:
         # Make a copy as commandLineSwitches is a reference only
         # that might get destroyed later.
@@ -530,6 +569,11 @@ def Initialize(applicationSettings=None, commandLineSwitches=None, **kwargs):
     if "app_user_model_id" in application_settings:
         g_commandLineSwitches["app-user-model-id"] =\
                 application_settings["app_user_model_id"]
+    if "javascript_callbacks_limit" in application_settings:
+        g_commandLineSwitches["javascript-callbacks-limit"] =\
+                str(int(application_settings["javascript_callbacks_limit"]))
+    if custom_schemes_switch:
+        g_commandLineSwitches["custom-schemes"] = custom_schemes_switch
 
     # ------------------------------------------------------------------------
     # Paths
@@ -623,8 +667,11 @@ def Initialize(applicationSettings=None, commandLineSwitches=None, **kwargs):
     cefApplicationSettings.no_sandbox = 1
     SetApplicationSettings(application_settings, &cefApplicationSettings)
 
-    # External message pump
+    # External message pump. When OnScheduleMessagePumpWork global
+    # callback was set then it is the application that schedules
+    # message loop work, e.g. in an asyncio event loop.
     if GetAppSetting("external_message_pump")\
+            and not GetGlobalClientCallback("OnScheduleMessagePumpWork")\
             and not g_external_message_pump.get():
         Debug("Create external message pump")
         # Using .reset() here to assign new instance was causing
@@ -657,6 +704,7 @@ def CreateBrowserSync(windowInfo=None,
                       browserSettings=None,
                       navigateUrl="",
                       window_title="",
+                      request_context="",
                       **kwargs):
     # Alternative names for existing parameters
     if "window_info" in kwargs:
@@ -748,12 +796,20 @@ def CreateBrowserSync(windowInfo=None,
     cdef CefRefPtr[CefBrowser] cefBrowser
 
     # Request context - part 1/2.
-    createSharedRequestContext = bool(not g_shared_request_context.get())
+    # A named context from RequestContextPool is used as is, it has
+    # no request context handler.
+    cdef PooledRequestContext pooledContext = None
+    if request_context:
+        pooledContext = GetPooledRequestContext(request_context)
+    createSharedRequestContext = bool(not g_shared_request_context.get()
+                                      and pooledContext is None)
     cdef CefRefPtr[CefRequestContext] cefRequestContext
     cdef CefRefPtr[RequestContextHandler] requestContextHandler =\
             <CefRefPtr[RequestContextHandler]?>new RequestContextHandler(
                     cefBrowser)
-    if g_applicationSettings["unique_request_context_per_browser"]:
+    if pooledContext is not None:
+        cefRequestContext = pooledContext.cefRequestContext
+    elif g_applicationSettings["unique_request_context_per_browser"]:
         cefRequestContext = CefRequestContext.CreateContext(
                 CefRequestContext.GetGlobalContext(),
                 <CefRefPtr[CefRequestContextHandler]?>requestContextHandler)
@@ -791,7 +847,9 @@ def CreateBrowserSync(windowInfo=None,
             copy.deepcopy(browserSettings[key])
 
     # Request context - part 2/2.
-    if g_applicationSettings["unique_request_context_per_browser"]:
+    if pooledContext is not None:
+        pooledContext.browserCount += 1
+    elif g_applicationSettings["unique_request_context_per_browser"]:
         requestContextHandler.get().SetBrowser(cefBrowser)
     else:
         if createSharedRequestContext:
@@ -956,6 +1014,16 @@ def Shutdown():
         # Reset will set it to NULL
         g_external_message_pump.reset()
 
+    # Native resources held by routes, scheme handler factories and
+    # cached responses, and the cookie manager and request context held
+    # by the cookie cache are released before CEF shutdown, same as
+    # other CEF references.
+    ClearSchemeHandlerFactories()
+    ClearResourceRoutes()
+    DisableResourceCache()
+    DisableCookieCache()
+    g_requestContextPool.clear()
+
     Debug("CefShutdown()")
     with nogil:
         CefShutdown()
@@ -976,7 +1044,8 @@ cpdef py_void SetGlobalClientCallback(py_string name, object callback):
     if name.startswith("_"):
         name = name[1:]
     if name in ["OnCertificateError", "OnBeforePluginLoad", "OnAfterCreated",
-                "OnAccessibilityTreeChange", "OnAccessibilityLocationChange"]:
+                "OnAccessibilityTreeChange", "OnAccessibilityLocationChange",
+                "OnScheduleMessagePumpWork"]:
         g_globalClientCallbacks[name] = callback
     else:
         raise Exception("SetGlobalClientCallback() failed: "\
@@ -0,0 +1,384 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+# Channels are duplex message streams between Python and javascript
+# running in the main frame of a browser. The renderer side is
+# implemented in subprocess/channel.cpp.
+#
+# Messages are sent in batches using process messages, IPC is ordered
+# so there is no need for reordering. Long strings are split into
+# chunks. The number of batches in flight (not yet acknowledged by
+# the other side) is limited by "window_size", this provides
+# backpressure: Send() returns False when the window is full and
+# OnDrain is called when more messages can be sent.
+#
+# Process messages:
+#   Browser > Renderer:
+#     "ChannelOpen" [name, options, seq]
+#     "ChannelMessage" [name, seq, items]
+#     "ChannelAck" [name, seq, reset]
+#     "ChannelClose" [name]
+#   Renderer > Browser: the same except for "ChannelOpen".
+#
+# Items in a batch are lists [final, payload]. A string split into
+# chunks is sent as a sequence of items with final=False, the last
+# chunk has final=True. Other values are never split.
+#
+# A batch is acknowledged by the receiving side only after it was
+# delivered to the message handler. A "ChannelAck" with reset=True
+# is sent by a renderer that did not know about the channel when
+# "ChannelOpen" was received (eg. a new renderer process after
+# cross-origin navigation), all batches up to seq were lost then.
+
+include "cefpython.pyx"
+include "browser.pyx"
+
+# [browserId][name] = Channel
+cdef dict g_channels = {}
+
+cdef dict g_channelDefaultOptions = {
+    "chunk_size": 65536,
+    "batch_interval": 0,
+    "max_batch_size": 64,
+    "window_size": 8,
+}
+
+cdef Channel GetOrCreateChannel(PyBrowser pyBrowser, py_string name,
+                                dict options=None):
+    cdef int browserId = pyBrowser.GetIdentifier()
+    cdef Channel channel
+    if browserId in g_channels and name in g_channels[browserId]:
+        channel = g_channels[browserId][name]
+        if options:
+            channel.SetOptions(options)
+        return channel
+    channel = Channel()
+    channel.browserId = browserId
+    channel.name = name
+    channel.options = dict(g_channelDefaultOptions)
+    if options:
+        channel.ValidateOptions(options)
+        channel.options.update(options)
+    if browserId not in g_channels:
+        g_channels[browserId] = {}
+    g_channels[browserId][name] = channel
+    channel.SendOpen()
+    Debug("Created channel, browserId=%s, name=%s" % (browserId, name))
+    return channel
+
+cdef Channel GetChannelForMessage(CefRefPtr[CefBrowser] cefBrowser,
+                                  py_string name):
+    # A channel may be opened first from javascript, in such case
+    # it is created here with default options. Renderer already
+    # knows about it, so "ChannelOpen" is not sent.
+    cdef int browserId = cefBrowser.get().GetIdentifier()
+    cdef Channel channel
+    if browserId in g_channels and name in g_channels[browserId]:
+        return g_channels[browserId][name]
+    channel = Channel()
+    channel.browserId = browserId
+    channel.name = name
+    channel.options = dict(g_channelDefaultOptions)
+    if browserId not in g_channels:
+        g_channels[browserId] = {}
+    g_channels[browserId][name] = channel
+    Debug("Created channel from javascript, browserId=%s, name=%s"
+          % (browserId, name))
+    return channel
+
+cdef void RemoveChannel(int browserId, py_string name) except *:
+    if browserId in g_channels and name in g_channels[browserId]:
+        del g_channels[browserId][name]
+        if not g_channels[browserId]:
+            del g_channels[browserId]
+
+cdef void ReopenChannelsForBrowser(int browserId) except *:
+    # Called when V8 context for the main frame was created. Renderer
+    # process might have changed, so channels need to be opened again.
+    cdef Channel channel
+    if browserId not in g_channels:
+        return
+    for channel in g_channels[browserId].values():
+        channel.SendOpen()
+
+cdef void RemoveChannelsForBrowser(int browserId) except *:
+    # Called from LifespanHandler_OnBeforeClose().
+    cdef Channel channel
+    if browserId not in g_channels:
+        return
+    for channel in g_channels[browserId].values():
+        channel.closed = True
+        channel.queue = []
+        channel.incoming = []
+    del g_channels[browserId]
+
+cdef list SplitStringIntoChunks(object data, int chunkSize):
+    # Returns list of items [final, payload]. Strings are split on
+    # characters, so bytes are decoded first.
+    cdef list items = []
+    cdef object chunk
+    cdef int start
+    cdef py_bool isBytes = False
+    if type(data) == bytes:
+        data = data.decode(g_applicationSettings["string_encoding"],
+                           errors=BYTES_DECODE_ERRORS)
+        isBytes = (PY_MAJOR_VERSION < 3)
+    if len(data) <= chunkSize:
+        chunks = [data]
+    else:
+        chunks = [data[start:start + chunkSize]
+                  for start in range(0, len(data), chunkSize)]
+    for index, chunk in enumerate(chunks):
+        if isBytes:
+            chunk = chunk.encode(g_applicationSettings["string_encoding"],
+                                 errors=UNICODE_ENCODE_ERRORS)
+        items.append([index == len(chunks) - 1, chunk])
+    return items
+
+
+cdef class Channel:
+    cdef int browserId
+    cdef py_string name
+    cdef dict options
+    cdef object handler
+    # Page < Python
+    cdef list queue
+    cdef int sendSeq
+    cdef int ackedSeq
+    cdef py_bool flushScheduled
+    cdef py_bool drainPending
+    # Page > Python
+    cdef list incoming
+    cdef list partial
+    cdef py_bool closed
+
+    def __init__(self):
+        self.options = {}
+        self.queue = []
+        self.incoming = []
+        self.partial = []
+
+    cdef void ValidateOptions(self, dict options) except *:
+        for key in options:
+            if key not in g_channelDefaultOptions:
+                raise Exception("Channel: invalid option: %s" % key)
+            if key == "batch_interval":
+                if int(options[key]) < 0:
+                    raise Exception("Channel: option %s must be >= 0" % key)
+            elif int(options[key]) < 1:
+                raise Exception("Channel: option %s must be > 0" % key)
+
+    cdef void SendOpen(self) except *:
+        cdef PyBrowser pyBrowser = GetPyBrowserById(self.browserId)
+        if not pyBrowser:
+            return
+        pyBrowser.SendProcessMessage(
+                cef_types.PID_RENDERER, 0, "ChannelOpen",
+                [self.name, self.options, self.sendSeq])
+
+    cdef py_bool IsBackpressured(self):
+        return bool(self.queue) and (self.sendSeq - self.ackedSeq
+                                     >= self.options["window_size"])
+
+    cpdef py_void SetOptions(self, dict options):
+        self.ValidateOptions(options)
+        self.options.update(options)
+        self.SendOpen()
+
+    cpdef dict GetOptions(self):
+        return dict(self.options)
+
+    cpdef py_string GetName(self):
+        return self.name
+
+    cpdef object GetBrowser(self):
+        return GetPyBrowserById(self.browserId)
+
+    cpdef int GetBufferedAmount(self) except *:
+        return len(self.queue)
+
+    cpdef py_bool IsClosed(self):
+        return self.closed
+
+    cpdef py_void SetHandler(self, object handler):
+        self.handler = handler
+        # Deliver messages that were received while there was
+        # no handler set.
+        cdef list incoming = self.incoming
+        self.incoming = []
+        for seq, items in incoming:
+            self.OnMessage(seq, items)
+
+    cdef object GetCallback(self, str funcName):
+        if self.handler and hasattr(self.handler, funcName) \
+                and callable(getattr(self.handler, funcName)):
+            return getattr(self.handler, funcName)
+
+    cpdef py_bool Send(self, object data):
+        if self.closed:
+            raise Exception("Channel.Send() failed: channel is closed,"
+                            " name=%s" % self.name)
+        if IsString(data):
+            self.queue.extend(SplitStringIntoChunks(
+                    data, self.options["chunk_size"]))
+        else:
+            self.queue.append([True, data])
+        if not self.options["batch_interval"]:
+            self.Flush()
+        elif not self.flushScheduled:
+            self.flushScheduled = True
+            PostDelayedTask(TID_UI, self.options["batch_interval"],
+                            self.Flush)
+        if self.IsBackpressured():
+            self.drainPending = True
+            return False
+        return True
+
+    def Flush(self):
+        cdef PyBrowser pyBrowser
+        cdef list batch
+        cdef int maxBatchSize = self.options["max_batch_size"]
+        self.flushScheduled = False
+        if self.closed:
+            return
+        pyBrowser = GetPyBrowserById(self.browserId)
+        if not pyBrowser:
+            return
+        while self.queue and (self.sendSeq - self.ackedSeq
+                              < self.options["window_size"]):
+            batch = self.queue[:maxBatchSize]
+            del self.queue[:maxBatchSize]
+            self.sendSeq += 1
+            # Main frame id is required for python callbacks that
+            # might be passed in messages.
+            pyBrowser.SendProcessMessage(
+                    cef_types.PID_RENDERER,
+                    pyBrowser.GetMainFrame().GetIdentifier(),
+                    "ChannelMessage", [self.name, self.sendSeq, batch])
+
+    cpdef py_void Close(self):
+        cdef PyBrowser pyBrowser
+        if self.closed:
+            return
+        self.closed = True
+        self.queue = []
+        self.incoming = []
+        RemoveChannel(self.browserId, self.name)
+        pyBrowser = GetPyBrowserById(self.browserId)
+        if pyBrowser:
+            pyBrowser.SendProcessMessage(cef_types.PID_RENDERER, 0,
+                                         "ChannelClose", [self.name])
+
+    cdef void OnAck(self, int seq, py_bool reset) except *:
+        cdef object callback
+        # With reset=True renderer lost batches up to seq, these
+        # won't ever be acknowledged, so treat them the same.
+        if seq > self.ackedSeq:
+            self.ackedSeq = seq
+        self.Flush()
+        if self.drainPending and not self.IsBackpressured():
+            self.drainPending = False
+            callback = self.GetCallback("OnDrain")
+            if callback:
+                callback(channel=self)
+
+    cdef void OnMessage(self, int seq, list items) except *:
+        cdef object callback = self.GetCallback("OnMessage")
+        cdef PyBrowser pyBrowser
+        if not callback:
+            # Not acknowledged until a handler is set, so that
+            # javascript side gets backpressure.
+            self.incoming.append((seq, items))
+            return
+        for final, payload in items:
+            if not final:
+                self.partial.append(payload)
+                continue
+            if self.partial:
+                self.partial.append(payload)
+                payload = "".join(self.partial)
+                self.partial = []
+            # Error in one message doesn't drop the rest of the batch,
+            # otherwise the batch wouldn't be acknowledged and javascript
+            # side would stay backpressured.
+            try:
+                callback(channel=self, message=payload)
+            except:
+                (exc_type, exc_value, exc_trace) = sys.exc_info()
+                sys.excepthook(exc_type, exc_value, exc_trace)
+            if self.closed:
+                return
+        pyBrowser = GetPyBrowserById(self.browserId)
+        if pyBrowser:
+            pyBrowser.SendProcessMessage(cef_types.PID_RENDERER, 0,
+                                         "ChannelAck", [self.name, seq, False])
+
+    cdef void OnRemoteClose(self) except *:
+        cdef object callback
+        self.closed = True
+        self.queue = []
+        RemoveChannel(self.browserId, self.name)
+        callback = self.GetCallback("OnClose")
+        if callback:
+            callback(channel=self)
+
+# -----------------------------------------------------------------------------
+# Called from client_handler/client_handler.cpp
+# -----------------------------------------------------------------------------
+
+cdef public void Channel_OnMessage(
+        CefRefPtr[CefBrowser] cefBrowser,
+        const CefString& cefName,
+        int seq,
+        CefRefPtr[CefListValue] cefItems
+        ) except * with gil:
+    cdef Channel channel
+    try:
+        if IsBrowserClosed(cefBrowser):
+            return
+        channel = GetChannelForMessage(cefBrowser, CefToPyString(cefName))
+        channel.OnMessage(seq, CefListValueToPyList(cefBrowser, cefItems))
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void Channel_OnAck(
+        CefRefPtr[CefBrowser] cefBrowser,
+        const CefString& cefName,
+        int seq,
+        cpp_bool reset
+        ) except * with gil:
+    cdef int browserId
+    cdef py_string name
+    cdef Channel channel
+    try:
+        if IsBrowserClosed(cefBrowser):
+            return
+        browserId = cefBrowser.get().GetIdentifier()
+        name = CefToPyString(cefName)
+        if browserId in g_channels and name in g_channels[browserId]:
+            channel = g_channels[browserId][name]
+            channel.OnAck(seq, reset)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void Channel_OnClose(
+        CefRefPtr[CefBrowser] cefBrowser,
+        const CefString& cefName
+        ) except * with gil:
+    cdef int browserId
+    cdef py_string name
+    cdef Channel channel
+    try:
+        if IsBrowserClosed(cefBrowser):
+            return
+        browserId = cefBrowser.get().GetIdentifier()
+        name = CefToPyString(cefName)
+        if browserId in g_channels and name in g_channels[browserId]:
+            channel = g_channels[browserId][name]
+            channel.OnRemoteClose()
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
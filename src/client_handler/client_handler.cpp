@@ -117,6 +117,64 @@ bool ClientHandler::OnProcessMessageReceived(
                           " messageName=ExecutePythonCallback";
             return false;
         }
+    } else if (messageName == "JavascriptCallbackReply") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 3
+                && arguments->GetType(0) == VTYPE_INT // replyId
+                && arguments->GetType(1) == VTYPE_BOOL // success
+                && arguments->GetType(2) == VTYPE_LIST) { // value
+            JavascriptCallback_OnReply(browser, arguments->GetInt(0),
+                                       arguments->GetBool(1),
+                                       arguments->GetList(2));
+            return true;
+        } else {
+            LOG(ERROR) << "[Browser process] OnProcessMessageReceived():"
+                          " invalid arguments,"
+                          " messageName=JavascriptCallbackReply";
+            return false;
+        }
+    } else if (messageName == "ChannelMessage") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 3
+                && arguments->GetType(0) == VTYPE_STRING // name
+                && arguments->GetType(1) == VTYPE_INT // seq
+                && arguments->GetType(2) == VTYPE_LIST) { // items
+            Channel_OnMessage(browser, arguments->GetString(0),
+                              arguments->GetInt(1), arguments->GetList(2));
+            return true;
+        } else {
+            LOG(ERROR) << "[Browser process] OnProcessMessageReceived():"
+                          " invalid arguments,"
+                          " messageName=ChannelMessage";
+            return false;
+        }
+    } else if (messageName == "ChannelAck") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 3
+                && arguments->GetType(0) == VTYPE_STRING // name
+                && arguments->GetType(1) == VTYPE_INT // seq
+                && arguments->GetType(2) == VTYPE_BOOL) { // reset
+            Channel_OnAck(browser, arguments->GetString(0),
+                          arguments->GetInt(1), arguments->GetBool(2));
+            return true;
+        } else {
+            LOG(ERROR) << "[Browser process] OnProcessMessageReceived():"
+                          " invalid arguments,"
+                          " messageName=ChannelAck";
+            return false;
+        }
+    } else if (messageName == "ChannelClose") {
+        CefRefPtr<CefListValue> arguments = message->GetArgumentList();
+        if (arguments->GetSize() == 1
+                && arguments->GetType(0) == VTYPE_STRING) { // name
+            Channel_OnClose(browser, arguments->GetString(0));
+            return true;
+        } else {
+            LOG(ERROR) << "[Browser process] OnProcessMessageReceived():"
+                          " invalid arguments,"
+                          " messageName=ChannelClose";
+            return false;
+        }
     }
     return false;
 }
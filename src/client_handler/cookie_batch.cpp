@@ -0,0 +1,419 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "cookie_batch.h"
+#include "cookie_cache.h"
+#include <stdio.h>
+#include <map>
+#include <string>
+#include "include/base/cef_bind.h"
+#include "include/wrapper/cef_closure_task.h"
+
+namespace {
+
+const char kCookiesFileMagic[] = "CEFCOOK1";
+const size_t kCookiesFileMagicSize = 8;
+
+// Shares collected cookies with the UI thread task without copying
+class CookieList : public CefBaseRefCounted
+{
+public:
+    CookieVector cookies;
+
+    IMPLEMENT_REFCOUNTING(CookieList);
+};
+
+void DeliverCookies(int batchId, CefRefPtr<CookieList> list) {
+    CookieBatch_OnCookiesCollected(batchId, list->cookies);
+}
+
+void DeliverSetResult(int batchId, int succeeded, int total) {
+    CookieBatch_OnCookiesSet(batchId, succeeded, total);
+}
+
+void DeliverSaveResult(int batchId, int count) {
+    CookieBatch_OnCookiesSaved(batchId, count);
+}
+
+void DeliverError(int batchId, const std::string& error) {
+    CookieBatch_OnFailed(batchId, error);
+}
+
+void SaveCookiesOnFileThread(int batchId, const CefString& path,
+                             CefRefPtr<CookieList> list) {
+    std::string error;
+    if (WriteCookiesFile(path, list->cookies, error)) {
+        CefPostTask(TID_UI, CefCreateClosureTask(base::Bind(
+                &DeliverSaveResult, batchId,
+                static_cast<int>(list->cookies.size()))));
+    } else {
+        CefPostTask(TID_UI, CefCreateClosureTask(base::Bind(
+                &DeliverError, batchId, error)));
+    }
+}
+
+// Counts completed SetCookie calls, called on the IO thread only
+class SetCookiesCounter : public CefSetCookieCallback
+{
+public:
+    SetCookiesCounter(int batchId, int total)
+        : batchId_(batchId),
+          total_(total),
+          completed_(0),
+          succeeded_(0) {
+    }
+
+    virtual void OnComplete(bool success) OVERRIDE {
+        completed_++;
+        if (success) {
+            succeeded_++;
+        }
+        if (completed_ == total_) {
+            CefPostTask(TID_UI, CefCreateClosureTask(base::Bind(
+                    &DeliverSetResult, batchId_, succeeded_, total_)));
+        }
+    }
+
+private:
+    int batchId_;
+    int total_;
+    int completed_;
+    int succeeded_;
+
+    IMPLEMENT_REFCOUNTING(SetCookiesCounter);
+};
+
+void SetCookiesOnIOThread(CefRefPtr<CefCookieManager> manager,
+                          CefRefPtr<CefRequestContext> context, int batchId,
+                          std::vector<CefString> urls,
+                          CefRefPtr<CookieList> list) {
+    const CookieVector& cookies = list->cookies;
+    int total = static_cast<int>(cookies.size());
+    if (!total) {
+        CefPostTask(TID_UI, CefCreateClosureTask(base::Bind(
+                &DeliverSetResult, batchId, 0, 0)));
+        return;
+    }
+    CefRefPtr<SetCookiesCounter> counter = new SetCookiesCounter(batchId,
+                                                                 total);
+    bool cacheEnabled = IsCookieCacheEnabled();
+    for (size_t i = 0; i < cookies.size(); i++) {
+        CefString url = urls[i].empty() ? GetCookieUrl(cookies[i]) : urls[i];
+        CefRefPtr<CefSetCookieCallback> callback = counter.get();
+        if (cacheEnabled) {
+            callback = new CacheSetCookieCallback(manager, context, url,
+                                                  cookies[i], counter.get());
+        }
+        if (!manager->SetCookie(url, cookies[i], callback)) {
+            // Callback is not called for invalid cookies
+            counter->OnComplete(false);
+        }
+    }
+}
+
+void LoadCookiesOnFileThread(CefRefPtr<CefCookieManager> manager,
+                             CefRefPtr<CefRequestContext> context,
+                             int batchId, const CefString& path) {
+    std::string error;
+    CefRefPtr<CookieList> list = new CookieList();
+    if (!ReadCookiesFile(path, list->cookies, error)) {
+        CefPostTask(TID_UI, CefCreateClosureTask(base::Bind(
+                &DeliverError, batchId, error)));
+        return;
+    }
+    std::vector<CefString> urls(list->cookies.size());
+    CefPostTask(TID_IO, CefCreateClosureTask(base::Bind(
+            &SetCookiesOnIOThread, manager, context, batchId, urls,
+            list)));
+}
+
+// Binary writing and reading helpers
+
+void PutUint32(std::string& out, uint32 value) {
+    for (int i = 0; i < 4; i++) {
+        out.push_back(static_cast<char>((value >> (i * 8)) & 0xFF));
+    }
+}
+
+void PutInt64(std::string& out, int64 value) {
+    uint64 bits = static_cast<uint64>(value);
+    for (int i = 0; i < 8; i++) {
+        out.push_back(static_cast<char>((bits >> (i * 8)) & 0xFF));
+    }
+}
+
+void PutString(std::string& out, const std::string& value) {
+    PutUint32(out, static_cast<uint32>(value.size()));
+    out.append(value);
+}
+
+int64 TimeToMicroseconds(const cef_time_t& time) {
+    double doubleTime = 0;
+    if (time.year == 0 || !cef_time_to_doublet(&time, &doubleTime)) {
+        return 0;
+    }
+    return static_cast<int64>(doubleTime * 1000000.0);
+}
+
+void MicrosecondsToTime(int64 value, cef_time_t& time) {
+    if (value) {
+        cef_time_from_doublet(static_cast<double>(value) / 1000000.0,
+                              &time);
+    }
+}
+
+class BinaryReader
+{
+public:
+    explicit BinaryReader(const std::string& data)
+        : data_(data), pos_(0) {
+    }
+    bool GetUint32(uint32& value) {
+        if (data_.size() - pos_ < 4) {
+            return false;
+        }
+        value = 0;
+        for (int i = 0; i < 4; i++) {
+            value |= static_cast<uint32>(
+                    static_cast<unsigned char>(data_[pos_ + i])) << (i * 8);
+        }
+        pos_ += 4;
+        return true;
+    }
+    bool GetInt64(int64& value) {
+        if (data_.size() - pos_ < 8) {
+            return false;
+        }
+        uint64 bits = 0;
+        for (int i = 0; i < 8; i++) {
+            bits |= static_cast<uint64>(
+                    static_cast<unsigned char>(data_[pos_ + i])) << (i * 8);
+        }
+        value = static_cast<int64>(bits);
+        pos_ += 8;
+        return true;
+    }
+    bool GetByte(unsigned char& value) {
+        if (pos_ >= data_.size()) {
+            return false;
+        }
+        value = static_cast<unsigned char>(data_[pos_++]);
+        return true;
+    }
+    bool GetString(std::string& value) {
+        uint32 size;
+        if (!GetUint32(size) || data_.size() - pos_ < size) {
+            return false;
+        }
+        value.assign(data_, pos_, size);
+        pos_ += size;
+        return true;
+    }
+    bool Skip(size_t size) {
+        if (data_.size() - pos_ < size) {
+            return false;
+        }
+        pos_ += size;
+        return true;
+    }
+
+private:
+    const std::string& data_;
+    size_t pos_;
+};
+
+FILE* OpenCookiesFile(const CefString& path, const char* mode) {
+#if defined(OS_WIN)
+    return _wfopen(path.ToWString().c_str(),
+                   CefString(mode).ToWString().c_str());
+#else
+    return fopen(path.ToString().c_str(), mode);
+#endif
+}
+
+}  // namespace
+
+CollectCookiesVisitor::CollectCookiesVisitor(int batchId,
+                                             const CefString& savePath)
+    : batchId_(batchId),
+      savePath_(savePath) {
+}
+
+CollectCookiesVisitor::~CollectCookiesVisitor() {
+    CefRefPtr<CookieList> list = new CookieList();
+    list->cookies.swap(cookies_);
+    if (savePath_.empty()) {
+        CefPostTask(TID_UI, CefCreateClosureTask(base::Bind(
+                &DeliverCookies, batchId_, list)));
+    } else {
+        CefPostTask(TID_FILE, CefCreateClosureTask(base::Bind(
+                &SaveCookiesOnFileThread, batchId_, savePath_, list)));
+    }
+}
+
+bool CollectCookiesVisitor::Visit(const CefCookie& cookie, int count,
+                                  int total, bool& deleteCookie) {
+    if (cookies_.empty() && total > 0) {
+        cookies_.reserve(total);
+    }
+    cookies_.push_back(cookie);
+    return true;
+}
+
+void SetCookiesBatch(CefRefPtr<CefCookieManager> manager,
+                     CefRefPtr<CefRequestContext> context, int batchId,
+                     const std::vector<CefString>& urls,
+                     const CookieVector& cookies) {
+    CefRefPtr<CookieList> list = new CookieList();
+    list->cookies = cookies;
+    CefPostTask(TID_IO, CefCreateClosureTask(base::Bind(
+            &SetCookiesOnIOThread, manager, context, batchId, urls, list)));
+}
+
+void LoadCookiesBatch(CefRefPtr<CefCookieManager> manager,
+                      CefRefPtr<CefRequestContext> context, int batchId,
+                      const CefString& path) {
+    CefPostTask(TID_FILE, CefCreateClosureTask(base::Bind(
+            &LoadCookiesOnFileThread, manager, context, batchId, path)));
+}
+
+bool WriteCookiesFile(const CefString& path, const CookieVector& cookies,
+                      std::string& error) {
+    // String table for names, domains and paths
+    std::map<std::string, uint32> stringIndexes;
+    std::vector<const std::string*> strings;
+    std::string records;
+    for (size_t i = 0; i < cookies.size(); i++) {
+        const CefCookie& cookie = cookies[i];
+        const cef_string_t* fields[] = {&cookie.name, &cookie.domain,
+                                        &cookie.path};
+        for (int j = 0; j < 3; j++) {
+            std::string value = CefString(fields[j]).ToString();
+            std::map<std::string, uint32>::iterator it =
+                    stringIndexes.find(value);
+            if (it == stringIndexes.end()) {
+                it = stringIndexes.insert(std::make_pair(
+                        value, static_cast<uint32>(strings.size()))).first;
+                strings.push_back(&it->first);
+            }
+            PutUint32(records, it->second);
+        }
+        PutString(records, CefString(&cookie.value).ToString());
+        unsigned char flags = (cookie.secure ? 1 : 0)
+                              | (cookie.httponly ? 2 : 0)
+                              | (cookie.has_expires ? 4 : 0);
+        records.push_back(static_cast<char>(flags));
+        PutInt64(records, TimeToMicroseconds(cookie.creation));
+        PutInt64(records, TimeToMicroseconds(cookie.last_access));
+        PutInt64(records, TimeToMicroseconds(cookie.expires));
+    }
+    std::string data(kCookiesFileMagic, kCookiesFileMagicSize);
+    PutUint32(data, static_cast<uint32>(strings.size()));
+    for (size_t i = 0; i < strings.size(); i++) {
+        PutString(data, *strings[i]);
+    }
+    PutUint32(data, static_cast<uint32>(cookies.size()));
+    data.append(records);
+
+    FILE* file = OpenCookiesFile(path, "wb");
+    if (!file) {
+        error = "Cannot open file for writing: " + path.ToString();
+        return false;
+    }
+    bool ok = fwrite(data.data(), 1, data.size(), file) == data.size();
+    if (fclose(file) != 0) {
+        ok = false;
+    }
+    if (!ok) {
+        error = "Cannot write file: " + path.ToString();
+    }
+    return ok;
+}
+
+bool ReadCookiesFile(const CefString& path, CookieVector& cookies,
+                     std::string& error) {
+    FILE* file = OpenCookiesFile(path, "rb");
+    if (!file) {
+        error = "Cannot open file: " + path.ToString();
+        return false;
+    }
+    std::string data;
+    char buffer[64 * 1024];
+    size_t read;
+    while ((read = fread(buffer, 1, sizeof(buffer), file)) > 0) {
+        data.append(buffer, read);
+    }
+    fclose(file);
+
+    error = "Invalid cookies file: " + path.ToString();
+    if (data.compare(0, kCookiesFileMagicSize, kCookiesFileMagic) != 0) {
+        return false;
+    }
+    BinaryReader reader(data);
+    reader.Skip(kCookiesFileMagicSize);
+    uint32 stringCount;
+    if (!reader.GetUint32(stringCount)) {
+        return false;
+    }
+    std::vector<std::string> strings;
+    for (uint32 i = 0; i < stringCount; i++) {
+        std::string value;
+        if (!reader.GetString(value)) {
+            return false;
+        }
+        strings.push_back(value);
+    }
+    uint32 cookieCount;
+    if (!reader.GetUint32(cookieCount)) {
+        return false;
+    }
+    for (uint32 i = 0; i < cookieCount; i++) {
+        uint32 indexes[3];
+        std::string value;
+        unsigned char flags;
+        int64 times[3];
+        for (int j = 0; j < 3; j++) {
+            if (!reader.GetUint32(indexes[j])
+                    || indexes[j] >= strings.size()) {
+                return false;
+            }
+        }
+        if (!reader.GetString(value) || !reader.GetByte(flags)) {
+            return false;
+        }
+        for (int j = 0; j < 3; j++) {
+            if (!reader.GetInt64(times[j])) {
+                return false;
+            }
+        }
+        CefCookie cookie;
+        CefString(&cookie.name) = strings[indexes[0]];
+        CefString(&cookie.domain) = strings[indexes[1]];
+        CefString(&cookie.path) = strings[indexes[2]];
+        CefString(&cookie.value) = value;
+        cookie.secure = (flags & 1) != 0;
+        cookie.httponly = (flags & 2) != 0;
+        cookie.has_expires = (flags & 4) != 0;
+        MicrosecondsToTime(times[0], cookie.creation);
+        MicrosecondsToTime(times[1], cookie.last_access);
+        MicrosecondsToTime(times[2], cookie.expires);
+        cookies.push_back(cookie);
+    }
+    error.clear();
+    return true;
+}
+
+CefString GetCookieUrl(const CefCookie& cookie) {
+    std::string domain = CefString(&cookie.domain).ToString();
+    std::string path = CefString(&cookie.path).ToString();
+    if (!domain.empty() && domain[0] == '.') {
+        domain.erase(0, 1);
+    }
+    if (path.empty() || path[0] != '/') {
+        path.insert(0, "/");
+    }
+    std::string url = cookie.secure ? "https://" : "http://";
+    url.append(domain).append(path);
+    return url;
+}
@@ -0,0 +1,76 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// Bulk cookie operations for PyCookieManager.GetAllCookies() and
+// SetCookies() (see cookie.pyx). Cookies are collected and set on the
+// IO thread without calling into Python, results are passed to Python
+// once per batch on the UI thread.
+
+#pragma once
+
+#include <string>
+#include <vector>
+#include "common/cefpython_public_api.h"
+#include "include/cef_cookie.h"
+#include "include/cef_request_context.h"
+
+typedef std::vector<CefCookie> CookieVector;
+
+// Collects cookies into a vector. When visiting is done, or when there
+// were no cookies to visit, cookies are passed to
+// CookieBatch_OnCookiesCollected on the UI thread. When |savePath| is
+// set cookies are written to that file on the FILE thread instead and
+// CookieBatch_OnCookiesSaved is called.
+class CollectCookiesVisitor : public CefCookieVisitor
+{
+public:
+    explicit CollectCookiesVisitor(int batchId,
+                                   const CefString& savePath = CefString());
+    virtual ~CollectCookiesVisitor();
+
+    virtual bool Visit(const CefCookie& cookie, int count, int total,
+                       bool& deleteCookie) OVERRIDE;
+
+private:
+    int batchId_;
+    CefString savePath_;
+    CookieVector cookies_;
+
+    IMPLEMENT_REFCOUNTING(CollectCookiesVisitor);
+};
+
+// Sets cookies on the IO thread and calls CookieBatch_OnCookiesSet
+// on the UI thread when all cookies were set. |urls| must have the
+// same size as |cookies|, an empty url is built from the cookie's
+// domain, path and secure flag. |context| is passed to the cookie
+// cache hooks, see cookie_cache.h.
+void SetCookiesBatch(CefRefPtr<CefCookieManager> manager,
+                     CefRefPtr<CefRequestContext> context, int batchId,
+                     const std::vector<CefString>& urls,
+                     const CookieVector& cookies);
+
+// Reads cookies from a file written by CollectCookiesVisitor on the
+// FILE thread and sets them the same way as SetCookiesBatch.
+void LoadCookiesBatch(CefRefPtr<CefCookieManager> manager,
+                      CefRefPtr<CefRequestContext> context, int batchId,
+                      const CefString& path);
+
+// Cookies file format, all integers are little-endian:
+//   "CEFCOOK1"
+//   uint32 string count, strings: uint32 length, UTF-8 bytes
+//   uint32 cookie count, cookies:
+//     uint32 name, domain and path indexes in the string table
+//     uint32 value length, UTF-8 bytes
+//     uint8 flags: 1 secure, 2 httponly, 4 has_expires
+//     int64 creation, last access and expires time in microseconds
+//           since epoch, 0 when not set
+// Names, domains and paths repeat a lot and are stored only once.
+bool WriteCookiesFile(const CefString& path, const CookieVector& cookies,
+                      std::string& error);
+bool ReadCookiesFile(const CefString& path, CookieVector& cookies,
+                     std::string& error);
+
+// Url for setting a cookie, e.g. "https://example.com/path" for
+// a secure cookie with domain ".example.com".
+CefString GetCookieUrl(const CefCookie& cookie);
@@ -0,0 +1,528 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "cookie_cache.h"
+#include <ctype.h>
+#include <algorithm>
+#include <map>
+#include <string>
+#include <utility>
+#include "common/cefpython_public_api.h"
+#include "request_context_handler.h"
+#include "include/base/cef_bind.h"
+#include "include/base/cef_lock.h"
+#include "include/cef_parser.h"
+#include "include/wrapper/cef_closure_task.h"
+
+namespace {
+
+struct CachedCookie {
+    CefCookie cookie;
+    double expires;  // 0 for session cookies
+};
+
+// Cookies of a domain keyed by path and name
+typedef std::pair<std::string, std::string> CookieKey;
+typedef std::map<CookieKey, CachedCookie> PathCookies;
+// Domain cookies are stored under ".example.com", host-only cookies
+// under "example.com", the same as in CefCookie.domain.
+typedef std::map<std::string, PathCookies> DomainCookies;
+
+struct CookieUrl {
+    bool secure;
+    std::string host;
+    std::string path;
+};
+
+enum CookieChangeType {
+    COOKIE_CHANGE_SET,
+    COOKIE_CHANGE_DELETE,
+    COOKIE_CHANGE_CLEAR
+};
+
+struct CookieChange {
+    int type;
+    CefCookie cookie;  // COOKIE_CHANGE_SET
+    CookieUrl url;     // COOKIE_CHANGE_DELETE
+    std::string name;  // COOKIE_CHANGE_DELETE
+};
+
+base::Lock g_cookieCacheLock;
+bool g_cookieCacheEnabled = false;
+bool g_cookieCacheReady = false;
+// Incremented each time priming starts or the cache is disabled, so
+// that a superseded priming visitor doesn't overwrite cookies.
+int g_cookieCacheGeneration = 0;
+CefRefPtr<CefCookieManager> g_cookieCacheManager;
+// Context whose default cookie manager is g_cookieCacheManager, NULL
+// when not known. Cookie manager objects returned by CEF are wrappers
+// created on each call, contexts that share storage are compared
+// instead.
+CefRefPtr<CefRequestContext> g_cookieCacheContext;
+DomainCookies g_cachedCookies;
+// Changes made while priming, replayed on the visited cookies
+std::vector<CookieChange> g_cookieCacheChanges;
+
+double GetTimeNow() {
+    CefTime now;
+    now.Now();
+    return now.GetDoubleT();
+}
+
+bool ParseCookieUrl(const CefString& url, CookieUrl& cookieUrl) {
+    CefURLParts parts;
+    if (!CefParseURL(url, parts)) {
+        return false;
+    }
+    std::string scheme = CefString(&parts.scheme).ToString();
+    cookieUrl.secure = (scheme == "https" || scheme == "wss");
+    cookieUrl.host = CefString(&parts.host).ToString();
+    cookieUrl.path = CefString(&parts.path).ToString();
+    if (cookieUrl.path.empty()) {
+        cookieUrl.path = "/";
+    }
+    return !cookieUrl.host.empty();
+}
+
+// Path of a cookie set without a path, the directory of the url path
+std::string GetDefaultCookiePath(const std::string& path) {
+    size_t pos = path.rfind('/');
+    if (pos == std::string::npos || pos == 0) {
+        return "/";
+    }
+    return path.substr(0, pos);
+}
+
+bool IsCookiePathMatch(const std::string& cookiePath,
+                       const std::string& path) {
+    if (path.compare(0, cookiePath.size(), cookiePath) != 0) {
+        return false;
+    }
+    if (cookiePath.empty() || path.size() == cookiePath.size()) {
+        return true;
+    }
+    return (cookiePath[cookiePath.size() - 1] == '/'
+            || path[cookiePath.size()] == '/');
+}
+
+// Keys of cookies that may be sent to |host|: "a.example.com" for
+// host-only cookies and ".a.example.com", ".example.com", ".com" for
+// domain cookies.
+void GetCookieDomains(const std::string& host,
+                      std::vector<std::string>& domains) {
+    domains.push_back(host);
+    size_t pos = 0;
+    while (pos != std::string::npos) {
+        domains.push_back("." + host.substr(pos));
+        pos = host.find('.', pos);
+        if (pos != std::string::npos) {
+            pos++;
+        }
+    }
+}
+
+void PutCookie(DomainCookies& cookies, const CefCookie& cookie,
+               double now) {
+    std::string domain = CefString(&cookie.domain).ToString();
+    CookieKey key(CefString(&cookie.path).ToString(),
+                  CefString(&cookie.name).ToString());
+    double expires = 0;
+    if (cookie.has_expires) {
+        expires = CefTime(cookie.expires).GetDoubleT();
+    }
+    if (expires && expires <= now) {
+        // Cookies are deleted by setting an expiry date in the past
+        DomainCookies::iterator it = cookies.find(domain);
+        if (it != cookies.end()) {
+            it->second.erase(key);
+            if (it->second.empty()) {
+                cookies.erase(it);
+            }
+        }
+        return;
+    }
+    CachedCookie& cached = cookies[domain][key];
+    cached.cookie = cookie;
+    cached.expires = expires;
+}
+
+void DeleteCookies(DomainCookies& cookies, const CookieUrl& url,
+                   const std::string& name) {
+    if (name.empty()) {
+        // Host cookies irrespective of path, but not domain cookies
+        cookies.erase(url.host);
+        return;
+    }
+    std::vector<std::string> domains;
+    GetCookieDomains(url.host, domains);
+    for (size_t i = 0; i < domains.size(); i++) {
+        DomainCookies::iterator it = cookies.find(domains[i]);
+        if (it == cookies.end()) {
+            continue;
+        }
+        PathCookies& pathCookies = it->second;
+        for (PathCookies::iterator cookieIt = pathCookies.begin();
+                cookieIt != pathCookies.end();) {
+            if (cookieIt->first.second == name
+                    && IsCookiePathMatch(cookieIt->first.first, url.path)) {
+                pathCookies.erase(cookieIt++);
+            } else {
+                ++cookieIt;
+            }
+        }
+        if (pathCookies.empty()) {
+            cookies.erase(it);
+        }
+    }
+}
+
+void ApplyCookieChange(DomainCookies& cookies, const CookieChange& change,
+                       double now) {
+    switch (change.type) {
+        case COOKIE_CHANGE_SET:
+            PutCookie(cookies, change.cookie, now);
+            break;
+        case COOKIE_CHANGE_DELETE:
+            DeleteCookies(cookies, change.url, change.name);
+            break;
+        case COOKIE_CHANGE_CLEAR:
+            cookies.clear();
+            break;
+    }
+}
+
+// The change is ignored unless |manager| is the cached cookie manager
+// or |context| shares storage with the context of the cached cookie
+// manager. |context| is set only when |manager| is NULL or is the
+// default cookie manager of |context|.
+void RecordCookieChange(const CookieChange& change,
+                        CefRefPtr<CefCookieManager> manager,
+                        CefRefPtr<CefRequestContext> context) {
+    base::AutoLock lock_scope(g_cookieCacheLock);
+    if (!g_cookieCacheEnabled) {
+        return;
+    }
+    if (!manager.get() || manager.get() != g_cookieCacheManager.get()) {
+        if (!context.get() || !g_cookieCacheContext.get()
+                || !context->IsSharingWith(g_cookieCacheContext)) {
+            return;
+        }
+    }
+    ApplyCookieChange(g_cachedCookies, change, GetTimeNow());
+    if (!g_cookieCacheReady) {
+        g_cookieCacheChanges.push_back(change);
+    }
+}
+
+int CountCookies(const DomainCookies& cookies) {
+    size_t count = 0;
+    for (DomainCookies::const_iterator it = cookies.begin();
+            it != cookies.end(); ++it) {
+        count += it->second.size();
+    }
+    return static_cast<int>(count);
+}
+
+bool IsLongerCookiePath(const CefCookie& a, const CefCookie& b) {
+    return a.path.length > b.path.length;
+}
+
+void DeliverPrimeResult(int primeId, int count) {
+    CookieCache_OnPrimed(primeId, count);
+}
+
+// Collects all cookies and replaces cached cookies with them when
+// visiting is done, or when there were no cookies to visit.
+class PrimeCookieCacheVisitor : public CefCookieVisitor
+{
+public:
+    PrimeCookieCacheVisitor(int generation, int primeId)
+        : generation_(generation),
+          primeId_(primeId),
+          canceled_(false) {
+    }
+
+    virtual ~PrimeCookieCacheVisitor() {
+        if (canceled_) {
+            return;
+        }
+        int count = -1;
+        {
+            base::AutoLock lock_scope(g_cookieCacheLock);
+            if (g_cookieCacheEnabled
+                    && generation_ == g_cookieCacheGeneration) {
+                double now = GetTimeNow();
+                DomainCookies cookies;
+                for (size_t i = 0; i < cookies_.size(); i++) {
+                    PutCookie(cookies, cookies_[i], now);
+                }
+                for (size_t i = 0; i < g_cookieCacheChanges.size(); i++) {
+                    ApplyCookieChange(cookies, g_cookieCacheChanges[i],
+                                      now);
+                }
+                g_cachedCookies.swap(cookies);
+                g_cookieCacheChanges.clear();
+                g_cookieCacheReady = true;
+                count = CountCookies(g_cachedCookies);
+            }
+        }
+        CefPostTask(TID_UI, CefCreateClosureTask(base::Bind(
+                &DeliverPrimeResult, primeId_, count)));
+    }
+
+    virtual bool Visit(const CefCookie& cookie, int count, int total,
+                       bool& deleteCookie) OVERRIDE {
+        cookies_.push_back(cookie);
+        return true;
+    }
+
+    void Cancel() {
+        canceled_ = true;
+    }
+
+private:
+    int generation_;
+    int primeId_;
+    bool canceled_;
+    std::vector<CefCookie> cookies_;
+
+    IMPLEMENT_REFCOUNTING(PrimeCookieCacheVisitor);
+};
+
+bool PrimeCookieCache(int primeId) {
+    CefRefPtr<CefCookieManager> manager;
+    int generation;
+    {
+        base::AutoLock lock_scope(g_cookieCacheLock);
+        generation = ++g_cookieCacheGeneration;
+        g_cookieCacheReady = false;
+        g_cookieCacheChanges.clear();
+        manager = g_cookieCacheManager;
+    }
+    CefRefPtr<PrimeCookieCacheVisitor> visitor =
+            new PrimeCookieCacheVisitor(generation, primeId);
+    if (!manager.get() || !manager->VisitAllCookies(visitor.get())) {
+        visitor->Cancel();
+        base::AutoLock lock_scope(g_cookieCacheLock);
+        if (generation == g_cookieCacheGeneration) {
+            // Keep using current entries
+            g_cookieCacheReady = true;
+            g_cookieCacheChanges.clear();
+        }
+        return false;
+    }
+    return true;
+}
+
+}  // namespace
+
+bool EnableCookieCache(CefRefPtr<CefCookieManager> manager,
+                       CefRefPtr<CefRequestContext> context, int primeId) {
+    {
+        base::AutoLock lock_scope(g_cookieCacheLock);
+        g_cookieCacheEnabled = true;
+        g_cookieCacheManager = manager;
+        g_cookieCacheContext = context;
+        g_cachedCookies.clear();
+    }
+    if (!PrimeCookieCache(primeId)) {
+        DisableCookieCache();
+        return false;
+    }
+    return true;
+}
+
+void DisableCookieCache() {
+    base::AutoLock lock_scope(g_cookieCacheLock);
+    g_cookieCacheEnabled = false;
+    g_cookieCacheReady = false;
+    g_cookieCacheGeneration++;
+    g_cookieCacheManager = NULL;
+    g_cookieCacheContext = NULL;
+    g_cachedCookies.clear();
+    g_cookieCacheChanges.clear();
+}
+
+bool IsCookieCacheEnabled() {
+    base::AutoLock lock_scope(g_cookieCacheLock);
+    return g_cookieCacheEnabled;
+}
+
+bool IsCookieCacheReady() {
+    base::AutoLock lock_scope(g_cookieCacheLock);
+    return g_cookieCacheEnabled && g_cookieCacheReady;
+}
+
+bool RefreshCookieCache(int primeId) {
+    if (!IsCookieCacheEnabled()) {
+        return false;
+    }
+    return PrimeCookieCache(primeId);
+}
+
+int GetCookieCacheSize() {
+    base::AutoLock lock_scope(g_cookieCacheLock);
+    return CountCookies(g_cachedCookies);
+}
+
+void GetCachedCookies(const CefString& url, const CefString& name,
+                      bool includeHttpOnly, std::vector<CefCookie>& cookies) {
+    CookieUrl cookieUrl;
+    if (!ParseCookieUrl(url, cookieUrl)) {
+        return;
+    }
+    std::string nameString = name.ToString();
+    std::vector<std::string> domains;
+    GetCookieDomains(cookieUrl.host, domains);
+    double now = GetTimeNow();
+    {
+        base::AutoLock lock_scope(g_cookieCacheLock);
+        if (!g_cookieCacheEnabled) {
+            return;
+        }
+        for (size_t i = 0; i < domains.size(); i++) {
+            DomainCookies::const_iterator it =
+                    g_cachedCookies.find(domains[i]);
+            if (it == g_cachedCookies.end()) {
+                continue;
+            }
+            const PathCookies& pathCookies = it->second;
+            for (PathCookies::const_iterator cookieIt = pathCookies.begin();
+                    cookieIt != pathCookies.end(); ++cookieIt) {
+                const CachedCookie& cached = cookieIt->second;
+                if (!nameString.empty()
+                        && cookieIt->first.second != nameString) {
+                    continue;
+                }
+                if ((cached.expires && cached.expires <= now)
+                        || (cached.cookie.secure && !cookieUrl.secure)
+                        || (cached.cookie.httponly && !includeHttpOnly)
+                        || !IsCookiePathMatch(cookieIt->first.first,
+                                              cookieUrl.path)) {
+                    continue;
+                }
+                cookies.push_back(cached.cookie);
+            }
+        }
+    }
+    std::stable_sort(cookies.begin(), cookies.end(), IsLongerCookiePath);
+}
+
+void CookieCacheOnCookieSet(CefRefPtr<CefBrowser> browser,
+                            const CefCookie& cookie) {
+    if (!browser.get()) {
+        // Cookie manager is not known
+        return;
+    }
+    CefRefPtr<CefRequestContext> context =
+            browser->GetHost()->GetRequestContext();
+    if (!context.get()) {
+        return;
+    }
+    // Browsers created with a RequestContextHandler store cookies in
+    // the manager returned by RequestHandler.GetCookieManager(), or
+    // in the context's default manager when it returned None.
+    CefRefPtr<CefCookieManager> manager;
+    CefRefPtr<CefRequestContextHandler> handler = context->GetHandler();
+    if (handler.get()) {
+        manager = static_cast<RequestContextHandler*>(handler.get())
+                ->GetLastCookieManager();
+    }
+    CookieChange change;
+    change.type = COOKIE_CHANGE_SET;
+    change.cookie = cookie;
+    if (manager.get()) {
+        RecordCookieChange(change, manager, NULL);
+    } else {
+        RecordCookieChange(change, NULL, context);
+    }
+}
+
+void CookieCacheOnSetCookie(CefRefPtr<CefCookieManager> manager,
+                            CefRefPtr<CefRequestContext> context,
+                            const CefString& url, const CefCookie& cookie) {
+    CookieUrl cookieUrl;
+    if (!manager.get() || !ParseCookieUrl(url, cookieUrl)) {
+        return;
+    }
+    CookieChange change;
+    change.type = COOKIE_CHANGE_SET;
+    change.cookie = cookie;
+    std::string domain = CefString(&cookie.domain).ToString();
+    std::transform(domain.begin(), domain.end(), domain.begin(), ::tolower);
+    if (domain.empty()) {
+        // Host-only cookie
+        CefString(&change.cookie.domain).FromString(cookieUrl.host);
+    } else if (domain[0] != '.') {
+        CefString(&change.cookie.domain).FromString("." + domain);
+    } else {
+        CefString(&change.cookie.domain).FromString(domain);
+    }
+    if (!cookie.path.length) {
+        CefString(&change.cookie.path).FromString(
+                GetDefaultCookiePath(cookieUrl.path));
+    }
+    RecordCookieChange(change, manager, context);
+}
+
+void CookieCacheOnDeleteCookies(CefRefPtr<CefCookieManager> manager,
+                                CefRefPtr<CefRequestContext> context,
+                                const CefString& url,
+                                const CefString& name) {
+    if (!manager.get()) {
+        return;
+    }
+    CookieChange change;
+    if (url.empty()) {
+        // All cookies are deleted
+        change.type = COOKIE_CHANGE_CLEAR;
+    } else {
+        change.type = COOKIE_CHANGE_DELETE;
+        if (!ParseCookieUrl(url, change.url)) {
+            return;
+        }
+        change.name = name.ToString();
+    }
+    RecordCookieChange(change, manager, context);
+}
+
+CacheSetCookieCallback::CacheSetCookieCallback(
+        CefRefPtr<CefCookieManager> manager,
+        CefRefPtr<CefRequestContext> context,
+        const CefString& url, const CefCookie& cookie,
+        CefRefPtr<CefSetCookieCallback> next)
+    : manager_(manager),
+      context_(context),
+      url_(url),
+      cookie_(cookie),
+      next_(next) {
+}
+
+void CacheSetCookieCallback::OnComplete(bool success) {
+    if (success) {
+        CookieCacheOnSetCookie(manager_, context_, url_, cookie_);
+    }
+    if (next_.get()) {
+        next_->OnComplete(success);
+    }
+}
+
+CacheDeleteCookiesCallback::CacheDeleteCookiesCallback(
+        CefRefPtr<CefCookieManager> manager,
+        CefRefPtr<CefRequestContext> context,
+        const CefString& url, const CefString& name,
+        CefRefPtr<CefDeleteCookiesCallback> next)
+    : manager_(manager),
+      context_(context),
+      url_(url),
+      name_(name),
+      next_(next) {
+}
+
+void CacheDeleteCookiesCallback::OnComplete(int num_deleted) {
+    CookieCacheOnDeleteCookies(manager_, context_, url_, name_);
+    if (next_.get()) {
+        next_->OnComplete(num_deleted);
+    }
+}
@@ -0,0 +1,115 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// In-process copy of the cookies of a single cookie manager that
+// answers lookups synchronously, see cookie_cache.pyx. The cache is
+// primed by visiting all cookies once and is then updated
+// incrementally by these hooks:
+//   RequestHandler::CanSetCookie     cookies set by responses
+//   ResourceHandler::CanSetCookie    cookies set by resource handlers
+//   CookieManager.SetCookie(), SetCookies(), LoadCookies() and
+//   DeleteCookies() when called on the cached cookie manager
+// Hooks ignore cookies of other cookie managers, e.g. of browsers
+// created with a different request context.
+// Cookies set by javascript (document.cookie) are not reported by CEF,
+// they are picked up by RefreshCookieCache().
+//
+// Cookies are indexed by domain and then by path and name. A lookup
+// visits only the host and its parent domains, so its cost doesn't
+// depend on the total number of cookies. All functions can be called
+// on any thread.
+
+#pragma once
+
+#include <vector>
+#include "include/cef_browser.h"
+#include "include/cef_cookie.h"
+#include "include/cef_request_context.h"
+
+// Clears the cache and visits all cookies of |manager|. When visiting
+// is done CookieCache_OnPrimed(primeId, count) is called on the UI
+// thread, count is -1 when priming was superseded by another call to
+// EnableCookieCache, RefreshCookieCache or DisableCookieCache. Returns
+// false when cookies cannot be accessed, the cache is disabled then.
+// |context| is the request context whose default cookie manager is
+// |manager|, or NULL when not known. Changes of cookie managers of
+// other contexts that share storage with it are cached too.
+bool EnableCookieCache(CefRefPtr<CefCookieManager> manager,
+                       CefRefPtr<CefRequestContext> context, int primeId);
+void DisableCookieCache();
+bool IsCookieCacheEnabled();
+// False while the cache is being primed.
+bool IsCookieCacheReady();
+// Visits all cookies again. Current entries are used for lookups until
+// visiting is done, changes made in the meantime are replayed on the
+// new entries.
+bool RefreshCookieCache(int primeId);
+int GetCookieCacheSize();
+
+// Cookies that would be sent with a request to |url|, longest path
+// first. When |name| is not empty only cookies with that name.
+void GetCachedCookies(const CefString& url, const CefString& name,
+                      bool includeHttpOnly, std::vector<CefCookie>& cookies);
+
+// Hooks. Domain and path of |cookie| are expected to be set. The
+// cookie manager is looked up from the request context of |browser|,
+// ignored when |browser| is NULL.
+void CookieCacheOnCookieSet(CefRefPtr<CefBrowser> browser,
+                            const CefCookie& cookie);
+// Domain and path are computed from |url| when not set, the same way
+// as CefCookieManager::SetCookie does. Ignored when |manager| is not
+// the cached cookie manager. |context| is the same as for
+// EnableCookieCache.
+void CookieCacheOnSetCookie(CefRefPtr<CefCookieManager> manager,
+                            CefRefPtr<CefRequestContext> context,
+                            const CefString& url, const CefCookie& cookie);
+void CookieCacheOnDeleteCookies(CefRefPtr<CefCookieManager> manager,
+                                CefRefPtr<CefRequestContext> context,
+                                const CefString& url,
+                                const CefString& name);
+
+// Callbacks for CefCookieManager::SetCookie() and DeleteCookies() that
+// call the hooks above when CEF completed the operation, so that the
+// cache is updated in the same order as the cookie store and a cookie
+// that CEF rejected is not cached. The result is passed to |next|,
+// which may be NULL.
+class CacheSetCookieCallback : public CefSetCookieCallback
+{
+public:
+    CacheSetCookieCallback(CefRefPtr<CefCookieManager> manager,
+                           CefRefPtr<CefRequestContext> context,
+                           const CefString& url, const CefCookie& cookie,
+                           CefRefPtr<CefSetCookieCallback> next);
+
+    virtual void OnComplete(bool success) OVERRIDE;
+
+private:
+    CefRefPtr<CefCookieManager> manager_;
+    CefRefPtr<CefRequestContext> context_;
+    CefString url_;
+    CefCookie cookie_;
+    CefRefPtr<CefSetCookieCallback> next_;
+
+    IMPLEMENT_REFCOUNTING(CacheSetCookieCallback);
+};
+
+class CacheDeleteCookiesCallback : public CefDeleteCookiesCallback
+{
+public:
+    CacheDeleteCookiesCallback(CefRefPtr<CefCookieManager> manager,
+                               CefRefPtr<CefRequestContext> context,
+                               const CefString& url, const CefString& name,
+                               CefRefPtr<CefDeleteCookiesCallback> next);
+
+    virtual void OnComplete(int num_deleted) OVERRIDE;
+
+private:
+    CefRefPtr<CefCookieManager> manager_;
+    CefRefPtr<CefRequestContext> context_;
+    CefString url_;
+    CefString name_;
+    CefRefPtr<CefDeleteCookiesCallback> next_;
+
+    IMPLEMENT_REFCOUNTING(CacheDeleteCookiesCallback);
+};
@@ -0,0 +1,221 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "cookie_policy.h"
+#include <ctype.h>
+#include <algorithm>
+#include <map>
+#include "include/base/cef_lock.h"
+
+namespace {
+
+// Verdicts indexed by CookiePolicyParty, -1 when not set
+struct CookieDomainRule {
+    int verdicts[3];
+};
+
+typedef std::map<std::string, CookieDomainRule> CookieDomainRules;
+
+base::Lock g_cookiePolicyLock;
+CookieDomainRules g_cookiePolicyRules;
+int g_cookiePolicyRulesCount = 0;
+int g_cookiePolicyThirdPartyVerdict = REQUEST_FILTER_DEFER;
+int g_cookiePolicyDefaultVerdict = REQUEST_FILTER_DEFER;
+int64 g_cookiePolicyAllowed = 0;
+int64 g_cookiePolicyBlocked = 0;
+int64 g_cookiePolicyDeferred = 0;
+
+bool IsValidVerdict(int verdict) {
+    return (verdict == REQUEST_FILTER_DEFER
+            || verdict == REQUEST_FILTER_ALLOW
+            || verdict == REQUEST_FILTER_BLOCK);
+}
+
+bool IsValidParty(int party) {
+    return (party == COOKIE_PARTY_ANY || party == COOKIE_PARTY_FIRST
+            || party == COOKIE_PARTY_THIRD);
+}
+
+// Lower case domain without the leading dot of domain cookies
+std::string NormalizeDomain(const std::string& domain) {
+    std::string result = domain;
+    std::transform(result.begin(), result.end(), result.begin(), ::tolower);
+    if (!result.empty() && result[0] == '.') {
+        result.erase(0, 1);
+    }
+    return result;
+}
+
+// Called with g_cookiePolicyLock held.
+int MatchCookieRules(const std::string& domain, int party) {
+    size_t pos = 0;
+    while (pos != std::string::npos) {
+        CookieDomainRules::const_iterator it =
+                g_cookiePolicyRules.find(domain.substr(pos));
+        if (it != g_cookiePolicyRules.end()) {
+            const CookieDomainRule& rule = it->second;
+            if (party != COOKIE_PARTY_ANY && rule.verdicts[party] != -1) {
+                return rule.verdicts[party];
+            }
+            if (rule.verdicts[COOKIE_PARTY_ANY] != -1) {
+                return rule.verdicts[COOKIE_PARTY_ANY];
+            }
+        }
+        pos = domain.find('.', pos);
+        if (pos != std::string::npos) {
+            pos++;
+        }
+    }
+    if (party == COOKIE_PARTY_THIRD) {
+        return g_cookiePolicyThirdPartyVerdict;
+    }
+    return g_cookiePolicyDefaultVerdict;
+}
+
+// Returns true when the policy is not used, without parsing urls.
+bool IsCookiePolicyEmpty() {
+    base::AutoLock lock_scope(g_cookiePolicyLock);
+    return (!g_cookiePolicyRulesCount
+            && g_cookiePolicyThirdPartyVerdict == REQUEST_FILTER_DEFER
+            && g_cookiePolicyDefaultVerdict == REQUEST_FILTER_DEFER);
+}
+
+int CountVerdict(int verdict) {
+    base::AutoLock lock_scope(g_cookiePolicyLock);
+    if (verdict == REQUEST_FILTER_ALLOW) {
+        g_cookiePolicyAllowed++;
+    } else if (verdict == REQUEST_FILTER_BLOCK) {
+        g_cookiePolicyBlocked++;
+    } else {
+        g_cookiePolicyDeferred++;
+    }
+    return verdict;
+}
+
+// Cookie domain is used, or the request host for host cookies
+int MatchCookie(CefRefPtr<CefRequest> request, const CefCookie& cookie) {
+    std::string domain = CefString(&cookie.domain).ToString();
+    int party = COOKIE_PARTY_ANY;
+    if (request.get()) {
+        if (domain.empty()) {
+            domain = GetUrlHost(request->GetURL().ToString());
+        }
+        party = GetCookiePolicyParty(
+                domain, request->GetFirstPartyForCookies().ToString());
+    }
+    return MatchCookiePolicy(domain, party);
+}
+
+}  // namespace
+
+bool AddCookiePolicyRule(const std::string& domain, int party,
+                         int verdict) {
+    std::string key = NormalizeDomain(domain);
+    if (key.empty() || !IsValidParty(party) || !IsValidVerdict(verdict)) {
+        return false;
+    }
+    base::AutoLock lock_scope(g_cookiePolicyLock);
+    CookieDomainRules::iterator it = g_cookiePolicyRules.find(key);
+    if (it == g_cookiePolicyRules.end()) {
+        CookieDomainRule rule;
+        std::fill(rule.verdicts, rule.verdicts + 3, -1);
+        it = g_cookiePolicyRules.insert(std::make_pair(key, rule)).first;
+    }
+    if (it->second.verdicts[party] == -1) {
+        g_cookiePolicyRulesCount++;
+    }
+    it->second.verdicts[party] = verdict;
+    return true;
+}
+
+bool RemoveCookiePolicyRule(const std::string& domain, int party) {
+    if (!IsValidParty(party)) {
+        return false;
+    }
+    base::AutoLock lock_scope(g_cookiePolicyLock);
+    CookieDomainRules::iterator it =
+            g_cookiePolicyRules.find(NormalizeDomain(domain));
+    if (it == g_cookiePolicyRules.end()
+            || it->second.verdicts[party] == -1) {
+        return false;
+    }
+    it->second.verdicts[party] = -1;
+    g_cookiePolicyRulesCount--;
+    const int* verdicts = it->second.verdicts;
+    if (verdicts[0] == -1 && verdicts[1] == -1 && verdicts[2] == -1) {
+        g_cookiePolicyRules.erase(it);
+    }
+    return true;
+}
+
+void ClearCookiePolicyRules() {
+    base::AutoLock lock_scope(g_cookiePolicyLock);
+    g_cookiePolicyRules.clear();
+    g_cookiePolicyRulesCount = 0;
+}
+
+int GetCookiePolicyRulesCount() {
+    base::AutoLock lock_scope(g_cookiePolicyLock);
+    return g_cookiePolicyRulesCount;
+}
+
+void SetCookiePolicyThirdPartyVerdict(int verdict) {
+    base::AutoLock lock_scope(g_cookiePolicyLock);
+    g_cookiePolicyThirdPartyVerdict = verdict;
+}
+
+void SetCookiePolicyDefaultVerdict(int verdict) {
+    base::AutoLock lock_scope(g_cookiePolicyLock);
+    g_cookiePolicyDefaultVerdict = verdict;
+}
+
+int MatchCookiePolicy(const std::string& domain, int party) {
+    std::string normalized = NormalizeDomain(domain);
+    base::AutoLock lock_scope(g_cookiePolicyLock);
+    return MatchCookieRules(normalized, party);
+}
+
+int GetCookiePolicyParty(const std::string& domain,
+                         const std::string& firstPartyUrl) {
+    std::string firstPartyHost = GetUrlHost(firstPartyUrl);
+    if (firstPartyHost.empty()) {
+        return COOKIE_PARTY_ANY;
+    }
+    return (GetBaseDomain(NormalizeDomain(domain))
+            == GetBaseDomain(firstPartyHost))
+           ? COOKIE_PARTY_FIRST : COOKIE_PARTY_THIRD;
+}
+
+void GetCookiePolicyStats(int64& allowed, int64& blocked,
+                          int64& deferred) {
+    base::AutoLock lock_scope(g_cookiePolicyLock);
+    allowed = g_cookiePolicyAllowed;
+    blocked = g_cookiePolicyBlocked;
+    deferred = g_cookiePolicyDeferred;
+}
+
+int CookiePolicyCanGetCookies(CefRefPtr<CefRequest> request) {
+    if (IsCookiePolicyEmpty()) {
+        return REQUEST_FILTER_DEFER;
+    }
+    std::string host = GetUrlHost(request->GetURL().ToString());
+    int party = GetCookiePolicyParty(
+            host, request->GetFirstPartyForCookies().ToString());
+    return CountVerdict(MatchCookiePolicy(host, party));
+}
+
+int CookiePolicyCanSetCookie(CefRefPtr<CefRequest> request,
+                             const CefCookie& cookie) {
+    if (IsCookiePolicyEmpty()) {
+        return REQUEST_FILTER_DEFER;
+    }
+    return CountVerdict(MatchCookie(request, cookie));
+}
+
+int CookiePolicyCanGetCookie(const CefCookie& cookie) {
+    if (IsCookiePolicyEmpty()) {
+        return REQUEST_FILTER_DEFER;
+    }
+    return CountVerdict(MatchCookie(NULL, cookie));
+}
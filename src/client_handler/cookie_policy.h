@@ -0,0 +1,55 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// Allows or blocks cookies in RequestHandler::CanGetCookies and
+// CanSetCookie and in ResourceHandler::CanGetCookie and CanSetCookie
+// without calling into Python, see cookie_policy.pyx. Verdicts are the
+// same as in request_filter.h.
+//
+// Rules are kept in a map of domains. A rule for "example.com" matches
+// that domain and its subdomains, the most specific domain wins.
+// A cookie is third-party when the base domain of the cookie domain
+// (or of the request url in CanGetCookies) differs from the base domain
+// of the request's first party url. Verdict is the first found of:
+//   1. Rule for the cookie's party, then rule for any party
+//   2. Third-party verdict, for third-party cookies
+//   3. Default verdict, REQUEST_FILTER_DEFER by default
+// Python callbacks are called only for REQUEST_FILTER_DEFER.
+
+#pragma once
+
+#include <string>
+#include "include/cef_cookie.h"
+#include "include/cef_request.h"
+#include "request_filter.h"
+
+enum CookiePolicyParty {
+    COOKIE_PARTY_ANY = 0,  // Also used when the party is not known
+    COOKIE_PARTY_FIRST,
+    COOKIE_PARTY_THIRD
+};
+
+// Replaces an existing rule for the same domain and party.
+bool AddCookiePolicyRule(const std::string& domain, int party,
+                         int verdict);
+bool RemoveCookiePolicyRule(const std::string& domain, int party);
+void ClearCookiePolicyRules();
+int GetCookiePolicyRulesCount();
+void SetCookiePolicyThirdPartyVerdict(int verdict);
+void SetCookiePolicyDefaultVerdict(int verdict);
+// Third-party verdict doesn't apply when |party| is COOKIE_PARTY_ANY.
+int MatchCookiePolicy(const std::string& domain, int party);
+// Party of a cookie from |domain| on a page from |firstPartyUrl|,
+// COOKIE_PARTY_ANY when |firstPartyUrl| is empty.
+int GetCookiePolicyParty(const std::string& domain,
+                         const std::string& firstPartyUrl);
+void GetCookiePolicyStats(int64& allowed, int64& blocked,
+                          int64& deferred);
+
+// Used by RequestHandler and ResourceHandler. |request| is NULL in
+// ResourceHandler, the cookie's party is not known then.
+int CookiePolicyCanGetCookies(CefRefPtr<CefRequest> request);
+int CookiePolicyCanSetCookie(CefRefPtr<CefRequest> request,
+                             const CefCookie& cookie);
+int CookiePolicyCanGetCookie(const CefCookie& cookie);
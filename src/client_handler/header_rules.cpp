@@ -0,0 +1,213 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "header_rules.h"
+#include <string>
+#include <vector>
+#include "resource_router.h"
+#include "include/base/cef_lock.h"
+#include "util.h"
+
+namespace {
+
+struct HeaderRule {
+    int id;
+    int matchType;
+    std::string pattern;
+#if defined(CEFPYTHON_HAS_REGEX)
+    std::regex regex;
+#endif
+    int action;
+    CefString name;
+    std::string lowerName;
+    CefString value;
+};
+
+typedef CefRequest::HeaderMap HeaderMap;
+
+base::Lock g_headerRulesLock;
+std::vector<HeaderRule> g_headerRules;
+int g_headerRuleMaxId = 0;
+
+HeaderMap::iterator FindHeader(HeaderMap& headers,
+                               const std::string& lowerName) {
+    HeaderMap::iterator it;
+    for (it = headers.begin(); it != headers.end(); ++it) {
+        if (ToLower(it->first.ToString()) == lowerName) {
+            break;
+        }
+    }
+    return it;
+}
+
+// Returns true if any header was removed.
+bool EraseHeaders(HeaderMap& headers, const std::string& lowerName) {
+    bool erased = false;
+    HeaderMap::iterator it = headers.begin();
+    while (it != headers.end()) {
+        if (ToLower(it->first.ToString()) == lowerName) {
+            headers.erase(it++);
+            erased = true;
+        } else {
+            ++it;
+        }
+    }
+    return erased;
+}
+
+void ApplyHeaderRule(HeaderMap& headers, const HeaderRule& rule) {
+    if (rule.action == HEADER_RULE_SET) {
+        EraseHeaders(headers, rule.lowerName);
+        headers.insert(std::make_pair(rule.name, rule.value));
+    } else if (rule.action == HEADER_RULE_APPEND) {
+        // Values are joined into a comma separated list
+        HeaderMap::iterator it = FindHeader(headers, rule.lowerName);
+        if (it != headers.end()) {
+            it->second = it->second.ToString() + ", "
+                         + rule.value.ToString();
+        } else {
+            headers.insert(std::make_pair(rule.name, rule.value));
+        }
+    } else if (rule.action == HEADER_RULE_REMOVE) {
+        EraseHeaders(headers, rule.lowerName);
+    }
+}
+
+}  // namespace
+
+int AddHeaderRule(int matchType, const CefString& pattern, int action,
+                  const CefString& name, const CefString& value,
+                  CefString& error) {
+    HeaderRule rule;
+    rule.matchType = matchType;
+    rule.pattern = pattern.ToString();
+    rule.action = action;
+    rule.name = name;
+    rule.lowerName = ToLower(name.ToString());
+    rule.value = value;
+    if (rule.lowerName.empty()) {
+        error = "Header name is empty";
+        return 0;
+    }
+    if (action != HEADER_RULE_SET && action != HEADER_RULE_APPEND
+            && action != HEADER_RULE_REMOVE) {
+        error = "Invalid action";
+        return 0;
+    }
+    if (matchType == ROUTE_MATCH_REGEX) {
+#if defined(CEFPYTHON_HAS_REGEX)
+        try {
+            rule.regex = std::regex(rule.pattern);
+        } catch (const std::regex_error& e) {
+            error = std::string("Invalid regular expression: ") + e.what();
+            return 0;
+        }
+#else
+        error = "Regular expressions are not supported in this build";
+        return 0;
+#endif
+    } else if (matchType != ROUTE_MATCH_PREFIX
+            && matchType != ROUTE_MATCH_GLOB) {
+        error = "Invalid match type";
+        return 0;
+    }
+    base::AutoLock lock_scope(g_headerRulesLock);
+    rule.id = ++g_headerRuleMaxId;
+    g_headerRules.push_back(rule);
+    return rule.id;
+}
+
+bool RemoveHeaderRule(int ruleId) {
+    base::AutoLock lock_scope(g_headerRulesLock);
+    std::vector<HeaderRule>::iterator it;
+    for (it = g_headerRules.begin(); it != g_headerRules.end(); ++it) {
+        if (it->id == ruleId) {
+            g_headerRules.erase(it);
+            return true;
+        }
+    }
+    return false;
+}
+
+void ClearHeaderRules() {
+    base::AutoLock lock_scope(g_headerRulesLock);
+    g_headerRules.clear();
+}
+
+int GetHeaderRulesCount() {
+    base::AutoLock lock_scope(g_headerRulesLock);
+    return static_cast<int>(g_headerRules.size());
+}
+
+void ApplyHeaderRules(CefRefPtr<CefRequest> request) {
+    // Header map is copied only when a rule matches
+    std::vector<const HeaderRule*> matched;
+    base::AutoLock lock_scope(g_headerRulesLock);
+    if (g_headerRules.empty()) {
+        return;
+    }
+    std::string url = request->GetURL().ToString();
+    std::vector<HeaderRule>::const_iterator it;
+    for (it = g_headerRules.begin(); it != g_headerRules.end(); ++it) {
+        bool match = false;
+        if (it->matchType == ROUTE_MATCH_PREFIX) {
+            match = url.compare(0, it->pattern.size(), it->pattern) == 0;
+        } else if (it->matchType == ROUTE_MATCH_GLOB) {
+            match = GlobMatch(it->pattern, url);
+        }
+#if defined(CEFPYTHON_HAS_REGEX)
+        else if (it->matchType == ROUTE_MATCH_REGEX) {
+            match = std::regex_search(url, it->regex);
+        }
+#endif
+        if (match) {
+            matched.push_back(&(*it));
+        }
+    }
+    if (matched.empty()) {
+        return;
+    }
+    HeaderMap headers;
+    request->GetHeaderMap(headers);
+    for (size_t i = 0; i < matched.size(); i++) {
+        ApplyHeaderRule(headers, *matched[i]);
+    }
+    request->SetHeaderMap(headers);
+}
+
+bool GetRequestHeader(CefRefPtr<CefRequest> request, const CefString& name,
+                      CefString& value) {
+    HeaderMap headers;
+    request->GetHeaderMap(headers);
+    HeaderMap::iterator it = FindHeader(headers, ToLower(name.ToString()));
+    if (it == headers.end()) {
+        return false;
+    }
+    value = it->second;
+    return true;
+}
+
+void SetRequestHeader(CefRefPtr<CefRequest> request, const CefString& name,
+                      const CefString& value, bool overwrite) {
+    HeaderMap headers;
+    request->GetHeaderMap(headers);
+    std::string lowerName = ToLower(name.ToString());
+    if (!overwrite && FindHeader(headers, lowerName) != headers.end()) {
+        return;
+    }
+    EraseHeaders(headers, lowerName);
+    headers.insert(std::make_pair(name, value));
+    request->SetHeaderMap(headers);
+}
+
+bool RemoveRequestHeader(CefRefPtr<CefRequest> request,
+                         const CefString& name) {
+    HeaderMap headers;
+    request->GetHeaderMap(headers);
+    if (!EraseHeaders(headers, ToLower(name.ToString()))) {
+        return false;
+    }
+    request->SetHeaderMap(headers);
+    return true;
+}
@@ -0,0 +1,43 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// Request header rules applied natively in RequestHandler::
+// OnBeforeResourceLoad, see header_rules.pyx. Url patterns are matched
+// the same way as ResourceRouter routes (RouteMatchType).
+//
+// Also helpers for accessing a single request header, CEF only
+// provides access to the whole header map.
+
+#pragma once
+
+#include "include/cef_request.h"
+
+enum HeaderRuleAction {
+    HEADER_RULE_SET = 0,
+    HEADER_RULE_APPEND,
+    HEADER_RULE_REMOVE
+};
+
+// Returns rule id or 0 on error, in such case |error| is set.
+int AddHeaderRule(int matchType, const CefString& pattern, int action,
+                  const CefString& name, const CefString& value,
+                  CefString& error);
+bool RemoveHeaderRule(int ruleId);
+void ClearHeaderRules();
+int GetHeaderRulesCount();
+
+// Applies matching rules to a request that is not read-only.
+void ApplyHeaderRules(CefRefPtr<CefRequest> request);
+
+// Header names are case-insensitive. Returns false if header is not
+// set. When there are many headers with this name the first one
+// is returned.
+bool GetRequestHeader(CefRefPtr<CefRequest> request, const CefString& name,
+                      CefString& value);
+// Replaces all headers with this name when |overwrite| is true,
+// otherwise the header is set only when it doesn't exist.
+void SetRequestHeader(CefRefPtr<CefRequest> request, const CefString& name,
+                      const CefString& value, bool overwrite);
+bool RemoveRequestHeader(CefRefPtr<CefRequest> request,
+                         const CefString& name);
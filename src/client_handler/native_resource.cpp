@@ -0,0 +1,855 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "native_resource.h"
+#include <string.h>
+#include <sstream>
+#include <string>
+#include "include/cef_parser.h"
+#include "include/cef_zip_reader.h"
+#include "include/base/cef_logging.h"
+#include "include/wrapper/cef_byte_read_handler.h"
+
+#if defined(OS_WIN)
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+// ----------------------------------------------------------------------------
+// SizedStreamResourceHandler
+// ----------------------------------------------------------------------------
+
+void SizedStreamResourceHandler::GetResponseHeaders(
+                                        CefRefPtr<CefResponse> response,
+                                        int64& response_length,
+                                        CefString& redirectUrl) {
+    CefStreamResourceHandler::GetResponseHeaders(response, response_length,
+                                                 redirectUrl);
+    response_length = length_;
+}
+
+// ----------------------------------------------------------------------------
+// SharedBytes
+// ----------------------------------------------------------------------------
+
+SharedBytes::SharedBytes(const char* data, size_t size)
+        : bytes_(data, data + size) {
+}
+
+SharedBytes::SharedBytes(std::vector<unsigned char>& bytes) {
+    bytes_.swap(bytes);
+}
+
+const unsigned char* SharedBytes::data() const {
+    // CefByteReadHandler requires a valid pointer even when empty.
+    static const unsigned char empty = 0;
+    return bytes_.empty() ? &empty : &bytes_[0];
+}
+
+// ----------------------------------------------------------------------------
+// BytesResource
+// ----------------------------------------------------------------------------
+
+BytesResource::BytesResource(const char* data, size_t size,
+                             const CefString& mimeType, int statusCode,
+                             const CefString& statusText,
+                             const CefResponse::HeaderMap& headers)
+        : bytes_(new SharedBytes(data, size)),
+          mimeType_(mimeType),
+          statusCode_(statusCode),
+          statusText_(statusText),
+          headers_(headers) {
+}
+
+CefRefPtr<CefResourceHandler> BytesResource::CreateHandler(
+                                        CefRefPtr<CefRequest> request) {
+    // Bytes are not copied, the read handler keeps a reference
+    // to the shared buffer.
+    CefRefPtr<CefStreamReader> stream = CefStreamReader::CreateForHandler(
+            new CefByteReadHandler(bytes_->data(), bytes_->size(),
+                                   bytes_.get()));
+    return new SizedStreamResourceHandler(
+            statusCode_, statusText_, mimeType_, headers_, stream,
+            static_cast<int64>(bytes_->size()));
+}
+
+// ----------------------------------------------------------------------------
+// RangeResourceHandler
+// ----------------------------------------------------------------------------
+
+namespace {
+
+typedef CefResponse::HeaderMap::value_type HeaderPair;
+
+enum RangeResult {
+    RANGE_NONE,
+    RANGE_SATISFIABLE,
+    RANGE_NOT_SATISFIABLE
+};
+
+bool ParseInt64(const std::string& value, int64& result) {
+    if (value.empty() || value.size() > 18) {
+        return false;
+    }
+    result = 0;
+    for (size_t i = 0; i < value.size(); i++) {
+        if (value[i] < '0' || value[i] > '9') {
+            return false;
+        }
+        result = result * 10 + (value[i] - '0');
+    }
+    return true;
+}
+
+std::string GetRequestHeader(CefRefPtr<CefRequest> request,
+                             const std::string& lowerName) {
+    CefRequest::HeaderMap headers;
+    request->GetHeaderMap(headers);
+    CefRequest::HeaderMap::iterator it;
+    for (it = headers.begin(); it != headers.end(); ++it) {
+        std::string name = it->first.ToString();
+        for (size_t i = 0; i < name.size(); i++) {
+            name[i] = static_cast<char>(tolower(name[i]));
+        }
+        if (name == lowerName) {
+            return it->second.ToString();
+        }
+    }
+    return std::string();
+}
+
+// Only a single range is supported, e.g. "bytes=0-499", "bytes=500-"
+// or "bytes=-500". Multiple ranges are ignored and the whole content
+// is served.
+RangeResult ParseRangeHeader(const std::string& header, int64 total,
+                             int64& start, int64& end) {
+    const std::string prefix = "bytes=";
+    if (header.compare(0, prefix.size(), prefix) != 0) {
+        return RANGE_NONE;
+    }
+    std::string spec = header.substr(prefix.size());
+    size_t dash = spec.find('-');
+    if (dash == std::string::npos || spec.find(',') != std::string::npos) {
+        return RANGE_NONE;
+    }
+    std::string first = spec.substr(0, dash);
+    std::string last = spec.substr(dash + 1);
+    int64 firstValue = 0;
+    int64 lastValue = 0;
+    if (first.empty()) {
+        // Suffix range, last N bytes
+        if (!ParseInt64(last, lastValue)) {
+            return RANGE_NONE;
+        }
+        if (lastValue == 0 || total == 0) {
+            return RANGE_NOT_SATISFIABLE;
+        }
+        start = lastValue < total ? total - lastValue : 0;
+        end = total - 1;
+        return RANGE_SATISFIABLE;
+    }
+    if (!ParseInt64(first, firstValue)) {
+        return RANGE_NONE;
+    }
+    if (last.empty()) {
+        lastValue = total - 1;
+    } else if (!ParseInt64(last, lastValue) || lastValue < firstValue) {
+        return RANGE_NONE;
+    }
+    if (firstValue >= total) {
+        return RANGE_NOT_SATISFIABLE;
+    }
+    start = firstValue;
+    end = lastValue < total ? lastValue : total - 1;
+    return RANGE_SATISFIABLE;
+}
+
+std::string ContentRange(int64 start, int64 end, int64 total) {
+    std::ostringstream value;
+    value << "bytes ";
+    if (start < 0) {
+        value << "*";
+    } else {
+        value << start << "-" << end;
+    }
+    value << "/" << total;
+    return value.str();
+}
+
+}  // namespace
+
+RangeResourceHandler::RangeResourceHandler(
+                                    CefRefPtr<CefStreamReader> stream,
+                                    int64 offset, int64 length,
+                                    const CefString& mimeType,
+                                    int statusCode,
+                                    const CefString& statusText,
+                                    const CefResponse::HeaderMap& headers)
+        : stream_(stream),
+          offset_(offset),
+          length_(length),
+          remaining_(length),
+          mimeType_(mimeType),
+          statusCode_(statusCode),
+          statusText_(statusText),
+          headers_(headers) {
+}
+
+bool RangeResourceHandler::ProcessRequest(CefRefPtr<CefRequest> request,
+                                          CefRefPtr<CefCallback> callback) {
+    if (!stream_.get()) {
+        if (statusCode_ == 200) {
+            statusCode_ = 404;
+            statusText_ = "Not Found";
+        }
+        remaining_ = 0;
+        callback->Continue();
+        return true;
+    }
+    int64 start = 0;
+    int64 end = length_ - 1;
+    if (statusCode_ == 200) {
+        headers_.insert(HeaderPair("Accept-Ranges", "bytes"));
+        RangeResult range = ParseRangeHeader(
+                GetRequestHeader(request, "range"), length_, start, end);
+        if (range == RANGE_SATISFIABLE) {
+            statusCode_ = 206;
+            statusText_ = "Partial Content";
+            headers_.insert(HeaderPair("Content-Range",
+                                       ContentRange(start, end, length_)));
+        } else if (range == RANGE_NOT_SATISFIABLE) {
+            statusCode_ = 416;
+            statusText_ = "Range Not Satisfiable";
+            headers_.insert(HeaderPair("Content-Range",
+                                       ContentRange(-1, -1, length_)));
+            start = 0;
+            end = -1;
+        }
+    }
+    remaining_ = end - start + 1;
+    if (remaining_ > 0
+            && stream_->Seek(offset_ + start, SEEK_SET) != 0) {
+        statusCode_ = 500;
+        statusText_ = "Internal Server Error";
+        remaining_ = 0;
+    }
+    callback->Continue();
+    return true;
+}
+
+void RangeResourceHandler::GetResponseHeaders(CefRefPtr<CefResponse> response,
+                                              int64& response_length,
+                                              CefString& redirectUrl) {
+    response->SetStatus(statusCode_);
+    response->SetStatusText(statusText_);
+    response->SetMimeType(mimeType_);
+    if (!headers_.empty()) {
+        response->SetHeaderMap(headers_);
+    }
+    response_length = remaining_;
+}
+
+bool RangeResourceHandler::ReadResponse(void* data_out,
+                                        int bytes_to_read,
+                                        int& bytes_read,
+                                        CefRefPtr<CefCallback> callback) {
+    bytes_read = 0;
+    if (remaining_ <= 0 || !stream_.get()) {
+        return false;
+    }
+    int toRead = bytes_to_read;
+    if (remaining_ < toRead) {
+        toRead = static_cast<int>(remaining_);
+    }
+    size_t read = stream_->Read(data_out, 1, toRead);
+    if (read == 0) {
+        return false;
+    }
+    bytes_read = static_cast<int>(read);
+    remaining_ -= bytes_read;
+    return true;
+}
+
+void RangeResourceHandler::Cancel() {
+    stream_ = NULL;
+}
+
+// ----------------------------------------------------------------------------
+// MappedFile
+// ----------------------------------------------------------------------------
+
+MappedFile::MappedFile()
+        : data_(NULL),
+          size_(0)
+#if defined(OS_WIN)
+          , mapping_(NULL)
+#endif
+{
+}
+
+MappedFile::~MappedFile() {
+#if defined(OS_WIN)
+    if (data_) {
+        UnmapViewOfFile(data_);
+    }
+    if (mapping_) {
+        CloseHandle(mapping_);
+    }
+#else
+    if (data_) {
+        munmap(data_, static_cast<size_t>(size_));
+    }
+#endif
+}
+
+bool MappedFile::Open(const CefString& path) {
+#if defined(OS_WIN)
+    HANDLE file = CreateFileW(path.ToWString().c_str(), GENERIC_READ,
+                              FILE_SHARE_READ, NULL, OPEN_EXISTING,
+                              FILE_ATTRIBUTE_NORMAL, NULL);
+    if (file == INVALID_HANDLE_VALUE) {
+        return false;
+    }
+    LARGE_INTEGER fileSize;
+    if (!GetFileSizeEx(file, &fileSize)
+            || static_cast<unsigned long long>(fileSize.QuadPart)
+                    > static_cast<size_t>(-1)) {
+        CloseHandle(file);
+        return false;
+    }
+    size_ = fileSize.QuadPart;
+    if (size_ > 0) {
+        mapping_ = CreateFileMappingW(file, NULL, PAGE_READONLY, 0, 0, NULL);
+        if (mapping_) {
+            data_ = MapViewOfFile(mapping_, FILE_MAP_READ, 0, 0, 0);
+        }
+    }
+    CloseHandle(file);
+    return size_ == 0 || data_ != NULL;
+#else
+    int fd = open(path.ToString().c_str(), O_RDONLY);
+    if (fd < 0) {
+        return false;
+    }
+    struct stat st;
+    if (fstat(fd, &st) != 0
+            || static_cast<unsigned long long>(st.st_size)
+                    > static_cast<size_t>(-1)) {
+        close(fd);
+        return false;
+    }
+    size_ = st.st_size;
+    if (size_ > 0) {
+        void* data = mmap(NULL, static_cast<size_t>(size_), PROT_READ,
+                          MAP_SHARED, fd, 0);
+        if (data != MAP_FAILED) {
+            data_ = data;
+        }
+    }
+    close(fd);
+    return size_ == 0 || data_ != NULL;
+#endif
+}
+
+const unsigned char* MappedFile::data() const {
+    static const unsigned char empty = 0;
+    return data_ ? static_cast<const unsigned char*>(data_) : &empty;
+}
+
+// ----------------------------------------------------------------------------
+// FileResource
+// ----------------------------------------------------------------------------
+
+FileResource::FileResource(const CefString& path, int64 offset, int64 length,
+                           bool useMmap, const CefString& mimeType,
+                           int statusCode, const CefString& statusText,
+                           const CefResponse::HeaderMap& headers)
+        : path_(path),
+          offset_(offset < 0 ? 0 : offset),
+          length_(length),
+          useMmap_(useMmap),
+          mimeType_(mimeType),
+          statusCode_(statusCode),
+          statusText_(statusText),
+          headers_(headers),
+          mapFailed_(false) {
+    if (mimeType_.empty()) {
+        mimeType_ = GuessMimeType(path_);
+    }
+}
+
+CefRefPtr<MappedFile> FileResource::GetMappedFile() {
+    base::AutoLock lock_scope(lock_);
+    if (!mappedFile_.get() && !mapFailed_) {
+        CefRefPtr<MappedFile> mappedFile = new MappedFile();
+        if (mappedFile->Open(path_)) {
+            mappedFile_ = mappedFile;
+        } else {
+            mapFailed_ = true;
+        }
+    }
+    return mappedFile_;
+}
+
+CefRefPtr<CefResourceHandler> FileResource::CreateHandler(
+                                        CefRefPtr<CefRequest> request) {
+    if (!useMmap_) {
+        return CreateFileHandler(path_, offset_, length_, mimeType_,
+                                 statusCode_, statusText_, headers_);
+    }
+    CefRefPtr<CefStreamReader> stream;
+    CefRefPtr<MappedFile> mappedFile = GetMappedFile();
+    int64 size = mappedFile.get() ? mappedFile->size() : 0;
+    int64 offset = offset_ < size ? offset_ : size;
+    int64 length = size - offset;
+    if (length_ >= 0 && length_ < length) {
+        length = length_;
+    }
+    if (mappedFile.get()) {
+        // Reads directly from the mapping, data is not copied.
+        stream = CefStreamReader::CreateForHandler(
+                new CefByteReadHandler(mappedFile->data() + offset,
+                                       static_cast<size_t>(length),
+                                       mappedFile.get()));
+    }
+    return new RangeResourceHandler(stream, 0, length, mimeType_,
+                                    statusCode_, statusText_, headers_);
+}
+
+// ----------------------------------------------------------------------------
+// DirectoryResource
+// ----------------------------------------------------------------------------
+
+DirectoryResource::DirectoryResource(const CefString& directory,
+                                     const CefString& urlPrefix,
+                                     const CefString& defaultFile,
+                                     const CefResponse::HeaderMap& headers)
+        : directory_(directory.ToString()),
+          urlPrefix_(urlPrefix.ToString()),
+          defaultFile_(defaultFile.ToString()),
+          headers_(headers) {
+    if (!directory_.empty() && directory_[directory_.size() - 1] != '/'
+            && directory_[directory_.size() - 1] != '\\') {
+        directory_ += "/";
+    }
+}
+
+CefRefPtr<CefResourceHandler> DirectoryResource::CreateHandler(
+                                        CefRefPtr<CefRequest> request) {
+    std::string path;
+    if (!GetRelativePath(request->GetURL().ToString(), urlPrefix_,
+                         defaultFile_, path)) {
+        CefRefPtr<CefStreamReader> notFound;
+        return new RangeResourceHandler(notFound, 0, 0, "text/html", 404,
+                                        "Not Found", headers_);
+    }
+    path = directory_ + path;
+    return CreateFileHandler(path, 0, -1, GuessMimeType(path), 200, "OK",
+                             headers_);
+}
+
+// ----------------------------------------------------------------------------
+// ZipResource
+// ----------------------------------------------------------------------------
+
+ZipResource::ZipResource(const CefString& zipPath,
+                         const CefString& urlPrefix,
+                         const CefString& defaultFile,
+                         const CefString& password,
+                         int64 cacheSize,
+                         const CefResponse::HeaderMap& headers)
+        : zipPath_(zipPath),
+          urlPrefix_(urlPrefix.ToString()),
+          defaultFile_(defaultFile.ToString()),
+          password_(password),
+          cacheSizeLimit_(cacheSize),
+          headers_(headers),
+          cacheSize_(0) {
+}
+
+bool ZipResource::Load(CefString& error) {
+    CefRefPtr<CefStreamReader> stream =
+            CefStreamReader::CreateForFile(zipPath_);
+    if (!stream.get()) {
+        error = "Cannot open file: " + zipPath_.ToString();
+        return false;
+    }
+    CefRefPtr<CefZipReader> reader = CefZipReader::Create(stream);
+    if (!reader.get() || !reader->MoveToFirstFile()) {
+        error = "Cannot read zip archive: " + zipPath_.ToString();
+        return false;
+    }
+    do {
+        std::string name = reader->GetFileName().ToString();
+        if (!name.empty() && name[name.size() - 1] != '/') {
+            index_[name] = reader->GetFileSize();
+        }
+    } while (reader->MoveToNextFile());
+    reader->Close();
+    return true;
+}
+
+int64 ZipResource::GetCacheSize() {
+    base::AutoLock lock_scope(cacheLock_);
+    return cacheSize_;
+}
+
+CefRefPtr<SharedBytes> ZipResource::ExtractFile(const std::string& name) {
+    // Zip reader must be used on the thread that created it, a new
+    // reader is created for each extraction.
+    CefRefPtr<CefStreamReader> stream =
+            CefStreamReader::CreateForFile(zipPath_);
+    if (!stream.get()) {
+        return NULL;
+    }
+    CefRefPtr<CefZipReader> reader = CefZipReader::Create(stream);
+    if (!reader.get() || !reader->MoveToFile(name, true)
+            || !reader->OpenFile(password_)) {
+        return NULL;
+    }
+    std::vector<unsigned char> bytes(
+            static_cast<size_t>(reader->GetFileSize()));
+    size_t total = 0;
+    while (total < bytes.size()) {
+        int read = reader->ReadFile(&bytes[total], bytes.size() - total);
+        if (read <= 0) {
+            break;
+        }
+        total += read;
+    }
+    reader->CloseFile();
+    reader->Close();
+    if (total != bytes.size()) {
+        LOG(ERROR) << "[Browser process] ZipResource: failed to extract "
+                   << name;
+        return NULL;
+    }
+    return new SharedBytes(bytes);
+}
+
+CefRefPtr<SharedBytes> ZipResource::GetFile(const std::string& name) {
+    {
+        base::AutoLock lock_scope(cacheLock_);
+        std::map<std::string, CacheEntry>::iterator it = cache_.find(name);
+        if (it != cache_.end()) {
+            lru_.splice(lru_.begin(), lru_, it->second.lruPosition);
+            return it->second.bytes;
+        }
+    }
+    // Extracted outside of the lock
+    CefRefPtr<SharedBytes> bytes = ExtractFile(name);
+    if (!bytes.get()) {
+        return NULL;
+    }
+    int64 size = static_cast<int64>(bytes->size());
+    if (size > cacheSizeLimit_) {
+        return bytes;
+    }
+    base::AutoLock lock_scope(cacheLock_);
+    if (cache_.find(name) != cache_.end()) {
+        return bytes;
+    }
+    while (!lru_.empty() && cacheSize_ + size > cacheSizeLimit_) {
+        std::map<std::string, CacheEntry>::iterator oldest =
+                cache_.find(lru_.back());
+        cacheSize_ -= static_cast<int64>(oldest->second.bytes->size());
+        cache_.erase(oldest);
+        lru_.pop_back();
+    }
+    lru_.push_front(name);
+    CacheEntry entry;
+    entry.bytes = bytes;
+    entry.lruPosition = lru_.begin();
+    cache_[name] = entry;
+    cacheSize_ += size;
+    return bytes;
+}
+
+CefRefPtr<CefResourceHandler> ZipResource::CreateHandler(
+                                        CefRefPtr<CefRequest> request) {
+    CefRefPtr<CefStreamReader> stream;
+    std::string path;
+    if (!GetRelativePath(request->GetURL().ToString(), urlPrefix_,
+                         defaultFile_, path)
+            || index_.find(path) == index_.end()) {
+        return new RangeResourceHandler(stream, 0, 0, "text/html", 404,
+                                        "Not Found", headers_);
+    }
+    CefRefPtr<SharedBytes> bytes = GetFile(path);
+    if (!bytes.get()) {
+        return new RangeResourceHandler(stream, 0, 0, "text/html", 500,
+                                        "Internal Server Error", headers_);
+    }
+    stream = CefStreamReader::CreateForHandler(
+            new CefByteReadHandler(bytes->data(), bytes->size(),
+                                   bytes.get()));
+    return new RangeResourceHandler(stream, 0,
+                                    static_cast<int64>(bytes->size()),
+                                    GuessMimeType(path), 200, "OK",
+                                    headers_);
+}
+
+// ----------------------------------------------------------------------------
+// ChunkQueue
+// ----------------------------------------------------------------------------
+
+ChunkQueue::ChunkQueue()
+        : offset_(0),
+          size_(0),
+          finished_(false),
+          cancelled_(false) {
+}
+
+bool ChunkQueue::Write(const char* data, size_t size) {
+    CefRefPtr<CefCallback> callback;
+    {
+        base::AutoLock lock_scope(lock_);
+        if (finished_ || cancelled_) {
+            return false;
+        }
+        if (!size) {
+            return true;
+        }
+        chunks_.push_back(std::vector<unsigned char>(data, data + size));
+        size_ += static_cast<int64>(size);
+        callback.swap(pendingCallback_);
+    }
+    if (callback.get()) {
+        callback->Continue();
+    }
+    return true;
+}
+
+void ChunkQueue::Finish() {
+    CefRefPtr<CefCallback> callback;
+    {
+        base::AutoLock lock_scope(lock_);
+        finished_ = true;
+        callback.swap(pendingCallback_);
+    }
+    if (callback.get()) {
+        callback->Continue();
+    }
+}
+
+void ChunkQueue::Cancel() {
+    base::AutoLock lock_scope(lock_);
+    cancelled_ = true;
+    chunks_.clear();
+    offset_ = 0;
+    size_ = 0;
+    pendingCallback_ = NULL;
+}
+
+bool ChunkQueue::IsCancelled() {
+    base::AutoLock lock_scope(lock_);
+    return cancelled_;
+}
+
+int64 ChunkQueue::GetQueuedSize() {
+    base::AutoLock lock_scope(lock_);
+    return size_;
+}
+
+bool ChunkQueue::Read(void* data_out, int bytes_to_read, int& bytes_read,
+                      CefRefPtr<CefCallback> callback) {
+    base::AutoLock lock_scope(lock_);
+    bytes_read = 0;
+    if (cancelled_) {
+        return false;
+    }
+    unsigned char* out = static_cast<unsigned char*>(data_out);
+    while (bytes_read < bytes_to_read && !chunks_.empty()) {
+        std::vector<unsigned char>& chunk = chunks_.front();
+        size_t available = chunk.size() - offset_;
+        size_t count = static_cast<size_t>(bytes_to_read - bytes_read);
+        if (available < count) {
+            count = available;
+        }
+        memcpy(out + bytes_read, &chunk[offset_], count);
+        bytes_read += static_cast<int>(count);
+        offset_ += count;
+        size_ -= static_cast<int64>(count);
+        if (offset_ == chunk.size()) {
+            chunks_.pop_front();
+            offset_ = 0;
+        }
+    }
+    if (bytes_read > 0) {
+        return true;
+    }
+    if (finished_) {
+        // Response complete
+        return false;
+    }
+    // Wait for more data
+    pendingCallback_ = callback;
+    return true;
+}
+
+// ----------------------------------------------------------------------------
+// ChunkedResource
+// ----------------------------------------------------------------------------
+
+namespace {
+
+class ChunkedResourceHandler : public CefResourceHandler {
+public:
+    ChunkedResourceHandler(CefRefPtr<ChunkQueue> queue,
+                           const CefString& mimeType, int statusCode,
+                           const CefString& statusText,
+                           const CefResponse::HeaderMap& headers,
+                           int64 length)
+            : queue_(queue), mimeType_(mimeType), statusCode_(statusCode),
+              statusText_(statusText), headers_(headers), length_(length) {
+    }
+
+    bool ProcessRequest(CefRefPtr<CefRequest> request,
+                        CefRefPtr<CefCallback> callback) OVERRIDE {
+        callback->Continue();
+        return true;
+    }
+
+    void GetResponseHeaders(CefRefPtr<CefResponse> response,
+                            int64& response_length,
+                            CefString& redirectUrl) OVERRIDE {
+        response->SetStatus(statusCode_);
+        response->SetStatusText(statusText_);
+        response->SetMimeType(mimeType_);
+        if (!headers_.empty()) {
+            response->SetHeaderMap(headers_);
+        }
+        response_length = length_;
+    }
+
+    bool ReadResponse(void* data_out, int bytes_to_read, int& bytes_read,
+                      CefRefPtr<CefCallback> callback) OVERRIDE {
+        return queue_->Read(data_out, bytes_to_read, bytes_read, callback);
+    }
+
+    void Cancel() OVERRIDE {
+        queue_->Cancel();
+    }
+
+private:
+    CefRefPtr<ChunkQueue> queue_;
+    CefString mimeType_;
+    int statusCode_;
+    CefString statusText_;
+    CefResponse::HeaderMap headers_;
+    int64 length_;
+
+    IMPLEMENT_REFCOUNTING(ChunkedResourceHandler);
+};
+
+}  // namespace
+
+ChunkedResource::ChunkedResource(CefRefPtr<ChunkQueue> queue,
+                                 const CefString& mimeType, int statusCode,
+                                 const CefString& statusText,
+                                 const CefResponse::HeaderMap& headers,
+                                 int64 length)
+        : queue_(queue),
+          mimeType_(mimeType),
+          statusCode_(statusCode),
+          statusText_(statusText),
+          headers_(headers),
+          length_(length) {
+}
+
+CefRefPtr<CefResourceHandler> ChunkedResource::CreateHandler(
+                                        CefRefPtr<CefRequest> request) {
+    return new ChunkedResourceHandler(queue_, mimeType_, statusCode_,
+                                      statusText_, headers_, length_);
+}
+
+// ----------------------------------------------------------------------------
+// Helpers
+// ----------------------------------------------------------------------------
+
+CefString GuessMimeType(const CefString& path) {
+    std::string pathStr = path.ToString();
+    CefString mimeType;
+    size_t dot = pathStr.find_last_of('.');
+    size_t slash = pathStr.find_last_of("/\\");
+    if (dot != std::string::npos
+            && (slash == std::string::npos || dot > slash)) {
+        mimeType = CefGetMimeType(pathStr.substr(dot + 1));
+    }
+    if (mimeType.empty()) {
+        mimeType = "application/octet-stream";
+    }
+    return mimeType;
+}
+
+bool GetRelativePath(const std::string& url, const std::string& urlPrefix,
+                     const std::string& defaultFile, std::string& path) {
+    if (url.compare(0, urlPrefix.size(), urlPrefix) != 0) {
+        return false;
+    }
+    path = url.substr(urlPrefix.size());
+    size_t end = path.find_first_of("?#");
+    if (end != std::string::npos) {
+        path = path.substr(0, end);
+    }
+    // Encoded path separators are not decoded, so that "%2F.." can't
+    // be used to escape the directory.
+    path = CefURIDecode(path, true, static_cast<cef_uri_unescape_rule_t>(
+            UU_SPACES | UU_URL_SPECIAL_CHARS_EXCEPT_PATH_SEPARATORS))
+            .ToString();
+    while (!path.empty() && path[0] == '/') {
+        path = path.substr(1);
+    }
+    if (path.empty() || path[path.size() - 1] == '/') {
+        if (defaultFile.empty()) {
+            return false;
+        }
+        path += defaultFile;
+    }
+    if (path.find('\\') != std::string::npos
+            || path.find(':') != std::string::npos
+            || path.find('\0') != std::string::npos) {
+        return false;
+    }
+    std::istringstream segments(path);
+    std::string segment;
+    while (std::getline(segments, segment, '/')) {
+        if (segment == "..") {
+            return false;
+        }
+    }
+    return true;
+}
+
+CefRefPtr<CefResourceHandler> CreateFileHandler(
+                                    const CefString& path,
+                                    int64 offset, int64 length,
+                                    const CefString& mimeType,
+                                    int statusCode,
+                                    const CefString& statusText,
+                                    const CefResponse::HeaderMap& headers) {
+    // Size is checked for each request, file may change.
+    int64 size = 0;
+    CefRefPtr<CefStreamReader> stream = CefStreamReader::CreateForFile(path);
+    if (stream.get() && stream->Seek(0, SEEK_END) == 0) {
+        size = stream->Tell();
+    } else {
+        stream = NULL;
+    }
+    if (offset < 0) {
+        offset = 0;
+    } else if (offset > size) {
+        offset = size;
+    }
+    int64 available = size - offset;
+    if (length < 0 || length > available) {
+        length = available;
+    }
+    return new RangeResourceHandler(stream, offset, length, mimeType,
+                                    statusCode, statusText, headers);
+}
@@ -0,0 +1,314 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// Resources served by handlers implemented in C++. CEF reads response
+// data on the IO thread without calling into Python. A resource is
+// created once in Python (see native_resource.pyx) and creates a new
+// handler for each request.
+
+#pragma once
+
+#include <deque>
+#include <list>
+#include <map>
+#include <string>
+#include <vector>
+#include "include/base/cef_lock.h"
+#include "include/cef_request.h"
+#include "include/cef_resource_handler.h"
+#include "include/cef_response.h"
+#include "include/cef_stream.h"
+#include "include/wrapper/cef_stream_resource_handler.h"
+
+class NativeResource : public CefBaseRefCounted {
+public:
+    virtual CefRefPtr<CefResourceHandler> CreateHandler(
+            CefRefPtr<CefRequest> request) = 0;
+};
+
+// CefStreamResourceHandler reports an unknown response length. This
+// handler reports the length, so that Content-Length is known.
+class SizedStreamResourceHandler : public CefStreamResourceHandler {
+public:
+    SizedStreamResourceHandler(int statusCode,
+                               const CefString& statusText,
+                               const CefString& mimeType,
+                               CefResponse::HeaderMap headers,
+                               CefRefPtr<CefStreamReader> stream,
+                               int64 length)
+            : CefStreamResourceHandler(statusCode, statusText, mimeType,
+                                       headers, stream),
+              length_(length) {
+    }
+
+    void GetResponseHeaders(CefRefPtr<CefResponse> response,
+                            int64& response_length,
+                            CefString& redirectUrl) OVERRIDE;
+
+private:
+    int64 length_;
+};
+
+// Bytes shared by all handlers created by a resource.
+class SharedBytes : public CefBaseRefCounted {
+public:
+    SharedBytes(const char* data, size_t size);
+    // Takes ownership of |bytes| contents, |bytes| is left empty.
+    explicit SharedBytes(std::vector<unsigned char>& bytes);
+
+    const unsigned char* data() const;
+    size_t size() const { return bytes_.size(); }
+
+private:
+    std::vector<unsigned char> bytes_;
+
+    IMPLEMENT_REFCOUNTING(SharedBytes);
+};
+
+class BytesResource : public NativeResource {
+public:
+    BytesResource(const char* data, size_t size,
+                  const CefString& mimeType, int statusCode,
+                  const CefString& statusText,
+                  const CefResponse::HeaderMap& headers);
+
+    CefRefPtr<CefResourceHandler> CreateHandler(
+            CefRefPtr<CefRequest> request) OVERRIDE;
+
+private:
+    CefRefPtr<SharedBytes> bytes_;
+    CefString mimeType_;
+    int statusCode_;
+    CefString statusText_;
+    CefResponse::HeaderMap headers_;
+
+    IMPLEMENT_REFCOUNTING(BytesResource);
+};
+
+// Serves a stream of known length. Supports a single byte range
+// requested with the "Range" header, responds with "206 Partial
+// Content" in such case.
+class RangeResourceHandler : public CefResourceHandler {
+public:
+    // |offset| is the position in |stream| where data begins.
+    // A NULL |stream| results in an empty response, "404 Not Found"
+    // when |statusCode| is 200.
+    RangeResourceHandler(CefRefPtr<CefStreamReader> stream,
+                         int64 offset, int64 length,
+                         const CefString& mimeType, int statusCode,
+                         const CefString& statusText,
+                         const CefResponse::HeaderMap& headers);
+
+    bool ProcessRequest(CefRefPtr<CefRequest> request,
+                        CefRefPtr<CefCallback> callback) OVERRIDE;
+    void GetResponseHeaders(CefRefPtr<CefResponse> response,
+                            int64& response_length,
+                            CefString& redirectUrl) OVERRIDE;
+    bool ReadResponse(void* data_out,
+                      int bytes_to_read,
+                      int& bytes_read,
+                      CefRefPtr<CefCallback> callback) OVERRIDE;
+    void Cancel() OVERRIDE;
+
+private:
+    CefRefPtr<CefStreamReader> stream_;
+    int64 offset_;
+    int64 length_;
+    int64 remaining_;
+    CefString mimeType_;
+    int statusCode_;
+    CefString statusText_;
+    CefResponse::HeaderMap headers_;
+
+    IMPLEMENT_REFCOUNTING(RangeResourceHandler);
+};
+
+// Read-only memory mapping of a file.
+class MappedFile : public CefBaseRefCounted {
+public:
+    MappedFile();
+    ~MappedFile();
+
+    bool Open(const CefString& path);
+    const unsigned char* data() const;
+    int64 size() const { return size_; }
+
+private:
+    void* data_;
+    int64 size_;
+#if defined(OS_WIN)
+    void* mapping_;
+#endif
+
+    IMPLEMENT_REFCOUNTING(MappedFile);
+};
+
+class FileResource : public NativeResource {
+public:
+    // |length| -1 means till the end of file. When |mimeType| is empty
+    // it is guessed from file extension.
+    FileResource(const CefString& path, int64 offset, int64 length,
+                 bool useMmap, const CefString& mimeType, int statusCode,
+                 const CefString& statusText,
+                 const CefResponse::HeaderMap& headers);
+
+    CefRefPtr<CefResourceHandler> CreateHandler(
+            CefRefPtr<CefRequest> request) OVERRIDE;
+
+private:
+    CefRefPtr<MappedFile> GetMappedFile();
+
+    CefString path_;
+    int64 offset_;
+    int64 length_;
+    bool useMmap_;
+    CefString mimeType_;
+    int statusCode_;
+    CefString statusText_;
+    CefResponse::HeaderMap headers_;
+    // File is mapped on first request and stays mapped as long
+    // as this resource is alive.
+    base::Lock lock_;
+    CefRefPtr<MappedFile> mappedFile_;
+    bool mapFailed_;
+
+    IMPLEMENT_REFCOUNTING(FileResource);
+};
+
+// Serves files from a directory. Path of the file is the part of url
+// following |urlPrefix|. Paths that could escape the directory are
+// rejected with "404 Not Found".
+class DirectoryResource : public NativeResource {
+public:
+    DirectoryResource(const CefString& directory,
+                      const CefString& urlPrefix,
+                      const CefString& defaultFile,
+                      const CefResponse::HeaderMap& headers);
+
+    CefRefPtr<CefResourceHandler> CreateHandler(
+            CefRefPtr<CefRequest> request) OVERRIDE;
+
+private:
+    std::string directory_;
+    std::string urlPrefix_;
+    std::string defaultFile_;
+    CefResponse::HeaderMap headers_;
+
+    IMPLEMENT_REFCOUNTING(DirectoryResource);
+};
+
+// Serves files from a zip archive. Archive is indexed when loaded.
+// Files are decompressed on demand and kept in a LRU cache of
+// |cacheSize| bytes.
+class ZipResource : public NativeResource {
+public:
+    ZipResource(const CefString& zipPath,
+                const CefString& urlPrefix,
+                const CefString& defaultFile,
+                const CefString& password,
+                int64 cacheSize,
+                const CefResponse::HeaderMap& headers);
+
+    // Must be called once before the resource is used.
+    bool Load(CefString& error);
+    int GetFileCount() const { return static_cast<int>(index_.size()); }
+    int64 GetCacheSize();
+
+    CefRefPtr<CefResourceHandler> CreateHandler(
+            CefRefPtr<CefRequest> request) OVERRIDE;
+
+private:
+    typedef std::list<std::string> LruList;
+    struct CacheEntry {
+        CefRefPtr<SharedBytes> bytes;
+        LruList::iterator lruPosition;
+    };
+
+    CefRefPtr<SharedBytes> GetFile(const std::string& name);
+    CefRefPtr<SharedBytes> ExtractFile(const std::string& name);
+
+    CefString zipPath_;
+    std::string urlPrefix_;
+    std::string defaultFile_;
+    CefString password_;
+    int64 cacheSizeLimit_;
+    CefResponse::HeaderMap headers_;
+    // File name -> uncompressed size. Not modified after Load().
+    std::map<std::string, int64> index_;
+    base::Lock cacheLock_;
+    std::map<std::string, CacheEntry> cache_;
+    LruList lru_;  // Most recently used first
+    int64 cacheSize_;
+
+    IMPLEMENT_REFCOUNTING(ZipResource);
+};
+
+// Chunks of response data written from Python on any thread and read
+// by CEF on the IO thread. When there is no data available a pending
+// read is continued when more data is written or the queue finished.
+class ChunkQueue : public CefBaseRefCounted {
+public:
+    ChunkQueue();
+
+    // Returns false if queue was finished or cancelled.
+    bool Write(const char* data, size_t size);
+    void Finish();
+    void Cancel();
+    bool IsCancelled();
+    int64 GetQueuedSize();
+    // Same semantics as CefResourceHandler::ReadResponse.
+    bool Read(void* data_out, int bytes_to_read, int& bytes_read,
+              CefRefPtr<CefCallback> callback);
+
+private:
+    base::Lock lock_;
+    std::deque<std::vector<unsigned char> > chunks_;
+    size_t offset_;  // Read offset in the front chunk
+    int64 size_;
+    bool finished_;
+    bool cancelled_;
+    CefRefPtr<CefCallback> pendingCallback_;
+
+    IMPLEMENT_REFCOUNTING(ChunkQueue);
+};
+
+// Serves data from a ChunkQueue, for a single request.
+class ChunkedResource : public NativeResource {
+public:
+    ChunkedResource(CefRefPtr<ChunkQueue> queue,
+                    const CefString& mimeType, int statusCode,
+                    const CefString& statusText,
+                    const CefResponse::HeaderMap& headers,
+                    int64 length);
+
+    CefRefPtr<CefResourceHandler> CreateHandler(
+            CefRefPtr<CefRequest> request) OVERRIDE;
+
+private:
+    CefRefPtr<ChunkQueue> queue_;
+    CefString mimeType_;
+    int statusCode_;
+    CefString statusText_;
+    CefResponse::HeaderMap headers_;
+    int64 length_;
+
+    IMPLEMENT_REFCOUNTING(ChunkedResource);
+};
+
+CefString GuessMimeType(const CefString& path);
+
+// Returns the decoded path following |urlPrefix| in |url|. Query and
+// fragment are removed. |defaultFile| is appended when path ends with
+// a slash. Returns false if path is not safe to use.
+bool GetRelativePath(const std::string& url, const std::string& urlPrefix,
+                     const std::string& defaultFile, std::string& path);
+
+// Handler for a region of file, |length| -1 means till the end of file.
+CefRefPtr<CefResourceHandler> CreateFileHandler(
+                                    const CefString& path,
+                                    int64 offset, int64 length,
+                                    const CefString& mimeType,
+                                    int statusCode,
+                                    const CefString& statusText,
+                                    const CefResponse::HeaderMap& headers);
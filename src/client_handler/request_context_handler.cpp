@@ -11,14 +11,18 @@
 
 CefRefPtr<CefCookieManager> RequestContextHandler::GetCookieManager() {
     REQUIRE_IO_THREAD();
+    CefRefPtr<CefCookieManager> manager;
     if (browser_.get()) {
-        return RequestHandler_GetCookieManager(browser_,
+        manager = RequestHandler_GetCookieManager(browser_,
             browser_->GetMainFrame()->GetURL());
     } else {
         CefString mainUrl;
-        return RequestHandler_GetCookieManager(browser_, mainUrl);
-    }    
+        manager = RequestHandler_GetCookieManager(browser_, mainUrl);
+    }
     // Default: return NULL.
+    base::AutoLock lock_scope(lock_);
+    cookieManager_ = manager;
+    return manager;
 }
 
 bool RequestContextHandler::OnBeforePluginLoad(
@@ -9,6 +9,7 @@
 #endif
 
 #include "common/cefpython_public_api.h"
+#include "include/base/cef_lock.h"
 
 class RequestContextHandler :
         public CefRequestContextHandler
@@ -16,6 +17,8 @@ class RequestContextHandler :
 private:
     CefRefPtr<CefBrowser> browser_;
     typedef cef_plugin_policy_t PluginPolicy;
+    base::Lock lock_;
+    CefRefPtr<CefCookieManager> cookieManager_;
 
 public:
     // Browser may be NULL when instantiated from cefpython.CreateBrowserSync.
@@ -29,6 +32,13 @@ public:
         browser_ = browser;
     }
 
+    // Cookie manager last returned by GetCookieManager, NULL when
+    // the context's default cookie manager is used.
+    CefRefPtr<CefCookieManager> GetLastCookieManager() {
+        base::AutoLock lock_scope(lock_);
+        return cookieManager_;
+    }
+
     virtual CefRefPtr<CefCookieManager> GetCookieManager() OVERRIDE;
     virtual bool OnBeforePluginLoad(const CefString& mime_type,
                                   const CefString& plugin_url,
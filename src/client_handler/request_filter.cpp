@@ -0,0 +1,748 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "request_filter.h"
+#include <ctype.h>
+#include <map>
+#include <queue>
+#include <set>
+#include <sstream>
+#include <vector>
+#include "include/base/cef_lock.h"
+#include "util.h"
+
+namespace {
+
+// Each verdict is a bit in match masks
+const int kAllowBit = 1 << REQUEST_FILTER_ALLOW;
+const int kBlockBit = 1 << REQUEST_FILTER_BLOCK;
+const int kDeferBit = 1 << REQUEST_FILTER_DEFER;
+
+// Matches many substrings in a single pass over text.
+class AhoCorasick {
+public:
+    AhoCorasick() : built_(true) { Clear(); }
+
+    void Clear() {
+        nodes_.clear();
+        nodes_.push_back(Node());
+        built_ = true;
+    }
+
+    void Add(const std::string& pattern, int mask) {
+        int node = 0;
+        for (size_t i = 0; i < pattern.size(); i++) {
+            std::map<char, int>::const_iterator it =
+                    nodes_[node].next.find(pattern[i]);
+            if (it == nodes_[node].next.end()) {
+                nodes_.push_back(Node());
+                int child = static_cast<int>(nodes_.size()) - 1;
+                nodes_[node].next[pattern[i]] = child;
+                node = child;
+            } else {
+                node = it->second;
+            }
+        }
+        nodes_[node].mask |= mask;
+        built_ = false;
+    }
+
+    // Computes failure links, called after patterns were added.
+    void Build() {
+        if (built_) {
+            return;
+        }
+        std::queue<int> queue;
+        queue.push(0);
+        while (!queue.empty()) {
+            int node = queue.front();
+            queue.pop();
+            std::map<char, int>::const_iterator it;
+            for (it = nodes_[node].next.begin();
+                    it != nodes_[node].next.end(); ++it) {
+                int child = it->second;
+                int fail = node ? Next(nodes_[node].fail, it->first) : 0;
+                nodes_[child].fail = fail;
+                // Patterns ending at the failure node end here too
+                nodes_[child].mask |= nodes_[fail].mask;
+                queue.push(child);
+            }
+        }
+        built_ = true;
+    }
+
+    int Match(const std::string& text) const {
+        int node = 0;
+        int mask = 0;
+        for (size_t i = 0; i < text.size(); i++) {
+            node = Next(node, text[i]);
+            mask |= nodes_[node].mask;
+        }
+        return mask;
+    }
+
+    bool IsEmpty() const { return nodes_.size() == 1; }
+
+private:
+    struct Node {
+        Node() : fail(0), mask(0) {}
+        std::map<char, int> next;
+        int fail;
+        int mask;
+    };
+
+    int Next(int node, char c) const {
+        while (true) {
+            std::map<char, int>::const_iterator it =
+                    nodes_[node].next.find(c);
+            if (it != nodes_[node].next.end()) {
+                return it->second;
+            }
+            if (!node) {
+                return 0;
+            }
+            node = nodes_[node].fail;
+        }
+    }
+
+    std::vector<Node> nodes_;
+    bool built_;
+};
+
+struct WildcardRule {
+    std::string pattern;
+    bool hostAnchor;  // "||" rule, matched at start of host labels
+    bool startAnchor;
+    bool endAnchor;
+    int typeMask;  // 0 means any type
+    int thirdParty;  // 1 third-party only, -1 first-party only, 0 any
+    int mask;
+};
+
+#if defined(CEFPYTHON_HAS_REGEX)
+struct RegexRule {
+    std::regex regex;
+    int mask;
+};
+#endif
+
+base::Lock g_requestFilterLock;
+std::map<std::string, int> g_filterDomains;  // Domain -> mask
+AhoCorasick g_filterSubstrings;
+std::vector<WildcardRule> g_filterWildcards;
+#if defined(CEFPYTHON_HAS_REGEX)
+std::vector<RegexRule> g_filterRegexes;
+#endif
+int g_filterRulesCount = 0;
+int g_filterDefaultVerdict = REQUEST_FILTER_DEFER;
+int64 g_filterAllowed = 0;
+int64 g_filterBlocked = 0;
+int64 g_filterDeferred = 0;
+
+// Public suffix rules in the format of the Public Suffix List, see
+// https://publicsuffix.org/list/. Separate lock, GetBaseDomain() is
+// called with g_requestFilterLock held and by cookie policy.
+base::Lock g_publicSuffixLock;
+bool g_publicSuffixDefaults = false;
+std::set<std::string> g_publicSuffixes;  // "co.uk"
+std::set<std::string> g_publicSuffixWildcards;  // "*.ck" stored as "ck"
+std::set<std::string> g_publicSuffixExceptions;  // "!www.ck"
+
+// Built-in rules. Hosting suffixes where sites of different owners
+// share a domain. Country code second-level domains like "co.uk" are
+// also recognized without rules, see IsGenericSecondLevel().
+const char* const kDefaultPublicSuffixes[] = {
+    "appspot.com", "azurewebsites.net", "blogspot.com",
+    "cloudfront.net", "firebaseapp.com", "github.io", "gitlab.io",
+    "herokuapp.com", "netlify.app", "pages.dev", "s3.amazonaws.com",
+    "vercel.app", "web.app", "workers.dev",
+};
+
+// Second-level labels used by registries of many country code TLDs,
+// e.g. "co.uk", "com.au", "ne.jp", "gob.mx".
+const char* const kGenericSecondLevels[] = {
+    "ac", "co", "com", "edu", "go", "gob", "gov", "gv", "ltd", "mil",
+    "ne", "net", "nic", "or", "org", "plc", "sch",
+};
+
+// Called with g_publicSuffixLock held
+bool AddPublicSuffixRule(const std::string& rule) {
+    if (rule.empty()) {
+        return false;
+    }
+    if (rule[0] == '!') {
+        return rule.size() > 1
+               && g_publicSuffixExceptions.insert(rule.substr(1)).second;
+    }
+    if (rule.compare(0, 2, "*.") == 0) {
+        return rule.size() > 2
+               && g_publicSuffixWildcards.insert(rule.substr(2)).second;
+    }
+    return g_publicSuffixes.insert(rule).second;
+}
+
+// Called with g_publicSuffixLock held
+void AddDefaultPublicSuffixRules() {
+    if (g_publicSuffixDefaults) {
+        return;
+    }
+    for (size_t i = 0; i < sizeof(kDefaultPublicSuffixes)
+            / sizeof(kDefaultPublicSuffixes[0]); i++) {
+        AddPublicSuffixRule(kDefaultPublicSuffixes[i]);
+    }
+    g_publicSuffixDefaults = true;
+}
+
+// "co" in "co.uk". Only for two letter country code TLDs.
+bool IsGenericSecondLevel(const std::string& label,
+                          const std::string& tld) {
+    if (tld.size() != 2) {
+        return false;
+    }
+    for (size_t i = 0; i < sizeof(kGenericSecondLevels)
+            / sizeof(kGenericSecondLevels[0]); i++) {
+        if (label == kGenericSecondLevels[i]) {
+            return true;
+        }
+    }
+    return false;
+}
+
+bool IsIpAddress(const std::string& host) {
+    if (!host.empty() && host[0] == '[') {
+        return true;
+    }
+    for (size_t i = 0; i < host.size(); i++) {
+        if (!isdigit(static_cast<unsigned char>(host[i]))
+                && host[i] != '.') {
+            return false;
+        }
+    }
+    return !host.empty();
+}
+
+// Position of the public suffix in |host|, the longest matching rule
+// wins. Without a matching rule the suffix is the last label, or the
+// last two labels for a generic second-level domain.
+size_t FindPublicSuffix(const std::string& host) {
+    base::AutoLock lock_scope(g_publicSuffixLock);
+    AddDefaultPublicSuffixRules();
+    size_t label = 0;
+    while (label != std::string::npos && label < host.size()) {
+        std::string suffix = host.substr(label);
+        size_t next = host.find('.', label);
+        if (g_publicSuffixExceptions.count(suffix)) {
+            // "!www.ck" means "www.ck" is registrable, suffix is "ck"
+            return next == std::string::npos ? label : next + 1;
+        }
+        if (g_publicSuffixes.count(suffix)
+                || (next != std::string::npos
+                    && g_publicSuffixWildcards.count(
+                            host.substr(next + 1)))) {
+            return label;
+        }
+        label = next == std::string::npos ? next : next + 1;
+    }
+    size_t last = host.rfind('.');
+    if (last == std::string::npos || last == 0) {
+        return 0;
+    }
+    size_t previous = host.rfind('.', last - 1);
+    size_t secondLevel = previous == std::string::npos ? 0 : previous + 1;
+    if (IsGenericSecondLevel(host.substr(secondLevel, last - secondLevel),
+                             host.substr(last + 1))) {
+        return secondLevel;
+    }
+    return last + 1;
+}
+
+bool IsSeparator(char c) {
+    unsigned char uc = static_cast<unsigned char>(c);
+    return !(isalnum(uc) || c == '_' || c == '-' || c == '.' || c == '%');
+}
+
+bool IsDomain(const std::string& value) {
+    if (value.empty() || value[0] == '.') {
+        return false;
+    }
+    for (size_t i = 0; i < value.size(); i++) {
+        unsigned char c = static_cast<unsigned char>(value[i]);
+        if (!(isalnum(c) || c == '-' || c == '.' || c == '_')) {
+            return false;
+        }
+    }
+    return true;
+}
+
+// Returns host part of url and its position.
+std::string GetHost(const std::string& url, size_t& start) {
+    size_t scheme = url.find("://");
+    start = scheme == std::string::npos ? 0 : scheme + 3;
+    size_t end = url.find_first_of("/?#", start);
+    if (end == std::string::npos) {
+        end = url.size();
+    }
+    size_t userInfo = url.rfind('@', end);
+    if (userInfo != std::string::npos && userInfo >= start) {
+        start = userInfo + 1;
+    }
+    size_t port = url.find(':', start);
+    if (port != std::string::npos && port < end) {
+        end = port;
+    }
+    return url.substr(start, end - start);
+}
+
+// "*" matches any sequence of characters, "^" matches a separator
+// character or end of text. Pattern must match the whole text.
+bool WildcardMatch(const std::string& pattern, const std::string& text,
+                   size_t t) {
+    size_t p = 0;
+    size_t starPattern = std::string::npos;
+    size_t starText = 0;
+    while (t < text.size()) {
+        if (p < pattern.size() && pattern[p] != '*'
+                && (pattern[p] == '^' ? IsSeparator(text[t])
+                                      : pattern[p] == text[t])) {
+            p++;
+            t++;
+        } else if (p < pattern.size() && pattern[p] == '*') {
+            starPattern = p++;
+            starText = t;
+        } else if (starPattern != std::string::npos) {
+            p = starPattern + 1;
+            t = ++starText;
+        } else {
+            return false;
+        }
+    }
+    while (p < pattern.size() && (pattern[p] == '*' || pattern[p] == '^')) {
+        p++;
+    }
+    return p == pattern.size();
+}
+
+int GetResourceTypeMask(const std::string& name) {
+    static const struct {
+        const char* name;
+        int mask;
+    } types[] = {
+        {"document", 1 << RT_MAIN_FRAME},
+        {"subdocument", 1 << RT_SUB_FRAME},
+        {"stylesheet", 1 << RT_STYLESHEET},
+        {"script", 1 << RT_SCRIPT},
+        {"image", (1 << RT_IMAGE) | (1 << RT_FAVICON)},
+        {"font", 1 << RT_FONT_RESOURCE},
+        {"object", (1 << RT_OBJECT) | (1 << RT_PLUGIN_RESOURCE)},
+        {"media", 1 << RT_MEDIA},
+        {"xmlhttprequest", 1 << RT_XHR},
+        {"ping", (1 << RT_PING) | (1 << RT_CSP_REPORT)},
+        {"other", (1 << RT_SUB_RESOURCE) | (1 << RT_WORKER)
+                  | (1 << RT_SHARED_WORKER) | (1 << RT_PREFETCH)
+                  | (1 << RT_SERVICE_WORKER)},
+    };
+    for (size_t i = 0; i < sizeof(types) / sizeof(types[0]); i++) {
+        if (name == types[i].name) {
+            return types[i].mask;
+        }
+    }
+    return 0;
+}
+
+// Returns false if options are not supported.
+bool ParseOptions(const std::string& options, WildcardRule& rule) {
+    int included = 0;
+    int excluded = 0;
+    std::istringstream stream(options);
+    std::string option;
+    while (std::getline(stream, option, ',')) {
+        bool inverse = !option.empty() && option[0] == '~';
+        std::string name = inverse ? option.substr(1) : option;
+        if (name == "third-party") {
+            rule.thirdParty = inverse ? -1 : 1;
+            continue;
+        }
+        int typeMask = GetResourceTypeMask(name);
+        if (!typeMask) {
+            return false;
+        }
+        if (inverse) {
+            excluded |= typeMask;
+        } else {
+            included |= typeMask;
+        }
+    }
+    if (excluded) {
+        included = (included ? included : ~0) & ~excluded;
+    }
+    rule.typeMask = included;
+    return true;
+}
+
+// Called with g_requestFilterLock held. Returns false if rule is not
+// supported.
+bool AddRule(std::string line, int verdict) {
+    int mask = 1 << verdict;
+    if (line.compare(0, 2, "@@") == 0) {
+        mask = kAllowBit;
+        line = line.substr(2);
+    }
+    if (line.size() > 2 && line[0] == '/' && line[line.size() - 1] == '/') {
+#if defined(CEFPYTHON_HAS_REGEX)
+        RegexRule rule;
+        try {
+            rule.regex = std::regex(line.substr(1, line.size() - 2),
+                                    std::regex::icase
+                                    | std::regex::optimize);
+        } catch (const std::regex_error&) {
+            return false;
+        }
+        rule.mask = mask;
+        g_filterRegexes.push_back(rule);
+        return true;
+#else
+        return false;
+#endif
+    }
+    WildcardRule rule;
+    rule.hostAnchor = false;
+    rule.startAnchor = false;
+    rule.endAnchor = false;
+    rule.typeMask = 0;
+    rule.thirdParty = 0;
+    rule.mask = mask;
+    bool hasOptions = false;
+    size_t dollar = line.rfind('$');
+    if (dollar != std::string::npos) {
+        if (!ParseOptions(ToLower(line.substr(dollar + 1)), rule)) {
+            return false;
+        }
+        hasOptions = true;
+        line = line.substr(0, dollar);
+    }
+    line = ToLower(line);
+    if (line.compare(0, 2, "||") == 0) {
+        rule.hostAnchor = true;
+        line = line.substr(2);
+    } else if (line.compare(0, 1, "|") == 0) {
+        rule.startAnchor = true;
+        line = line.substr(1);
+    }
+    if (!line.empty() && line[line.size() - 1] == '|') {
+        rule.endAnchor = true;
+        line = line.substr(0, line.size() - 1);
+    }
+    if (line.empty() || line == "*") {
+        return false;
+    }
+    if (!hasOptions && !rule.startAnchor && !rule.endAnchor) {
+        if (rule.hostAnchor) {
+            std::string domain = line;
+            if (domain[domain.size() - 1] == '^') {
+                domain = domain.substr(0, domain.size() - 1);
+            }
+            if (IsDomain(domain)) {
+                g_filterDomains[domain] |= mask;
+                return true;
+            }
+        } else if (line.find_first_of("*^") == std::string::npos) {
+            g_filterSubstrings.Add(line, mask);
+            return true;
+        }
+    }
+    rule.pattern = line;
+    g_filterWildcards.push_back(rule);
+    return true;
+}
+
+// Called with g_requestFilterLock held.
+int MatchRules(const std::string& url, const std::string& firstPartyUrl,
+               int resourceType) {
+    std::string lowerUrl = ToLower(url);
+    size_t hostStart = 0;
+    std::string host = GetHost(lowerUrl, hostStart);
+    int mask = 0;
+    // Domain and its parent domains
+    if (!g_filterDomains.empty()) {
+        size_t label = 0;
+        while (label != std::string::npos) {
+            std::map<std::string, int>::const_iterator it =
+                    g_filterDomains.find(host.substr(label));
+            if (it != g_filterDomains.end()) {
+                mask |= it->second;
+            }
+            label = host.find('.', label);
+            if (label != std::string::npos) {
+                label++;
+            }
+        }
+    }
+    if (mask & kAllowBit) {
+        return mask;
+    }
+    if (!g_filterSubstrings.IsEmpty()) {
+        g_filterSubstrings.Build();
+        mask |= g_filterSubstrings.Match(lowerUrl);
+    }
+    if (mask & kAllowBit) {
+        return mask;
+    }
+    int thirdParty = 0;
+    std::vector<WildcardRule>::const_iterator it;
+    for (it = g_filterWildcards.begin(); it != g_filterWildcards.end();
+            ++it) {
+        if ((mask & it->mask) == it->mask) {
+            continue;
+        }
+        if (it->typeMask && (resourceType < 0
+                || !(it->typeMask & (1 << resourceType)))) {
+            continue;
+        }
+        if (it->thirdParty) {
+            if (!thirdParty) {
+                size_t firstPartyStart = 0;
+                std::string firstPartyHost = GetHost(
+                        ToLower(firstPartyUrl), firstPartyStart);
+                thirdParty = (firstPartyHost.empty()
+                        || GetBaseDomain(firstPartyHost)
+                                == GetBaseDomain(host)) ? -1 : 1;
+            }
+            if (it->thirdParty != thirdParty) {
+                continue;
+            }
+        }
+        std::string pattern = it->pattern;
+        if (!it->endAnchor) {
+            pattern += "*";
+        }
+        bool matched = false;
+        if (it->hostAnchor) {
+            // Match at the start of host and after each dot in host
+            size_t label = hostStart;
+            while (!matched && label < hostStart + host.size()) {
+                matched = WildcardMatch(pattern, lowerUrl, label);
+                label = lowerUrl.find('.', label);
+                if (label == std::string::npos
+                        || label >= hostStart + host.size()) {
+                    break;
+                }
+                label++;
+            }
+        } else if (it->startAnchor) {
+            matched = WildcardMatch(pattern, lowerUrl, 0);
+        } else {
+            matched = WildcardMatch("*" + pattern, lowerUrl, 0);
+        }
+        if (matched) {
+            mask |= it->mask;
+            if (mask & kAllowBit) {
+                return mask;
+            }
+        }
+    }
+#if defined(CEFPYTHON_HAS_REGEX)
+    std::vector<RegexRule>::const_iterator regex;
+    for (regex = g_filterRegexes.begin(); regex != g_filterRegexes.end();
+            ++regex) {
+        if ((mask & regex->mask) != regex->mask
+                && std::regex_search(url, regex->regex)) {
+            mask |= regex->mask;
+        }
+    }
+#endif
+    return mask;
+}
+
+}  // namespace
+
+std::string GetUrlHost(const std::string& url) {
+    size_t start = 0;
+    return GetHost(ToLower(url), start);
+}
+
+std::string GetBaseDomain(const std::string& host) {
+    if (IsIpAddress(host)) {
+        return host;
+    }
+    size_t suffix = FindPublicSuffix(host);
+    if (suffix < 2) {
+        // Host is a public suffix itself
+        return host;
+    }
+    size_t label = host.rfind('.', suffix - 2);
+    return label == std::string::npos ? host : host.substr(label + 1);
+}
+
+int AddPublicSuffixRules(const std::string& rules) {
+    int added = 0;
+    std::istringstream stream(rules);
+    std::string line;
+    base::AutoLock lock_scope(g_publicSuffixLock);
+    AddDefaultPublicSuffixRules();
+    while (std::getline(stream, line)) {
+        // Rule is the first word, the rest of line is ignored
+        std::istringstream words(line);
+        std::string rule;
+        words >> rule;
+        if (rule.empty() || rule.compare(0, 2, "//") == 0) {
+            continue;
+        }
+        if (AddPublicSuffixRule(ToLower(rule))) {
+            added++;
+        }
+    }
+    return added;
+}
+
+void ClearPublicSuffixRules() {
+    base::AutoLock lock_scope(g_publicSuffixLock);
+    g_publicSuffixes.clear();
+    g_publicSuffixWildcards.clear();
+    g_publicSuffixExceptions.clear();
+    g_publicSuffixDefaults = false;
+}
+
+int AddRequestFilterRules(const std::string& rules, int verdict,
+                          int& skipped) {
+    skipped = 0;
+    if (verdict != REQUEST_FILTER_DEFER && verdict != REQUEST_FILTER_ALLOW
+            && verdict != REQUEST_FILTER_BLOCK) {
+        return 0;
+    }
+    int added = 0;
+    std::istringstream stream(rules);
+    std::string line;
+    base::AutoLock lock_scope(g_requestFilterLock);
+    while (std::getline(stream, line)) {
+        size_t start = line.find_first_not_of(" \t\r");
+        if (start == std::string::npos) {
+            continue;
+        }
+        size_t end = line.find_last_not_of(" \t\r");
+        line = line.substr(start, end - start + 1);
+        if (line[0] == '!' || line[0] == '[' || line[0] == '#') {
+            // Comment or list header
+            continue;
+        }
+        if (line.find("##") != std::string::npos
+                || line.find("#@#") != std::string::npos
+                || line.find("#?#") != std::string::npos) {
+            // Element hiding
+            skipped++;
+            continue;
+        }
+        size_t space = line.find_first_of(" \t");
+        if (space != std::string::npos) {
+            // Hosts file: "0.0.0.0 example.com", comments after "#"
+            std::istringstream fields(line.substr(0, line.find('#')));
+            std::string address, name;
+            fields >> address;
+            if (address.find_first_not_of("0123456789abcdef.:")
+                    != std::string::npos) {
+                skipped++;
+                continue;
+            }
+            while (fields >> name) {
+                name = ToLower(name);
+                if (name == "localhost" || name == "localhost.localdomain"
+                        || name == "broadcasthost" || !IsDomain(name)) {
+                    continue;
+                }
+                g_filterDomains[name] |= 1 << verdict;
+                added++;
+            }
+            continue;
+        }
+        if (AddRule(line, verdict)) {
+            added++;
+        } else {
+            skipped++;
+        }
+    }
+    g_filterRulesCount += added;
+    return added;
+}
+
+void ClearRequestFilterRules() {
+    base::AutoLock lock_scope(g_requestFilterLock);
+    g_filterDomains.clear();
+    g_filterSubstrings.Clear();
+    g_filterWildcards.clear();
+#if defined(CEFPYTHON_HAS_REGEX)
+    g_filterRegexes.clear();
+#endif
+    g_filterRulesCount = 0;
+    g_filterAllowed = 0;
+    g_filterBlocked = 0;
+    g_filterDeferred = 0;
+}
+
+int GetRequestFilterRulesCount() {
+    base::AutoLock lock_scope(g_requestFilterLock);
+    return g_filterRulesCount;
+}
+
+void SetRequestFilterDefaultVerdict(int verdict) {
+    base::AutoLock lock_scope(g_requestFilterLock);
+    g_filterDefaultVerdict = verdict;
+}
+
+int MatchRequestFilter(const std::string& url,
+                       const std::string& firstPartyUrl,
+                       int resourceType) {
+    base::AutoLock lock_scope(g_requestFilterLock);
+    int mask = g_filterRulesCount ? MatchRules(url, firstPartyUrl,
+                                               resourceType) : 0;
+    // Exception rules win over blocking rules
+    if (mask & kAllowBit) {
+        return REQUEST_FILTER_ALLOW;
+    } else if (mask & kBlockBit) {
+        return REQUEST_FILTER_BLOCK;
+    } else if (mask & kDeferBit) {
+        return REQUEST_FILTER_DEFER;
+    }
+    return g_filterDefaultVerdict;
+}
+
+int GetRequestFilterResourceType(const std::string& name) {
+    int mask = GetResourceTypeMask(name);
+    for (int type = 0; mask; type++) {
+        if (mask & (1 << type)) {
+            return type;
+        }
+    }
+    return -1;
+}
+
+void GetRequestFilterStats(int64& allowed, int64& blocked,
+                           int64& deferred) {
+    base::AutoLock lock_scope(g_requestFilterLock);
+    allowed = g_filterAllowed;
+    blocked = g_filterBlocked;
+    deferred = g_filterDeferred;
+}
+
+int FilterResourceRequest(CefRefPtr<CefRequest> request) {
+    {
+        base::AutoLock lock_scope(g_requestFilterLock);
+        if (!g_filterRulesCount
+                && g_filterDefaultVerdict == REQUEST_FILTER_DEFER) {
+            // Filter is not used
+            return REQUEST_FILTER_DEFER;
+        }
+    }
+    int verdict = MatchRequestFilter(
+            request->GetURL().ToString(),
+            request->GetFirstPartyForCookies().ToString(),
+            static_cast<int>(request->GetResourceType()));
+    base::AutoLock lock_scope(g_requestFilterLock);
+    if (verdict == REQUEST_FILTER_ALLOW) {
+        g_filterAllowed++;
+    } else if (verdict == REQUEST_FILTER_BLOCK) {
+        g_filterBlocked++;
+    } else {
+        g_filterDeferred++;
+    }
+    return verdict;
+}
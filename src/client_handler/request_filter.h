@@ -0,0 +1,71 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// Allows or blocks requests in RequestHandler::OnBeforeResourceLoad
+// without calling into Python. Rules are loaded from filter lists in
+// Adblock Plus syntax or in hosts file format, see request_filter.pyx.
+//
+// Supported rules:
+//   ||example.com^    Domain and its subdomains, kept in a set of
+//                     domains, looked up for each suffix of the host.
+//   banner/ad         Substring of url, all substrings are matched
+//                     in a single pass with Aho-Corasick automaton.
+//   |http://x*.js|    Wildcards, "^" separator and anchors.
+//   /ads?[0-9]+/      Regular expressions.
+//   @@rule            Exception rule, always allows.
+//   0.0.0.0 x.com     Hosts file entry, same as ||x.com^.
+// Options: $third-party, $~third-party and resource types, e.g.
+// $script,image or $~script. Rules with other options and element
+// hiding rules are skipped.
+
+#pragma once
+
+#include <string>
+#include "include/cef_request.h"
+
+enum RequestFilterVerdict {
+    REQUEST_FILTER_DEFER = 0,  // Call Python's OnBeforeResourceLoad
+    REQUEST_FILTER_ALLOW,
+    REQUEST_FILTER_BLOCK
+};
+
+// Adds rules from a filter list, one rule per line. |verdict| is used
+// for rules that are not exception rules. Returns number of rules
+// added, |skipped| is set to number of unsupported rules.
+int AddRequestFilterRules(const std::string& rules, int verdict,
+                          int& skipped);
+void ClearRequestFilterRules();
+int GetRequestFilterRulesCount();
+// Verdict for requests not matching any rule, REQUEST_FILTER_DEFER
+// by default.
+void SetRequestFilterDefaultVerdict(int verdict);
+// |resourceType| is a cef_resource_type_t value or -1 if not known,
+// rules with resource type options don't match then.
+int MatchRequestFilter(const std::string& url,
+                       const std::string& firstPartyUrl,
+                       int resourceType);
+// Resource type for a type option name, e.g. "script". Returns -1
+// for unknown names.
+int GetRequestFilterResourceType(const std::string& name);
+void GetRequestFilterStats(int64& allowed, int64& blocked,
+                           int64& deferred);
+
+// Host of |url| in lower case, without port.
+std::string GetUrlHost(const std::string& url);
+// Registrable domain of |host|, the public suffix and one more label,
+// e.g. "example.co.uk" for "www.example.co.uk". Hosts with different
+// base domains are third-party to each other. IP addresses and public
+// suffixes are returned as they are.
+std::string GetBaseDomain(const std::string& host);
+// Adds rules in the format of the Public Suffix List, one rule per
+// line, e.g. "co.uk", "*.ck" or "!www.ck". Built-in rules cover
+// common hosting suffixes, generic second-level domains of country
+// code TLDs (e.g. "co.uk", "com.au") are recognized without rules.
+// Returns number of rules added.
+int AddPublicSuffixRules(const std::string& rules);
+// Removes loaded rules, built-in rules are kept.
+void ClearPublicSuffixRules();
+
+// Used by RequestHandler::OnBeforeResourceLoad.
+int FilterResourceRequest(CefRefPtr<CefRequest> request);
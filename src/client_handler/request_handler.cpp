@@ -3,6 +3,13 @@
 // Project website: https://github.com/cztomczak/cefpython
 
 #include "request_handler.h"
+#include "cookie_cache.h"
+#include "cookie_policy.h"
+#include "header_rules.h"
+#include "request_filter.h"
+#include "resource_cache.h"
+#include "resource_router.h"
+#include "response_filter.h"
 #include "include/base/cef_logging.h"
 
 
@@ -25,6 +32,16 @@ ReturnValue RequestHandler::OnBeforeResourceLoad(
                                         CefRefPtr<CefRequestCallback> callback)
 {
     REQUIRE_IO_THREAD();
+    // Requests allowed or blocked by the native filter don't acquire
+    // the GIL. Header rules are applied before calling Python.
+    int verdict = FilterResourceRequest(request);
+    if (verdict == REQUEST_FILTER_BLOCK) {
+        return RV_CANCEL;
+    }
+    ApplyHeaderRules(request);
+    if (verdict == REQUEST_FILTER_ALLOW) {
+        return RV_CONTINUE;
+    }
     bool retval = RequestHandler_OnBeforeResourceLoad(browser, frame, request);
     if (retval) {
         return RV_CANCEL;
@@ -40,6 +57,19 @@ CefRefPtr<CefResourceHandler> RequestHandler::GetResourceHandler(
                                                 CefRefPtr<CefRequest> request)
 {
     REQUIRE_IO_THREAD();
+    // Routes and cache are evaluated without acquiring the GIL, Python
+    // is called only for requests that are not handled natively.
+    // Cached entries are served also for requests that the router
+    // doesn't intercept when Python fallback is disabled.
+    CefRefPtr<CefResourceHandler> handler;
+    bool toPython = RouteResourceRequest(request, handler);
+    if (handler.get()) {
+        return handler;
+    }
+    handler = ServeFromResourceCache(request);
+    if (handler.get() || !toPython) {
+        return handler;
+    }
     return RequestHandler_GetResourceHandler(browser, frame, request);
 }
 
@@ -122,6 +152,12 @@ bool RequestHandler::CanGetCookies(CefRefPtr<CefBrowser> browser,
                                    CefRefPtr<CefFrame> frame,
                                    CefRefPtr<CefRequest> request) {
     REQUIRE_IO_THREAD();
+    // Cookies allowed or blocked by the native policy don't acquire
+    // the GIL.
+    int verdict = CookiePolicyCanGetCookies(request);
+    if (verdict != REQUEST_FILTER_DEFER) {
+        return verdict == REQUEST_FILTER_ALLOW;
+    }
     return RequestHandler_CanGetCookies(browser, frame, request);
 }
 
@@ -130,5 +166,27 @@ bool RequestHandler::CanSetCookie(CefRefPtr<CefBrowser> browser,
                                   CefRefPtr<CefRequest> request,
                                   const CefCookie& cookie) {
     REQUIRE_IO_THREAD();
-    return RequestHandler_CanSetCookie(browser, frame, request, cookie);
+    int verdict = CookiePolicyCanSetCookie(request, cookie);
+    bool ret = (verdict == REQUEST_FILTER_DEFER)
+            ? RequestHandler_CanSetCookie(browser, frame, request, cookie)
+            : verdict == REQUEST_FILTER_ALLOW;
+    if (ret) {
+        CookieCacheOnCookieSet(browser, cookie);
+    }
+    return ret;
+}
+
+
+CefRefPtr<CefResponseFilter> RequestHandler::GetResourceResponseFilter(
+                                        CefRefPtr<CefBrowser> browser,
+                                        CefRefPtr<CefFrame> frame,
+                                        CefRefPtr<CefRequest> request,
+                                        CefRefPtr<CefResponse> response) {
+    REQUIRE_IO_THREAD();
+    // The GIL is acquired only when a browser has the callback
+    if (!IsResponseFilterCallbackEnabled()) {
+        return NULL;
+    }
+    return RequestHandler_GetResourceResponseFilter(browser, frame, request,
+                                                    response);
 }
@@ -76,6 +76,13 @@ public:
                       CefRefPtr<CefRequest> request,
                       const CefCookie& cookie) override;
 
+    CefRefPtr<CefResponseFilter> GetResourceResponseFilter(
+                                      CefRefPtr<CefBrowser> browser,
+                                      CefRefPtr<CefFrame> frame,
+                                      CefRefPtr<CefRequest> request,
+                                      CefRefPtr<CefResponse> response
+                                      ) override;
+
 private:
     IMPLEMENT_REFCOUNTING(RequestHandler);
 };
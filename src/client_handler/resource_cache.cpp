@@ -0,0 +1,1032 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "resource_cache.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+#include <iomanip>
+#include <list>
+#include <map>
+#include <sstream>
+#include "include/base/cef_bind.h"
+#include "include/base/cef_lock.h"
+#include "include/base/cef_logging.h"
+#include "include/cef_task.h"
+#include "include/wrapper/cef_byte_read_handler.h"
+#include "include/wrapper/cef_closure_task.h"
+#include "util.h"
+
+#if defined(OS_WIN)
+#include <windows.h>
+#else
+#include <dirent.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+namespace {
+
+const char kCacheFileMagic[] = "CEFPYTHON-CACHE-1";
+const char kCacheFileExtension[] = ".cache";
+
+class CacheEntry : public CefBaseRefCounted {
+public:
+    CacheEntry() : expires(0), noCache(false) {}
+
+    bool IsFresh(int64 now) const { return !noCache && now < expires; }
+
+    std::string key;
+    CefRefPtr<SharedBytes> body;
+    CefString mimeType;
+    CefString statusText;
+    CefResponse::HeaderMap headers;
+    int64 expires;  // Unix time
+    bool noCache;
+    std::string etag;
+    std::string lastModified;
+
+    IMPLEMENT_REFCOUNTING(CacheEntry);
+};
+
+class CachedResource : public NativeResource {
+public:
+    explicit CachedResource(CefRefPtr<CacheEntry> entry) : entry_(entry) {}
+
+    CefRefPtr<CefResourceHandler> CreateHandler(
+            CefRefPtr<CefRequest> request) OVERRIDE {
+        // Body is shared, range requests are supported.
+        CefRefPtr<CefStreamReader> stream =
+                CefStreamReader::CreateForHandler(
+                        new CefByteReadHandler(entry_->body->data(),
+                                               entry_->body->size(),
+                                               entry_->body.get()));
+        return new RangeResourceHandler(
+                stream, 0, static_cast<int64>(entry_->body->size()),
+                entry_->mimeType, 200, entry_->statusText, entry_->headers);
+    }
+
+private:
+    CefRefPtr<CacheEntry> entry_;
+
+    IMPLEMENT_REFCOUNTING(CachedResource);
+};
+
+typedef std::list<std::string> LruList;
+
+struct MemoryEntry {
+    CefRefPtr<CacheEntry> entry;
+    LruList::iterator lruPosition;
+};
+
+struct DiskEntry {
+    int64 size;
+    int64 lastUsed;
+};
+
+// Memory tier and settings
+base::Lock g_cacheLock;
+bool g_cacheEnabled = false;
+bool g_cacheServe = false;
+bool g_cacheStore = false;
+std::vector<std::string> g_varyHeaders;  // Lower case
+int64 g_memoryLimit = 0;
+int64 g_memorySize = 0;
+int64 g_storeLimit = 0;  // Largest response stored by ResourceCacheWriter
+std::map<std::string, MemoryEntry> g_memoryEntries;
+LruList g_lru;  // Most recently used first
+
+// Disk tier, file name -> entry. The lock protects the index, files
+// are read and written without holding it.
+base::Lock g_diskLock;
+std::string g_diskPath;
+int64 g_diskLimit = 0;
+int64 g_diskSize = 0;
+int64 g_diskClock = 0;
+std::map<std::string, DiskEntry> g_diskEntries;
+// Entries waiting to be written or being written on the FILE thread,
+// key -> entry
+std::map<std::string, CefRefPtr<CacheEntry> > g_diskWrites;
+
+std::string Trim(const std::string& value) {
+    size_t start = value.find_first_not_of(" \t");
+    if (start == std::string::npos) {
+        return std::string();
+    }
+    size_t end = value.find_last_not_of(" \t");
+    return value.substr(start, end - start + 1);
+}
+
+// Removes characters that would break the line based file format.
+std::string StripLineBreaks(const std::string& value) {
+    std::string result;
+    for (size_t i = 0; i < value.size(); i++) {
+        if (value[i] != '\r' && value[i] != '\n') {
+            result += value[i];
+        }
+    }
+    return result;
+}
+
+std::string FindHeader(const CefResponse::HeaderMap& headers,
+                       const std::string& lowerName) {
+    CefResponse::HeaderMap::const_iterator it;
+    for (it = headers.begin(); it != headers.end(); ++it) {
+        if (ToLower(it->first.ToString()) == lowerName) {
+            return it->second.ToString();
+        }
+    }
+    return std::string();
+}
+
+// Parses RFC 1123 dates, e.g. "Sun, 06 Nov 1994 08:49:37 GMT".
+// Returns -1 on error.
+int64 ParseHttpDate(const std::string& value) {
+    static const char* const months[] = {"jan", "feb", "mar", "apr",
+            "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"};
+    int day, year, hour, minute, second;
+    char monthName[4] = {0};
+    if (sscanf(value.c_str(), "%*[a-zA-Z], %d %3s %d %d:%d:%d",
+               &day, monthName, &year, &hour, &minute, &second) != 6) {
+        return -1;
+    }
+    int month = 0;
+    std::string lowerMonth = ToLower(monthName);
+    while (month < 12 && lowerMonth != months[month]) {
+        month++;
+    }
+    if (month == 12) {
+        return -1;
+    }
+    // Days since 1970-01-01 in the proleptic Gregorian calendar
+    int64 y = year - (month < 2 ? 1 : 0);
+    int64 era = (y >= 0 ? y : y - 399) / 400;
+    int64 yearOfEra = y - era * 400;
+    int64 m = month + 1;
+    int64 dayOfYear = (153 * (m + (m > 2 ? -3 : 9)) + 2) / 5 + day - 1;
+    int64 dayOfEra = yearOfEra * 365 + yearOfEra / 4 - yearOfEra / 100
+                     + dayOfYear;
+    int64 days = era * 146097 + dayOfEra - 719468;
+    return days * 86400 + hour * 3600 + minute * 60 + second;
+}
+
+// Returns false when response must not be stored.
+bool ComputeFreshness(const CefResponse::HeaderMap& headers, int64 now,
+                      int64& expires, bool& noCache) {
+    expires = now;
+    noCache = false;
+    bool hasMaxAge = false;
+    std::istringstream directives(
+            ToLower(FindHeader(headers, "cache-control")));
+    std::string directive;
+    while (std::getline(directives, directive, ',')) {
+        directive = Trim(directive);
+        if (directive == "no-store") {
+            return false;
+        } else if (directive == "no-cache") {
+            noCache = true;
+        } else if (directive.compare(0, 8, "max-age=") == 0) {
+            hasMaxAge = true;
+            expires = now + atol(directive.c_str() + 8);
+        }
+    }
+    if (ToLower(FindHeader(headers, "pragma")).find("no-cache")
+            != std::string::npos) {
+        noCache = true;
+    }
+    if (hasMaxAge) {
+        return true;
+    }
+    std::string expiresHeader = FindHeader(headers, "expires");
+    if (!expiresHeader.empty()) {
+        int64 parsed = ParseHttpDate(expiresHeader);
+        // Invalid dates, e.g. "0", mean already expired.
+        expires = parsed > 0 ? parsed : 0;
+        return true;
+    }
+    // Heuristic freshness, 10% of time since last modification
+    int64 lastModified = ParseHttpDate(FindHeader(headers, "last-modified"));
+    if (lastModified > 0 && lastModified < now) {
+        expires = now + (now - lastModified) / 10;
+    }
+    return true;
+}
+
+// Called with g_cacheLock held
+std::string MakeKey(const CefString& url,
+                    const CefRequest::HeaderMap& requestHeaders) {
+    std::string key = url.ToString();
+    size_t fragment = key.find('#');
+    if (fragment != std::string::npos) {
+        key.erase(fragment);
+    }
+    for (size_t i = 0; i < g_varyHeaders.size(); i++) {
+        key += "\t" + g_varyHeaders[i] + "="
+               + FindHeader(requestHeaders, g_varyHeaders[i]);
+    }
+    return StripLineBreaks(key);
+}
+
+// Called with g_cacheLock held
+bool IsVaryCacheable(const CefResponse::HeaderMap& headers) {
+    // Encoding is irrelevant, cached body is already decoded.
+    std::istringstream names(ToLower(FindHeader(headers, "vary")));
+    std::string name;
+    while (std::getline(names, name, ',')) {
+        name = Trim(name);
+        if (name.empty() || name == "accept-encoding") {
+            continue;
+        }
+        bool found = false;
+        for (size_t i = 0; i < g_varyHeaders.size(); i++) {
+            if (g_varyHeaders[i] == name) {
+                found = true;
+                break;
+            }
+        }
+        if (!found) {
+            // Includes "*"
+            return false;
+        }
+    }
+    return true;
+}
+
+// Headers that must not be replayed from cache. Content-Length is set
+// by the handler, body is stored decoded.
+bool IsStoredHeader(const std::string& name) {
+    std::string lowerName = ToLower(name);
+    return lowerName != "content-length"
+           && lowerName != "content-encoding"
+           && lowerName != "transfer-encoding"
+           && lowerName != "connection"
+           && lowerName != "keep-alive"
+           && lowerName != "set-cookie";
+}
+
+// ----------------------------------------------------------------------------
+// Memory tier, functions are called with g_cacheLock held
+// ----------------------------------------------------------------------------
+
+void RemoveMemoryEntry(const std::string& key) {
+    std::map<std::string, MemoryEntry>::iterator it =
+            g_memoryEntries.find(key);
+    if (it != g_memoryEntries.end()) {
+        g_memorySize -= it->second.entry->body->size();
+        g_lru.erase(it->second.lruPosition);
+        g_memoryEntries.erase(it);
+    }
+}
+
+void InsertMemoryEntry(CefRefPtr<CacheEntry> entry) {
+    RemoveMemoryEntry(entry->key);
+    int64 size = static_cast<int64>(entry->body->size());
+    if (size > g_memoryLimit) {
+        return;
+    }
+    g_lru.push_front(entry->key);
+    MemoryEntry memoryEntry;
+    memoryEntry.entry = entry;
+    memoryEntry.lruPosition = g_lru.begin();
+    g_memoryEntries[entry->key] = memoryEntry;
+    g_memorySize += size;
+    while (g_memorySize > g_memoryLimit && !g_lru.empty()) {
+        std::string oldestKey = g_lru.back();
+        RemoveMemoryEntry(oldestKey);
+    }
+}
+
+CefRefPtr<CacheEntry> FindMemoryEntry(const std::string& key) {
+    std::map<std::string, MemoryEntry>::iterator it =
+            g_memoryEntries.find(key);
+    if (it == g_memoryEntries.end()) {
+        return NULL;
+    }
+    g_lru.splice(g_lru.begin(), g_lru, it->second.lruPosition);
+    return it->second.entry;
+}
+
+// ----------------------------------------------------------------------------
+// Disk tier. Functions that access the index are called with g_diskLock
+// held, functions that access files are called without it.
+// ----------------------------------------------------------------------------
+
+std::string GetCacheFileName(const std::string& key) {
+    // FNV-1a 64-bit hash of the key. Collisions are detected when
+    // reading, the key is stored in the file.
+    uint64 hash = 14695981039346656037ULL;
+    for (size_t i = 0; i < key.size(); i++) {
+        hash ^= static_cast<unsigned char>(key[i]);
+        hash *= 1099511628211ULL;
+    }
+    std::ostringstream name;
+    name << std::hex << std::setw(16) << std::setfill('0') << hash
+         << kCacheFileExtension;
+    return name.str();
+}
+
+std::string JoinCachePath(const std::string& directory,
+                          const std::string& fileName) {
+#if defined(OS_WIN)
+    return directory + "\\" + fileName;
+#else
+    return directory + "/" + fileName;
+#endif
+}
+
+std::string GetCacheFilePath(const std::string& fileName) {
+    return JoinCachePath(g_diskPath, fileName);
+}
+
+FILE* OpenCacheFile(const std::string& path, const char* mode) {
+#if defined(OS_WIN)
+    return _wfopen(CefString(path).ToWString().c_str(),
+                   CefString(mode).ToWString().c_str());
+#else
+    return fopen(path.c_str(), mode);
+#endif
+}
+
+void RemoveFile(const std::string& path) {
+#if defined(OS_WIN)
+    _wremove(CefString(path).ToWString().c_str());
+#else
+    unlink(path.c_str());
+#endif
+}
+
+void RemoveCacheFile(const std::string& fileName) {
+    // File is removed first, |fileName| may be a key in g_diskEntries.
+    RemoveFile(GetCacheFilePath(fileName));
+    std::map<std::string, DiskEntry>::iterator it =
+            g_diskEntries.find(fileName);
+    if (it != g_diskEntries.end()) {
+        g_diskSize -= it->second.size;
+        g_diskEntries.erase(it);
+    }
+}
+
+bool RenameCacheFile(const std::string& from, const std::string& to) {
+#if defined(OS_WIN)
+    return MoveFileExW(CefString(from).ToWString().c_str(),
+                       CefString(to).ToWString().c_str(),
+                       MOVEFILE_REPLACE_EXISTING) != 0;
+#else
+    return rename(from.c_str(), to.c_str()) == 0;
+#endif
+}
+
+// Creates cache directory and indexes existing cache files. The index
+// is built in |entries| without holding g_diskLock.
+void LoadDiskIndex(const std::string& directory,
+                   std::map<std::string, DiskEntry>& entries,
+                   int64& size, int64& clock) {
+    entries.clear();
+    size = 0;
+    clock = 0;
+    std::string extension(kCacheFileExtension);
+#if defined(OS_WIN)
+    CreateDirectoryW(CefString(directory).ToWString().c_str(), NULL);
+    WIN32_FIND_DATAW findData;
+    HANDLE find = FindFirstFileW(
+            CefString(JoinCachePath(directory, "*")).ToWString().c_str(),
+            &findData);
+    if (find == INVALID_HANDLE_VALUE) {
+        return;
+    }
+    do {
+        std::string name = CefString(findData.cFileName).ToString();
+        if (name.size() <= extension.size()
+                || name.compare(name.size() - extension.size(),
+                                extension.size(), extension) != 0) {
+            continue;
+        }
+        DiskEntry entry;
+        entry.size = (static_cast<int64>(findData.nFileSizeHigh) << 32)
+                     | findData.nFileSizeLow;
+        entry.lastUsed = (static_cast<int64>(
+                findData.ftLastWriteTime.dwHighDateTime) << 32)
+                | findData.ftLastWriteTime.dwLowDateTime;
+        entries[name] = entry;
+        size += entry.size;
+    } while (FindNextFileW(find, &findData));
+    FindClose(find);
+#else
+    mkdir(directory.c_str(), 0700);
+    DIR* dir = opendir(directory.c_str());
+    if (!dir) {
+        LOG(ERROR) << "[Browser process] ResourceCache: cannot open"
+                      " directory: " << directory;
+        return;
+    }
+    struct dirent* dirEntry;
+    while ((dirEntry = readdir(dir)) != NULL) {
+        std::string name(dirEntry->d_name);
+        struct stat fileStat;
+        if (name.size() <= extension.size()
+                || name.compare(name.size() - extension.size(),
+                                extension.size(), extension) != 0
+                || stat(JoinCachePath(directory, name).c_str(),
+                        &fileStat) != 0) {
+            continue;
+        }
+        DiskEntry entry;
+        entry.size = static_cast<int64>(fileStat.st_size);
+        entry.lastUsed = static_cast<int64>(fileStat.st_mtime);
+        entries[name] = entry;
+        size += entry.size;
+    }
+    closedir(dir);
+#endif
+    // Continue the clock after the most recently used file
+    std::map<std::string, DiskEntry>::const_iterator it;
+    for (it = entries.begin(); it != entries.end(); ++it) {
+        if (it->second.lastUsed > clock) {
+            clock = it->second.lastUsed;
+        }
+    }
+}
+
+void EvictDiskEntries() {
+    while (g_diskSize > g_diskLimit && !g_diskEntries.empty()) {
+        std::map<std::string, DiskEntry>::iterator oldest =
+                g_diskEntries.begin();
+        std::map<std::string, DiskEntry>::iterator it;
+        for (it = g_diskEntries.begin(); it != g_diskEntries.end(); ++it) {
+            if (it->second.lastUsed < oldest->second.lastUsed) {
+                oldest = it;
+            }
+        }
+        RemoveCacheFile(oldest->first);
+    }
+}
+
+// Writes |entry| to |path|, returns size of the file or -1 on error.
+int64 WriteCacheFile(const std::string& path, CefRefPtr<CacheEntry> entry) {
+    std::ostringstream header;
+    header << kCacheFileMagic << "\n"
+           << entry->key << "\n"
+           << StripLineBreaks(entry->mimeType.ToString()) << "\n"
+           << StripLineBreaks(entry->statusText.ToString()) << "\n"
+           << entry->expires << "\n"
+           << (entry->noCache ? 1 : 0) << "\n"
+           << StripLineBreaks(entry->etag) << "\n"
+           << StripLineBreaks(entry->lastModified) << "\n"
+           << entry->headers.size() << "\n";
+    CefResponse::HeaderMap::const_iterator it;
+    for (it = entry->headers.begin(); it != entry->headers.end(); ++it) {
+        header << StripLineBreaks(it->first.ToString()) << ": "
+               << StripLineBreaks(it->second.ToString()) << "\n";
+    }
+    std::string headerData = header.str();
+    // Written to a temporary file, so that a partially written file
+    // is never read.
+    std::string tempPath = path + ".tmp";
+    FILE* file = OpenCacheFile(tempPath, "wb");
+    if (!file) {
+        LOG(ERROR) << "[Browser process] ResourceCache: cannot write"
+                      " file: " << tempPath;
+        return -1;
+    }
+    bool ok = fwrite(headerData.data(), 1, headerData.size(), file)
+                      == headerData.size()
+              && fwrite(entry->body->data(), 1, entry->body->size(), file)
+                      == entry->body->size();
+    ok = (fclose(file) == 0) && ok;
+    if (!ok || !RenameCacheFile(tempPath, path)) {
+        LOG(ERROR) << "[Browser process] ResourceCache: cannot write"
+                      " file: " << path;
+        RemoveFile(tempPath);
+        return -1;
+    }
+    return static_cast<int64>(headerData.size() + entry->body->size());
+}
+
+bool ReadLine(const std::vector<unsigned char>& data, size_t& offset,
+              std::string& line) {
+    size_t start = offset;
+    while (offset < data.size() && data[offset] != '\n') {
+        offset++;
+    }
+    if (offset == data.size()) {
+        return false;
+    }
+    line.assign(data.begin() + start, data.begin() + offset);
+    offset++;
+    return true;
+}
+
+// Reads the file at |path|. Returns NULL when the file belongs to
+// another key or when it can't be read, |invalid| is set then.
+CefRefPtr<CacheEntry> ReadCacheFile(const std::string& path,
+                                    const std::string& key, bool& invalid) {
+    invalid = true;
+    FILE* file = OpenCacheFile(path, "rb");
+    if (!file) {
+        return NULL;
+    }
+    // Size is not taken from the index, the file may have been
+    // replaced since.
+    std::vector<unsigned char> data;
+    long fileSize = -1;
+    if (fseek(file, 0, SEEK_END) == 0) {
+        fileSize = ftell(file);
+    }
+    if (fileSize > 0 && fseek(file, 0, SEEK_SET) == 0) {
+        data.resize(static_cast<size_t>(fileSize));
+        data.resize(fread(&data[0], 1, data.size(), file));
+    }
+    fclose(file);
+    CefRefPtr<CacheEntry> entry = new CacheEntry();
+    size_t offset = 0;
+    std::string line;
+    bool ok = ReadLine(data, offset, line) && line == kCacheFileMagic
+              && ReadLine(data, offset, entry->key);
+    if (ok && entry->key != key) {
+        // Hash collision, the file belongs to another entry
+        invalid = false;
+        return NULL;
+    }
+    std::string mimeType, statusText, expires, noCache, count;
+    ok = ok && ReadLine(data, offset, mimeType)
+            && ReadLine(data, offset, statusText)
+            && ReadLine(data, offset, expires)
+            && ReadLine(data, offset, noCache)
+            && ReadLine(data, offset, entry->etag)
+            && ReadLine(data, offset, entry->lastModified)
+            && ReadLine(data, offset, count);
+    int headerCount = ok ? atoi(count.c_str()) : 0;
+    for (int i = 0; ok && i < headerCount; i++) {
+        ok = ReadLine(data, offset, line);
+        size_t separator = line.find(": ");
+        if (ok && separator != std::string::npos) {
+            entry->headers.insert(std::make_pair(
+                    CefString(line.substr(0, separator)),
+                    CefString(line.substr(separator + 2))));
+        }
+    }
+    if (!ok) {
+        LOG(ERROR) << "[Browser process] ResourceCache: invalid file: "
+                   << path;
+        return NULL;
+    }
+    entry->mimeType = mimeType;
+    entry->statusText = statusText;
+    std::istringstream(expires) >> entry->expires;
+    entry->noCache = noCache == "1";
+    data.erase(data.begin(), data.begin() + offset);
+    entry->body = new SharedBytes(data);
+    invalid = false;
+    return entry;
+}
+
+// ----------------------------------------------------------------------------
+
+// Looks up memory tier first, entries read from disk are moved
+// to memory.
+CefRefPtr<CacheEntry> FindEntry(const CefString& url,
+                                const CefRequest::HeaderMap& requestHeaders) {
+    std::string key;
+    {
+        base::AutoLock lock_scope(g_cacheLock);
+        if (!g_cacheEnabled) {
+            return NULL;
+        }
+        key = MakeKey(url, requestHeaders);
+        CefRefPtr<CacheEntry> entry = FindMemoryEntry(key);
+        if (entry.get()) {
+            return entry;
+        }
+    }
+    // The file is read without holding g_diskLock
+    std::string fileName = GetCacheFileName(key);
+    std::string path;
+    CefRefPtr<CacheEntry> entry;
+    {
+        base::AutoLock lock_scope(g_diskLock);
+        std::map<std::string, CefRefPtr<CacheEntry> >::iterator pending =
+                g_diskWrites.find(key);
+        if (pending != g_diskWrites.end()) {
+            entry = pending->second;
+        } else if (!g_diskPath.empty() && g_diskEntries.find(fileName)
+                                          != g_diskEntries.end()) {
+            path = GetCacheFilePath(fileName);
+        }
+    }
+    if (!path.empty()) {
+        bool invalid = false;
+        entry = ReadCacheFile(path, key, invalid);
+        base::AutoLock lock_scope(g_diskLock);
+        std::map<std::string, DiskEntry>::iterator diskEntry =
+                g_diskEntries.find(fileName);
+        // Cache may have been cleared or moved meanwhile
+        if (diskEntry != g_diskEntries.end()
+                && path == GetCacheFilePath(fileName)) {
+            if (invalid) {
+                RemoveCacheFile(fileName);
+            } else if (entry.get()) {
+                diskEntry->second.lastUsed = ++g_diskClock;
+            }
+        }
+    }
+    if (entry.get()) {
+        base::AutoLock lock_scope(g_cacheLock);
+        if (g_cacheEnabled) {
+            InsertMemoryEntry(entry);
+        }
+    }
+    return entry;
+}
+
+void WriteDiskEntryOnFileThread(CefRefPtr<CacheEntry> entry) {
+    std::string fileName = GetCacheFileName(entry->key);
+    std::string path;
+    {
+        base::AutoLock lock_scope(g_diskLock);
+        std::map<std::string, CefRefPtr<CacheEntry> >::iterator pending =
+                g_diskWrites.find(entry->key);
+        // Entry was removed, cleared or replaced by a newer one meanwhile
+        if (pending == g_diskWrites.end()
+                || pending->second.get() != entry.get()) {
+            return;
+        }
+        path = GetCacheFilePath(fileName);
+    }
+    // The file is written without holding g_diskLock. Entry stays in
+    // g_diskWrites meanwhile, lookups find it there.
+    int64 size = WriteCacheFile(path, entry);
+    base::AutoLock lock_scope(g_diskLock);
+    std::map<std::string, CefRefPtr<CacheEntry> >::iterator pending =
+            g_diskWrites.find(entry->key);
+    if (pending == g_diskWrites.end()) {
+        // Removed or cleared while the file was written
+        if (size >= 0) {
+            RemoveFile(path);
+        }
+        return;
+    }
+    if (pending->second.get() != entry.get()) {
+        // Replaced by a newer entry, which is written next
+        return;
+    }
+    g_diskWrites.erase(pending);
+    if (size < 0) {
+        RemoveCacheFile(fileName);
+        return;
+    }
+    std::map<std::string, DiskEntry>::iterator old =
+            g_diskEntries.find(fileName);
+    if (old != g_diskEntries.end()) {
+        g_diskSize -= old->second.size;
+    }
+    DiskEntry diskEntry;
+    diskEntry.size = size;
+    diskEntry.lastUsed = ++g_diskClock;
+    g_diskEntries[fileName] = diskEntry;
+    g_diskSize += diskEntry.size;
+    EvictDiskEntries();
+}
+
+// Memory tier is updated immediately. Disk tier is written on the
+// FILE thread, so that callers holding the GIL or running on the IO
+// thread don't wait for file IO.
+void StoreEntry(CefRefPtr<CacheEntry> entry) {
+    {
+        base::AutoLock lock_scope(g_cacheLock);
+        InsertMemoryEntry(entry);
+    }
+    {
+        base::AutoLock lock_scope(g_diskLock);
+        if (g_diskPath.empty()) {
+            return;
+        }
+        g_diskWrites[entry->key] = entry;
+    }
+    if (!CefPostTask(TID_FILE, CefCreateClosureTask(base::Bind(
+            &WriteDiskEntryOnFileThread, entry)))) {
+        // CEF is not running
+        WriteDiskEntryOnFileThread(entry);
+    }
+}
+
+bool PutEntry(const CefString& url,
+              const CefRequest::HeaderMap& requestHeaders,
+              CefRefPtr<SharedBytes> body,
+              const CefString& mimeType,
+              const CefString& statusText,
+              const CefResponse::HeaderMap& headers) {
+    CefRefPtr<CacheEntry> entry = new CacheEntry();
+    if (!ComputeFreshness(headers, static_cast<int64>(time(NULL)),
+                          entry->expires, entry->noCache)) {
+        return false;
+    }
+    {
+        base::AutoLock lock_scope(g_cacheLock);
+        if (!g_cacheEnabled || !IsVaryCacheable(headers)) {
+            return false;
+        }
+        entry->key = MakeKey(url, requestHeaders);
+    }
+    entry->body = body;
+    entry->mimeType = mimeType;
+    entry->statusText = statusText;
+    entry->etag = FindHeader(headers, "etag");
+    entry->lastModified = FindHeader(headers, "last-modified");
+    CefResponse::HeaderMap::const_iterator it;
+    for (it = headers.begin(); it != headers.end(); ++it) {
+        if (IsStoredHeader(it->first.ToString())) {
+            entry->headers.insert(*it);
+        }
+    }
+    StoreEntry(entry);
+    return true;
+}
+
+}  // namespace
+
+void EnableResourceCache(int64 memorySize, const CefString& diskPath,
+                         int64 diskSize,
+                         const std::vector<CefString>& varyHeaders,
+                         bool serveCached, bool storeResponses) {
+    {
+        base::AutoLock lock_scope(g_cacheLock);
+        g_memoryEntries.clear();
+        g_lru.clear();
+        g_memorySize = 0;
+        g_memoryLimit = memorySize;
+        g_varyHeaders.clear();
+        for (size_t i = 0; i < varyHeaders.size(); i++) {
+            g_varyHeaders.push_back(ToLower(varyHeaders[i].ToString()));
+        }
+        g_cacheServe = serveCached;
+        g_cacheStore = storeResponses;
+        g_storeLimit = memorySize;
+        if (!diskPath.empty() && diskSize > g_storeLimit) {
+            g_storeLimit = diskSize;
+        }
+        g_cacheEnabled = true;
+    }
+    std::string path = diskPath.ToString();
+    std::map<std::string, DiskEntry> entries;
+    int64 size = 0;
+    int64 clock = 0;
+    if (!path.empty()) {
+        LoadDiskIndex(path, entries, size, clock);
+    }
+    base::AutoLock lock_scope(g_diskLock);
+    g_diskWrites.clear();
+    g_diskPath = path;
+    g_diskLimit = diskSize;
+    g_diskEntries.swap(entries);
+    g_diskSize = size;
+    g_diskClock = clock;
+    EvictDiskEntries();
+}
+
+void DisableResourceCache() {
+    {
+        base::AutoLock lock_scope(g_cacheLock);
+        g_cacheEnabled = false;
+        g_cacheServe = false;
+        g_cacheStore = false;
+        g_storeLimit = 0;
+        g_memoryEntries.clear();
+        g_lru.clear();
+        g_memorySize = 0;
+    }
+    base::AutoLock lock_scope(g_diskLock);
+    g_diskWrites.clear();
+    g_diskPath.clear();
+    g_diskEntries.clear();
+    g_diskSize = 0;
+}
+
+bool IsResourceCacheEnabled() {
+    base::AutoLock lock_scope(g_cacheLock);
+    return g_cacheEnabled;
+}
+
+bool PutCachedResource(const CefString& url,
+                       const CefRequest::HeaderMap& requestHeaders,
+                       const char* data, size_t size,
+                       const CefString& mimeType,
+                       const CefString& statusText,
+                       const CefResponse::HeaderMap& headers) {
+    return PutEntry(url, requestHeaders, new SharedBytes(data, size),
+                    mimeType, statusText, headers);
+}
+
+CefRefPtr<NativeResource> GetCachedResource(
+                                const CefString& url,
+                                const CefRequest::HeaderMap& requestHeaders,
+                                bool allowStale) {
+    CefRefPtr<CacheEntry> entry = FindEntry(url, requestHeaders);
+    if (!entry.get() || (!allowStale
+            && !entry->IsFresh(static_cast<int64>(time(NULL))))) {
+        return NULL;
+    }
+    return new CachedResource(entry);
+}
+
+bool GetCachedResourceValidators(const CefString& url,
+                                 const CefRequest::HeaderMap& requestHeaders,
+                                 CefString& etag, CefString& lastModified) {
+    CefRefPtr<CacheEntry> entry = FindEntry(url, requestHeaders);
+    if (!entry.get()) {
+        return false;
+    }
+    etag = entry->etag;
+    lastModified = entry->lastModified;
+    return true;
+}
+
+bool RefreshCachedResource(const CefString& url,
+                           const CefRequest::HeaderMap& requestHeaders,
+                           const CefResponse::HeaderMap& headers) {
+    CefRefPtr<CacheEntry> entry = FindEntry(url, requestHeaders);
+    if (!entry.get()) {
+        return false;
+    }
+    // Entries are shared with handlers, a copy is modified.
+    CefRefPtr<CacheEntry> refreshed = new CacheEntry();
+    if (!ComputeFreshness(headers, static_cast<int64>(time(NULL)),
+                          refreshed->expires, refreshed->noCache)) {
+        RemoveCachedResource(url, requestHeaders);
+        return false;
+    }
+    refreshed->key = entry->key;
+    refreshed->body = entry->body;
+    refreshed->mimeType = entry->mimeType;
+    refreshed->statusText = entry->statusText;
+    refreshed->headers = entry->headers;
+    std::string etag = FindHeader(headers, "etag");
+    refreshed->etag = etag.empty() ? entry->etag : etag;
+    std::string lastModified = FindHeader(headers, "last-modified");
+    refreshed->lastModified = lastModified.empty() ? entry->lastModified
+                                                   : lastModified;
+    StoreEntry(refreshed);
+    return true;
+}
+
+bool RemoveCachedResource(const CefString& url,
+                          const CefRequest::HeaderMap& requestHeaders) {
+    std::string key;
+    bool removed = false;
+    {
+        base::AutoLock lock_scope(g_cacheLock);
+        key = MakeKey(url, requestHeaders);
+        removed = g_memoryEntries.find(key) != g_memoryEntries.end();
+        RemoveMemoryEntry(key);
+    }
+    base::AutoLock lock_scope(g_diskLock);
+    if (g_diskWrites.erase(key)) {
+        removed = true;
+    }
+    std::string fileName = GetCacheFileName(key);
+    if (g_diskEntries.find(fileName) != g_diskEntries.end()) {
+        RemoveCacheFile(fileName);
+        removed = true;
+    }
+    return removed;
+}
+
+void ClearResourceCache() {
+    {
+        base::AutoLock lock_scope(g_cacheLock);
+        g_memoryEntries.clear();
+        g_lru.clear();
+        g_memorySize = 0;
+    }
+    base::AutoLock lock_scope(g_diskLock);
+    g_diskWrites.clear();
+    while (!g_diskEntries.empty()) {
+        RemoveCacheFile(g_diskEntries.begin()->first);
+    }
+}
+
+int64 GetResourceCacheMemorySize() {
+    base::AutoLock lock_scope(g_cacheLock);
+    return g_memorySize;
+}
+
+int64 GetResourceCacheDiskSize() {
+    base::AutoLock lock_scope(g_diskLock);
+    return g_diskSize;
+}
+
+CefRefPtr<CefResourceHandler> ServeFromResourceCache(
+                                    CefRefPtr<CefRequest> request) {
+    {
+        base::AutoLock lock_scope(g_cacheLock);
+        if (!g_cacheEnabled || !g_cacheServe) {
+            return NULL;
+        }
+    }
+    if (request->GetMethod() != "GET") {
+        return NULL;
+    }
+    CefRequest::HeaderMap requestHeaders;
+    request->GetHeaderMap(requestHeaders);
+    // Hard reload bypasses the cache. "max-age=0" sent on a normal
+    // reload is ignored, serving reloads is the purpose of this cache.
+    if (ToLower(FindHeader(requestHeaders, "cache-control")).find(
+                "no-cache") != std::string::npos
+            || ToLower(FindHeader(requestHeaders, "pragma")).find(
+                "no-cache") != std::string::npos) {
+        return NULL;
+    }
+    CefRefPtr<NativeResource> resource = GetCachedResource(
+            request->GetURL(), requestHeaders, false);
+    if (!resource.get()) {
+        return NULL;
+    }
+    return resource->CreateHandler(request);
+}
+
+// ----------------------------------------------------------------------------
+// ResourceCacheWriter
+// ----------------------------------------------------------------------------
+
+ResourceCacheWriter::ResourceCacheWriter()
+    : active_(false), limit_(0), responseLength_(-1) {
+}
+
+void ResourceCacheWriter::Start(CefRefPtr<CefRequest> request) {
+    Cancel();
+    {
+        base::AutoLock lock_scope(g_cacheLock);
+        if (!g_cacheEnabled || !g_cacheStore) {
+            return;
+        }
+        limit_ = g_storeLimit;
+    }
+    if (request->GetMethod() != "GET") {
+        return;
+    }
+    url_ = request->GetURL();
+    request->GetHeaderMap(requestHeaders_);
+    active_ = true;
+}
+
+void ResourceCacheWriter::SetResponse(CefRefPtr<CefResponse> response,
+                                      int64 responseLength,
+                                      const CefString& redirectUrl) {
+    if (!active_) {
+        return;
+    }
+    response->GetHeaderMap(headers_);
+    // Only responses that can be served or revalidated later are
+    // collected, other responses would just evict useful entries.
+    int64 now = static_cast<int64>(time(NULL));
+    int64 expires = 0;
+    bool noCache = false;
+    if (response->GetStatus() != 200 || !redirectUrl.empty()
+            || responseLength > limit_
+            || !ComputeFreshness(headers_, now, expires, noCache)
+            || ((noCache || expires <= now)
+                && FindHeader(headers_, "etag").empty()
+                && FindHeader(headers_, "last-modified").empty())) {
+        Cancel();
+        return;
+    }
+    mimeType_ = response->GetMimeType();
+    statusText_ = response->GetStatusText();
+    responseLength_ = responseLength;
+    if (responseLength > 0) {
+        body_.reserve(static_cast<size_t>(responseLength));
+    }
+}
+
+void ResourceCacheWriter::Write(const void* data, int size) {
+    if (!active_ || size <= 0) {
+        return;
+    }
+    if (static_cast<int64>(body_.size() + size) > limit_) {
+        Cancel();
+        return;
+    }
+    const unsigned char* bytes = static_cast<const unsigned char*>(data);
+    body_.insert(body_.end(), bytes, bytes + size);
+}
+
+void ResourceCacheWriter::Finish() {
+    // Truncated responses are not stored
+    if (active_ && (responseLength_ < 0
+            || static_cast<int64>(body_.size()) == responseLength_)) {
+        PutEntry(url_, requestHeaders_, new SharedBytes(body_), mimeType_,
+                 statusText_, headers_);
+    }
+    Cancel();
+}
+
+void ResourceCacheWriter::Cancel() {
+    active_ = false;
+    responseLength_ = -1;
+    url_.clear();
+    mimeType_.clear();
+    statusText_.clear();
+    requestHeaders_.clear();
+    headers_.clear();
+    std::vector<unsigned char>().swap(body_);
+}
@@ -0,0 +1,105 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// Cache of responses fetched by Python resource handlers. Entries
+// are keyed by url and the values of request headers listed in
+// |varyHeaders|. Memory tier is a LRU of |memorySize| bytes. When
+// |diskPath| is set entries are also written to that directory, which
+// is bounded by |diskSize| bytes and survives application restarts.
+// Freshness is computed from Cache-Control, Expires and Last-Modified
+// response headers. Stale entries can be revalidated using ETag and
+// Last-Modified validators.
+//
+// When serving is enabled fresh entries are served natively in
+// RequestHandler::GetResourceHandler, without calling into Python.
+// Responses of Python resource handlers are stored by
+// ResourceCacheWriter as they are read by CEF, Python can also store
+// responses with ResourceCache.Put() (see resource_cache.pyx). Disk
+// tier is written on the FILE thread.
+
+#pragma once
+
+#include <string>
+#include <vector>
+#include "include/cef_request.h"
+#include "include/cef_resource_handler.h"
+#include "include/cef_response.h"
+#include "native_resource.h"
+
+void EnableResourceCache(int64 memorySize, const CefString& diskPath,
+                         int64 diskSize,
+                         const std::vector<CefString>& varyHeaders,
+                         bool serveCached, bool storeResponses);
+// Memory tier is released, files on disk are kept.
+void DisableResourceCache();
+bool IsResourceCacheEnabled();
+
+// Stores response with status 200. Returns false when the cache is
+// disabled or the response must not be stored, e.g. because of
+// "Cache-Control: no-store".
+bool PutCachedResource(const CefString& url,
+                       const CefRequest::HeaderMap& requestHeaders,
+                       const char* data, size_t size,
+                       const CefString& mimeType,
+                       const CefString& statusText,
+                       const CefResponse::HeaderMap& headers);
+// Returns NULL when not found or when the entry is stale and
+// |allowStale| is false.
+CefRefPtr<NativeResource> GetCachedResource(
+                                const CefString& url,
+                                const CefRequest::HeaderMap& requestHeaders,
+                                bool allowStale);
+// Validators for a conditional request. Returns false when not found.
+bool GetCachedResourceValidators(const CefString& url,
+                                 const CefRequest::HeaderMap& requestHeaders,
+                                 CefString& etag, CefString& lastModified);
+// Updates freshness after a "304 Not Modified" response.
+bool RefreshCachedResource(const CefString& url,
+                           const CefRequest::HeaderMap& requestHeaders,
+                           const CefResponse::HeaderMap& headers);
+bool RemoveCachedResource(const CefString& url,
+                          const CefRequest::HeaderMap& requestHeaders);
+// Removes entries from memory and disk.
+void ClearResourceCache();
+int64 GetResourceCacheMemorySize();
+int64 GetResourceCacheDiskSize();
+
+// Returns a handler for a fresh entry when serving is enabled and
+// the request is a GET request that doesn't bypass the cache.
+// Otherwise returns NULL.
+CefRefPtr<CefResourceHandler> ServeFromResourceCache(
+                                    CefRefPtr<CefRequest> request);
+
+// Collects a response of a Python resource handler and stores it in
+// the cache when the response is complete. Responses that are not
+// GET 200 responses, that can't be served or revalidated later or
+// that don't fit in the cache are ignored. Used on the IO thread by
+// ResourceHandler, only when storing responses is enabled.
+class ResourceCacheWriter {
+public:
+    ResourceCacheWriter();
+
+    // Called in ProcessRequest()
+    void Start(CefRefPtr<CefRequest> request);
+    // Called in GetResponseHeaders()
+    void SetResponse(CefRefPtr<CefResponse> response, int64 responseLength,
+                     const CefString& redirectUrl);
+    // Called with data read in ReadResponse()
+    void Write(const void* data, int size);
+    // Called when ReadResponse() completes the response
+    void Finish();
+    // Discards collected data
+    void Cancel();
+
+private:
+    bool active_;
+    int64 limit_;
+    int64 responseLength_;
+    CefString url_;
+    CefRequest::HeaderMap requestHeaders_;
+    CefString mimeType_;
+    CefString statusText_;
+    CefResponse::HeaderMap headers_;
+    std::vector<unsigned char> body_;
+};
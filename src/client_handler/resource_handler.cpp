@@ -3,10 +3,13 @@
 // Project website: https://github.com/cztomczak/cefpython
 
 #include "resource_handler.h"
+#include "cookie_cache.h"
+#include "cookie_policy.h"
 
 bool ResourceHandler::ProcessRequest(CefRefPtr<CefRequest> request,
                           CefRefPtr<CefCallback> callback) {
     REQUIRE_IO_THREAD();
+    cacheWriter_.Start(request);
     return ResourceHandler_ProcessRequest(resourceHandlerId_, request,
             callback);
 }
@@ -17,6 +20,7 @@ void ResourceHandler::GetResponseHeaders(CefRefPtr<CefResponse> response,
     REQUIRE_IO_THREAD();
     ResourceHandler_GetResponseHeaders(resourceHandlerId_, response,
             response_length, redirectUrl);
+    cacheWriter_.SetResponse(response, response_length, redirectUrl);
 }
 
 bool ResourceHandler::ReadResponse(void* data_out,
@@ -24,21 +28,40 @@ bool ResourceHandler::ReadResponse(void* data_out,
                         int& bytes_read,
                         CefRefPtr<CefCallback> callback) {
     REQUIRE_IO_THREAD();
-    return ResourceHandler_ReadResponse(resourceHandlerId_, data_out,
+    bool ret = ResourceHandler_ReadResponse(resourceHandlerId_, data_out,
             bytes_to_read, bytes_read, callback);
+    // Returning false completes the response
+    if (ret) {
+        cacheWriter_.Write(data_out, bytes_read);
+    } else {
+        cacheWriter_.Finish();
+    }
+    return ret;
 }
 
 bool ResourceHandler::CanGetCookie(const CefCookie& cookie) {
     REQUIRE_IO_THREAD();
+    int verdict = CookiePolicyCanGetCookie(cookie);
+    if (verdict != REQUEST_FILTER_DEFER) {
+        return verdict == REQUEST_FILTER_ALLOW;
+    }
     return ResourceHandler_CanGetCookie(resourceHandlerId_, cookie);
 }
 
 bool ResourceHandler::CanSetCookie(const CefCookie& cookie) {
     REQUIRE_IO_THREAD();
-    return ResourceHandler_CanSetCookie(resourceHandlerId_, cookie);
+    int verdict = CookiePolicyCanSetCookie(NULL, cookie);
+    bool ret = (verdict == REQUEST_FILTER_DEFER)
+            ? ResourceHandler_CanSetCookie(resourceHandlerId_, cookie)
+            : verdict == REQUEST_FILTER_ALLOW;
+    if (ret) {
+        CookieCacheOnCookieSet(browser_, cookie);
+    }
+    return ret;
 }
 
 void ResourceHandler::Cancel() {
     REQUIRE_IO_THREAD();
+    cacheWriter_.Cancel();
     return ResourceHandler_Cancel(resourceHandlerId_);
 }
@@ -9,14 +9,18 @@
 #endif
 
 #include "common/cefpython_public_api.h"
+#include "resource_cache.h"
 
 class ResourceHandler : public CefResourceHandler
 {
 public:
     int resourceHandlerId_;
+    // May be NULL, see CookieCacheOnCookieSet
+    CefRefPtr<CefBrowser> browser_;
 public:
-    ResourceHandler(int resourceHandlerId)
-        : resourceHandlerId_(resourceHandlerId) {
+    ResourceHandler(int resourceHandlerId, CefRefPtr<CefBrowser> browser)
+        : resourceHandlerId_(resourceHandlerId),
+          browser_(browser) {
     }    
 
   virtual bool ProcessRequest(CefRefPtr<CefRequest> request,
@@ -38,5 +42,8 @@ public:
   virtual void Cancel() OVERRIDE;
     
 private:
+  // Stores the response in ResourceCache, see resource_cache.h
+  ResourceCacheWriter cacheWriter_;
+
   IMPLEMENT_REFCOUNTING(ResourceHandler);
 };
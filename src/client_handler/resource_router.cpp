@@ -0,0 +1,154 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "resource_router.h"
+#include <string>
+#include <vector>
+#include "include/base/cef_lock.h"
+#include "util.h"
+
+namespace {
+
+struct ResourceRoute {
+    int id;
+    int matchType;
+    std::string pattern;
+#if defined(CEFPYTHON_HAS_REGEX)
+    std::regex regex;
+#endif
+    CefRefPtr<NativeResource> resource;
+};
+
+base::Lock g_resourceRoutesLock;
+std::vector<ResourceRoute> g_resourceRoutes;
+int g_resourceRouteMaxId = 0;
+bool g_resourceRouterPythonFallback = true;
+
+}  // namespace
+
+bool GlobMatch(const std::string& pattern, const std::string& text) {
+    size_t p = 0;
+    size_t t = 0;
+    size_t starPattern = std::string::npos;
+    size_t starText = 0;
+    while (t < text.size()) {
+        if (p < pattern.size()
+                && (pattern[p] == '?' || pattern[p] == text[t])) {
+            p++;
+            t++;
+        } else if (p < pattern.size() && pattern[p] == '*') {
+            starPattern = p++;
+            starText = t;
+        } else if (starPattern != std::string::npos) {
+            // Let the last "*" match one more character
+            p = starPattern + 1;
+            t = ++starText;
+        } else {
+            return false;
+        }
+    }
+    while (p < pattern.size() && pattern[p] == '*') {
+        p++;
+    }
+    return p == pattern.size();
+}
+
+int AddResourceRoute(int matchType, const CefString& pattern,
+                     CefRefPtr<NativeResource> resource, CefString& error) {
+    ResourceRoute route;
+    route.matchType = matchType;
+    route.pattern = pattern.ToString();
+    route.resource = resource;
+    if (matchType == ROUTE_MATCH_REGEX) {
+#if defined(CEFPYTHON_HAS_REGEX)
+        try {
+            route.regex = std::regex(route.pattern);
+        } catch (const std::regex_error& e) {
+            error = std::string("Invalid regular expression: ") + e.what();
+            return 0;
+        }
+#else
+        error = "Regular expressions are not supported in this build";
+        return 0;
+#endif
+    } else if (matchType != ROUTE_MATCH_PREFIX
+            && matchType != ROUTE_MATCH_GLOB) {
+        error = "Invalid match type";
+        return 0;
+    }
+    base::AutoLock lock_scope(g_resourceRoutesLock);
+    route.id = ++g_resourceRouteMaxId;
+    g_resourceRoutes.push_back(route);
+    return route.id;
+}
+
+bool RemoveResourceRoute(int routeId) {
+    base::AutoLock lock_scope(g_resourceRoutesLock);
+    std::vector<ResourceRoute>::iterator it;
+    for (it = g_resourceRoutes.begin(); it != g_resourceRoutes.end(); ++it) {
+        if (it->id == routeId) {
+            g_resourceRoutes.erase(it);
+            return true;
+        }
+    }
+    return false;
+}
+
+void ClearResourceRoutes() {
+    base::AutoLock lock_scope(g_resourceRoutesLock);
+    g_resourceRoutes.clear();
+}
+
+int GetResourceRoutesCount() {
+    base::AutoLock lock_scope(g_resourceRoutesLock);
+    return static_cast<int>(g_resourceRoutes.size());
+}
+
+void SetResourceRouterPythonFallback(bool enabled) {
+    base::AutoLock lock_scope(g_resourceRoutesLock);
+    g_resourceRouterPythonFallback = enabled;
+}
+
+bool RouteResourceRequest(CefRefPtr<CefRequest> request,
+                          CefRefPtr<CefResourceHandler>& handler) {
+    handler = NULL;
+    CefRefPtr<NativeResource> resource;
+    bool matched = false;
+    {
+        base::AutoLock lock_scope(g_resourceRoutesLock);
+        if (g_resourceRoutes.empty()) {
+            return g_resourceRouterPythonFallback;
+        }
+        std::string url = request->GetURL().ToString();
+        std::vector<ResourceRoute>::const_iterator it;
+        for (it = g_resourceRoutes.begin(); it != g_resourceRoutes.end();
+                ++it) {
+            if (it->matchType == ROUTE_MATCH_PREFIX) {
+                matched = url.compare(0, it->pattern.size(),
+                                      it->pattern) == 0;
+            } else if (it->matchType == ROUTE_MATCH_GLOB) {
+                matched = GlobMatch(it->pattern, url);
+            }
+#if defined(CEFPYTHON_HAS_REGEX)
+            else if (it->matchType == ROUTE_MATCH_REGEX) {
+                matched = std::regex_search(url, it->regex);
+            }
+#endif
+            if (matched) {
+                resource = it->resource;
+                break;
+            }
+        }
+        if (!matched) {
+            return g_resourceRouterPythonFallback;
+        }
+    }
+    if (!resource.get()) {
+        // Route forwards to Python
+        return true;
+    }
+    // Handler is created outside of the lock, it may open files.
+    handler = resource->CreateHandler(request);
+    return false;
+}
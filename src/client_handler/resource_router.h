@@ -0,0 +1,42 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// Routes requests to native resources without calling into Python.
+// Routes are evaluated on the IO thread in RequestHandler::
+// GetResourceHandler, they are modified from Python on any thread.
+
+#pragma once
+
+#include "include/cef_request.h"
+#include "include/cef_resource_handler.h"
+#include "native_resource.h"
+
+enum RouteMatchType {
+    ROUTE_MATCH_PREFIX = 0,
+    ROUTE_MATCH_GLOB,
+    ROUTE_MATCH_REGEX
+};
+
+// A NULL |resource| forwards matching requests to Python's
+// GetResourceHandler. Returns route id or 0 on error, in such case
+// |error| is set.
+int AddResourceRoute(int matchType, const CefString& pattern,
+                     CefRefPtr<NativeResource> resource, CefString& error);
+bool RemoveResourceRoute(int routeId);
+void ClearResourceRoutes();
+int GetResourceRoutesCount();
+
+// Whether requests not matching any route are forwarded to Python.
+// Enabled by default.
+void SetResourceRouterPythonFallback(bool enabled);
+
+// Returns true when the request should be passed to Python. Otherwise
+// |handler| is set to the native handler or NULL if the request
+// should not be intercepted.
+bool RouteResourceRequest(CefRefPtr<CefRequest> request,
+                          CefRefPtr<CefResourceHandler>& handler);
+
+// Simple glob matching, "*" matches any sequence of characters
+// (including "/") and "?" matches a single character.
+bool GlobMatch(const std::string& pattern, const std::string& text);
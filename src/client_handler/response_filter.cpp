@@ -0,0 +1,299 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "response_filter.h"
+#include <string.h>
+#include "common/cefpython_public_api.h"
+#include "include/base/cef_lock.h"
+#include "include/base/cef_logging.h"
+
+namespace {
+
+// Output kept back until the end of the response. Calls that don't
+// produce output write a single byte of it, so that CEF keeps calling
+// the filter while input is held back.
+const size_t kOutputReserve = 1024;
+
+base::Lock g_responseFilterCallbackLock;
+bool g_responseFilterCallbackEnabled = false;
+
+}  // namespace
+
+void SetResponseFilterCallbackEnabled(bool enabled) {
+    base::AutoLock lock_scope(g_responseFilterCallbackLock);
+    g_responseFilterCallbackEnabled = enabled;
+}
+
+bool IsResponseFilterCallbackEnabled() {
+    base::AutoLock lock_scope(g_responseFilterCallbackLock);
+    return g_responseFilterCallbackEnabled;
+}
+
+// ----------------------------------------------------------------------------
+// BufferedResponseFilter
+// ----------------------------------------------------------------------------
+
+BufferedResponseFilter::BufferedResponseFilter()
+        : outputOffset_(0),
+          eof_(false) {
+}
+
+CefResponseFilter::FilterStatus BufferedResponseFilter::Filter(
+                                        void* data_in,
+                                        size_t data_in_size,
+                                        size_t& data_in_read,
+                                        void* data_out,
+                                        size_t data_out_size,
+                                        size_t& data_out_written) {
+    data_in_read = 0;
+    data_out_written = 0;
+    if (outputOffset_) {
+        // Output is kept until the end of the response, written part
+        // of it is removed.
+        output_.erase(0, outputOffset_);
+        outputOffset_ = 0;
+    }
+    if (data_in_size) {
+        // Process input only when pending output fits in the output
+        // buffer and the reserve, so that it doesn't grow. Otherwise
+        // the output buffer is filled and input is read in the next
+        // call.
+        if (output_.size() - outputOffset_ < data_out_size + kOutputReserve) {
+            if (!Process(static_cast<const char*>(data_in), data_in_size,
+                         false, output_)) {
+                return RESPONSE_FILTER_ERROR;
+            }
+            data_in_read = data_in_size;
+        }
+    } else if (!eof_) {
+        // Called with empty input when there is no more input data
+        eof_ = true;
+        if (!Process(NULL, 0, true, output_)) {
+            return RESPONSE_FILTER_ERROR;
+        }
+    }
+    bool holding = !eof_ && HasPendingInput();
+    if (holding && outputOffset_ == output_.size()) {
+        // Nothing to write, CEF wouldn't call again if the response
+        // is complete.
+        if (!Release(output_)) {
+            return RESPONSE_FILTER_ERROR;
+        }
+        holding = HasPendingInput();
+    }
+    size_t count = output_.size() - outputOffset_;
+    if (!eof_ && count > 1) {
+        // Keep the reserve until the end of the response
+        count = count > kOutputReserve ? count - kOutputReserve : 1;
+    }
+    if (count > data_out_size) {
+        count = data_out_size;
+    }
+    if (count) {
+        memcpy(data_out, output_.data() + outputOffset_, count);
+        outputOffset_ += count;
+        data_out_written = count;
+    }
+    // Calls continue after data was written and more data is pending
+    if (outputOffset_ < output_.size() || holding) {
+        return RESPONSE_FILTER_NEED_MORE_DATA;
+    }
+    return RESPONSE_FILTER_DONE;
+}
+
+// ----------------------------------------------------------------------------
+// ReplaceResponseFilter
+// ----------------------------------------------------------------------------
+
+namespace {
+
+// Streaming find/replace. Input that may be the beginning of a match
+// is kept until more data is available.
+class StreamReplacer {
+public:
+    StreamReplacer(const std::string& find, const std::string& replace)
+            : find_(find), replace_(replace) {}
+
+    void Process(const std::string& input, bool eof, std::string& output) {
+        pending_.append(input);
+        size_t start = 0;
+        size_t pos;
+        while (!find_.empty()
+                && (pos = pending_.find(find_, start)) != std::string::npos) {
+            output.append(pending_, start, pos - start);
+            output.append(replace_);
+            start = pos + find_.size();
+        }
+        size_t keep = 0;
+        if (!eof) {
+            // Keep the longest suffix that is a prefix of |find_|
+            size_t maxKeep = find_.empty() ? 0 : find_.size() - 1;
+            if (maxKeep > pending_.size() - start) {
+                maxKeep = pending_.size() - start;
+            }
+            for (keep = maxKeep; keep > 0; keep--) {
+                if (pending_.compare(pending_.size() - keep, keep,
+                                     find_, 0, keep) == 0) {
+                    break;
+                }
+            }
+        }
+        output.append(pending_, start, pending_.size() - start - keep);
+        pending_.erase(0, pending_.size() - keep);
+    }
+
+    bool HasPending() const { return !pending_.empty(); }
+
+private:
+    std::string find_;
+    std::string replace_;
+    std::string pending_;
+};
+
+class ReplaceResponseFilter : public BufferedResponseFilter {
+public:
+    explicit ReplaceResponseFilter(
+            const ResponseFilterReplacements& replacements) {
+        for (size_t i = 0; i < replacements.size(); i++) {
+            replacers_.push_back(StreamReplacer(replacements[i].first,
+                                                replacements[i].second));
+        }
+    }
+
+protected:
+    bool Process(const char* data, size_t size, bool eof,
+                 std::string& output) OVERRIDE {
+        // Replacements are applied one after another
+        std::string chunk(data ? data : "", size);
+        for (size_t i = 0; i < replacers_.size(); i++) {
+            std::string replaced;
+            replacers_[i].Process(chunk, eof, replaced);
+            chunk.swap(replaced);
+        }
+        output.append(chunk);
+        return true;
+    }
+
+    bool Release(std::string& output) OVERRIDE {
+        // Matches that begin in the held back input are not replaced
+        return Process(NULL, 0, true, output);
+    }
+
+    bool HasPendingInput() OVERRIDE {
+        for (size_t i = 0; i < replacers_.size(); i++) {
+            if (replacers_[i].HasPending()) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+private:
+    std::vector<StreamReplacer> replacers_;
+
+    IMPLEMENT_REFCOUNTING(ReplaceResponseFilter);
+};
+
+#if defined(CEFPYTHON_HAS_REGEX)
+class RegexResponseFilter : public BufferedResponseFilter {
+public:
+    RegexResponseFilter(const std::regex& regex,
+                        const std::string& replacement,
+                        size_t maxSize)
+            : regex_(regex), replacement_(replacement),
+              maxSize_(maxSize), passthrough_(false) {}
+
+protected:
+    bool Process(const char* data, size_t size, bool eof,
+                 std::string& output) OVERRIDE {
+        if (passthrough_) {
+            output.append(data ? data : "", size);
+            return true;
+        }
+        body_.append(data ? data : "", size);
+        if (body_.size() > maxSize_) {
+            // Too large to buffer, pass through unmodified
+            passthrough_ = true;
+            output.append(body_);
+            body_.clear();
+        } else if (eof) {
+            output.append(std::regex_replace(body_, regex_, replacement_));
+            body_.clear();
+        }
+        return true;
+    }
+
+    bool Release(std::string& output) OVERRIDE {
+        // Input received so far is replaced on its own
+        return Process(NULL, 0, true, output);
+    }
+
+    bool HasPendingInput() OVERRIDE { return !body_.empty(); }
+
+private:
+    std::regex regex_;
+    std::string replacement_;
+    size_t maxSize_;
+    bool passthrough_;
+    std::string body_;
+
+    IMPLEMENT_REFCOUNTING(RegexResponseFilter);
+};
+#endif  // CEFPYTHON_HAS_REGEX
+
+}  // namespace
+
+CefRefPtr<CefResponseFilter> ReplaceResponseFilterTemplate::CreateFilter() {
+    return new ReplaceResponseFilter(replacements_);
+}
+
+RegexResponseFilterTemplate::RegexResponseFilterTemplate(
+                                        const std::string& pattern,
+                                        const std::string& replacement,
+                                        size_t maxSize)
+        : replacement_(replacement),
+          maxSize_(maxSize) {
+    // Pattern is compiled once and copied for each response
+#if defined(CEFPYTHON_HAS_REGEX)
+    try {
+        regex_ = std::regex(pattern);
+    } catch (const std::regex_error& e) {
+        error_ = std::string("Invalid regular expression: ") + e.what();
+    }
+#else
+    error_ = "Regular expressions are not supported in this build";
+#endif
+}
+
+CefRefPtr<CefResponseFilter> RegexResponseFilterTemplate::CreateFilter() {
+#if defined(CEFPYTHON_HAS_REGEX)
+    if (error_.empty()) {
+        return new RegexResponseFilter(regex_, replacement_, maxSize_);
+    }
+#endif
+    return NULL;
+}
+
+// ----------------------------------------------------------------------------
+// PythonResponseFilter
+// ----------------------------------------------------------------------------
+
+PythonResponseFilter::~PythonResponseFilter() {
+    ResponseFilter_Release(filterId_);
+}
+
+bool PythonResponseFilter::Process(const char* data, size_t size, bool eof,
+                                   std::string& output) {
+    std::string result;
+    if (!ResponseFilter_Filter(filterId_, data, size, eof, result)) {
+        return false;
+    }
+    output.append(result);
+    return true;
+}
+
+bool PythonResponseFilter::Release(std::string& output) {
+    // Filter() is called with empty data without eof
+    return Process(NULL, 0, false, output);
+}
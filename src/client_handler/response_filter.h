@@ -0,0 +1,122 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// Response filters modify response body while it is being loaded.
+// Native filters run on the IO thread without calling into Python.
+// A filter template is created once in Python (response_filter.pyx)
+// and creates a new filter for each response.
+
+#pragma once
+
+#include <string>
+#include <utility>
+#include <vector>
+#include "include/cef_response_filter.h"
+#include "util.h"
+
+// Whether any browser has the GetResourceResponseFilter client
+// callback, Python isn't called for responses otherwise. Can be called
+// on any thread.
+void SetResponseFilterCallbackEnabled(bool enabled);
+bool IsResponseFilterCallbackEnabled();
+
+class ResponseFilterTemplate : public CefBaseRefCounted {
+public:
+    virtual CefRefPtr<CefResponseFilter> CreateFilter() = 0;
+};
+
+// Output produced by Process() is kept until CEF reads it. Process()
+// is called with |eof| set once, after all input was processed.
+// CEF stops calling the filter when the response is complete and
+// a call didn't write any data (see cef_response_filter.h), so every
+// call must write data while input is held back. The end of output is
+// kept until the end of the response for calls that don't produce
+// output, when there is nothing to write Release() is called.
+class BufferedResponseFilter : public CefResponseFilter {
+public:
+    BufferedResponseFilter();
+
+    bool InitFilter() OVERRIDE { return true; }
+    FilterStatus Filter(void* data_in,
+                        size_t data_in_size,
+                        size_t& data_in_read,
+                        void* data_out,
+                        size_t data_out_size,
+                        size_t& data_out_written) OVERRIDE;
+
+protected:
+    // Returns false on error.
+    virtual bool Process(const char* data, size_t size, bool eof,
+                         std::string& output) = 0;
+    // Writes input that is held back to output, more input may follow.
+    // Returns false on error.
+    virtual bool Release(std::string& output) = 0;
+    // Whether Process() keeps input that is not yet written to output.
+    virtual bool HasPendingInput() = 0;
+
+private:
+    std::string output_;
+    size_t outputOffset_;
+    bool eof_;
+};
+
+typedef std::vector<std::pair<std::string, std::string> >
+        ResponseFilterReplacements;
+
+class ReplaceResponseFilterTemplate : public ResponseFilterTemplate {
+public:
+    explicit ReplaceResponseFilterTemplate(
+            const ResponseFilterReplacements& replacements)
+            : replacements_(replacements) {}
+
+    CefRefPtr<CefResponseFilter> CreateFilter() OVERRIDE;
+
+private:
+    ResponseFilterReplacements replacements_;
+
+    IMPLEMENT_REFCOUNTING(ReplaceResponseFilterTemplate);
+};
+
+// The whole response is buffered, up to |maxSize| bytes. Larger
+// responses are passed through unmodified. Returns NULL from
+// CreateFilter() if the pattern is invalid or regular expressions
+// are not supported.
+class RegexResponseFilterTemplate : public ResponseFilterTemplate {
+public:
+    RegexResponseFilterTemplate(const std::string& pattern,
+                                const std::string& replacement,
+                                size_t maxSize);
+
+    // Empty string when pattern is valid
+    std::string GetError() { return error_; }
+    CefRefPtr<CefResponseFilter> CreateFilter() OVERRIDE;
+
+private:
+#if defined(CEFPYTHON_HAS_REGEX)
+    std::regex regex_;
+#endif
+    std::string replacement_;
+    std::string error_;
+    size_t maxSize_;
+
+    IMPLEMENT_REFCOUNTING(RegexResponseFilterTemplate);
+};
+
+// Calls Python filter object with |filterId|, see response_filter.pyx.
+class PythonResponseFilter : public BufferedResponseFilter {
+public:
+    explicit PythonResponseFilter(int filterId) : filterId_(filterId) {}
+    ~PythonResponseFilter();
+
+protected:
+    bool Process(const char* data, size_t size, bool eof,
+                 std::string& output) OVERRIDE;
+    bool Release(std::string& output) OVERRIDE;
+    bool HasPendingInput() OVERRIDE { return true; }
+
+private:
+    int filterId_;
+
+    IMPLEMENT_REFCOUNTING(PythonResponseFilter);
+};
@@ -0,0 +1,20 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "scheme_handler_factory.h"
+#include "include/base/cef_logging.h"
+
+
+CefRefPtr<CefResourceHandler> SchemeHandlerFactory::Create(
+                                        CefRefPtr<CefBrowser> browser,
+                                        CefRefPtr<CefFrame> frame,
+                                        const CefString& scheme_name,
+                                        CefRefPtr<CefRequest> request) {
+    REQUIRE_IO_THREAD();
+    if (resource_.get()) {
+        return resource_->CreateHandler(request);
+    }
+    return SchemeHandlerFactory_Create(factoryId_, browser, frame,
+                                       scheme_name, request);
+}
@@ -0,0 +1,31 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#pragma once
+
+#include "common/cefpython_public_api.h"
+#include "include/cef_scheme.h"
+#include "native_resource.h"
+
+// Creates handlers for a custom scheme. When |resource| is set
+// requests are served natively, otherwise the Python factory with
+// |factoryId| is called.
+class SchemeHandlerFactory : public CefSchemeHandlerFactory {
+public:
+    SchemeHandlerFactory(CefRefPtr<NativeResource> resource, int factoryId)
+            : resource_(resource), factoryId_(factoryId) {}
+    virtual ~SchemeHandlerFactory() {}
+
+    CefRefPtr<CefResourceHandler> Create(
+            CefRefPtr<CefBrowser> browser,
+            CefRefPtr<CefFrame> frame,
+            const CefString& scheme_name,
+            CefRefPtr<CefRequest> request) OVERRIDE;
+
+private:
+    CefRefPtr<NativeResource> resource_;
+    int factoryId_;
+
+    IMPLEMENT_REFCOUNTING(SchemeHandlerFactory);
+};
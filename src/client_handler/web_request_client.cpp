@@ -4,19 +4,145 @@
 
 #include "web_request_client.h"
 
+#if defined(OS_WIN)
+#include <io.h>
+#include <windows.h>
+#elif defined(OS_MACOSX)
+#include <mach/mach_time.h>
+#include <unistd.h>
+#else
+#include <time.h>
+#include <unistd.h>
+#endif
+
+namespace {
+
+// Milliseconds from a monotonic clock. Unlike wall clock time it isn't
+// affected by system time changes, which would otherwise suppress
+// progress events or let all of them through.
+int64 GetMonotonicTimeMs() {
+#if defined(OS_WIN)
+    static LARGE_INTEGER frequency = {0};
+    if (!frequency.QuadPart) {
+        QueryPerformanceFrequency(&frequency);
+    }
+    LARGE_INTEGER counter;
+    QueryPerformanceCounter(&counter);
+    return static_cast<int64>(counter.QuadPart * 1000
+                              / frequency.QuadPart);
+#elif defined(OS_MACOSX)
+    static mach_timebase_info_data_t timebase = {0, 0};
+    if (!timebase.denom) {
+        mach_timebase_info(&timebase);
+    }
+    return static_cast<int64>(mach_absolute_time() * timebase.numer
+                              / timebase.denom / 1000000);
+#else
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return static_cast<int64>(now.tv_sec) * 1000 + now.tv_nsec / 1000000;
+#endif
+}
+
+}  // namespace
+
+bool ProgressThrottle::ShouldReport(int64 current, int64 total) {
+    if (intervalMs_ <= 0 && step_ <= 0) {
+        return true;
+    }
+    int64 nowMs = GetMonotonicTimeMs();
+    if (lastBytes_ >= 0 && current != total) {
+        if (current - lastBytes_ < step_) {
+            return false;
+        }
+        if (nowMs - lastTimeMs_ < intervalMs_) {
+            return false;
+        }
+    }
+    lastBytes_ = current;
+    lastTimeMs_ = nowMs;
+    return true;
+}
+
+WebRequestClient::~WebRequestClient() {
+    CloseDownloadFile();
+}
+
+void WebRequestClient::SetDownloadBuffer() {
+    CloseDownloadFile();
+    downloadMode_ = WEB_REQUEST_DOWNLOAD_BUFFER;
+}
+
+bool WebRequestClient::SetDownloadFile(const CefString& path) {
+    CloseDownloadFile();
+#if defined(OS_WIN)
+    downloadFile_ = _wfopen(path.ToWString().c_str(), L"wb");
+#else
+    downloadFile_ = fopen(path.ToString().c_str(), "wb");
+#endif
+    if (!downloadFile_) {
+        return false;
+    }
+    downloadMode_ = WEB_REQUEST_DOWNLOAD_FILE;
+    return true;
+}
+
+bool WebRequestClient::SetDownloadFileDescriptor(int fd) {
+    CloseDownloadFile();
+#if defined(OS_WIN)
+    int dupFd = _dup(fd);
+    if (dupFd < 0) {
+        return false;
+    }
+    downloadFile_ = _fdopen(dupFd, "wb");
+    if (!downloadFile_) {
+        _close(dupFd);
+        return false;
+    }
+#else
+    int dupFd = dup(fd);
+    if (dupFd < 0) {
+        return false;
+    }
+    downloadFile_ = fdopen(dupFd, "wb");
+    if (!downloadFile_) {
+        close(dupFd);
+        return false;
+    }
+#endif
+    downloadMode_ = WEB_REQUEST_DOWNLOAD_FILE;
+    return true;
+}
+
+void WebRequestClient::CloseDownloadFile() {
+    if (downloadFile_) {
+        if (fclose(downloadFile_) != 0) {
+            writeFailed_ = true;
+        }
+        downloadFile_ = NULL;
+    }
+}
+
 void WebRequestClient::OnRequestComplete(CefRefPtr<CefURLRequest> request) {
+    CloseDownloadFile();
     WebRequestClient_OnRequestComplete(webRequestId_, request);
 }
 
 void WebRequestClient::OnUploadProgress(CefRefPtr<CefURLRequest> request,
                             int64 current,
                             int64 total) {
+    if (!uploadThrottle_.ShouldReport(current, total)) {
+        return;
+    }
     WebRequestClient_OnUploadProgress(webRequestId_, request, current, total);
 }
 
 void WebRequestClient::OnDownloadProgress(CefRefPtr<CefURLRequest> request,
                               int64 current,
                               int64 total) {
+    if (!downloadThrottle_.ShouldReport(current, total)) {
+        return;
+    }
     WebRequestClient_OnDownloadProgress(webRequestId_, request, current,
             total);
 }
@@ -24,7 +150,21 @@ void WebRequestClient::OnDownloadProgress(CefRefPtr<CefURLRequest> request,
 void WebRequestClient::OnDownloadData(CefRefPtr<CefURLRequest> request,
                           const void* data,
                           size_t data_length) {
-    WebRequestClient_OnDownloadData(webRequestId_, request, data, data_length);
+    downloadSize_ += data_length;
+    if (downloadMode_ == WEB_REQUEST_DOWNLOAD_BUFFER) {
+        downloadData_.append(static_cast<const char*>(data), data_length);
+    } else if (downloadMode_ == WEB_REQUEST_DOWNLOAD_FILE) {
+        if (writeFailed_) {
+            return;
+        }
+        if (fwrite(data, 1, data_length, downloadFile_) != data_length) {
+            writeFailed_ = true;
+            request->Cancel();
+        }
+    } else {
+        WebRequestClient_OnDownloadData(webRequestId_, request, data,
+                                        data_length);
+    }
 }
 
 bool WebRequestClient::GetAuthCredentials(bool isProxy,
@@ -36,3 +176,16 @@ bool WebRequestClient::GetAuthCredentials(bool isProxy,
     // Not yet implemented.
     return false;
 }
+
+void WebRequestPoolClient::OnRequestComplete(
+                                    CefRefPtr<CefURLRequest> request) {
+    std::string data;
+    data.swap(data_);
+    WebRequestPool_OnRequestComplete(requestId_, request, data);
+}
+
+void WebRequestPoolClient::OnDownloadData(CefRefPtr<CefURLRequest> request,
+                                          const void* data,
+                                          size_t data_length) {
+    data_.append(static_cast<const char*>(data), data_length);
+}
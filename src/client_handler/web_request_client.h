@@ -8,17 +8,84 @@
 #include <stdint.h>
 #endif
 
+#include <string>
 #include "common/cefpython_public_api.h"
 
+#include <stdio.h>
+
+// Decides whether a progress event is passed to Python. An event is
+// passed when at least |intervalMs| milliseconds elapsed and at least
+// |step| bytes were transferred since the last passed event. The first
+// event and the event for completed transfer are always passed.
+class ProgressThrottle
+{
+public:
+    ProgressThrottle() :
+            intervalMs_(0),
+            step_(0),
+            lastBytes_(-1),
+            lastTimeMs_(0) {
+    }
+    void Set(int64 intervalMs, int64 step) {
+        intervalMs_ = intervalMs;
+        step_ = step;
+    }
+    bool ShouldReport(int64 current, int64 total);
+
+private:
+    int64 intervalMs_;
+    int64 step_;
+    int64 lastBytes_;
+    int64 lastTimeMs_;  // Monotonic clock
+};
+
+enum WebRequestDownloadMode {
+    // OnDownloadData is called in Python for each chunk
+    WEB_REQUEST_DOWNLOAD_CHUNKS = 0,
+    // Chunks are appended to a buffer, see GetDownloadData()
+    WEB_REQUEST_DOWNLOAD_BUFFER,
+    // Chunks are written to a file
+    WEB_REQUEST_DOWNLOAD_FILE
+};
+
 class WebRequestClient : public CefURLRequestClient
 {
 public:
     int webRequestId_;
 public:
     WebRequestClient(int webRequestId) :
-            webRequestId_(webRequestId) {
+            webRequestId_(webRequestId),
+            downloadMode_(WEB_REQUEST_DOWNLOAD_CHUNKS),
+            downloadFile_(NULL),
+            downloadSize_(0),
+            writeFailed_(false) {
     }    
-    virtual ~WebRequestClient(){}
+    virtual ~WebRequestClient();
+
+    // Download mode must be set before the request is created. File
+    // is closed when the request completes, before calling Python.
+    void SetDownloadBuffer();
+    bool SetDownloadFile(const CefString& path);
+    // Data is written to a duplicate of |fd|, the caller still
+    // owns |fd|.
+    bool SetDownloadFileDescriptor(int fd);
+    const char* GetDownloadData() const { return downloadData_.data(); }
+    size_t GetDownloadDataSize() const { return downloadData_.size(); }
+    // Releases the buffer, called after Python copied the data.
+    void ClearDownloadData() { std::string().swap(downloadData_); }
+    int64 GetDownloadSize() const { return downloadSize_; }
+    // When writing to file fails the request is canceled.
+    bool HasWriteFailed() const { return writeFailed_; }
+    // Applies to both OnUploadProgress and OnDownloadProgress, these
+    // are not called in Python for throttled events.
+    void SetProgressThrottle(int64 intervalMs, int64 step) {
+        uploadThrottle_.Set(intervalMs, step);
+        downloadThrottle_.Set(intervalMs, step);
+    }
+    // Applies to OnUploadProgress only.
+    void SetUploadProgressThrottle(int64 intervalMs, int64 step) {
+        uploadThrottle_.Set(intervalMs, step);
+    }
 
     virtual void OnRequestComplete(CefRefPtr<CefURLRequest> request) OVERRIDE;
 
@@ -41,6 +108,58 @@ public:
                                   const CefString& scheme,
                                   CefRefPtr<CefAuthCallback> callback) OVERRIDE;
 
+private:
+    void CloseDownloadFile();
+
+    int downloadMode_;
+    std::string downloadData_;
+    FILE* downloadFile_;
+    int64 downloadSize_;
+    bool writeFailed_;
+    ProgressThrottle uploadThrottle_;
+    ProgressThrottle downloadThrottle_;
+
 protected:
   IMPLEMENT_REFCOUNTING(WebRequestClient);
 };
+
+// Client for requests issued by WebRequestPool (web_request_pool.pyx).
+// Response body is buffered in C++ and passed to Python only once
+// when the request completes, progress is not reported.
+class WebRequestPoolClient : public CefURLRequestClient
+{
+public:
+    explicit WebRequestPoolClient(int requestId) :
+            requestId_(requestId) {
+    }
+    virtual ~WebRequestPoolClient(){}
+
+    virtual void OnRequestComplete(CefRefPtr<CefURLRequest> request) OVERRIDE;
+
+    virtual void OnUploadProgress(CefRefPtr<CefURLRequest> request,
+                                int64 current,
+                                int64 total) OVERRIDE {}
+
+    virtual void OnDownloadProgress(CefRefPtr<CefURLRequest> request,
+                                  int64 current,
+                                  int64 total) OVERRIDE {}
+
+    virtual void OnDownloadData(CefRefPtr<CefURLRequest> request,
+                              const void* data,
+                              size_t data_length) OVERRIDE;
+
+    virtual bool GetAuthCredentials(bool isProxy,
+                                  const CefString& host,
+                                  int port,
+                                  const CefString& realm,
+                                  const CefString& scheme,
+                                  CefRefPtr<CefAuthCallback> callback) OVERRIDE {
+        return false;
+    }
+
+private:
+    int requestId_;
+    std::string data_;
+
+    IMPLEMENT_REFCOUNTING(WebRequestPoolClient);
+};
@@ -6,6 +6,8 @@
 #define CEF_TESTS_CEFCLIENT_UTIL_H_
 #pragma once
 
+#include <ctype.h>
+#include <string>
 #include "include/cef_task.h"
 
 #if defined(OS_WIN)
@@ -34,4 +36,19 @@
 #define REQUIRE_IO_THREAD()   ASSERT(CefCurrentlyOn(TID_IO));
 #define REQUIRE_FILE_THREAD() ASSERT(CefCurrentlyOn(TID_FILE));
 
+// std::regex is not available in VS2008 (Python 2.7 builds)
+#if !defined(_MSC_VER) || _MSC_VER >= 1600
+#define CEFPYTHON_HAS_REGEX 1
+#include <regex>  // NOLINT(build/include_order)
+#endif
+
+inline std::string ToLower(const std::string& value) {
+    std::string result(value);
+    for (size_t i = 0; i < result.size(); i++) {
+        result[i] = static_cast<char>(
+                tolower(static_cast<unsigned char>(result[i])));
+    }
+    return result;
+}
+
 #endif  // CEF_TESTS_CEFCLIENT_UTIL_H_
@@ -29,6 +29,9 @@ cdef PyCookieManager g_globalCookieManager = None
 import weakref
 cdef object g_userCookieVisitors = weakref.WeakValueDictionary()
 cdef int g_userCookieVisitorMaxId = 0
+# [batchId] = Future, see GetAllCookies() and SetCookies().
+cdef dict g_cookieBatchFutures = {}
+cdef int g_cookieBatchMaxId = 0
 
 # ------------------------------------------------------------------------------
 # Cookie
@@ -193,6 +196,9 @@ class CookieManager(object):
             cefCookieManager = CefCookieManager_GetGlobalManager(
                     <CefRefPtr[CefCompletionCallback]?>NULL)
             g_globalCookieManager = CreatePyCookieManager(cefCookieManager)
+            # Global manager is the default manager of the global context
+            (<PyCookieManager>g_globalCookieManager).cefRequestContext = (
+                    CefRequestContext.GetGlobalContext())
         return g_globalCookieManager
 
     @classmethod
@@ -234,6 +240,8 @@ cdef PyCookieManager CreatePyCookieManager(
 
 cdef class PyCookieManager:
     cdef CefRefPtr[CefCookieManager] cefCookieManager
+    # Context whose default cookie manager this is, NULL when not known
+    cdef CefRefPtr[CefRequestContext] cefRequestContext
 
     cpdef py_void SetSupportedSchemes(self, list schemes):
         cdef cpp_vector[CefString] schemesVector
@@ -271,16 +279,108 @@ cdef class PyCookieManager:
 
     cpdef py_void SetCookie(self, py_string url, PyCookie cookie):
         assert isinstance(cookie, Cookie), "cookie object is invalid"
+        cdef CefString cefUrl
+        PyToCefString(url, cefUrl)
+        # The cache is updated only when CEF accepted the cookie
+        cdef CefRefPtr[CefSetCookieCallback] callback
+        if IsCookieCacheEnabled():
+            callback = <CefRefPtr[CefSetCookieCallback]?>(
+                    new CacheSetCookieCallback(
+                            self.cefCookieManager, self.cefRequestContext,
+                            cefUrl, cookie.cefCookie,
+                            <CefRefPtr[CefSetCookieCallback]?>NULL))
         CefPostTask(TID_IO, CreateTask_SetCookie(
                 self.cefCookieManager.get(),
-                PyToCefStringValue(url), cookie.cefCookie,
-                <CefRefPtr[CefSetCookieCallback]?>NULL))
+                cefUrl, cookie.cefCookie, callback))
+
+    cpdef Future GetAllCookies(self, py_string url="",
+                               py_bool include_http_only=True):
+        # Cookies are collected in C++ on the IO thread, the future
+        # is resolved with a list of Cookie objects on the UI thread.
+        cdef int batchId = StoreCookieBatchFuture()
+        cdef Future future = g_cookieBatchFutures[batchId]
+        cdef CefRefPtr[CefCookieVisitor] cefCookieVisitor = (
+                <CefRefPtr[CefCookieVisitor]?>new CollectCookiesVisitor(
+                        batchId))
+        cdef cpp_bool ret
+        if url:
+            ret = self.cefCookieManager.get().VisitUrlCookies(
+                    PyToCefStringValue(url), bool(include_http_only),
+                    cefCookieVisitor)
+        else:
+            ret = self.cefCookieManager.get().VisitAllCookies(
+                    cefCookieVisitor)
+        if not ret:
+            g_cookieBatchFutures.pop(batchId, None)
+            future.SetException(Exception("Cookies cannot be accessed"))
+        return future
+
+    cpdef Future SetCookies(self, list cookies, py_string url=""):
+        # cookies is a list of Cookie objects or dicts in the format of
+        # Cookie.Get(). Future is resolved with the number of cookies
+        # that were set.
+        cdef cpp_vector[CefCookie] cefCookies
+        cdef cpp_vector[CefString] cefUrls
+        cdef CefString cefUrl
+        cdef PyCookie pyCookie
+        cdef int batchId
+        PyToCefString(url, cefUrl)
+        cefCookies.reserve(len(cookies))
+        for cookie in cookies:
+            if isinstance(cookie, dict):
+                pyCookie = Cookie()
+                pyCookie.Set(cookie)
+            elif isinstance(cookie, Cookie):
+                pyCookie = cookie
+            else:
+                raise Exception("CookieManager.SetCookies() failed: invalid"
+                                " cookie: %s" % cookie)
+            cefCookies.push_back(pyCookie.cefCookie)
+            cefUrls.push_back(cefUrl)
+        batchId = StoreCookieBatchFuture()
+        SetCookiesBatch(self.cefCookieManager, self.cefRequestContext,
+                        batchId, cefUrls, cefCookies)
+        return g_cookieBatchFutures[batchId]
+
+    cpdef Future SaveCookies(self, py_string path):
+        # Cookies are collected on the IO thread and written to a binary
+        # file on the FILE thread, see cookie_batch.h for the format.
+        # Future is resolved with the number of cookies saved.
+        cdef int batchId = StoreCookieBatchFuture()
+        cdef Future future = g_cookieBatchFutures[batchId]
+        cdef CefRefPtr[CefCookieVisitor] cefCookieVisitor = (
+                <CefRefPtr[CefCookieVisitor]?>new CollectCookiesVisitor(
+                        batchId, PyToCefStringValue(path)))
+        if not self.cefCookieManager.get().VisitAllCookies(
+                cefCookieVisitor):
+            g_cookieBatchFutures.pop(batchId, None)
+            future.SetException(Exception("Cookies cannot be accessed"))
+        return future
+
+    cpdef Future LoadCookies(self, py_string path):
+        # Future is resolved with the number of cookies restored from
+        # a file written by SaveCookies().
+        cdef int batchId = StoreCookieBatchFuture()
+        LoadCookiesBatch(self.cefCookieManager, self.cefRequestContext,
+                         batchId, PyToCefStringValue(path))
+        return g_cookieBatchFutures[batchId]
 
     cpdef py_void DeleteCookies(self, py_string url, py_string cookie_name):
+        cdef CefString cefUrl
+        cdef CefString cefCookieName
+        PyToCefString(url, cefUrl)
+        PyToCefString(cookie_name, cefCookieName)
+        # The cache is updated after CEF deleted the cookies
+        cdef CefRefPtr[CefDeleteCookiesCallback] callback
+        if IsCookieCacheEnabled():
+            callback = <CefRefPtr[CefDeleteCookiesCallback]?>(
+                    new CacheDeleteCookiesCallback(
+                            self.cefCookieManager, self.cefRequestContext,
+                            cefUrl, cefCookieName,
+                            <CefRefPtr[CefDeleteCookiesCallback]?>NULL))
         CefPostTask(TID_IO, CreateTask_DeleteCookies(
                 self.cefCookieManager.get(),
-                PyToCefStringValue(url), PyToCefStringValue(cookie_name),
-                <CefRefPtr[CefDeleteCookiesCallback]?>NULL))
+                cefUrl, cefCookieName, callback))
 
     cpdef py_bool SetStoragePath(self, py_string path, 
             py_bool persistSessionCookies=False):
@@ -293,6 +393,75 @@ cdef class PyCookieManager:
                 <CefRefPtr[CefCompletionCallback]?>NULL)
 
 
+# ------------------------------------------------------------------------------
+# Cookie batches
+# ------------------------------------------------------------------------------
+
+cdef int StoreCookieBatchFuture() except *:
+    global g_cookieBatchMaxId
+    g_cookieBatchMaxId += 1
+    g_cookieBatchFutures[g_cookieBatchMaxId] = Future()
+    return g_cookieBatchMaxId
+
+cdef public void CookieBatch_OnCookiesCollected(
+        int batchId,
+        const cpp_vector[CefCookie]& cookies
+        ) except * with gil:
+    cdef Future future
+    cdef list pyCookies
+    cdef size_t i
+    try:
+        future = g_cookieBatchFutures.pop(batchId, None)
+        if future is None:
+            return
+        pyCookies = []
+        for i in range(cookies.size()):
+            pyCookies.append(CreatePyCookie(cookies[i]))
+        future.SetResult(pyCookies)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void CookieBatch_OnCookiesSet(
+        int batchId,
+        int succeeded,
+        int total
+        ) except * with gil:
+    cdef Future future
+    try:
+        future = g_cookieBatchFutures.pop(batchId, None)
+        if future is not None:
+            future.SetResult(succeeded)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void CookieBatch_OnCookiesSaved(
+        int batchId,
+        int count
+        ) except * with gil:
+    cdef Future future
+    try:
+        future = g_cookieBatchFutures.pop(batchId, None)
+        if future is not None:
+            future.SetResult(count)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void CookieBatch_OnFailed(
+        int batchId,
+        const cpp_string& error
+        ) except * with gil:
+    cdef Future future
+    try:
+        future = g_cookieBatchFutures.pop(batchId, None)
+        if future is not None:
+            future.SetException(Exception(CharToPyString(error.c_str())))
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
 # ------------------------------------------------------------------------------
 # PyCookieVisitor
 # ------------------------------------------------------------------------------
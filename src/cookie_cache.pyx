@@ -0,0 +1,103 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+include "cefpython.pyx"
+
+
+class CookieCache:
+    # Cookies of a single cookie manager are kept in C++ and updated
+    # when cookies are set or deleted, see cookie_cache.h for what is
+    # tracked. Lookups don't need a cookie visitor and a message loop
+    # turn and can be made on any thread.
+
+    @classmethod
+    def Enable(cls, PyCookieManager cookie_manager=None):
+        # Future is resolved with the number of cookies when the cache
+        # was primed. Lookups made before that may miss cookies.
+        cdef int batchId
+        cdef Future future
+        if cookie_manager is None:
+            cookie_manager = CookieManager.GetGlobalManager()
+        batchId = StoreCookieBatchFuture()
+        future = g_cookieBatchFutures[batchId]
+        if not EnableCookieCache(cookie_manager.cefCookieManager,
+                                 cookie_manager.cefRequestContext, batchId):
+            g_cookieBatchFutures.pop(batchId, None)
+            future.SetException(Exception("Cookies cannot be accessed"))
+        return future
+
+    @classmethod
+    def Disable(cls):
+        DisableCookieCache()
+
+    @classmethod
+    def IsEnabled(cls):
+        return IsCookieCacheEnabled()
+
+    @classmethod
+    def IsReady(cls):
+        return IsCookieCacheReady()
+
+    @classmethod
+    def Refresh(cls):
+        # Picks up cookies that were set by javascript. Cached cookies
+        # are used for lookups until the future is resolved.
+        cdef int batchId
+        cdef Future future
+        if not IsCookieCacheEnabled():
+            raise Exception("CookieCache.Refresh() failed: cache is not"
+                            " enabled")
+        batchId = StoreCookieBatchFuture()
+        future = g_cookieBatchFutures[batchId]
+        if not RefreshCookieCache(batchId):
+            g_cookieBatchFutures.pop(batchId, None)
+            future.SetException(Exception("Cookies cannot be accessed"))
+        return future
+
+    @classmethod
+    def GetCookies(cls, py_string url, py_bool include_http_only=True):
+        # Cookies that would be sent with a request to url, longest
+        # path first.
+        cdef cpp_vector[CefCookie] cefCookies
+        cdef CefString cefName
+        cdef size_t i
+        GetCachedCookies(PyToCefStringValue(url), cefName,
+                         bool(include_http_only), cefCookies)
+        return [CreatePyCookie(cefCookies[i])
+                for i in range(cefCookies.size())]
+
+    @classmethod
+    def GetCookie(cls, py_string url, py_string name,
+                  py_bool include_http_only=True):
+        cdef cpp_vector[CefCookie] cefCookies
+        if not name:
+            raise Exception("CookieCache.GetCookie() failed: name is empty")
+        GetCachedCookies(PyToCefStringValue(url), PyToCefStringValue(name),
+                         bool(include_http_only), cefCookies)
+        if cefCookies.size():
+            return CreatePyCookie(cefCookies[0])
+        return None
+
+    @classmethod
+    def GetSize(cls):
+        return GetCookieCacheSize()
+
+
+cdef public void CookieCache_OnPrimed(
+        int primeId,
+        int count
+        ) except * with gil:
+    cdef Future future
+    try:
+        future = g_cookieBatchFutures.pop(primeId, None)
+        if future is None:
+            return
+        if count == -1:
+            # Superseded by Enable(), Refresh() or Disable()
+            future.Cancel()
+        else:
+            future.SetResult(count)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
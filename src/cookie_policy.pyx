@@ -0,0 +1,74 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+include "cefpython.pyx"
+
+cdef dict g_cookiePolicyParties = {
+    "any": COOKIE_PARTY_ANY,
+    "first-party": COOKIE_PARTY_FIRST,
+    "third-party": COOKIE_PARTY_THIRD,
+}
+
+
+cdef int GetCookiePolicyPartyValue(py_string party) except -1:
+    if party not in g_cookiePolicyParties:
+        raise Exception("Invalid party: %s" % party)
+    return g_cookiePolicyParties[party]
+
+
+class CookiePolicy:
+    # Rules are evaluated in C++ on the IO thread before calling
+    # CanGetCookies/CanSetCookie callbacks of RequestHandler and
+    # CanGetCookie/CanSetCookie of ResourceHandler, Python is called
+    # only for cookies with the "defer" verdict. Verdicts are the same
+    # as in RequestFilter.
+
+    @classmethod
+    def AddRule(cls, py_string domain, py_string verdict,
+                py_string party="any"):
+        if not AddCookiePolicyRule(PyToBytes(domain),
+                                   GetCookiePolicyPartyValue(party),
+                                   GetRequestFilterVerdict(verdict)):
+            raise Exception("CookiePolicy.AddRule() failed: invalid"
+                            " domain: %s" % domain)
+
+    @classmethod
+    def RemoveRule(cls, py_string domain, py_string party="any"):
+        return RemoveCookiePolicyRule(PyToBytes(domain),
+                                      GetCookiePolicyPartyValue(party))
+
+    @classmethod
+    def ClearRules(cls):
+        ClearCookiePolicyRules()
+
+    @classmethod
+    def GetRulesCount(cls):
+        return GetCookiePolicyRulesCount()
+
+    @classmethod
+    def SetThirdPartyVerdict(cls, py_string verdict):
+        SetCookiePolicyThirdPartyVerdict(GetRequestFilterVerdict(verdict))
+
+    @classmethod
+    def SetDefaultVerdict(cls, py_string verdict):
+        SetCookiePolicyDefaultVerdict(GetRequestFilterVerdict(verdict))
+
+    @classmethod
+    def Match(cls, py_string domain, py_string first_party_url=""):
+        cdef cpp_string cppDomain = PyToBytes(domain)
+        cdef int verdict = MatchCookiePolicy(
+                cppDomain,
+                GetCookiePolicyParty(cppDomain, PyToBytes(first_party_url)))
+        for name, value in g_requestFilterVerdicts.items():
+            if value == verdict:
+                return name
+
+    @classmethod
+    def GetStats(cls):
+        cdef int64 allowed = 0
+        cdef int64 blocked = 0
+        cdef int64 deferred = 0
+        GetCookiePolicyStats(allowed, blocked, deferred)
+        return {"allowed": allowed, "blocked": blocked,
+                "deferred": deferred}
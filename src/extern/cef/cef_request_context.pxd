@@ -2,11 +2,15 @@
 # All rights reserved. Licensed under BSD 3-clause license.
 # Project website: https://github.com/cztomczak/cefpython
 
+from libcpp cimport bool as cpp_bool
 from cef_ptr cimport CefRefPtr
+from cef_string cimport CefString
 # noinspection PyUnresolvedReferences
 from cef_request_context_handler cimport CefRequestContextHandler
 from cef_callback cimport CefCompletionCallback
 from cef_cookie cimport CefCookieManager
+from cef_types cimport CefRequestContextSettings
+from cef_values cimport CefValue
 
 cdef extern from "include/cef_request_context.h":
     cdef cppclass CefRequestContext:
@@ -16,5 +20,14 @@ cdef extern from "include/cef_request_context.h":
         CefRefPtr[CefRequestContext] CreateContext(
                 CefRefPtr[CefRequestContext] other,
                 CefRefPtr[CefRequestContextHandler] handler)
+        @staticmethod
+        CefRefPtr[CefRequestContext] CreateContext(
+                const CefRequestContextSettings& settings,
+                CefRefPtr[CefRequestContextHandler] handler)
+        cpp_bool IsSharingWith(CefRefPtr[CefRequestContext] other)
+        CefString GetCachePath()
         CefRefPtr[CefCookieManager] GetDefaultCookieManager(
                 CefRefPtr[CefCompletionCallback] callback)
+        cpp_bool SetPreference(const CefString& name,
+                               CefRefPtr[CefValue] value,
+                               CefString& error)
@@ -0,0 +1,8 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+cdef extern from "include/cef_response_filter.h":
+
+    cdef cppclass CefResponseFilter:
+        pass
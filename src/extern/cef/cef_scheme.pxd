@@ -0,0 +1,19 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_ptr cimport CefRefPtr
+from cef_string cimport CefString
+# noinspection PyUnresolvedReferences
+from libcpp cimport bool as cpp_bool
+
+cdef extern from "include/cef_scheme.h":
+
+    cdef cppclass CefSchemeHandlerFactory:
+        pass
+
+    cpp_bool CefRegisterSchemeHandlerFactory(
+            const CefString& scheme_name,
+            const CefString& domain_name,
+            CefRefPtr[CefSchemeHandlerFactory] factory)
+    cpp_bool CefClearSchemeHandlerFactories()
@@ -110,7 +110,12 @@ cdef extern from "include/internal/cef_types.h":
         int y
 
     ctypedef struct CefRequestContextSettings:
-        pass
+        cef_string_t cache_path
+        int persist_session_cookies
+        int persist_user_preferences
+        int ignore_certificate_errors
+        int enable_net_security_expiration
+        cef_string_t accept_language_list
 
     ctypedef enum cef_log_severity_t:
         LOGSEVERITY_DEFAULT,
@@ -74,6 +74,7 @@ cdef extern from "include/cef_values.h":
         cpp_bool Clear()
         cpp_bool Remove(int index)
         cef_value_type_t GetType(int index)
+        CefRefPtr[CefValue] GetValue(int index)
         cpp_bool GetBool(int index)
         int GetInt(int index)
         double GetDouble(int index)
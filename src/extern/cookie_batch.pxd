@@ -0,0 +1,27 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_ptr cimport CefRefPtr
+from cef_string cimport CefString
+# noinspection PyUnresolvedReferences
+from cef_cookie cimport CefCookie, CefCookieManager
+# noinspection PyUnresolvedReferences
+from cef_request_context cimport CefRequestContext
+# noinspection PyUnresolvedReferences
+from libcpp.vector cimport vector as cpp_vector
+
+cdef extern from "client_handler/cookie_batch.h":
+
+    cdef cppclass CollectCookiesVisitor:
+        CollectCookiesVisitor(int batchId)
+        CollectCookiesVisitor(int batchId, const CefString& savePath)
+
+    void SetCookiesBatch(CefRefPtr[CefCookieManager] manager,
+                         CefRefPtr[CefRequestContext] context, int batchId,
+                         const cpp_vector[CefString]& urls,
+                         const cpp_vector[CefCookie]& cookies)
+    void LoadCookiesBatch(CefRefPtr[CefCookieManager] manager,
+                          CefRefPtr[CefRequestContext] context, int batchId,
+                          const CefString& path)
+    CefString GetCookieUrl(const CefCookie& cookie)
@@ -0,0 +1,52 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_ptr cimport CefRefPtr
+from cef_string cimport CefString
+# noinspection PyUnresolvedReferences
+from cef_cookie cimport CefCookie, CefCookieManager, CefSetCookieCallback
+# noinspection PyUnresolvedReferences
+from cef_cookie cimport CefDeleteCookiesCallback
+# noinspection PyUnresolvedReferences
+from cef_request_context cimport CefRequestContext
+# noinspection PyUnresolvedReferences
+from libcpp cimport bool as cpp_bool
+# noinspection PyUnresolvedReferences
+from libcpp.vector cimport vector as cpp_vector
+
+cdef extern from "client_handler/cookie_cache.h":
+
+    cpp_bool EnableCookieCache(CefRefPtr[CefCookieManager] manager,
+                               CefRefPtr[CefRequestContext] context,
+                               int primeId)
+    void DisableCookieCache()
+    cpp_bool IsCookieCacheEnabled()
+    cpp_bool IsCookieCacheReady()
+    cpp_bool RefreshCookieCache(int primeId)
+    int GetCookieCacheSize()
+    void GetCachedCookies(const CefString& url, const CefString& name,
+                          cpp_bool includeHttpOnly,
+                          cpp_vector[CefCookie]& cookies)
+    void CookieCacheOnSetCookie(CefRefPtr[CefCookieManager] manager,
+                                CefRefPtr[CefRequestContext] context,
+                                const CefString& url,
+                                const CefCookie& cookie)
+    void CookieCacheOnDeleteCookies(CefRefPtr[CefCookieManager] manager,
+                                    CefRefPtr[CefRequestContext] context,
+                                    const CefString& url,
+                                    const CefString& name)
+
+    cdef cppclass CacheSetCookieCallback:
+        CacheSetCookieCallback(CefRefPtr[CefCookieManager] manager,
+                               CefRefPtr[CefRequestContext] context,
+                               const CefString& url, const CefCookie& cookie,
+                               CefRefPtr[CefSetCookieCallback] next)
+
+    cdef cppclass CacheDeleteCookiesCallback:
+        CacheDeleteCookiesCallback(CefRefPtr[CefCookieManager] manager,
+                                   CefRefPtr[CefRequestContext] context,
+                                   const CefString& url,
+                                   const CefString& name,
+                                   CefRefPtr[CefDeleteCookiesCallback] next)
+
@@ -0,0 +1,29 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_types cimport int64
+# noinspection PyUnresolvedReferences
+from libcpp cimport bool as cpp_bool
+# noinspection PyUnresolvedReferences
+from libcpp.string cimport string as cpp_string
+
+cdef extern from "client_handler/cookie_policy.h":
+
+    cdef enum CookiePolicyParty:
+        COOKIE_PARTY_ANY,
+        COOKIE_PARTY_FIRST,
+        COOKIE_PARTY_THIRD
+
+    cpp_bool AddCookiePolicyRule(const cpp_string& domain, int party,
+                                 int verdict)
+    cpp_bool RemoveCookiePolicyRule(const cpp_string& domain, int party)
+    void ClearCookiePolicyRules()
+    int GetCookiePolicyRulesCount()
+    void SetCookiePolicyThirdPartyVerdict(int verdict)
+    void SetCookiePolicyDefaultVerdict(int verdict)
+    int MatchCookiePolicy(const cpp_string& domain, int party)
+    int GetCookiePolicyParty(const cpp_string& domain,
+                             const cpp_string& firstPartyUrl)
+    void GetCookiePolicyStats(int64& allowed, int64& blocked,
+                              int64& deferred)
@@ -0,0 +1,32 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_ptr cimport CefRefPtr
+from cef_string cimport CefString
+# noinspection PyUnresolvedReferences
+from libcpp cimport bool as cpp_bool
+# noinspection PyUnresolvedReferences
+from cef_request cimport CefRequest
+
+cdef extern from "client_handler/header_rules.h":
+
+    cdef enum HeaderRuleAction:
+        HEADER_RULE_SET,
+        HEADER_RULE_APPEND,
+        HEADER_RULE_REMOVE
+
+    int AddHeaderRule(int matchType, const CefString& pattern, int action,
+                      const CefString& name, const CefString& value,
+                      CefString& error)
+    cpp_bool RemoveHeaderRule(int ruleId)
+    void ClearHeaderRules()
+    int GetHeaderRulesCount()
+
+    cpp_bool GetRequestHeader(CefRefPtr[CefRequest] request,
+                              const CefString& name, CefString& value)
+    void SetRequestHeader(CefRefPtr[CefRequest] request,
+                          const CefString& name, const CefString& value,
+                          cpp_bool overwrite)
+    cpp_bool RemoveRequestHeader(CefRefPtr[CefRequest] request,
+                                 const CefString& name)
@@ -0,0 +1,65 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_ptr cimport CefRefPtr
+from cef_string cimport CefString
+from cef_types cimport int64
+# noinspection PyUnresolvedReferences
+from libcpp cimport bool as cpp_bool
+# noinspection PyUnresolvedReferences
+from cef_request cimport CefRequest
+# noinspection PyUnresolvedReferences
+from cef_response cimport CefResponseHeaderMap
+# noinspection PyUnresolvedReferences
+from cef_resource_handler cimport CefResourceHandler
+
+cdef extern from "client_handler/native_resource.h":
+
+    cdef cppclass NativeResource:
+        CefRefPtr[CefResourceHandler] CreateHandler(
+                CefRefPtr[CefRequest] request)
+
+    cdef cppclass BytesResource(NativeResource):
+        BytesResource(const char* data, size_t size,
+                      const CefString& mimeType, int statusCode,
+                      const CefString& statusText,
+                      const CefResponseHeaderMap& headers)
+
+    cdef cppclass FileResource(NativeResource):
+        FileResource(const CefString& path, int64 offset, int64 length,
+                     cpp_bool useMmap, const CefString& mimeType,
+                     int statusCode, const CefString& statusText,
+                     const CefResponseHeaderMap& headers)
+
+    cdef cppclass DirectoryResource(NativeResource):
+        DirectoryResource(const CefString& directory,
+                          const CefString& urlPrefix,
+                          const CefString& defaultFile,
+                          const CefResponseHeaderMap& headers)
+
+    cdef cppclass ZipResource(NativeResource):
+        ZipResource(const CefString& zipPath,
+                    const CefString& urlPrefix,
+                    const CefString& defaultFile,
+                    const CefString& password,
+                    int64 cacheSize,
+                    const CefResponseHeaderMap& headers)
+        cpp_bool Load(CefString& error)
+        int GetFileCount()
+        int64 GetCacheSize()
+
+    cdef cppclass ChunkQueue:
+        ChunkQueue()
+        cpp_bool Write(const char* data, size_t size) nogil
+        void Finish()
+        void Cancel()
+        cpp_bool IsCancelled()
+        int64 GetQueuedSize()
+
+    cdef cppclass ChunkedResource(NativeResource):
+        ChunkedResource(CefRefPtr[ChunkQueue] queue,
+                        const CefString& mimeType, int statusCode,
+                        const CefString& statusText,
+                        const CefResponseHeaderMap& headers,
+                        int64 length)
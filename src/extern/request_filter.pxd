@@ -0,0 +1,29 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_types cimport int64
+# noinspection PyUnresolvedReferences
+from libcpp.string cimport string as cpp_string
+
+cdef extern from "client_handler/request_filter.h":
+
+    cdef enum RequestFilterVerdict:
+        REQUEST_FILTER_DEFER,
+        REQUEST_FILTER_ALLOW,
+        REQUEST_FILTER_BLOCK
+
+    int AddRequestFilterRules(const cpp_string& rules, int verdict,
+                              int& skipped)
+    void ClearRequestFilterRules()
+    int GetRequestFilterRulesCount()
+    void SetRequestFilterDefaultVerdict(int verdict)
+    int MatchRequestFilter(const cpp_string& url,
+                           const cpp_string& firstPartyUrl,
+                           int resourceType)
+    int GetRequestFilterResourceType(const cpp_string& name)
+    void GetRequestFilterStats(int64& allowed, int64& blocked,
+                               int64& deferred)
+    cpp_string GetBaseDomain(const cpp_string& host)
+    int AddPublicSuffixRules(const cpp_string& rules)
+    void ClearPublicSuffixRules()
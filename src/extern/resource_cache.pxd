@@ -0,0 +1,51 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_ptr cimport CefRefPtr
+from cef_string cimport CefString
+from cef_types cimport int64
+# noinspection PyUnresolvedReferences
+from libcpp cimport bool as cpp_bool
+# noinspection PyUnresolvedReferences
+from libcpp.vector cimport vector as cpp_vector
+# noinspection PyUnresolvedReferences
+from cef_response cimport CefResponseHeaderMap
+# noinspection PyUnresolvedReferences
+from native_resource cimport NativeResource
+
+cdef extern from "client_handler/resource_cache.h":
+
+    # Request headers are passed as CefResponseHeaderMap, both header
+    # map types are the same multimap.
+    void EnableResourceCache(int64 memorySize, const CefString& diskPath,
+                             int64 diskSize,
+                             const cpp_vector[CefString]& varyHeaders,
+                             cpp_bool serveCached,
+                             cpp_bool storeResponses)
+    void DisableResourceCache()
+    cpp_bool IsResourceCacheEnabled()
+    cpp_bool PutCachedResource(const CefString& url,
+                               const CefResponseHeaderMap& requestHeaders,
+                               const char* data, size_t size,
+                               const CefString& mimeType,
+                               const CefString& statusText,
+                               const CefResponseHeaderMap& headers) nogil
+    CefRefPtr[NativeResource] GetCachedResource(
+            const CefString& url,
+            const CefResponseHeaderMap& requestHeaders,
+            cpp_bool allowStale)
+    cpp_bool GetCachedResourceValidators(
+            const CefString& url,
+            const CefResponseHeaderMap& requestHeaders,
+            CefString& etag, CefString& lastModified)
+    cpp_bool RefreshCachedResource(
+            const CefString& url,
+            const CefResponseHeaderMap& requestHeaders,
+            const CefResponseHeaderMap& headers)
+    cpp_bool RemoveCachedResource(
+            const CefString& url,
+            const CefResponseHeaderMap& requestHeaders)
+    void ClearResourceCache()
+    int64 GetResourceCacheMemorySize()
+    int64 GetResourceCacheDiskSize()
@@ -2,7 +2,12 @@
 # All rights reserved. Licensed under BSD 3-clause license.
 # Project website: https://github.com/cztomczak/cefpython
 
+from cef_ptr cimport CefRefPtr
+# noinspection PyUnresolvedReferences
+from cef_browser cimport CefBrowser
+
 cdef extern from "client_handler/resource_handler.h":
 
     cdef cppclass ResourceHandler:
-        ResourceHandler(int resourceHandlerId)
+        ResourceHandler(int resourceHandlerId,
+                        CefRefPtr[CefBrowser] browser)
@@ -0,0 +1,25 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_ptr cimport CefRefPtr
+from cef_string cimport CefString
+# noinspection PyUnresolvedReferences
+from libcpp cimport bool as cpp_bool
+# noinspection PyUnresolvedReferences
+from native_resource cimport NativeResource
+
+cdef extern from "client_handler/resource_router.h":
+
+    cdef enum RouteMatchType:
+        ROUTE_MATCH_PREFIX,
+        ROUTE_MATCH_GLOB,
+        ROUTE_MATCH_REGEX
+
+    int AddResourceRoute(int matchType, const CefString& pattern,
+                         CefRefPtr[NativeResource] resource,
+                         CefString& error)
+    cpp_bool RemoveResourceRoute(int routeId)
+    void ClearResourceRoutes()
+    int GetResourceRoutesCount()
+    void SetResourceRouterPythonFallback(cpp_bool enabled)
@@ -0,0 +1,38 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_ptr cimport CefRefPtr
+# noinspection PyUnresolvedReferences
+from libcpp.string cimport string as cpp_string
+# noinspection PyUnresolvedReferences
+from libcpp.pair cimport pair as cpp_pair
+# noinspection PyUnresolvedReferences
+from libcpp.vector cimport vector as cpp_vector
+# noinspection PyUnresolvedReferences
+from libcpp cimport bool as cpp_bool
+# noinspection PyUnresolvedReferences
+from cef_response_filter cimport CefResponseFilter
+
+cdef extern from "client_handler/response_filter.h":
+
+    ctypedef cpp_vector[cpp_pair[cpp_string, cpp_string]] \
+            ResponseFilterReplacements
+
+    cdef cppclass ResponseFilterTemplate:
+        CefRefPtr[CefResponseFilter] CreateFilter()
+
+    cdef cppclass ReplaceResponseFilterTemplate(ResponseFilterTemplate):
+        ReplaceResponseFilterTemplate(
+                const ResponseFilterReplacements& replacements)
+
+    cdef cppclass RegexResponseFilterTemplate(ResponseFilterTemplate):
+        RegexResponseFilterTemplate(const cpp_string& pattern,
+                                    const cpp_string& replacement,
+                                    size_t maxSize)
+        cpp_string GetError()
+
+    cdef cppclass PythonResponseFilter(CefResponseFilter):
+        PythonResponseFilter(int filterId)
+
+    void SetResponseFilterCallbackEnabled(cpp_bool enabled)
@@ -0,0 +1,15 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+from cef_ptr cimport CefRefPtr
+# noinspection PyUnresolvedReferences
+from cef_scheme cimport CefSchemeHandlerFactory
+# noinspection PyUnresolvedReferences
+from native_resource cimport NativeResource
+
+cdef extern from "client_handler/scheme_handler_factory.h":
+
+    cdef cppclass SchemeHandlerFactory(CefSchemeHandlerFactory):
+        SchemeHandlerFactory(CefRefPtr[NativeResource] resource,
+                             int factoryId)
@@ -2,7 +2,25 @@
 # All rights reserved. Licensed under BSD 3-clause license.
 # Project website: https://github.com/cztomczak/cefpython
 
+from cef_string cimport CefString
+from cef_types cimport int64
+# noinspection PyUnresolvedReferences
+from libcpp cimport bool as cpp_bool
+
 cdef extern from "client_handler/web_request_client.h":
 
     cdef cppclass WebRequestClient:
         WebRequestClient(int webRequestId)
+        void SetDownloadBuffer()
+        cpp_bool SetDownloadFile(const CefString& path)
+        cpp_bool SetDownloadFileDescriptor(int fd)
+        const char* GetDownloadData()
+        size_t GetDownloadDataSize()
+        void ClearDownloadData()
+        int64 GetDownloadSize()
+        cpp_bool HasWriteFailed()
+        void SetProgressThrottle(int64 intervalMs, int64 step)
+        void SetUploadProgressThrottle(int64 intervalMs, int64 step)
+
+    cdef cppclass WebRequestPoolClient:
+        WebRequestPoolClient(int requestId)
@@ -163,6 +163,27 @@ cdef class PyFrame:
         code += ")"
         self.ExecuteJavascript(code)
 
+    cpdef Future ExtractElements(self, list queries, int timeout_ms=0):
+        # Queries are normalized here, so that the renderer process
+        # does not need to handle default values.
+        cdef list normalized = []
+        cdef dict query
+        for query in queries:
+            if "selector" not in query:
+                raise Exception("Frame.ExtractElements() failed: selector"
+                                " missing in query: %s" % query)
+            normalized.append({
+                "selector": query["selector"],
+                "attributes": list(query.get("attributes",
+                                             [".textContent"])),
+                "limit": int(query.get("limit", 0)),
+            })
+        # Frame id is int64 and it is passed as a string.
+        return SendMessageWithReply(self.GetBrowser(), self.GetIdentifier(),
+                                    "ExtractElements",
+                                    [str(self.GetIdentifier()), normalized],
+                                    timeout_ms)
+
     cpdef py_void ExecuteJavascript(self, py_string jsCode,
             py_string scriptUrl="", int startLine=1):
         self.GetCefFrame().get().ExecuteJavaScript(PyToCefStringValue(jsCode),
@@ -0,0 +1,99 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+# Future is returned by asynchronous operations. Futures are resolved
+# on the UI thread and done callbacks are called on the UI thread.
+# There is no blocking wait, as blocking the UI thread would block
+# the operation itself. Use AddDoneCallback() instead.
+
+include "cefpython.pyx"
+
+
+class FutureCancelledError(Exception):
+    pass
+
+
+class FutureTimeoutError(Exception):
+    pass
+
+
+cdef class Future:
+    cdef py_bool done
+    cdef py_bool cancelled
+    cdef object result
+    cdef object exception
+    cdef list callbacks
+
+    def __init__(self):
+        self.callbacks = []
+
+    cpdef py_bool IsDone(self):
+        return self.done
+
+    cpdef py_bool IsCancelled(self):
+        return self.cancelled
+
+    cpdef py_bool Cancel(self):
+        if self.done:
+            return False
+        self.cancelled = True
+        self.exception = FutureCancelledError("Future was cancelled")
+        self.SetDone()
+        return True
+
+    cpdef object GetResult(self):
+        if not self.done:
+            raise Exception("Future.GetResult() failed: future is not"
+                            " done yet")
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+    cpdef object GetException(self):
+        if not self.done:
+            raise Exception("Future.GetException() failed: future is not"
+                            " done yet")
+        return self.exception
+
+    cpdef py_void AddDoneCallback(self, object callback):
+        if self.done:
+            self.CallDoneCallback(callback)
+        else:
+            self.callbacks.append(callback)
+
+    cpdef py_bool SetResult(self, object result):
+        if self.done:
+            return False
+        self.result = result
+        self.SetDone()
+        return True
+
+    cpdef py_bool SetException(self, object exception):
+        if self.done:
+            return False
+        self.exception = exception
+        self.SetDone()
+        return True
+
+    cpdef py_void SetTimeout(self, int timeout_ms):
+        PostDelayedTask(TID_UI, timeout_ms, self._OnTimeout)
+
+    def _OnTimeout(self):
+        self.SetException(FutureTimeoutError("Future timed out"))
+
+    cdef void SetDone(self) except *:
+        cdef list callbacks = self.callbacks
+        self.done = True
+        self.callbacks = []
+        for callback in callbacks:
+            self.CallDoneCallback(callback)
+
+    cdef void CallDoneCallback(self, object callback) except *:
+        # An exception in one callback must not prevent other
+        # callbacks from being called.
+        try:
+            callback(self)
+        except:
+            (exc_type, exc_value, exc_trace) = sys.exc_info()
+            sys.excepthook(exc_type, exc_value, exc_trace)
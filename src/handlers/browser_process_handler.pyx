@@ -21,3 +21,16 @@ cdef public void BrowserProcessHandler_OnBeforeChildProcessLaunch(
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef public void BrowserProcessHandler_OnScheduleMessagePumpWork(
+        int64 delay_ms
+        ) except * with gil:
+    # Called on any thread.
+    cdef object callback
+    try:
+        callback = GetGlobalClientCallback("OnScheduleMessagePumpWork")
+        if callback:
+            callback(delay_ms=delay_ms)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
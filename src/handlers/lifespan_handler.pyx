@@ -143,6 +143,8 @@ cdef public void LifespanHandler_OnBeforeClose(
         del pyBrowser
 
         RemovePythonCallbacksForBrowser(browserId)
+        RemoveChannelsForBrowser(browserId)
+        RemoveJavascriptCallbacksForBrowser(browserId)
         RemovePyFramesForBrowser(browserId)
         RemovePyBrowser(browserId)
 
@@ -151,8 +151,11 @@ cdef public CefRefPtr[CefResourceHandler] RequestHandler_GetResourceHandler(
                     browser=pyBrowser,
                     frame=pyFrame,
                     request=pyRequest)
-            if returnValue:
-                return CreateResourceHandler(returnValue)
+            if isinstance(returnValue, NativeResourceHandler):
+                return (<NativeResourceHandler>returnValue).CreateHandler(
+                        cefRequest)
+            elif returnValue:
+                return CreateResourceHandler(returnValue, cefBrowser)
             else:
                 return <CefRefPtr[CefResourceHandler]>NULL
         else:
@@ -531,11 +534,13 @@ cdef public cpp_bool RequestHandler_CanGetCookies(
         if IsBrowserClosed(cef_browser):
             return False
 
+        # Called for each request, wrappers are created only when
+        # there is a callback.
         browser = GetPyBrowser(cef_browser, "CanGetCookies")
-        frame = GetPyFrame(cef_frame)
-        request = CreatePyRequest(cef_request)
         callback = browser.GetClientCallback("CanGetCookies")
         if callback:
+            frame = GetPyFrame(cef_frame)
+            request = CreatePyRequest(cef_request)
             retval = callback(
                     browser=browser,
                     frame=frame,
@@ -568,11 +573,11 @@ cdef public cpp_bool RequestHandler_CanSetCookie(
             return False
 
         browser = GetPyBrowser(cef_browser, "CanSetCookie")
-        frame = GetPyFrame(cef_frame)
-        request = CreatePyRequest(cef_request)
-        cookie = CreatePyCookie(cef_cookie)
         callback = browser.GetClientCallback("CanSetCookie")
         if callback:
+            frame = GetPyFrame(cef_frame)
+            request = CreatePyRequest(cef_request)
+            cookie = CreatePyCookie(cef_cookie)
             retval = callback(
                     browser=browser,
                     frame=frame,
@@ -585,3 +590,45 @@ cdef public cpp_bool RequestHandler_CanSetCookie(
     except:
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
+
+
+cdef public CefRefPtr[CefResponseFilter] \
+        RequestHandler_GetResourceResponseFilter(
+        CefRefPtr[CefBrowser] cef_browser,
+        CefRefPtr[CefFrame] cef_frame,
+        CefRefPtr[CefRequest] cef_request,
+        CefRefPtr[CefResponse] cef_response
+        ) except * with gil:
+    cdef PyBrowser browser
+    cdef PyFrame frame
+    cdef PyRequest request
+    cdef PyResponse response
+    cdef object callback
+    cdef object retval
+    try:
+        # Issue #455: CefRequestHandler callbacks still executed after
+        # browser was closed.
+        if IsBrowserClosed(cef_browser):
+            return <CefRefPtr[CefResponseFilter]>NULL
+
+        browser = GetPyBrowser(cef_browser, "GetResourceResponseFilter")
+        callback = browser.GetClientCallback("GetResourceResponseFilter")
+        if not callback:
+            return <CefRefPtr[CefResponseFilter]>NULL
+        frame = GetPyFrame(cef_frame)
+        request = CreatePyRequest(cef_request)
+        response = CreatePyResponse(cef_response)
+        retval = callback(
+                browser=browser,
+                frame=frame,
+                request=request,
+                response=response)
+        if isinstance(retval, NativeResponseFilter):
+            return (<NativeResponseFilter>retval).CreateFilter()
+        elif retval:
+            return CreateResponseFilter(retval)
+        else:
+            return <CefRefPtr[CefResponseFilter]>NULL
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
@@ -22,6 +22,9 @@ cdef int g_userResourceHandlerMaxId = 0
 cdef py_void ValidateUserResourceHandler(object userResourceHandler):
     cdef list methods = ["ProcessRequest", "GetResponseHeaders",
             "ReadResponse", "CanGetCookie", "CanSetCookie", "Cancel"]
+    if hasattr(userResourceHandler, "ReadResponseInto"):
+        # Buffer-based protocol replaces ReadResponse
+        methods.remove("ReadResponse")
     for method in methods:
         if userResourceHandler and hasattr(userResourceHandler, method)\
                 and callable(getattr(userResourceHandler, method)):
@@ -32,12 +35,15 @@ cdef py_void ValidateUserResourceHandler(object userResourceHandler):
                     % method)
 
 cdef CefRefPtr[CefResourceHandler] CreateResourceHandler(
-        object userResourceHandler) except *:
+        object userResourceHandler,
+        CefRefPtr[CefBrowser] cefBrowser) except *:
+    # Browser may be NULL for requests made by scheme handler factories
+    # outside of a browser, e.g. WebRequest.
     ValidateUserResourceHandler(userResourceHandler)
     cdef int resourceHandlerId = StoreUserResourceHandler(userResourceHandler)
     cdef CefRefPtr[CefResourceHandler] resourceHandler =\
             <CefRefPtr[CefResourceHandler]?>new ResourceHandler(
-                resourceHandlerId)
+                resourceHandlerId, cefBrowser)
     return resourceHandler
 
 cdef int StoreUserResourceHandler(object userResourceHandler) except *:
@@ -154,6 +160,11 @@ cdef public cpp_bool ResourceHandler_ReadResponse(
         bytesReadOut = [0]
         pyCallback = CreatePyCallback(cefCallback)
         if pyResourceHandler:
+            userCallback = pyResourceHandler.GetCallback("ReadResponseInto")
+            if userCallback:
+                return ReadResponseInto(userCallback, cefDataOut,
+                                        bytesToRead, cefBytesRead,
+                                        pyCallback)
             userCallback = pyResourceHandler.GetCallback("ReadResponse")
             if userCallback:
                 returnValue = userCallback(
@@ -182,6 +193,54 @@ cdef public cpp_bool ResourceHandler_ReadResponse(
         (exc_type, exc_value, exc_trace) = sys.exc_info()
         sys.excepthook(exc_type, exc_value, exc_trace)
 
+cdef cpp_bool ReadResponseInto(object userCallback, void* cefDataOut,
+        int bytesToRead, int& cefBytesRead, PyCallback pyCallback) except *:
+    # Python writes directly into the CEF buffer through a writable
+    # memoryview. Returns the number of bytes written, 0 when response
+    # is complete, or -1 when data is not yet available and
+    # callback.Continue() will be called later.
+    cdef cython_array array
+    cdef object buffer
+    cdef object returnValue
+    cdef int pyBytesRead
+    cdef Py_ssize_t refCount
+    cdef py_bool released = False
+    (&cefBytesRead)[0] = 0
+    array = cython_array(shape=(bytesToRead,), itemsize=1, format="B",
+                         mode="c", allocate_buffer=False)
+    array.data = <char*>cefDataOut
+    refCount = sys.getrefcount(array)
+    buffer = memoryview(array)
+    try:
+        returnValue = userCallback(buffer=buffer, callback=pyCallback)
+    finally:
+        # Buffer must not be used after returning, CEF owns the memory.
+        if hasattr(buffer, "release"):
+            try:
+                buffer.release()
+            except BufferError:
+                pass
+        buffer = None
+        # Slices and objects exported from the buffer (e.g. numpy
+        # arrays) keep a reference to the array.
+        released = sys.getrefcount(array) <= refCount
+        if not released:
+            NonCriticalError("ReadResponseInto() failed: a view of the"
+                             " buffer was kept after returning, the"
+                             " response was cancelled")
+    if not released:
+        # CEF is going to reuse the memory, no data written through
+        # the view that was kept may be sent.
+        return False
+    pyBytesRead = int(returnValue)
+    if pyBytesRead < -1 or pyBytesRead > bytesToRead:
+        raise Exception("ReadResponseInto() returned %s, expected -1..%s"
+                        % (pyBytesRead, bytesToRead))
+    if pyBytesRead > 0:
+        (&cefBytesRead)[0] = pyBytesRead
+        return True
+    return pyBytesRead < 0
+
 cdef public cpp_bool ResourceHandler_CanGetCookie(
         int resourceHandlerId,
         const CefCookie& cefCookie
@@ -193,10 +252,10 @@ cdef public cpp_bool ResourceHandler_CanGetCookie(
     try:
         assert IsThread(TID_IO), "Must be called on the IO thread"
         pyResourceHandler = GetPyResourceHandler(resourceHandlerId)
-        pyCookie = CreatePyCookie(cefCookie)
         if pyResourceHandler:
             userCallback = pyResourceHandler.GetCallback("CanGetCookie")
             if userCallback:
+                pyCookie = CreatePyCookie(cefCookie)
                 returnValue = userCallback(cookie=pyCookie)
                 return bool(returnValue)
         return False
@@ -215,10 +274,10 @@ cdef public cpp_bool ResourceHandler_CanSetCookie(
     try:
         assert IsThread(TID_IO), "Must be called on the IO thread"
         pyResourceHandler = GetPyResourceHandler(resourceHandlerId)
-        pyCookie = CreatePyCookie(cefCookie)
         if pyResourceHandler:
             userCallback = pyResourceHandler.GetCallback("CanSetCookie")
             if userCallback:
+                pyCookie = CreatePyCookie(cefCookie)
                 returnValue = userCallback(cookie=pyCookie)
                 return bool(returnValue)
         return False
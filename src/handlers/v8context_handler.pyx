@@ -24,6 +24,8 @@ cdef public void V8ContextHandler_OnContextCreated(
         pyBrowser = GetPyBrowser(cefBrowser, "OnContextCreated")
         pyBrowser.SetUserData("__v8ContextCreated", True)
         pyFrame = GetPyFrame(cefFrame)
+        if pyFrame.IsMain():
+            ReopenChannelsForBrowser(pyBrowser.GetIdentifier())
         # User defined callback
         clientCallback = pyBrowser.GetClientCallback("OnContextCreated")
         if clientCallback:
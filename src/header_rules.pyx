@@ -0,0 +1,52 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+include "cefpython.pyx"
+
+cdef dict g_headerRuleActions = {
+    "set": HEADER_RULE_SET,
+    "append": HEADER_RULE_APPEND,
+    "remove": HEADER_RULE_REMOVE,
+}
+
+
+class HeaderRules:
+    # Rules are applied in C++ on the IO thread before calling
+    # RequestHandler.OnBeforeResourceLoad. Url patterns are matched
+    # the same way as ResourceRouter routes.
+
+    @classmethod
+    def AddRule(cls, py_string pattern, py_string action, py_string name,
+                py_string value="", py_string match="prefix"):
+        cdef CefString cefPattern
+        cdef CefString cefName
+        cdef CefString cefValue
+        cdef CefString cefError
+        cdef int ruleId
+        if match not in g_routeMatchTypes:
+            raise Exception("Invalid match type: %s" % match)
+        if action not in g_headerRuleActions:
+            raise Exception("Invalid action: %s" % action)
+        PyToCefString(pattern, cefPattern)
+        PyToCefString(name, cefName)
+        PyToCefString(value, cefValue)
+        ruleId = AddHeaderRule(g_routeMatchTypes[match], cefPattern,
+                               g_headerRuleActions[action], cefName,
+                               cefValue, cefError)
+        if not ruleId:
+            raise Exception("HeaderRules.AddRule() failed: %s"
+                            % CefToPyString(cefError))
+        return ruleId
+
+    @classmethod
+    def RemoveRule(cls, int rule_id):
+        return RemoveHeaderRule(rule_id)
+
+    @classmethod
+    def ClearRules(cls):
+        ClearHeaderRules()
+
+    @classmethod
+    def GetRulesCount(cls):
+        return GetHeaderRulesCount()
@@ -4,14 +4,74 @@
 
 include "cefpython.pyx"
 include "browser.pyx"
+include "future.pyx"
+
+# Futures waiting for a "JavascriptCallbackReply" message from
+# the renderer. [replyId] = (browserId, Future)
+cdef dict g_jsCallbackReplies = {}
+cdef int g_jsCallbackReplyMaxId = 0
+
+# Ids of garbage collected callbacks to release in the renderer.
+# [browserId] = [callbackId, ..]
+cdef dict g_jsCallbacksToRelease = {}
+
+
+class JavascriptError(Exception):
+    pass
+
+
+cdef Future SendMessageWithReply(PyBrowser browser, object frameId,
+        py_string messageName, list arguments, int timeout_ms):
+    # Renderer replies with "JavascriptCallbackReply" message,
+    # replyId is passed as the first argument.
+    global g_jsCallbackReplyMaxId
+    cdef Future future = Future()
+    cdef int replyId
+    g_jsCallbackReplyMaxId += 1
+    replyId = g_jsCallbackReplyMaxId
+    g_jsCallbackReplies[replyId] = (browser.GetIdentifier(), future)
+    # Forget the reply when future is done for any other reason,
+    # e.g. it was cancelled or timed out.
+    future.AddDoneCallback(
+            lambda _: g_jsCallbackReplies.pop(replyId, None))
+    try:
+        browser.SendProcessMessage(cef_types.PID_RENDERER, frameId,
+                                   messageName, [replyId] + arguments)
+    except:
+        del g_jsCallbackReplies[replyId]
+        raise
+    if timeout_ms > 0:
+        future.SetTimeout(timeout_ms)
+    return future
+
+cdef void ReleaseJavascriptCallbacks() except *:
+    # Send ids of garbage collected callbacks to the renderer.
+    # Called on the UI thread when a javascript callback is used
+    # or created.
+    global g_jsCallbacksToRelease
+    cdef dict toRelease
+    cdef PyBrowser browser
+    if not g_jsCallbacksToRelease or not IsThread(TID_UI):
+        return
+    toRelease = g_jsCallbacksToRelease
+    g_jsCallbacksToRelease = {}
+    for browserId, callbackIds in toRelease.items():
+        browser = GetPyBrowserById(browserId)
+        if not browser or browserId in g_closed_browsers:
+            continue
+        browser.SendProcessMessage(cef_types.PID_RENDERER, 0,
+                                   "ReleaseJavascriptCallbacks",
+                                   [callbackIds])
 
 cdef JavascriptCallback CreateJavascriptCallback(int callbackId,
         CefRefPtr[CefBrowser] cefBrowser, object frameId,
         py_string functionName):
     # frameId is int64
+    ReleaseJavascriptCallbacks()
     cdef JavascriptCallback jsCallback = JavascriptCallback()
     jsCallback.callbackId = callbackId
     cdef PyBrowser browser = GetPyBrowser(cefBrowser)
+    jsCallback.browserId = browser.GetIdentifier()
     jsCallback.frame = browser.GetFrameByIdentifier(frameId)
     jsCallback.functionName = functionName
     Debug("Created javascript callback, callbackId=%s, functionName=%s" % \
@@ -22,14 +82,25 @@ cdef class JavascriptCallback:
     """A javascript callback object may still live while browser/frame
     are destroyed. Always check frame/browser for None value."""
     cdef int callbackId
+    cdef int browserId
     cdef PyFrame frame
     cdef py_string functionName
 
+    def __dealloc__(self):
+        # The renderer keeps a reference to the javascript function
+        # until it is released. Releases are sent in batches by
+        # ReleaseJavascriptCallbacks(), as this may be called on
+        # any thread.
+        if self.browserId and g_jsCallbacksToRelease is not None:
+            g_jsCallbacksToRelease.setdefault(self.browserId, []).append(
+                    self.callbackId)
+
     def Call(self, *args):
         # Send process message "ExecuteJavascriptCallback".
         if self.frame:
             browser = self.frame.GetBrowser()
             if browser:
+                ReleaseJavascriptCallbacks()
                 browser.SendProcessMessage(
                         cef_types.PID_RENDERER,
                         self.frame.GetIdentifier(),
@@ -45,6 +116,22 @@ cdef class JavascriptCallback:
             raise Exception("JavascriptCallback.Call() FAILED: frame not found"
                             ", callbackId = %s" % self.callbackId)
 
+    def CallAsync(self, *args, int timeout_ms=0):
+        # Send process message "ExecuteJavascriptCallbackWithReply".
+        cdef PyBrowser browser
+        if not self.frame:
+            raise Exception("JavascriptCallback.CallAsync() FAILED: frame"
+                            " not found, callbackId = %s" % self.callbackId)
+        browser = self.frame.GetBrowser()
+        if not browser:
+            raise Exception("JavascriptCallback.CallAsync() FAILED: browser"
+                            " not found, callbackId = %s" % self.callbackId)
+        ReleaseJavascriptCallbacks()
+        return SendMessageWithReply(browser, self.frame.GetIdentifier(),
+                                    "ExecuteJavascriptCallbackWithReply",
+                                    [self.callbackId] + list(args),
+                                    timeout_ms)
+
     def GetFunctionName(self):
         return self.functionName
 
@@ -57,3 +144,36 @@ cdef class JavascriptCallback:
 
     def GetFrame(self):
         return self.frame
+
+cdef void RemoveJavascriptCallbacksForBrowser(int browserId) except *:
+    cdef Future future
+    g_jsCallbacksToRelease.pop(browserId, None)
+    for (replyBrowserId, future) in list(g_jsCallbackReplies.values()):
+        if replyBrowserId == browserId:
+            future.SetException(JavascriptError("Browser was closed"))
+
+cdef public void JavascriptCallback_OnReply(
+        CefRefPtr[CefBrowser] cefBrowser,
+        int replyId,
+        cpp_bool success,
+        CefRefPtr[CefListValue] cefValue
+        ) except * with gil:
+    cdef Future future
+    cdef list value
+    try:
+        if replyId not in g_jsCallbackReplies:
+            # Future timed out or was cancelled
+            return
+        future = g_jsCallbackReplies.pop(replyId)[1]
+        if IsBrowserClosed(cefBrowser):
+            future.SetException(JavascriptError("Browser was closed"))
+            return
+        value = CefListValueToPyList(cefBrowser, cefValue)
+        if success:
+            future.SetResult(value[0] if value else None)
+        else:
+            future.SetException(JavascriptError(
+                    value[0] if value else "Javascript callback failed"))
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
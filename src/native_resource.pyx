@@ -0,0 +1,181 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+include "cefpython.pyx"
+
+# Resource handlers implemented in C++. Return an instance from
+# RequestHandler.GetResourceHandler() to serve a response without
+# calling Python for each chunk of data. The same instance may be
+# returned for many requests.
+
+cdef void PyToCefHeaderMap(object headers,
+                           CefResponseHeaderMap& cefHeaderMap) except *:
+    # headers is a dict or a list of (key, value) tuples
+    cdef CefString cefKey
+    cdef CefString cefValue
+    cdef cpp_pair[CefString, CefString] pair
+    if not headers:
+        return
+    if isinstance(headers, dict):
+        headers = list(headers.items())
+    for key, value in headers:
+        PyToCefString(str(key), cefKey)
+        PyToCefString(str(value), cefValue)
+        pair.first, pair.second = cefKey, cefValue
+        cefHeaderMap.insert(pair)
+
+cdef bytes PyToBytes(object data):
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, unicode):
+        return data.encode("utf-8")
+    # bytearray, memoryview and other objects supporting
+    # the buffer protocol.
+    return memoryview(data).tobytes()
+
+cdef class NativeResourceHandler:
+    cdef CefRefPtr[NativeResource] nativeResource
+
+    cdef CefRefPtr[CefResourceHandler] CreateHandler(self,
+            CefRefPtr[CefRequest] cefRequest) except *:
+        if not self.nativeResource.get():
+            raise Exception("NativeResourceHandler was not initialized")
+        return self.nativeResource.get().CreateHandler(cefRequest)
+
+cdef class BytesResourceHandler(NativeResourceHandler):
+    cdef size_t size
+
+    def __init__(self, object data, py_string mime_type="text/html",
+                 int status_code=200, py_string status_text="OK",
+                 object headers=None):
+        cdef bytes pyData = PyToBytes(data)
+        cdef const char* cData = pyData
+        cdef CefString cefMimeType
+        cdef CefString cefStatusText
+        cdef CefResponseHeaderMap cefHeaderMap
+        PyToCefString(mime_type, cefMimeType)
+        PyToCefString(status_text, cefStatusText)
+        PyToCefHeaderMap(headers, cefHeaderMap)
+        self.size = len(pyData)
+        # Data is copied once, handlers created for each request
+        # share the copy.
+        self.nativeResource = <CefRefPtr[NativeResource]?>new BytesResource(
+                cData, self.size, cefMimeType, status_code, cefStatusText,
+                cefHeaderMap)
+
+    def GetSize(self):
+        return self.size
+
+cdef class FileResourceHandler(NativeResourceHandler):
+
+    def __init__(self, py_string path, py_string mime_type="",
+                 int status_code=200, py_string status_text="OK",
+                 object headers=None, int64 offset=0, int64 length=-1,
+                 py_bool use_mmap=False):
+        cdef CefString cefPath
+        cdef CefString cefMimeType
+        cdef CefString cefStatusText
+        cdef CefResponseHeaderMap cefHeaderMap
+        PyToCefString(path, cefPath)
+        PyToCefString(mime_type, cefMimeType)
+        PyToCefString(status_text, cefStatusText)
+        PyToCefHeaderMap(headers, cefHeaderMap)
+        # File is opened for each request, or mapped into memory
+        # on first request when use_mmap is True.
+        self.nativeResource = <CefRefPtr[NativeResource]?>new FileResource(
+                cefPath, offset, length, bool(use_mmap), cefMimeType,
+                status_code, cefStatusText, cefHeaderMap)
+
+cdef class DirectoryResourceHandler(NativeResourceHandler):
+
+    def __init__(self, py_string directory, py_string url_prefix,
+                 py_string default_file="index.html", object headers=None):
+        cdef CefString cefDirectory
+        cdef CefString cefUrlPrefix
+        cdef CefString cefDefaultFile
+        cdef CefResponseHeaderMap cefHeaderMap
+        PyToCefString(directory, cefDirectory)
+        PyToCefString(url_prefix, cefUrlPrefix)
+        PyToCefString(default_file, cefDefaultFile)
+        PyToCefHeaderMap(headers, cefHeaderMap)
+        self.nativeResource = \
+                <CefRefPtr[NativeResource]?>new DirectoryResource(
+                        cefDirectory, cefUrlPrefix, cefDefaultFile,
+                        cefHeaderMap)
+
+cdef class ZipResourceHandler(NativeResourceHandler):
+    cdef ZipResource* zipResource
+
+    def __init__(self, py_string path, py_string url_prefix,
+                 py_string default_file="index.html", py_string password="",
+                 int64 cache_size=32*1024*1024, object headers=None):
+        cdef CefString cefPath
+        cdef CefString cefUrlPrefix
+        cdef CefString cefDefaultFile
+        cdef CefString cefPassword
+        cdef CefString cefError
+        cdef CefResponseHeaderMap cefHeaderMap
+        PyToCefString(path, cefPath)
+        PyToCefString(url_prefix, cefUrlPrefix)
+        PyToCefString(default_file, cefDefaultFile)
+        PyToCefString(password, cefPassword)
+        PyToCefHeaderMap(headers, cefHeaderMap)
+        self.zipResource = new ZipResource(cefPath, cefUrlPrefix,
+                                           cefDefaultFile, cefPassword,
+                                           cache_size, cefHeaderMap)
+        # Reference is kept by nativeResource
+        self.nativeResource = <CefRefPtr[NativeResource]?>self.zipResource
+        # Archive is indexed once, files are decompressed on demand.
+        if not self.zipResource.Load(cefError):
+            raise Exception("ZipResourceHandler failed: %s"
+                            % CefToPyString(cefError))
+
+    def GetFileCount(self):
+        return self.zipResource.GetFileCount()
+
+    def GetCacheSize(self):
+        return self.zipResource.GetCacheSize()
+
+cdef class ChunkedResourceHandler(NativeResourceHandler):
+    cdef CefRefPtr[ChunkQueue] queue
+
+    def __init__(self, py_string mime_type="text/html", int status_code=200,
+                 py_string status_text="OK", object headers=None,
+                 int64 length=-1):
+        cdef CefString cefMimeType
+        cdef CefString cefStatusText
+        cdef CefResponseHeaderMap cefHeaderMap
+        PyToCefString(mime_type, cefMimeType)
+        PyToCefString(status_text, cefStatusText)
+        PyToCefHeaderMap(headers, cefHeaderMap)
+        self.queue = <CefRefPtr[ChunkQueue]?>new ChunkQueue()
+        self.nativeResource = \
+                <CefRefPtr[NativeResource]?>new ChunkedResource(
+                        self.queue, cefMimeType, status_code, cefStatusText,
+                        cefHeaderMap, length)
+
+    def Write(self, object data):
+        # May be called on any thread. Data is copied once into
+        # the queue, CEF reads it on the IO thread.
+        cdef Py_buffer buffer
+        cdef cpp_bool ret
+        if isinstance(data, unicode):
+            data = data.encode("utf-8")
+        PyObject_GetBuffer(data, &buffer, PyBUF_SIMPLE)
+        try:
+            with nogil:
+                ret = self.queue.get().Write(<const char*>buffer.buf,
+                                             <size_t>buffer.len)
+        finally:
+            PyBuffer_Release(&buffer)
+        return ret
+
+    def Finish(self):
+        self.queue.get().Finish()
+
+    def IsCancelled(self):
+        return self.queue.get().IsCancelled()
+
+    def GetQueuedSize(self):
+        return self.queue.get().GetQueuedSize()
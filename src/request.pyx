@@ -6,6 +6,11 @@ include "cefpython.pyx"
 
 # noinspection PyUnresolvedReferences
 cimport cef_types
+import shutil
+import tempfile
+
+# Size of chunks read from file objects when spooling upload data
+cdef int POST_DATA_SPOOL_CHUNK_SIZE = 1024 * 1024
 
 # cef_urlrequest_flags_t
 UR_FLAG_NONE = cef_types.UR_FLAG_NONE
@@ -55,8 +60,36 @@ cdef PyRequest CreatePyRequest(CefRefPtr[CefRequest] cefRequest):
     pyRequest.cefRequest = cefRequest
     return pyRequest
 
+cdef void RemoveSpoolFile(object path) except *:
+    try:
+        os.remove(path)
+    except OSError:
+        Debug("Failed to remove upload spool file: %s" % path)
+
+cdef class SpoolFile:
+    # Temporary file created by SetPostDataStream(). Referenced by the
+    # request object until its post data is set again, and by web
+    # requests sending it until they complete. Removed when the last
+    # reference is released, so a request that is never sent or is
+    # sent several times doesn't leave the file behind.
+    cdef object path
+
+    def __dealloc__(self):
+        if self.path:
+            RemoveSpoolFile(self.path)
+
 cdef class PyRequest:
     cdef CefRefPtr[CefRequest] cefRequest
+    cdef SpoolFile spoolFile
+    # Headers and post data are converted from CEF on first access and
+    # cached until a setter is called. Request objects passed to
+    # callbacks are created for each call.
+    cdef list headerMultimap
+    # [lower case name] = value of the first header with that name
+    cdef dict headerIndex
+    # List of (cef_postdataelement_type_t, bytes)
+    cdef list postDataElements
+    cdef object postDataView
 
     cdef CefRefPtr[CefRequest] GetCefRequest(self) except *:
         if <void*>self.cefRequest != NULL and self.cefRequest.get():
@@ -80,40 +113,61 @@ cdef class PyRequest:
         PyToCefString(method, cefMethod)
         self.GetCefRequest().get().SetMethod(cefMethod)
 
+    cdef list LoadPostDataElements(self):
+        # Bytes of each element are copied from CEF only once
+        cdef cpp_vector[CefRefPtr[CefPostDataElement]] elementVector
+        cdef cpp_vector[CefRefPtr[CefPostDataElement]].iterator iterator
+        cdef CefRefPtr[CefPostData] postData
+        cdef CefRefPtr[CefPostDataElement] postDataElement
+        cdef list elements
+        cdef bytes pyData
+        cdef size_t bytesCount
+        cdef size_t bytesRead
+        cdef int elementType
+        if self.postDataElements is not None:
+            return self.postDataElements
+        elements = []
+        postData = self.GetCefRequest().get().GetPostData()
+        if postData.get() != NULL and postData.get().GetElementCount():
+            postData.get().GetElements(elementVector)
+            iterator = elementVector.begin()
+            while iterator != elementVector.end():
+                postDataElement = deref(iterator)
+                elementType = postDataElement.get().GetType()
+                if elementType == cef_types.PDE_TYPE_EMPTY:
+                    pyData = b""
+                elif elementType == cef_types.PDE_TYPE_BYTES:
+                    # Bytes are read directly into the bytes object
+                    bytesCount = postDataElement.get().GetBytesCount()
+                    pyData = PyBytes_FromStringAndSize(NULL, bytesCount)
+                    bytesRead = postDataElement.get().GetBytes(
+                            bytesCount, PyBytes_AS_STRING(pyData))
+                    if bytesRead < bytesCount:
+                        pyData = pyData[:bytesRead]
+                elif elementType == cef_types.PDE_TYPE_FILE:
+                    pyData = CefToPyBytes(postDataElement.get().GetFile())
+                else:
+                    raise Exception("Invalid type of CefPostDataElement")
+                elements.append((elementType, pyData))
+                preinc(iterator)
+        self.postDataElements = elements
+        return elements
+
     cpdef object GetPostData(self):
         if self.GetMethod() != "POST":
             return {}
-        cdef cpp_vector[CefRefPtr[CefPostDataElement]] elementVector
-        cdef CefRefPtr[CefPostData] postData = (
-                self.GetCefRequest().get().GetPostData())
-        if postData.get() == NULL:
-            return {}
-        if postData.get().GetElementCount() == 0:
-            return {}
-        postData.get().GetElements(elementVector)
-        cdef cpp_vector[CefRefPtr[CefPostDataElement]].iterator iterator = (
-                elementVector.begin())
-        cdef CefRefPtr[CefPostDataElement] postDataElement
         cdef list retMultipart = []
         cdef dict retUrlEncoded = {}
+        cdef int elementType
         # pyData is really of type "str", but Cython will throw
         # an error if we use that type: "Cannot convert 'bytes'
         # object to str implicitly. This is not portable to Py3."
         cdef bytes pyData
-        cdef size_t bytesCount
-        cdef void* voidData
-        cdef bytes pyFile
-        while iterator != elementVector.end():
-            postDataElement = deref(iterator)
-            if postDataElement.get().GetType() == cef_types.PDE_TYPE_EMPTY:
+        for elementType, pyData in self.LoadPostDataElements():
+            if elementType == cef_types.PDE_TYPE_EMPTY:
                 # May return an empty dict - retUrlEncoded.
                 pass
-            elif postDataElement.get().GetType() == cef_types.PDE_TYPE_BYTES:
-                bytesCount = postDataElement.get().GetBytesCount()
-                voidData = <void*>malloc(bytesCount)
-                postDataElement.get().GetBytes(bytesCount, voidData)
-                pyData = VoidPtrToBytes(voidData, bytesCount)
-                free(voidData)
+            elif elementType == cef_types.PDE_TYPE_BYTES:
                 if pyData.startswith(b'--') or retMultipart:
                     # Content-Type: multipart/form-data
                     retMultipart.append(pyData)
@@ -121,17 +175,31 @@ cdef class PyRequest:
                     # Content-Type: application/x-www-form-urlencoded
                     retUrlEncoded.update(urlparse.parse_qsl(qs=pyData, 
                             keep_blank_values=True))
-            elif postDataElement.get().GetType() == cef_types.PDE_TYPE_FILE:
-                pyFile = CefToPyBytes(postDataElement.get().GetFile())
-                retMultipart.append(b"@"+pyFile)
             else:
-                raise Exception("Invalid type of CefPostDataElement")
-            preinc(iterator)
+                retMultipart.append(b"@"+pyData)
         if retMultipart:
             return retMultipart
         else:
             return retUrlEncoded
 
+    cpdef object GetPostDataView(self):
+        # Read-only memoryview of the bytes elements of post data, file
+        # elements are not included. Data is not copied again when
+        # post data has a single bytes element.
+        cdef list chunks
+        cdef int elementType
+        cdef bytes pyData
+        if self.postDataView is None:
+            chunks = []
+            for elementType, pyData in self.LoadPostDataElements():
+                if elementType == cef_types.PDE_TYPE_BYTES:
+                    chunks.append(pyData)
+            if len(chunks) == 1:
+                self.postDataView = memoryview(chunks[0])
+            else:
+                self.postDataView = memoryview(b"".join(chunks))
+        return self.postDataView
+
     cpdef py_void SetPostData(self, object pyPostData):
         cdef CefRefPtr[CefPostData] postData = CefPostData_Create()
         cdef CefRefPtr[CefPostDataElement] postDataElement
@@ -163,35 +231,101 @@ cdef class PyRequest:
             self.GetCefRequest().get().SetPostData(postData)
         else:
             raise Exception("Invalid type of postData, only dict|list allowed")
+        self.spoolFile = None
+        self.postDataElements = None
+        self.postDataView = None
 
-    cpdef dict GetHeaderMap(self):
-        cdef list headerMultimap = self.GetHeaderMultimap()
-        cdef dict headerMap = {}
-        cdef tuple headerTuple
-        for headerTuple in headerMultimap:
-            key = headerTuple[0]
-            value = headerTuple[1]
-            headerMap[key] = value
-        return headerMap
+    cpdef py_void SetPostDataStream(self, object source):
+        # Post data is uploaded from a file element, CEF reads the file
+        # on the IO thread. File paths are used directly, other sources
+        # are spooled to a temporary file chunk by chunk, so the data
+        # is never held in memory as a whole. CEF 66 doesn't support
+        # uploading from a stream.
+        cdef CefRefPtr[CefPostData] postData = CefPostData_Create()
+        cdef CefRefPtr[CefPostDataElement] postDataElement = \
+                CefPostDataElement_Create()
+        cdef CefString cefPath
+        cdef SpoolFile spoolFile = None
+        if isinstance(source, (str, unicode, bytes)):
+            PyToCefString(source, cefPath)
+        else:
+            spoolFile = self.SpoolPostData(source)
+            PyToCefString(spoolFile.path, cefPath)
+        postDataElement.get().SetToFile(cefPath)
+        postData.get().AddElement(postDataElement)
+        self.GetCefRequest().get().SetPostData(postData)
+        # Previous spool file is removed unless it is still being sent
+        self.spoolFile = spoolFile
+        self.postDataElements = None
+        self.postDataView = None
 
-    cpdef list GetHeaderMultimap(self):
+    cdef SpoolFile SpoolPostData(self, object source):
+        # source is a file descriptor, a file-like object with read()
+        # method, e.g. mmap, or an iterable of bytes chunks.
+        cdef int fd
+        cdef object path
+        cdef object outFile
+        cdef SpoolFile spoolFile
+        fd, path = tempfile.mkstemp(prefix="cefpython_upload_")
+        try:
+            with os.fdopen(fd, "wb") as outFile:
+                if isinstance(source, int):
+                    with os.fdopen(os.dup(source), "rb") as sourceFile:
+                        shutil.copyfileobj(sourceFile, outFile,
+                                           POST_DATA_SPOOL_CHUNK_SIZE)
+                elif hasattr(source, "read"):
+                    shutil.copyfileobj(source, outFile,
+                                       POST_DATA_SPOOL_CHUNK_SIZE)
+                else:
+                    for chunk in source:
+                        outFile.write(PyToBytes(chunk))
+        except:
+            RemoveSpoolFile(path)
+            raise
+        spoolFile = SpoolFile()
+        spoolFile.path = path
+        return spoolFile
+
+    cdef SpoolFile GetSpoolFile(self):
+        return self.spoolFile
+
+    cdef list LoadHeaders(self):
         cdef cpp_multimap[CefString, CefString] cefHeaderMap
-        self.GetCefRequest().get().GetHeaderMap(cefHeaderMap)
-        cdef list pyHeaderMultimap = []
-        cdef cpp_multimap[CefString, CefString].iterator iterator = (
-                cefHeaderMap.begin())
+        cdef cpp_multimap[CefString, CefString].iterator iterator
         cdef CefString cefKey
         cdef CefString cefValue
         cdef str pyKey
         cdef str pyValue
+        cdef str lowerKey
+        cdef list headerMultimap
+        cdef dict headerIndex
+        if self.headerMultimap is not None:
+            return self.headerMultimap
+        self.GetCefRequest().get().GetHeaderMap(cefHeaderMap)
+        headerMultimap = []
+        headerIndex = {}
+        iterator = cefHeaderMap.begin()
         while iterator != cefHeaderMap.end():
             cefKey = deref(iterator).first
             cefValue = deref(iterator).second
             pyKey = CefToPyString(cefKey)
             pyValue = CefToPyString(cefValue)
-            pyHeaderMultimap.append((pyKey, pyValue))
+            headerMultimap.append((pyKey, pyValue))
+            lowerKey = pyKey.lower()
+            if lowerKey not in headerIndex:
+                headerIndex[lowerKey] = pyValue
             preinc(iterator)
-        return pyHeaderMultimap
+        self.headerMultimap = headerMultimap
+        self.headerIndex = headerIndex
+        return headerMultimap
+
+    cpdef dict GetHeaderMap(self):
+        # Last value wins for repeated headers
+        return dict(self.LoadHeaders())
+
+    cpdef list GetHeaderMultimap(self):
+        # Copy, so that the cache isn't modified by the caller
+        return list(self.LoadHeaders())
 
     cpdef py_void SetHeaderMap(self, dict headerMap):
         assert len(headerMap) > 0, "headerMap param is empty"
@@ -214,6 +348,32 @@ cdef class PyRequest:
             pair.first, pair.second = cefKey, cefValue
             cefHeaderMap.insert(pair)
         self.GetCefRequest().get().SetHeaderMap(cefHeaderMap)
+        self.headerMultimap = None
+        self.headerIndex = None
+
+    cpdef str GetHeader(self, py_string name):
+        # Single header is looked up in the cached index, or in C++
+        # when headers weren't converted to Python yet.
+        cdef CefString cefValue
+        if self.headerIndex is not None and isinstance(name, str):
+            return self.headerIndex.get(name.lower(), "")
+        if not GetRequestHeader(self.GetCefRequest(),
+                                PyToCefStringValue(name), cefValue):
+            return ""
+        return CefToPyString(cefValue)
+
+    cpdef py_void SetHeader(self, py_string name, py_string value,
+                            py_bool overwrite=True):
+        SetRequestHeader(self.GetCefRequest(), PyToCefStringValue(name),
+                         PyToCefStringValue(value), bool(overwrite))
+        self.headerMultimap = None
+        self.headerIndex = None
+
+    cpdef py_bool RemoveHeader(self, py_string name):
+        self.headerMultimap = None
+        self.headerIndex = None
+        return RemoveRequestHeader(self.GetCefRequest(),
+                                   PyToCefStringValue(name))
 
     cpdef int GetFlags(self) except *:
         return self.GetCefRequest().get().GetFlags()
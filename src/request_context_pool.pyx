@@ -0,0 +1,127 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+include "cefpython.pyx"
+
+# Named request contexts, kept alive until removed or until Shutdown.
+# Accessed on the UI thread only.
+cdef dict g_requestContextPool = {}
+
+
+cdef class PooledRequestContext:
+    cdef CefRefPtr[CefRequestContext] cefRequestContext
+    cdef int browserCount
+
+
+cdef PooledRequestContext GetPooledRequestContext(py_string name):
+    cdef PooledRequestContext pooledContext = g_requestContextPool.get(name)
+    if pooledContext is None:
+        raise Exception("Request context not found: %s" % name)
+    return pooledContext
+
+
+cdef void SetRequestContextPreference(
+        CefRefPtr[CefRequestContext] cefRequestContext,
+        py_string name,
+        object value) except *:
+    # Value is converted the same way as javascript bindings values,
+    # the list is only a holder for it.
+    cdef CefRefPtr[CefListValue] cefListValue = PyListToCefListValue(
+            0, None, [value])
+    cdef CefString cefError
+    if not cefRequestContext.get().SetPreference(
+            PyToCefStringValue(name), cefListValue.get().GetValue(0),
+            cefError):
+        raise Exception("Setting preference %s failed: %s"
+                        % (name, CefToPyString(cefError)))
+
+
+class RequestContextPool:
+    # Browsers created with CreateBrowserSync(request_context=name) use
+    # a named context instead of the shared one. Each context has its
+    # own storage, so browsers of different contexts don't share
+    # cookies, cache or preferences, while browsers created one after
+    # another with the same context reuse its warmed up cache.
+
+    @classmethod
+    def Create(cls, py_string name, dict settings=None,
+               dict preferences=None):
+        cdef CefRequestContextSettings cefSettings
+        cdef CefRefPtr[CefRequestContext] cefRequestContext
+        cdef PooledRequestContext pooledContext
+        assert IsThread(TID_UI), (
+                "RequestContextPool.Create() may only be called on the UI"
+                " thread")
+        if not name:
+            raise Exception("RequestContextPool.Create() failed: name is"
+                            " empty")
+        if name in g_requestContextPool:
+            raise Exception("RequestContextPool.Create() failed: context"
+                            " already exists: %s" % name)
+        if settings:
+            SetRequestContextSettings(settings, &cefSettings)
+        cefRequestContext = CefRequestContext.CreateContext(
+                cefSettings, <CefRefPtr[CefRequestContextHandler]?>NULL)
+        if not cefRequestContext.get():
+            raise Exception("RequestContextPool.Create() failed: context"
+                            " could not be created: %s" % name)
+        if preferences:
+            for key in preferences:
+                SetRequestContextPreference(cefRequestContext, key,
+                                            preferences[key])
+        pooledContext = PooledRequestContext()
+        pooledContext.cefRequestContext = cefRequestContext
+        g_requestContextPool[name] = pooledContext
+
+    @classmethod
+    def Remove(cls, py_string name):
+        # Browsers that use the context keep it alive until closed
+        return g_requestContextPool.pop(name, None) is not None
+
+    @classmethod
+    def Clear(cls):
+        g_requestContextPool.clear()
+
+    @classmethod
+    def Has(cls, py_string name):
+        return name in g_requestContextPool
+
+    @classmethod
+    def GetNames(cls):
+        return sorted(g_requestContextPool)
+
+    @classmethod
+    def GetCachePath(cls, py_string name):
+        cdef PooledRequestContext pooledContext = GetPooledRequestContext(
+                name)
+        return CefToPyString(
+                pooledContext.cefRequestContext.get().GetCachePath())
+
+    @classmethod
+    def GetCookieManager(cls, py_string name):
+        cdef PooledRequestContext pooledContext = GetPooledRequestContext(
+                name)
+        cdef PyCookieManager pyCookieManager = CreatePyCookieManager(
+                pooledContext.cefRequestContext.get().GetDefaultCookieManager(
+                        <CefRefPtr[CefCompletionCallback]?>NULL))
+        pyCookieManager.cefRequestContext = pooledContext.cefRequestContext
+        return pyCookieManager
+
+    @classmethod
+    def SetPreference(cls, py_string name, py_string preference,
+                      object value):
+        cdef PooledRequestContext pooledContext = GetPooledRequestContext(
+                name)
+        assert IsThread(TID_UI), (
+                "RequestContextPool.SetPreference() may only be called on"
+                " the UI thread")
+        SetRequestContextPreference(pooledContext.cefRequestContext,
+                                    preference, value)
+
+    @classmethod
+    def GetBrowserCount(cls, py_string name):
+        # Number of browsers created with the context so far
+        cdef PooledRequestContext pooledContext = GetPooledRequestContext(
+                name)
+        return pooledContext.browserCount
@@ -0,0 +1,86 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+include "cefpython.pyx"
+
+cdef dict g_requestFilterVerdicts = {
+    "defer": REQUEST_FILTER_DEFER,
+    "allow": REQUEST_FILTER_ALLOW,
+    "block": REQUEST_FILTER_BLOCK,
+}
+
+
+cdef int GetRequestFilterVerdict(py_string verdict) except -1:
+    if verdict not in g_requestFilterVerdicts:
+        raise Exception("Invalid verdict: %s" % verdict)
+    return g_requestFilterVerdicts[verdict]
+
+
+class RequestFilter:
+    # Rules are evaluated in C++ on the IO thread before calling
+    # RequestHandler.OnBeforeResourceLoad, Python is called only
+    # for requests with the "defer" verdict.
+
+    @classmethod
+    def LoadRules(cls, object rules, py_string verdict="block"):
+        # rules is a filter list contents or a list of lines
+        cdef int cVerdict = GetRequestFilterVerdict(verdict)
+        cdef int skipped = 0
+        cdef int added
+        if not isinstance(rules, (bytes, str, unicode)):
+            rules = "\n".join(rules)
+        added = AddRequestFilterRules(PyToBytes(rules), cVerdict, skipped)
+        if skipped:
+            Debug("RequestFilter.LoadRules(): skipped %s unsupported rules"
+                  % skipped)
+        return added
+
+    @classmethod
+    def ClearRules(cls):
+        ClearRequestFilterRules()
+
+    @classmethod
+    def LoadPublicSuffixList(cls, object rules):
+        # rules is public_suffix_list.dat contents or a list of lines.
+        # Public suffixes are used by third-party detection here and
+        # in CookiePolicy.
+        if not isinstance(rules, (bytes, str, unicode)):
+            rules = "\n".join(rules)
+        return AddPublicSuffixRules(PyToBytes(rules))
+
+    @classmethod
+    def ClearPublicSuffixList(cls):
+        ClearPublicSuffixRules()
+
+    @classmethod
+    def GetBaseDomain(cls, py_string host):
+        cdef cpp_string cppDomain = GetBaseDomain(PyToBytes(host.lower()))
+        return CharToPyString(cppDomain.c_str())
+
+    @classmethod
+    def GetRulesCount(cls):
+        return GetRequestFilterRulesCount()
+
+    @classmethod
+    def SetDefaultVerdict(cls, py_string verdict):
+        SetRequestFilterDefaultVerdict(GetRequestFilterVerdict(verdict))
+
+    @classmethod
+    def Match(cls, py_string url, py_string first_party_url="",
+              py_string resource_type=""):
+        cdef int verdict = MatchRequestFilter(
+                PyToBytes(url), PyToBytes(first_party_url),
+                GetRequestFilterResourceType(PyToBytes(resource_type)))
+        for name, value in g_requestFilterVerdicts.items():
+            if value == verdict:
+                return name
+
+    @classmethod
+    def GetStats(cls):
+        cdef int64 allowed = 0
+        cdef int64 blocked = 0
+        cdef int64 deferred = 0
+        GetRequestFilterStats(allowed, blocked, deferred)
+        return {"allowed": allowed, "blocked": blocked,
+                "deferred": deferred}
@@ -0,0 +1,127 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+include "cefpython.pyx"
+
+
+class ResourceCache:
+    # Cache is implemented in C++, see client_handler/resource_cache.h.
+    # Fresh entries are served on the IO thread before calling
+    # RequestHandler.GetResourceHandler, without acquiring the GIL.
+    # Responses of Python resource handlers are stored in C++ while
+    # CEF reads them, disk tier is written on the FILE thread.
+
+    @classmethod
+    def Enable(cls, int64 memory_size=32*1024*1024, py_string disk_path="",
+               int64 disk_size=256*1024*1024, object vary_headers=None,
+               py_bool serve_cached=True, py_bool store_responses=True):
+        cdef CefString cefDiskPath
+        cdef CefString cefHeader
+        cdef cpp_vector[CefString] cefVaryHeaders
+        PyToCefString(disk_path, cefDiskPath)
+        for header in vary_headers or []:
+            PyToCefString(header, cefHeader)
+            cefVaryHeaders.push_back(cefHeader)
+        EnableResourceCache(memory_size, cefDiskPath, disk_size,
+                            cefVaryHeaders, bool(serve_cached),
+                            bool(store_responses))
+
+    @classmethod
+    def Disable(cls):
+        DisableResourceCache()
+
+    @classmethod
+    def IsEnabled(cls):
+        return IsResourceCacheEnabled()
+
+    @classmethod
+    def Put(cls, py_string url, object data, py_string mime_type="",
+            object headers=None, object request_headers=None,
+            py_string status_text="OK"):
+        cdef bytes pyData = PyToBytes(data)
+        cdef const char* cData = pyData
+        cdef CefString cefUrl
+        cdef CefString cefMimeType
+        cdef CefString cefStatusText
+        cdef CefResponseHeaderMap cefHeaders
+        cdef CefResponseHeaderMap cefRequestHeaders
+        cdef size_t size = len(pyData)
+        cdef cpp_bool ret
+        PyToCefString(url, cefUrl)
+        PyToCefString(mime_type, cefMimeType)
+        PyToCefString(status_text, cefStatusText)
+        PyToCefHeaderMap(headers, cefHeaders)
+        PyToCefHeaderMap(request_headers, cefRequestHeaders)
+        # Copying the body and updating the memory tier doesn't need
+        # the GIL, disk tier is written later on the FILE thread.
+        with nogil:
+            ret = PutCachedResource(cefUrl, cefRequestHeaders, cData, size,
+                                    cefMimeType, cefStatusText, cefHeaders)
+        return ret
+
+    @classmethod
+    def Get(cls, py_string url, object request_headers=None,
+            py_bool allow_stale=False):
+        cdef CefString cefUrl
+        cdef CefResponseHeaderMap cefRequestHeaders
+        cdef CefRefPtr[NativeResource] nativeResource
+        cdef NativeResourceHandler handler
+        PyToCefString(url, cefUrl)
+        PyToCefHeaderMap(request_headers, cefRequestHeaders)
+        nativeResource = GetCachedResource(cefUrl, cefRequestHeaders,
+                                           bool(allow_stale))
+        if not nativeResource.get():
+            return None
+        handler = NativeResourceHandler()
+        handler.nativeResource = nativeResource
+        return handler
+
+    @classmethod
+    def GetValidators(cls, py_string url, object request_headers=None):
+        cdef CefString cefUrl
+        cdef CefResponseHeaderMap cefRequestHeaders
+        cdef CefString cefEtag
+        cdef CefString cefLastModified
+        cdef dict validators = {}
+        PyToCefString(url, cefUrl)
+        PyToCefHeaderMap(request_headers, cefRequestHeaders)
+        if not GetCachedResourceValidators(cefUrl, cefRequestHeaders,
+                                           cefEtag, cefLastModified):
+            return None
+        if not cefEtag.empty():
+            validators["If-None-Match"] = CefToPyString(cefEtag)
+        if not cefLastModified.empty():
+            validators["If-Modified-Since"] = CefToPyString(cefLastModified)
+        return validators
+
+    @classmethod
+    def Refresh(cls, py_string url, object headers,
+                object request_headers=None):
+        cdef CefString cefUrl
+        cdef CefResponseHeaderMap cefHeaders
+        cdef CefResponseHeaderMap cefRequestHeaders
+        PyToCefString(url, cefUrl)
+        PyToCefHeaderMap(headers, cefHeaders)
+        PyToCefHeaderMap(request_headers, cefRequestHeaders)
+        return RefreshCachedResource(cefUrl, cefRequestHeaders, cefHeaders)
+
+    @classmethod
+    def Remove(cls, py_string url, object request_headers=None):
+        cdef CefString cefUrl
+        cdef CefResponseHeaderMap cefRequestHeaders
+        PyToCefString(url, cefUrl)
+        PyToCefHeaderMap(request_headers, cefRequestHeaders)
+        return RemoveCachedResource(cefUrl, cefRequestHeaders)
+
+    @classmethod
+    def Clear(cls):
+        ClearResourceCache()
+
+    @classmethod
+    def GetMemorySize(cls):
+        return GetResourceCacheMemorySize()
+
+    @classmethod
+    def GetDiskSize(cls):
+        return GetResourceCacheDiskSize()
@@ -0,0 +1,55 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+include "cefpython.pyx"
+
+cdef dict g_routeMatchTypes = {
+    "prefix": ROUTE_MATCH_PREFIX,
+    "glob": ROUTE_MATCH_GLOB,
+    "regex": ROUTE_MATCH_REGEX,
+}
+
+
+class ResourceRouter:
+    # Routes are evaluated in C++ on the IO thread before calling
+    # RequestHandler.GetResourceHandler, so that requests served
+    # natively or not intercepted at all don't acquire the GIL.
+
+    @classmethod
+    def AddRoute(cls, py_string pattern, object handler=None,
+                 py_string match="prefix"):
+        cdef CefString cefPattern
+        cdef CefString cefError
+        cdef CefRefPtr[NativeResource] nativeResource
+        cdef int routeId
+        if match not in g_routeMatchTypes:
+            raise Exception("Invalid match type: %s" % match)
+        if handler is not None:
+            if not isinstance(handler, NativeResourceHandler):
+                raise Exception("ResourceRouter.AddRoute() failed: handler"
+                                " must be a NativeResourceHandler or None")
+            nativeResource = (<NativeResourceHandler>handler).nativeResource
+        PyToCefString(pattern, cefPattern)
+        routeId = AddResourceRoute(g_routeMatchTypes[match], cefPattern,
+                                   nativeResource, cefError)
+        if not routeId:
+            raise Exception("ResourceRouter.AddRoute() failed: %s"
+                            % CefToPyString(cefError))
+        return routeId
+
+    @classmethod
+    def RemoveRoute(cls, int route_id):
+        return RemoveResourceRoute(route_id)
+
+    @classmethod
+    def ClearRoutes(cls):
+        ClearResourceRoutes()
+
+    @classmethod
+    def GetRoutesCount(cls):
+        return GetResourceRoutesCount()
+
+    @classmethod
+    def SetPythonFallback(cls, py_bool enabled):
+        SetResourceRouterPythonFallback(bool(enabled))
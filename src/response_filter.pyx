@@ -0,0 +1,119 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+include "cefpython.pyx"
+
+# Response filters are returned from RequestHandler.
+# GetResourceResponseFilter(). Native filters are implemented in C++
+# and the same instance may be returned for many responses. Python
+# filters are objects with a Filter(data, eof) method, a new object
+# must be returned for each response.
+
+# [filterId] = Python filter object, released when CEF destroys
+# the filter.
+cdef dict g_pyResponseFilters = {}
+cdef int g_pyResponseFilterMaxId = 0
+
+cdef cpp_string PyToFilterString(object value) except *:
+    cdef bytes pyBytes = PyToBytes(value)
+    return pyBytes
+
+cdef class NativeResponseFilter:
+    cdef CefRefPtr[ResponseFilterTemplate] filterTemplate
+
+    cdef CefRefPtr[CefResponseFilter] CreateFilter(self) except *:
+        if not self.filterTemplate.get():
+            raise Exception("NativeResponseFilter was not initialized")
+        return self.filterTemplate.get().CreateFilter()
+
+cdef class ReplaceResponseFilter(NativeResponseFilter):
+
+    def __init__(self, object replacements):
+        # replacements is a dict or a list of (find, replace) tuples.
+        # Replacements are applied in order.
+        cdef ResponseFilterReplacements cppReplacements
+        cdef cpp_pair[cpp_string, cpp_string] pair
+        if isinstance(replacements, dict):
+            replacements = list(replacements.items())
+        for find, replace in replacements:
+            pair.first = PyToFilterString(find)
+            pair.second = PyToFilterString(replace)
+            if pair.first.empty():
+                raise Exception("ReplaceResponseFilter: string to find"
+                                " must not be empty")
+            cppReplacements.push_back(pair)
+        self.filterTemplate = <CefRefPtr[ResponseFilterTemplate]?>new \
+                ReplaceResponseFilterTemplate(cppReplacements)
+
+cdef class RegexResponseFilter(NativeResponseFilter):
+
+    def __init__(self, object pattern, object replacement,
+                 size_t max_size=10*1024*1024):
+        # The whole response is buffered before replacing, responses
+        # larger than max_size are not modified.
+        cdef RegexResponseFilterTemplate* regexTemplate = \
+                new RegexResponseFilterTemplate(
+                        PyToFilterString(pattern),
+                        PyToFilterString(replacement),
+                        max_size)
+        self.filterTemplate = <CefRefPtr[ResponseFilterTemplate]?> \
+                regexTemplate
+        if not regexTemplate.GetError().empty():
+            raise Exception("RegexResponseFilter: {error}".format(
+                    error=CharToPyString(regexTemplate.GetError().c_str())))
+
+cdef void UpdateResponseFilterCallback() except *:
+    # RequestHandler acquires the GIL for responses only when a browser
+    # has the GetResourceResponseFilter callback.
+    cdef PyBrowser pyBrowser
+    for pyBrowser in g_pyBrowsers.values():
+        if pyBrowser.GetClientCallback("GetResourceResponseFilter"):
+            SetResponseFilterCallbackEnabled(True)
+            return
+    SetResponseFilterCallbackEnabled(False)
+
+cdef CefRefPtr[CefResponseFilter] CreateResponseFilter(object pyFilter) \
+        except *:
+    global g_pyResponseFilterMaxId
+    if not hasattr(pyFilter, "Filter"):
+        raise Exception("Response filter object must have a Filter()"
+                        " method")
+    g_pyResponseFilterMaxId += 1
+    g_pyResponseFilters[g_pyResponseFilterMaxId] = pyFilter
+    return <CefRefPtr[CefResponseFilter]?>new PythonResponseFilter(
+            g_pyResponseFilterMaxId)
+
+cdef public cpp_bool ResponseFilter_Filter(
+        int filterId,
+        const char* data,
+        size_t size,
+        cpp_bool eof,
+        cpp_string& output
+        ) except * with gil:
+    # Called on the IO thread. Return False to cancel the request.
+    cdef object pyFilter
+    cdef object returnValue
+    cdef bytes pyOutput
+    try:
+        pyFilter = g_pyResponseFilters.get(filterId)
+        if pyFilter is None:
+            return False
+        returnValue = pyFilter.Filter(
+                data=data[:size] if size else b"",
+                eof=bool(eof))
+        if returnValue:
+            pyOutput = PyToBytes(returnValue)
+            output.append(<const char*>pyOutput, len(pyOutput))
+        return True
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+        return False
+
+cdef public void ResponseFilter_Release(int filterId) except * with gil:
+    try:
+        g_pyResponseFilters.pop(filterId, None)
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
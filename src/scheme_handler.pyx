@@ -0,0 +1,123 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+include "cefpython.pyx"
+
+# Python factories registered with RegisterSchemeHandlerFactory.
+# [factoryId] = callable
+cdef dict g_schemeHandlerFactories = {}
+# Factory registered for a scheme and domain, re-registering replaces
+# the factory in CEF, so the previous callable is dropped.
+# [(scheme_name, domain_name)] = factoryId
+cdef dict g_schemeHandlerFactoryIds = {}
+cdef int g_schemeHandlerFactoryMaxId = 0
+
+
+cpdef py_bool RegisterSchemeHandlerFactory(py_string scheme_name,
+                                           object handler,
+                                           py_string domain_name=""):
+    # handler is a NativeResourceHandler or a Python callable that
+    # returns a resource handler for each request.
+    global g_schemeHandlerFactoryMaxId
+    cdef CefString cefSchemeName
+    cdef CefString cefDomainName
+    cdef CefRefPtr[NativeResource] nativeResource
+    cdef int factoryId = 0
+    cdef cpp_bool ret
+    cdef tuple key
+    if isinstance(handler, NativeResourceHandler):
+        nativeResource = (<NativeResourceHandler>handler).nativeResource
+    elif callable(handler):
+        g_schemeHandlerFactoryMaxId += 1
+        factoryId = g_schemeHandlerFactoryMaxId
+        g_schemeHandlerFactories[factoryId] = handler
+    else:
+        raise Exception("RegisterSchemeHandlerFactory() failed: handler"
+                        " must be a NativeResourceHandler or a callable")
+    PyToCefString(scheme_name, cefSchemeName)
+    PyToCefString(domain_name, cefDomainName)
+    ret = CefRegisterSchemeHandlerFactory(
+            cefSchemeName, cefDomainName,
+            <CefRefPtr[CefSchemeHandlerFactory]?>new SchemeHandlerFactory(
+                    nativeResource, factoryId))
+    if not ret:
+        if factoryId:
+            del g_schemeHandlerFactories[factoryId]
+        return False
+    # Scheme and domain names are case insensitive
+    key = (scheme_name.lower(), domain_name.lower())
+    g_schemeHandlerFactories.pop(g_schemeHandlerFactoryIds.pop(key, 0), None)
+    if factoryId:
+        g_schemeHandlerFactoryIds[key] = factoryId
+    return True
+
+cpdef py_bool ClearSchemeHandlerFactories():
+    g_schemeHandlerFactories.clear()
+    g_schemeHandlerFactoryIds.clear()
+    return bool(CefClearSchemeHandlerFactories())
+
+cdef public CefRefPtr[CefResourceHandler] SchemeHandlerFactory_Create(
+        int factoryId,
+        CefRefPtr[CefBrowser] cefBrowser,
+        CefRefPtr[CefFrame] cefFrame,
+        const CefString& cefSchemeName,
+        CefRefPtr[CefRequest] cefRequest
+        ) except * with gil:
+    # Called on the IO thread. Browser and frame are NULL for requests
+    # that don't originate from a browser, e.g. from service workers.
+    cdef PyBrowser pyBrowser = None
+    cdef PyFrame pyFrame = None
+    cdef object factory
+    cdef object returnValue
+    try:
+        factory = g_schemeHandlerFactories.get(factoryId)
+        if not factory:
+            # Factory was cleared
+            return <CefRefPtr[CefResourceHandler]>NULL
+        if cefBrowser.get():
+            if IsBrowserClosed(cefBrowser):
+                return <CefRefPtr[CefResourceHandler]>NULL
+            pyBrowser = GetPyBrowser(cefBrowser, "SchemeHandlerFactory")
+            if cefFrame.get():
+                pyFrame = GetPyFrame(cefFrame)
+        returnValue = factory(
+                browser=pyBrowser,
+                frame=pyFrame,
+                scheme_name=CefToPyString(cefSchemeName),
+                request=CreatePyRequest(cefRequest))
+        if isinstance(returnValue, NativeResourceHandler):
+            return (<NativeResourceHandler>returnValue).CreateHandler(
+                    cefRequest)
+        elif returnValue:
+            return CreateResourceHandler(returnValue, cefBrowser)
+        else:
+            return <CefRefPtr[CefResourceHandler]>NULL
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
+
+cdef list g_customSchemeFlags = ["standard", "local", "display_isolated",
+                                 "secure", "cors_enabled", "csp_bypassing"]
+
+cdef str GetCustomSchemesSwitch(list customSchemes):
+    # Custom schemes must be registered in all processes, they are
+    # passed to subprocesses with the "custom-schemes" switch, e.g.
+    # "app:standard+secure,other:local".
+    cdef list schemes = []
+    cdef list flags
+    cdef dict scheme
+    for scheme in customSchemes:
+        name = str(scheme.get("name", ""))
+        if not re.match(r"^[a-zA-Z][a-zA-Z0-9+.\-]*$", name):
+            raise Exception("Invalid custom scheme name: %s" % name)
+        flags = []
+        for key in scheme:
+            if key == "name":
+                continue
+            if key not in g_customSchemeFlags:
+                raise Exception("Invalid custom scheme option: %s" % key)
+            if scheme[key]:
+                flags.append(key)
+        schemes.append(name.lower() + ":" + "+".join(flags))
+    return ",".join(schemes)
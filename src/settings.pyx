@@ -42,7 +42,9 @@ cdef void SetApplicationSettings(
                 or key == "downloads_enabled"\
                 or key == "context_menu" \
                 or key == "auto_zooming"\
-                or key == "app_user_model_id":
+                or key == "app_user_model_id"\
+                or key == "javascript_callbacks_limit"\
+                or key == "custom_schemes":
             # CEF Python only options. These are not to be found in CEF.
             continue
         elif key == "accept_language_list":
@@ -306,3 +308,35 @@ cdef void SetBrowserSettings(
                     <int>int(browserSettings[key])
         else:
             raise Exception("Invalid browserSettings key: %s" % key)
+
+
+cdef void SetRequestContextSettings(
+        dict requestContextSettings,
+        CefRequestContextSettings* cefRequestContextSettings
+        ) except *:
+    cdef CefString* cefString
+
+    for key in requestContextSettings:
+        if key == "cache_path":
+            cefString = new CefString(&cefRequestContextSettings.cache_path)
+            PyToCefStringPointer(requestContextSettings[key], cefString)
+            del cefString
+        elif key == "accept_language_list":
+            cefString = new CefString(
+                    &cefRequestContextSettings.accept_language_list)
+            PyToCefStringPointer(requestContextSettings[key], cefString)
+            del cefString
+        elif key == "persist_session_cookies":
+            cefRequestContextSettings.persist_session_cookies = \
+                    int(requestContextSettings[key])
+        elif key == "persist_user_preferences":
+            cefRequestContextSettings.persist_user_preferences = \
+                    int(requestContextSettings[key])
+        elif key == "ignore_certificate_errors":
+            cefRequestContextSettings.ignore_certificate_errors = \
+                    int(requestContextSettings[key])
+        elif key == "net_security_expiration_enabled":
+            cefRequestContextSettings.enable_net_security_expiration = \
+                    int(requestContextSettings[key])
+        else:
+            raise Exception("Invalid requestContextSettings key: %s" % key)
@@ -33,9 +33,12 @@
 #include "include/base/cef_logging.h"
 #include <vector>
 #include <algorithm>
+#include <sstream>
 #include "v8utils.h"
 #include "javascript_callback.h"
 #include "v8function_handler.h"
+#include "channel.h"
+#include "dom_extraction.h"
 
 #ifdef BROWSER_PROCESS
 #include "main_message_loop/main_message_loop_external_pump.h"
@@ -146,6 +149,38 @@ void CefPythonApp::OnBeforeCommandLineProcessing(
 
 void CefPythonApp::OnRegisterCustomSchemes(
         CefRawPtr<CefSchemeRegistrar> registrar) {
+    // Called in all processes. Schemes are passed from the
+    // "custom_schemes" application setting with the "custom-schemes"
+    // switch, e.g. "app:standard+secure+cors_enabled,other:local".
+    CefRefPtr<CefCommandLine> commandLine =
+            CefCommandLine::GetGlobalCommandLine();
+    std::string schemes;
+    if (commandLine.get()) {
+        schemes = commandLine->GetSwitchValue("custom-schemes").ToString();
+    }
+    std::istringstream schemesStream(schemes);
+    std::string scheme;
+    while (std::getline(schemesStream, scheme, ',')) {
+        std::string name = scheme.substr(0, scheme.find(':'));
+        std::string flags;
+        if (name.size() < scheme.size()) {
+            flags = "+" + scheme.substr(name.size() + 1) + "+";
+        }
+        if (name.empty()) {
+            continue;
+        }
+        bool ret = registrar->AddCustomScheme(
+                name,
+                flags.find("+standard+") != std::string::npos,
+                flags.find("+local+") != std::string::npos,
+                flags.find("+display_isolated+") != std::string::npos,
+                flags.find("+secure+") != std::string::npos,
+                flags.find("+cors_enabled+") != std::string::npos,
+                flags.find("+csp_bypassing+") != std::string::npos);
+        if (!ret) {
+            LOG(ERROR) << "AddCustomScheme() failed: " << name;
+        }
+    }
 }
 
 CefRefPtr<CefResourceBundleHandler> CefPythonApp::GetResourceBundleHandler() {
@@ -242,6 +277,10 @@ void CefPythonApp::OnScheduleMessagePumpWork(int64 delay_ms) {
             MainMessageLoopExternalPump::Get();
     if (message_pump) {
         message_pump->OnScheduleMessagePumpWork(delay_ms);
+    } else {
+        // Message loop work is scheduled by the application,
+        // see the OnScheduleMessagePumpWork global callback.
+        BrowserProcessHandler_OnScheduleMessagePumpWork(delay_ms);
     }
 #endif // BROWSER_PROCESS
 }
@@ -262,6 +301,7 @@ void CefPythonApp::OnBrowserCreated(CefRefPtr<CefBrowser> browser) {
 void CefPythonApp::OnBrowserDestroyed(CefRefPtr<CefBrowser> browser) {
     LOG(INFO) << "[Renderer process] OnBrowserDestroyed()";
     RemoveJavascriptBindings(browser);
+    RemoveChannelsForBrowser(browser);
 }
 
 void CefPythonApp::OnContextCreated(CefRefPtr<CefBrowser> browser,
@@ -294,6 +334,9 @@ void CefPythonApp::OnContextCreated(CefRefPtr<CefBrowser> browser,
     //       casting it to int for now.
     arguments->SetInt(0, (int)(frame->GetIdentifier()));
     browser->SendProcessMessage(PID_BROWSER, message);
+    if (frame->IsMain()) {
+        BindChannelApi(browser, frame, context);
+    }
     CefRefPtr<CefDictionaryValue> jsBindings = GetJavascriptBindings(browser);
     if (jsBindings.get()) {
         // Javascript bindings are most probably not yet set for
@@ -345,6 +388,12 @@ void CefPythonApp::OnContextReleased(CefRefPtr<CefBrowser> browser,
     // 3. Clear javascript callbacks.
     // ------------------------------------------------------------------------
     RemoveJavascriptCallbacksForFrame(frame);
+    // ------------------------------------------------------------------------
+    // 4. Release channel objects bound to the main frame context.
+    // ------------------------------------------------------------------------
+    if (frame->IsMain()) {
+        ReleaseChannelsContext(browser);
+    }
 }
 
 void CefPythonApp::OnUncaughtException(CefRefPtr<CefBrowser> browser,
@@ -399,6 +448,56 @@ bool CefPythonApp::OnProcessMessageReceived(CefRefPtr<CefBrowser> browser,
                           " a javascript callback (int)";
             return false;
         }
+    } else if (messageName == "ExecuteJavascriptCallbackWithReply") {
+        if (args->GetSize() >= 2
+                && args->GetType(0) == VTYPE_INT // replyId
+                && args->GetType(1) == VTYPE_INT) { // callbackId
+            int replyId = args->GetInt(0);
+            int jsCallbackId = args->GetInt(1);
+            CefRefPtr<CefListValue> jsArgs = args->Copy();
+            // Remove replyId and jsCallbackId.
+            jsArgs->Remove(0);
+            jsArgs->Remove(0);
+            ExecuteJavascriptCallbackWithReply(browser, jsCallbackId,
+                                               replyId, jsArgs);
+        } else {
+            LOG(ERROR) << "[Renderer process] OnProcessMessageReceived:"
+                          " invalid arguments, expected a reply id (int)"
+                          " and a javascript callback (int)";
+            return false;
+        }
+    } else if (messageName == "ReleaseJavascriptCallbacks") {
+        if (args->GetSize() == 1 && args->GetType(0) == VTYPE_LIST) {
+            ReleaseJavascriptCallbacks(args->GetList(0));
+        } else {
+            LOG(ERROR) << "[Renderer process] OnProcessMessageReceived:"
+                          " invalid arguments,"
+                          " messageName=ReleaseJavascriptCallbacks";
+            return false;
+        }
+    } else if (messageName == "GetJavascriptCallbackStats") {
+        if (args->GetSize() == 1 && args->GetType(0) == VTYPE_INT) {
+            CefRefPtr<CefListValue> value = CefListValue::Create();
+            value->SetDictionary(0, GetJavascriptCallbackStats());
+            SendJavascriptCallbackReply(browser, args->GetInt(0), true,
+                                        value);
+        } else {
+            LOG(ERROR) << "[Renderer process] OnProcessMessageReceived:"
+                          " invalid arguments,"
+                          " messageName=GetJavascriptCallbackStats";
+            return false;
+        }
+    } else if (messageName == "ExtractElements") {
+        if (args->GetSize() >= 1 && args->GetType(0) == VTYPE_INT) {
+            ExtractElements(browser, args);
+        } else {
+            LOG(ERROR) << "[Renderer process] OnProcessMessageReceived:"
+                          " invalid arguments,"
+                          " messageName=ExtractElements";
+            return false;
+        }
+    } else if (IsChannelMessage(messageName)) {
+        return OnChannelProcessMessage(browser, messageName, args);
     }
     return true;
 }
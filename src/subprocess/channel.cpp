@@ -0,0 +1,607 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "channel.h"
+#include <algorithm>
+#include <deque>
+#include <map>
+#include <string>
+#include "v8utils.h"
+#include "include/cef_task.h"
+#include "include/wrapper/cef_closure_task.h"
+#include "include/base/cef_bind.h"
+#include "include/base/cef_logging.h"
+
+// Javascript API in the main frame:
+//   var channel = cefpython.channel("name");
+//   channel.onmessage = function(message) {};
+//   channel.ondrain = function() {};
+//   channel.onclose = function() {};
+//   channel.send(message);  // returns false when backpressured
+//   channel.close();
+//   channel.bufferedAmount;  // number of items not yet sent
+// Messages that arrive while onmessage is not set are kept and
+// delivered later, they are not acknowledged until then.
+
+class RendererChannel : public CefBaseRefCounted {
+public:
+    RendererChannel(CefRefPtr<CefBrowser> browser, const CefString& name)
+            // Defaults must be the same as in channel.pyx.
+            : browser_(browser), name_(name),
+              chunkSize_(65536), batchInterval_(0),
+              maxBatchSize_(64), windowSize_(8),
+              sendSeq_(0), ackedSeq_(0),
+              flushScheduled_(false), drainPending_(false),
+              receivingChunks_(false), closed_(false) {
+    }
+
+    void SetOptions(CefRefPtr<CefDictionaryValue> options);
+    CefRefPtr<CefV8Value> GetJavascriptObject(
+            CefRefPtr<CefV8Context> context);
+    bool GetProperty(const CefString& name, CefRefPtr<CefV8Value>& retval);
+    bool SetProperty(const CefString& name, CefRefPtr<CefV8Value> value);
+    bool Send(CefRefPtr<CefV8Value> value);
+    void Flush();
+    void OnAck(int seq);
+    void OnMessage(int seq, CefRefPtr<CefListValue> items);
+    void DeliverIncoming();
+    void OnRemoteClose();
+    void Close();
+    void ReleaseContext();
+
+protected:
+    bool IsBackpressured();
+    void SendAck(int seq);
+    void CallHandler(CefRefPtr<CefV8Value> handler);
+
+    CefRefPtr<CefBrowser> browser_;
+    CefString name_;
+    int chunkSize_;
+    int batchInterval_;
+    int maxBatchSize_;
+    int windowSize_;
+    // Page > Python.
+    std::deque<CefRefPtr<CefListValue> > outgoing_;
+    int sendSeq_;
+    int ackedSeq_;
+    bool flushScheduled_;
+    bool drainPending_;
+    // Page < Python.
+    std::deque<std::pair<int, CefRefPtr<CefListValue> > > incoming_;
+    std::wstring partial_;
+    bool receivingChunks_;
+    bool closed_;
+    // V8 objects, valid only for the context below.
+    CefRefPtr<CefV8Context> context_;
+    CefRefPtr<CefV8Value> object_;
+    CefRefPtr<CefV8Value> onMessage_;
+    CefRefPtr<CefV8Value> onDrain_;
+    CefRefPtr<CefV8Value> onClose_;
+
+private:
+    IMPLEMENT_REFCOUNTING(RendererChannel);
+};
+
+typedef std::map<std::string, CefRefPtr<RendererChannel> > ChannelMap;
+
+// [browserId][name] = channel
+std::map<int, ChannelMap> g_channels;
+
+CefRefPtr<RendererChannel> FindChannel(int browserId,
+                                       const std::string& name) {
+    std::map<int, ChannelMap>::iterator it = g_channels.find(browserId);
+    if (it == g_channels.end()) {
+        return NULL;
+    }
+    ChannelMap::iterator it2 = it->second.find(name);
+    if (it2 == it->second.end()) {
+        return NULL;
+    }
+    return it2->second;
+}
+
+CefRefPtr<RendererChannel> CreateChannel(CefRefPtr<CefBrowser> browser,
+                                         const CefString& name) {
+    CefRefPtr<RendererChannel> channel = new RendererChannel(browser, name);
+    g_channels[browser->GetIdentifier()][name.ToString()] = channel;
+    return channel;
+}
+
+void RemoveChannel(int browserId, const std::string& name) {
+    std::map<int, ChannelMap>::iterator it = g_channels.find(browserId);
+    if (it == g_channels.end()) {
+        return;
+    }
+    it->second.erase(name);
+    if (it->second.empty()) {
+        g_channels.erase(it);
+    }
+}
+
+// ----------------------------------------------------------------------------
+// V8 handler and accessor
+// ----------------------------------------------------------------------------
+
+class ChannelV8Handler : public CefV8Handler {
+public:
+    // For the cefpython.channel() function channelName is empty.
+    ChannelV8Handler(int browserId, const std::string& channelName)
+            : browserId_(browserId), channelName_(channelName) {
+    }
+    virtual bool Execute(const CefString& functionName,
+                         CefRefPtr<CefV8Value> thisObject,
+                         const CefV8ValueList& arguments,
+                         CefRefPtr<CefV8Value>& returnValue,
+                         CefString& exception) OVERRIDE {
+        if (functionName == "channel") {
+            if (arguments.size() != 1 || !arguments[0]->IsString()
+                    || arguments[0]->GetStringValue().empty()) {
+                exception = "[CEF Python] cefpython.channel() FAILED:"
+                            " expected a channel name";
+                return true;
+            }
+            CefRefPtr<CefV8Context> context = \
+                    CefV8Context::GetCurrentContext();
+            CefString name = arguments[0]->GetStringValue();
+            CefRefPtr<RendererChannel> channel = FindChannel(
+                    browserId_, name.ToString());
+            if (!channel.get()) {
+                channel = CreateChannel(context->GetBrowser(), name);
+            }
+            returnValue = channel->GetJavascriptObject(context);
+            return true;
+        }
+        CefRefPtr<RendererChannel> channel = FindChannel(browserId_,
+                                                         channelName_);
+        if (!channel.get()) {
+            exception = std::string("[CEF Python] Channel FAILED:"
+                                    " channel is closed: ")
+                        .append(channelName_);
+            return true;
+        }
+        if (functionName == "send") {
+            if (arguments.size() != 1) {
+                exception = "[CEF Python] channel.send() FAILED:"
+                            " expected one argument";
+                return true;
+            }
+            returnValue = CefV8Value::CreateBool(channel->Send(arguments[0]));
+            return true;
+        } else if (functionName == "close") {
+            channel->Close();
+            returnValue = CefV8Value::CreateUndefined();
+            return true;
+        }
+        return false;
+    }
+protected:
+    int browserId_;
+    std::string channelName_;
+private:
+    IMPLEMENT_REFCOUNTING(ChannelV8Handler);
+};
+
+class ChannelV8Accessor : public CefV8Accessor {
+public:
+    ChannelV8Accessor(int browserId, const std::string& channelName)
+            : browserId_(browserId), channelName_(channelName) {
+    }
+    virtual bool Get(const CefString& name,
+                     const CefRefPtr<CefV8Value> object,
+                     CefRefPtr<CefV8Value>& retval,
+                     CefString& exception) OVERRIDE {
+        CefRefPtr<RendererChannel> channel = FindChannel(browserId_,
+                                                         channelName_);
+        if (!channel.get()) {
+            retval = CefV8Value::CreateUndefined();
+            return true;
+        }
+        return channel->GetProperty(name, retval);
+    }
+    virtual bool Set(const CefString& name,
+                     const CefRefPtr<CefV8Value> object,
+                     const CefRefPtr<CefV8Value> value,
+                     CefString& exception) OVERRIDE {
+        CefRefPtr<RendererChannel> channel = FindChannel(browserId_,
+                                                         channelName_);
+        if (!channel.get()) {
+            // Setting handlers on a closed channel is a no-op.
+            return true;
+        }
+        return channel->SetProperty(name, value);
+    }
+protected:
+    int browserId_;
+    std::string channelName_;
+private:
+    IMPLEMENT_REFCOUNTING(ChannelV8Accessor);
+};
+
+// ----------------------------------------------------------------------------
+// RendererChannel
+// ----------------------------------------------------------------------------
+
+void RendererChannel::SetOptions(CefRefPtr<CefDictionaryValue> options) {
+    if (options->HasKey("chunk_size")
+            && options->GetType("chunk_size") == VTYPE_INT) {
+        chunkSize_ = std::max(1, options->GetInt("chunk_size"));
+    }
+    if (options->HasKey("batch_interval")
+            && options->GetType("batch_interval") == VTYPE_INT) {
+        batchInterval_ = std::max(0, options->GetInt("batch_interval"));
+    }
+    if (options->HasKey("max_batch_size")
+            && options->GetType("max_batch_size") == VTYPE_INT) {
+        maxBatchSize_ = std::max(1, options->GetInt("max_batch_size"));
+    }
+    if (options->HasKey("window_size")
+            && options->GetType("window_size") == VTYPE_INT) {
+        windowSize_ = std::max(1, options->GetInt("window_size"));
+    }
+}
+
+CefRefPtr<CefV8Value> RendererChannel::GetJavascriptObject(
+        CefRefPtr<CefV8Context> context) {
+    // Must be called inside the context.
+    if (object_.get() && context_.get() && context_->IsSame(context)) {
+        return object_;
+    }
+    ReleaseContext();
+    int browserId = browser_->GetIdentifier();
+    std::string name = name_.ToString();
+    context_ = context;
+    object_ = CefV8Value::CreateObject(new ChannelV8Accessor(browserId, name),
+                                       NULL);
+    const char* properties[] = {"name", "bufferedAmount", "onmessage",
+                                "ondrain", "onclose"};
+    for (size_t i = 0; i < sizeof(properties) / sizeof(properties[0]); ++i) {
+        object_->SetValue(properties[i], V8_ACCESS_CONTROL_DEFAULT,
+                          V8_PROPERTY_ATTRIBUTE_NONE);
+    }
+    CefRefPtr<CefV8Handler> handler = new ChannelV8Handler(browserId, name);
+    object_->SetValue("send", CefV8Value::CreateFunction("send", handler),
+                      V8_PROPERTY_ATTRIBUTE_READONLY);
+    object_->SetValue("close", CefV8Value::CreateFunction("close", handler),
+                      V8_PROPERTY_ATTRIBUTE_READONLY);
+    return object_;
+}
+
+bool RendererChannel::GetProperty(const CefString& name,
+                                  CefRefPtr<CefV8Value>& retval) {
+    CefRefPtr<CefV8Value> handler;
+    if (name == "name") {
+        retval = CefV8Value::CreateString(name_);
+        return true;
+    } else if (name == "bufferedAmount") {
+        retval = CefV8Value::CreateInt((int)outgoing_.size());
+        return true;
+    } else if (name == "onmessage") {
+        handler = onMessage_;
+    } else if (name == "ondrain") {
+        handler = onDrain_;
+    } else if (name == "onclose") {
+        handler = onClose_;
+    } else {
+        return false;
+    }
+    retval = handler.get() ? handler : CefV8Value::CreateNull();
+    return true;
+}
+
+bool RendererChannel::SetProperty(const CefString& name,
+                                  CefRefPtr<CefV8Value> value) {
+    CefRefPtr<CefV8Value> handler;
+    if (value.get() && value->IsFunction()) {
+        handler = value;
+    }
+    if (name == "onmessage") {
+        onMessage_ = handler;
+        if (handler.get() && !incoming_.empty()) {
+            // Deliver after the current javascript task completes.
+            CefPostTask(TID_RENDERER, CefCreateClosureTask(base::Bind(
+                    &RendererChannel::DeliverIncoming, this)));
+        }
+    } else if (name == "ondrain") {
+        onDrain_ = handler;
+    } else if (name == "onclose") {
+        onClose_ = handler;
+    }
+    // Other properties are read-only.
+    return true;
+}
+
+bool RendererChannel::IsBackpressured() {
+    return !outgoing_.empty() && sendSeq_ - ackedSeq_ >= windowSize_;
+}
+
+bool RendererChannel::Send(CefRefPtr<CefV8Value> value) {
+    if (value->IsString()) {
+        std::wstring data = value->GetStringValue().ToWString();
+        size_t size = data.size();
+        size_t start = 0;
+        do {
+            size_t end = std::min(start + (size_t)chunkSize_, size);
+            // Do not split surrogate pairs (wchar_t is UTF-16 on Windows).
+            if (sizeof(wchar_t) == 2 && end < size && end - start > 1
+                    && data[end - 1] >= 0xD800 && data[end - 1] <= 0xDBFF) {
+                --end;
+            }
+            CefRefPtr<CefListValue> item = CefListValue::Create();
+            item->SetBool(0, end >= size);
+            item->SetString(1, CefString(data.substr(start, end - start)));
+            outgoing_.push_back(item);
+            start = end;
+        } while (start < size);
+    } else {
+        CefRefPtr<CefListValue> item = CefListValue::Create();
+        item->SetBool(0, true);
+        V8ValueAppendToCefListValue(value, item);
+        outgoing_.push_back(item);
+    }
+    if (!batchInterval_) {
+        Flush();
+    } else if (!flushScheduled_) {
+        flushScheduled_ = true;
+        CefPostDelayedTask(TID_RENDERER, CefCreateClosureTask(base::Bind(
+                &RendererChannel::Flush, this)), batchInterval_);
+    }
+    if (IsBackpressured()) {
+        drainPending_ = true;
+        return false;
+    }
+    return true;
+}
+
+void RendererChannel::Flush() {
+    flushScheduled_ = false;
+    if (closed_) {
+        return;
+    }
+    while (!outgoing_.empty() && sendSeq_ - ackedSeq_ < windowSize_) {
+        CefRefPtr<CefListValue> batch = CefListValue::Create();
+        while (!outgoing_.empty() && (int)batch->GetSize() < maxBatchSize_) {
+            batch->SetList((int)batch->GetSize(), outgoing_.front());
+            outgoing_.pop_front();
+        }
+        CefRefPtr<CefProcessMessage> message = \
+                CefProcessMessage::Create("ChannelMessage");
+        CefRefPtr<CefListValue> args = message->GetArgumentList();
+        args->SetString(0, name_);
+        args->SetInt(1, ++sendSeq_);
+        args->SetList(2, batch);
+        browser_->SendProcessMessage(PID_BROWSER, message);
+    }
+}
+
+void RendererChannel::OnAck(int seq) {
+    if (seq > ackedSeq_) {
+        ackedSeq_ = seq;
+    }
+    Flush();
+    if (drainPending_ && !IsBackpressured()) {
+        drainPending_ = false;
+        CallHandler(onDrain_);
+    }
+}
+
+void RendererChannel::OnMessage(int seq, CefRefPtr<CefListValue> items) {
+    incoming_.push_back(std::make_pair(seq, items));
+    DeliverIncoming();
+}
+
+void RendererChannel::DeliverIncoming() {
+    while (!incoming_.empty() && !closed_) {
+        CefRefPtr<CefV8Context> context = context_;
+        CefRefPtr<CefV8Value> object = object_;
+        CefRefPtr<CefV8Value> handler = onMessage_;
+        if (!(context.get() && context->IsValid() && handler.get())) {
+            // Wait until onmessage is set.
+            return;
+        }
+        int seq = incoming_.front().first;
+        CefRefPtr<CefListValue> items = incoming_.front().second;
+        incoming_.pop_front();
+        context->Enter();
+        // Each item is converted to an array [final, payload].
+        CefV8ValueList v8Items = CefListValueToCefV8ValueList(items);
+        for (CefV8ValueList::iterator it = v8Items.begin();
+                it != v8Items.end() && !closed_; ++it) {
+            bool isFinal = (*it)->GetValue(0)->GetBoolValue();
+            CefRefPtr<CefV8Value> payload = (*it)->GetValue(1);
+            if (!isFinal || receivingChunks_) {
+                partial_.append(payload->GetStringValue().ToWString());
+                receivingChunks_ = !isFinal;
+                if (!isFinal) {
+                    continue;
+                }
+                payload = CefV8Value::CreateString(CefString(partial_));
+                partial_.clear();
+            }
+            CefV8ValueList arguments;
+            arguments.push_back(payload);
+            if (!handler->ExecuteFunction(object, arguments).get()) {
+                LOG(ERROR) << "[Renderer process] Channel:"
+                              " onmessage handler failed";
+            }
+        }
+        context->Exit();
+        if (!closed_) {
+            SendAck(seq);
+        }
+    }
+}
+
+void RendererChannel::SendAck(int seq) {
+    CefRefPtr<CefProcessMessage> message = \
+            CefProcessMessage::Create("ChannelAck");
+    CefRefPtr<CefListValue> args = message->GetArgumentList();
+    args->SetString(0, name_);
+    args->SetInt(1, seq);
+    args->SetBool(2, false);
+    browser_->SendProcessMessage(PID_BROWSER, message);
+}
+
+void RendererChannel::CallHandler(CefRefPtr<CefV8Value> handler) {
+    CefRefPtr<CefV8Context> context = context_;
+    if (!(handler.get() && context.get() && context->IsValid())) {
+        return;
+    }
+    context->Enter();
+    if (!handler->ExecuteFunction(object_, CefV8ValueList()).get()) {
+        LOG(ERROR) << "[Renderer process] Channel: handler failed";
+    }
+    context->Exit();
+}
+
+void RendererChannel::OnRemoteClose() {
+    // Keep a reference while calling the onclose handler.
+    CefRefPtr<RendererChannel> self = this;
+    closed_ = true;
+    RemoveChannel(browser_->GetIdentifier(), name_.ToString());
+    CallHandler(onClose_);
+    ReleaseContext();
+}
+
+void RendererChannel::Close() {
+    if (closed_) {
+        return;
+    }
+    CefRefPtr<RendererChannel> self = this;
+    closed_ = true;
+    RemoveChannel(browser_->GetIdentifier(), name_.ToString());
+    CefRefPtr<CefProcessMessage> message = \
+            CefProcessMessage::Create("ChannelClose");
+    message->GetArgumentList()->SetString(0, name_);
+    browser_->SendProcessMessage(PID_BROWSER, message);
+    ReleaseContext();
+}
+
+void RendererChannel::ReleaseContext() {
+    context_ = NULL;
+    object_ = NULL;
+    onMessage_ = NULL;
+    onDrain_ = NULL;
+    onClose_ = NULL;
+}
+
+// ----------------------------------------------------------------------------
+// Functions called from CefPythonApp
+// ----------------------------------------------------------------------------
+
+void BindChannelApi(CefRefPtr<CefBrowser> browser,
+                    CefRefPtr<CefFrame> frame,
+                    CefRefPtr<CefV8Context> context) {
+    bool didEnterContext = false;
+    if (!CefV8Context::InContext()) {
+        if (!context->IsValid()) {
+            LOG(INFO) << "[Renderer process] BindChannelApi():"
+                         " V8 context provided by CEF is invalid";
+            return;
+        }
+        context->Enter();
+        didEnterContext = true;
+    }
+    CefRefPtr<CefV8Value> v8Object = CefV8Value::CreateObject(NULL, NULL);
+    v8Object->SetValue("channel", CefV8Value::CreateFunction(
+            "channel", new ChannelV8Handler(browser->GetIdentifier(), "")),
+            V8_PROPERTY_ATTRIBUTE_READONLY);
+    context->GetGlobal()->SetValue("cefpython", v8Object,
+                                   V8_PROPERTY_ATTRIBUTE_NONE);
+    if (didEnterContext)
+        context->Exit();
+}
+
+void ReleaseChannelsContext(CefRefPtr<CefBrowser> browser) {
+    std::map<int, ChannelMap>::iterator it = g_channels.find(
+            browser->GetIdentifier());
+    if (it == g_channels.end()) {
+        return;
+    }
+    for (ChannelMap::iterator it2 = it->second.begin();
+            it2 != it->second.end(); ++it2) {
+        it2->second->ReleaseContext();
+    }
+}
+
+void RemoveChannelsForBrowser(CefRefPtr<CefBrowser> browser) {
+    std::map<int, ChannelMap>::iterator it = g_channels.find(
+            browser->GetIdentifier());
+    if (it == g_channels.end()) {
+        return;
+    }
+    for (ChannelMap::iterator it2 = it->second.begin();
+            it2 != it->second.end(); ++it2) {
+        it2->second->ReleaseContext();
+    }
+    g_channels.erase(it);
+}
+
+bool IsChannelMessage(const std::string& messageName) {
+    return messageName == "ChannelOpen" || messageName == "ChannelMessage"
+           || messageName == "ChannelAck" || messageName == "ChannelClose";
+}
+
+bool OnChannelProcessMessage(CefRefPtr<CefBrowser> browser,
+                             const std::string& messageName,
+                             CefRefPtr<CefListValue> args) {
+    if (!(args->GetSize() >= 1 && args->GetType(0) == VTYPE_STRING)) {
+        LOG(ERROR) << "[Renderer process] OnChannelProcessMessage():"
+                      " invalid arguments, expected channel name";
+        return false;
+    }
+    CefString name = args->GetString(0);
+    CefRefPtr<RendererChannel> channel = FindChannel(
+            browser->GetIdentifier(), name.ToString());
+    if (messageName == "ChannelOpen") {
+        if (!(args->GetSize() == 3
+                && args->GetType(1) == VTYPE_DICTIONARY
+                && args->GetType(2) == VTYPE_INT)) {
+            LOG(ERROR) << "[Renderer process] OnChannelProcessMessage():"
+                          " invalid arguments, messageName=ChannelOpen";
+            return false;
+        }
+        if (!channel.get()) {
+            // This renderer did not know about the channel, so all
+            // batches sent by the browser so far were lost.
+            channel = CreateChannel(browser, name);
+            CefRefPtr<CefProcessMessage> message = \
+                    CefProcessMessage::Create("ChannelAck");
+            CefRefPtr<CefListValue> ackArgs = message->GetArgumentList();
+            ackArgs->SetString(0, name);
+            ackArgs->SetInt(1, args->GetInt(2));
+            ackArgs->SetBool(2, true);
+            browser->SendProcessMessage(PID_BROWSER, message);
+        }
+        channel->SetOptions(args->GetDictionary(1));
+    } else if (messageName == "ChannelMessage") {
+        if (!(args->GetSize() == 3
+                && args->GetType(1) == VTYPE_INT
+                && args->GetType(2) == VTYPE_LIST)) {
+            LOG(ERROR) << "[Renderer process] OnChannelProcessMessage():"
+                          " invalid arguments, messageName=ChannelMessage";
+            return false;
+        }
+        if (!channel.get()) {
+            // Message arrived before "ChannelOpen", eg. when renderer
+            // process changed after navigation.
+            channel = CreateChannel(browser, name);
+        }
+        channel->OnMessage(args->GetInt(1), args->GetList(2)->Copy());
+    } else if (messageName == "ChannelAck") {
+        if (!(args->GetSize() == 3
+                && args->GetType(1) == VTYPE_INT)) {
+            LOG(ERROR) << "[Renderer process] OnChannelProcessMessage():"
+                          " invalid arguments, messageName=ChannelAck";
+            return false;
+        }
+        if (channel.get()) {
+            channel->OnAck(args->GetInt(1));
+        }
+    } else if (messageName == "ChannelClose") {
+        if (channel.get()) {
+            channel->OnRemoteClose();
+        }
+    }
+    return true;
+}
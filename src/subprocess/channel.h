@@ -0,0 +1,26 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// Renderer process side of channels, see channel.pyx for
+// a description of the protocol. In javascript a channel
+// is available through the window.cefpython.channel(name)
+// function in the main frame.
+
+#pragma once
+#include "include/cef_v8.h"
+#include "include/cef_values.h"
+
+void BindChannelApi(CefRefPtr<CefBrowser> browser,
+                    CefRefPtr<CefFrame> frame,
+                    CefRefPtr<CefV8Context> context);
+
+void ReleaseChannelsContext(CefRefPtr<CefBrowser> browser);
+
+void RemoveChannelsForBrowser(CefRefPtr<CefBrowser> browser);
+
+bool IsChannelMessage(const std::string& messageName);
+
+bool OnChannelProcessMessage(CefRefPtr<CefBrowser> browser,
+                             const std::string& messageName,
+                             CefRefPtr<CefListValue> args);
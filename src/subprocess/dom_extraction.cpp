@@ -0,0 +1,163 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+#include "dom_extraction.h"
+#include <sstream>
+#include <string>
+#include "javascript_callback.h"
+#include "include/cef_v8.h"
+#include "include/base/cef_logging.h"
+
+CefString GetV8ExceptionMessage(CefRefPtr<CefV8Value> function,
+                                const CefString& defaultMessage) {
+    if (function.get() && function->HasException()) {
+        CefString message = function->GetException()->GetMessage();
+        function->ClearException();
+        return message;
+    }
+    return defaultMessage;
+}
+
+void SetDictionaryValueFromV8(CefRefPtr<CefDictionaryValue> dict,
+                              const CefString& key,
+                              CefRefPtr<CefV8Value> value) {
+    // Only primitive values are extracted, objects become null.
+    if (!value.get() || value->IsNull() || value->IsUndefined()) {
+        dict->SetNull(key);
+    } else if (value->IsBool()) {
+        dict->SetBool(key, value->GetBoolValue());
+    } else if (value->IsInt()) {
+        dict->SetInt(key, value->GetIntValue());
+    } else if (value->IsDouble()) {
+        dict->SetDouble(key, value->GetDoubleValue());
+    } else if (value->IsString()) {
+        dict->SetString(key, value->GetStringValue());
+    } else {
+        dict->SetNull(key);
+    }
+}
+
+bool ExtractQuery(CefRefPtr<CefV8Value> document,
+                  CefRefPtr<CefDictionaryValue> query,
+                  CefRefPtr<CefListValue> elements,
+                  CefString& error) {
+    // Query: {"selector": str, "attributes": [str, ..], "limit": int}
+    // Attribute names starting with a dot are read as element
+    // properties, e.g. ".textContent" or ".value".
+    if (!query.get()
+            || query->GetType("selector") != VTYPE_STRING
+            || query->GetType("attributes") != VTYPE_LIST) {
+        error = "Invalid query";
+        return false;
+    }
+    int limit = 0;
+    if (query->GetType("limit") == VTYPE_INT) {
+        limit = query->GetInt("limit");
+    }
+    CefRefPtr<CefListValue> attributes = query->GetList("attributes");
+    CefRefPtr<CefV8Value> querySelectorAll = document->GetValue(
+            "querySelectorAll");
+    if (!querySelectorAll.get() || !querySelectorAll->IsFunction()) {
+        error = "document.querySelectorAll() is not available";
+        return false;
+    }
+    CefV8ValueList arguments;
+    arguments.push_back(CefV8Value::CreateString(
+            query->GetString("selector")));
+    CefRefPtr<CefV8Value> nodes = querySelectorAll->ExecuteFunction(
+            document, arguments);
+    if (!nodes.get()) {
+        error = GetV8ExceptionMessage(querySelectorAll,
+                                      "querySelectorAll() failed");
+        return false;
+    }
+    int length = nodes->GetValue("length")->GetIntValue();
+    if (limit > 0 && limit < length) {
+        length = limit;
+    }
+    for (int i = 0; i < length; i++) {
+        CefRefPtr<CefV8Value> element = nodes->GetValue(i);
+        CefRefPtr<CefV8Value> getAttribute = element->GetValue(
+                "getAttribute");
+        CefRefPtr<CefDictionaryValue> item = CefDictionaryValue::Create();
+        for (size_t j = 0; j < attributes->GetSize(); j++) {
+            if (attributes->GetType(j) != VTYPE_STRING) {
+                continue;
+            }
+            CefString name = attributes->GetString(j);
+            std::string nameStr = name.ToString();
+            CefRefPtr<CefV8Value> value;
+            if (nameStr.size() > 1 && nameStr[0] == '.') {
+                value = element->GetValue(nameStr.substr(1));
+            } else if (getAttribute.get() && getAttribute->IsFunction()) {
+                CefV8ValueList getAttributeArgs;
+                getAttributeArgs.push_back(CefV8Value::CreateString(name));
+                value = getAttribute->ExecuteFunction(element,
+                                                      getAttributeArgs);
+                if (!value.get()) {
+                    error = GetV8ExceptionMessage(getAttribute,
+                                                  "getAttribute() failed");
+                    return false;
+                }
+            }
+            SetDictionaryValueFromV8(item, name, value);
+        }
+        elements->SetDictionary(i, item);
+    }
+    return true;
+}
+
+bool ExtractElements(CefRefPtr<CefBrowser> browser,
+                     CefRefPtr<CefListValue> args) {
+    int replyId = args->GetInt(0);
+    if (args->GetSize() != 3
+            || args->GetType(1) != VTYPE_STRING // frameId
+            || args->GetType(2) != VTYPE_LIST) { // queries
+        LOG(ERROR) << "[Renderer process] ExtractElements():"
+                      " invalid arguments";
+        SendJavascriptCallbackError(browser, replyId, "Invalid arguments");
+        return false;
+    }
+    // Frame id is int64, it is passed as a string.
+    int64 frameId = 0;
+    std::istringstream frameIdStream(args->GetString(1).ToString());
+    frameIdStream >> frameId;
+    CefRefPtr<CefFrame> frame = browser->GetFrame(frameId);
+    if (!frame.get()) {
+        SendJavascriptCallbackError(browser, replyId, "Frame not found");
+        return false;
+    }
+    CefRefPtr<CefV8Context> context = frame->GetV8Context();
+    if (!context.get() || !context->Enter()) {
+        SendJavascriptCallbackError(browser, replyId,
+                                    "Javascript context is not available");
+        return false;
+    }
+    CefString error;
+    CefRefPtr<CefListValue> results = CefListValue::Create();
+    CefRefPtr<CefV8Value> document = context->GetGlobal()->GetValue(
+            "document");
+    if (!document.get() || !document->IsObject()) {
+        error = "Document is not available";
+    } else {
+        CefRefPtr<CefListValue> queries = args->GetList(2);
+        for (size_t i = 0; i < queries->GetSize(); i++) {
+            CefRefPtr<CefListValue> elements = CefListValue::Create();
+            if (!ExtractQuery(document, queries->GetDictionary(i),
+                              elements, error)) {
+                break;
+            }
+            results->SetList(i, elements);
+        }
+    }
+    context->Exit();
+    if (!error.empty()) {
+        SendJavascriptCallbackError(browser, replyId, error);
+        return false;
+    }
+    CefRefPtr<CefListValue> value = CefListValue::Create();
+    value->SetList(0, results);
+    SendJavascriptCallbackReply(browser, replyId, true, value);
+    return true;
+}
@@ -0,0 +1,15 @@
+// Copyright (c) 2018 CEF Python, see the Authors file.
+// All rights reserved. Licensed under BSD 3-clause license.
+// Project website: https://github.com/cztomczak/cefpython
+
+// Renderer process side of Frame.ExtractElements(), see frame.pyx.
+// Queries are run with document.querySelectorAll() in the frame's
+// V8 context and results are sent in a single reply message.
+
+#pragma once
+#include "include/cef_browser.h"
+#include "include/cef_values.h"
+
+// Args: [replyId, frameId, queries]
+bool ExtractElements(CefRefPtr<CefBrowser> browser,
+                     CefRefPtr<CefListValue> args);
@@ -4,9 +4,12 @@
 
 #include "javascript_callback.h"
 #include <map>
+#include <set>
 #include <sstream>
+#include <stdlib.h>
 #include "v8utils.h"
 #include "cefpython_app.h"
+#include "include/cef_command_line.h"
 #include "include/base/cef_logging.h"
 
 template<typename T>
@@ -21,9 +24,51 @@ typedef std::map<int,
                  std::pair<CefRefPtr<CefFrame>, CefRefPtr<CefV8Value> > >
                  JavascriptCallbackMap;
 
+// Callback ids for each frame, ordered from oldest to newest.
+typedef std::map<int64, std::set<int> > JavascriptCallbackFrameMap;
+
 JavascriptCallbackMap g_jsCallbackMap;
+JavascriptCallbackFrameMap g_jsCallbackFrameMap;
 int g_jsCallbackMaxId = 0;
 
+// Counters reported to the browser process, see
+// GetJavascriptCallbackStats().
+int g_jsCallbacksCreated = 0;
+int g_jsCallbacksReleased = 0;
+int g_jsCallbacksReleasedWithFrame = 0;
+int g_jsCallbacksEvicted = 0;
+
+int GetJavascriptCallbacksLimit() {
+    // Max. number of callbacks per frame, set with the
+    // "javascript_callbacks_limit" application setting.
+    // 0 means no limit.
+    static int limit = -1;
+    if (limit == -1) {
+        CefRefPtr<CefCommandLine> commandLine = \
+                CefCommandLine::GetGlobalCommandLine();
+        limit = 0;
+        if (commandLine.get()
+                && commandLine->HasSwitch("javascript-callbacks-limit")) {
+            limit = atoi(commandLine->GetSwitchValue(
+                    "javascript-callbacks-limit").ToString().c_str());
+        }
+    }
+    return limit;
+}
+
+void EraseJavascriptCallback(JavascriptCallbackMap::iterator it) {
+    int64 frameId = it->second.first->GetIdentifier();
+    JavascriptCallbackFrameMap::iterator bucket = \
+            g_jsCallbackFrameMap.find(frameId);
+    if (bucket != g_jsCallbackFrameMap.end()) {
+        bucket->second.erase(it->first);
+        if (bucket->second.empty()) {
+            g_jsCallbackFrameMap.erase(bucket);
+        }
+    }
+    g_jsCallbackMap.erase(it);
+}
+
 CefString PutJavascriptCallback(
         CefRefPtr<CefFrame> frame, CefRefPtr<CefV8Value> jsCallback) {
     // Returns a "####cefpython####" string followed by json encoded data.
@@ -44,6 +89,20 @@ CefString PutJavascriptCallback(
     g_jsCallbackMap.insert(std::make_pair(
             callbackId,
             std::make_pair(frame, jsCallback)));
+    std::set<int>& bucket = g_jsCallbackFrameMap[frameId];
+    bucket.insert(callbackId);
+    g_jsCallbacksCreated++;
+    int limit = GetJavascriptCallbacksLimit();
+    if (limit > 0 && static_cast<int>(bucket.size()) > limit) {
+        // Evict the oldest callback in this frame. Copying the id
+        // as EraseJavascriptCallback() may destroy the bucket.
+        int oldestId = *bucket.begin();
+        LOG(WARNING) << "[Renderer process] PutJavascriptCallback():"
+                        " limit of callbacks per frame exceeded,"
+                        " releasing the oldest callback";
+        EraseJavascriptCallback(g_jsCallbackMap.find(oldestId));
+        g_jsCallbacksEvicted++;
+    }
     return strCallbackId;
 }
 
@@ -81,26 +140,198 @@ bool ExecuteJavascriptCallback(int callbackId, CefRefPtr<CefListValue> args) {
     }
 }
 
-void RemoveJavascriptCallbacksForFrame(CefRefPtr<CefFrame> frame) {
-    if (g_jsCallbackMap.empty()) {
-        return;
+void SendJavascriptCallbackReply(CefRefPtr<CefBrowser> browser,
+                                 int replyId, bool success,
+                                 CefRefPtr<CefListValue> value) {
+    // Message args: [replyId, success, value]. Value is a list with
+    // a single element: return value on success or an error message
+    // on failure.
+    CefRefPtr<CefProcessMessage> message = CefProcessMessage::Create(
+            "JavascriptCallbackReply");
+    CefRefPtr<CefListValue> args = message->GetArgumentList();
+    args->SetInt(0, replyId);
+    args->SetBool(1, success);
+    args->SetList(2, value);
+    browser->SendProcessMessage(PID_BROWSER, message);
+}
+
+void SendJavascriptCallbackError(CefRefPtr<CefBrowser> browser,
+                                 int replyId, const CefString& error) {
+    CefRefPtr<CefListValue> value = CefListValue::Create();
+    value->SetString(0, error);
+    SendJavascriptCallbackReply(browser, replyId, false, value);
+}
+
+CefString V8ValueToErrorMessage(CefRefPtr<CefV8Value> v8Value) {
+    // Error objects have a "message" property, a promise may also
+    // be rejected with a string.
+    if (v8Value.get() && v8Value->IsObject()
+            && v8Value->HasValue("message")) {
+        CefRefPtr<CefV8Value> message = v8Value->GetValue("message");
+        if (message.get() && message->IsString()) {
+            return message->GetStringValue();
+        }
     }
-    JavascriptCallbackMap::iterator it = g_jsCallbackMap.begin();
-    int64 frameId = frame->GetIdentifier();
-    while (it != g_jsCallbackMap.end()) {
-        if (it->second.first->GetIdentifier() == frameId) {
-            // Pass current iterator and increment it after passing
-            // to the function, but before erase() is called, this 
-            // is important for it to work in a loop. You can't do this:
-            // | if (..) erase(it);
-            // | ++it;
-            // This would cause an infinite loop.
-            g_jsCallbackMap.erase(it++);
-            LOG(INFO) << "[Renderer process]"
-                         " RemoveJavascriptCallbacksForFrame():"
-                         " removed js callback from the map";
+    if (v8Value.get() && v8Value->IsString()) {
+        return v8Value->GetStringValue();
+    }
+    return "Promise was rejected";
+}
+
+class JavascriptReplyHandler : public CefV8Handler {
+    // Handles the "resolve" and "reject" functions passed to then()
+    // of a promise returned by a javascript callback.
+public:
+    JavascriptReplyHandler(CefRefPtr<CefBrowser> browser, int replyId)
+            : browser_(browser), replyId_(replyId), replied_(false) {
+    }
+
+    virtual bool Execute(const CefString& name,
+                         CefRefPtr<CefV8Value> object,
+                         const CefV8ValueList& arguments,
+                         CefRefPtr<CefV8Value>& retval,
+                         CefString& exception) OVERRIDE {
+        if (replied_) {
+            return true;
+        }
+        replied_ = true;
+        CefRefPtr<CefV8Value> v8Value;
+        if (arguments.size()) {
+            v8Value = arguments[0];
         } else {
-            ++it;
+            v8Value = CefV8Value::CreateUndefined();
         }
+        if (name == "resolve") {
+            CefRefPtr<CefListValue> value = CefListValue::Create();
+            V8ValueAppendToCefListValue(v8Value, value);
+            SendJavascriptCallbackReply(browser_, replyId_, true, value);
+        } else {
+            SendJavascriptCallbackError(browser_, replyId_,
+                                        V8ValueToErrorMessage(v8Value));
+        }
+        return true;
+    }
+
+private:
+    CefRefPtr<CefBrowser> browser_;
+    int replyId_;
+    bool replied_;
+
+    IMPLEMENT_REFCOUNTING(JavascriptReplyHandler);
+};
+
+bool ExecuteJavascriptCallbackWithReply(CefRefPtr<CefBrowser> browser,
+                                        int callbackId, int replyId,
+                                        CefRefPtr<CefListValue> args) {
+    // Same as ExecuteJavascriptCallback, but a reply is always sent
+    // to the browser process. When callback returns a promise (or any
+    // other object with a then() method) the reply is sent when it
+    // settles.
+    JavascriptCallbackMap::const_iterator it = g_jsCallbackMap.find(
+            callbackId);
+    if (it == g_jsCallbackMap.end()) {
+        std::string logMessage = "[Renderer process]"
+                                 " ExecuteJavascriptCallbackWithReply():"
+                                 " callback not found, id=";
+        logMessage.append(AnyToString(callbackId));
+        LOG(ERROR) << logMessage.c_str();
+        SendJavascriptCallbackError(browser, replyId,
+                                    "Javascript callback not found");
+        return false;
+    }
+    CefRefPtr<CefFrame> frame = it->second.first;
+    CefRefPtr<CefV8Value> callback = it->second.second;
+    CefRefPtr<CefV8Context> context = frame->GetV8Context();
+    context->Enter();
+    CefV8ValueList v8Arguments = CefListValueToCefV8ValueList(args);
+    CefRefPtr<CefV8Value> v8ReturnValue = callback->ExecuteFunction(
+            NULL, v8Arguments);
+    if (!v8ReturnValue.get()) {
+        CefString error = "Javascript callback failed";
+        if (callback->HasException()) {
+            error = callback->GetException()->GetMessage();
+            callback->ClearException();
+        }
+        context->Exit();
+        SendJavascriptCallbackError(browser, replyId, error);
+        return false;
+    }
+    CefRefPtr<CefV8Value> then;
+    if (v8ReturnValue->IsObject() && !v8ReturnValue->IsFunction()
+            && v8ReturnValue->HasValue("then")) {
+        then = v8ReturnValue->GetValue("then");
+    }
+    if (then.get() && then->IsFunction()) {
+        CefRefPtr<CefV8Handler> handler = new JavascriptReplyHandler(
+                browser, replyId);
+        CefV8ValueList thenArguments;
+        thenArguments.push_back(CefV8Value::CreateFunction(
+                "resolve", handler));
+        thenArguments.push_back(CefV8Value::CreateFunction(
+                "reject", handler));
+        if (!then->ExecuteFunction(v8ReturnValue, thenArguments).get()) {
+            CefString error = "Calling then() on a returned value failed";
+            if (then->HasException()) {
+                error = then->GetException()->GetMessage();
+                then->ClearException();
+            }
+            // If then() already called one of the handlers then
+            // a reply was sent and this one will be ignored by
+            // the browser process.
+            SendJavascriptCallbackError(browser, replyId, error);
+        }
+    } else {
+        CefRefPtr<CefListValue> value = CefListValue::Create();
+        V8ValueAppendToCefListValue(v8ReturnValue, value);
+        SendJavascriptCallbackReply(browser, replyId, true, value);
+    }
+    context->Exit();
+    return true;
+}
+
+void ReleaseJavascriptCallbacks(CefRefPtr<CefListValue> callbackIds) {
+    // Callbacks that were garbage collected in Python. Callbacks
+    // may have already been removed along with their frame.
+    for (size_t i = 0; i < callbackIds->GetSize(); i++) {
+        if (callbackIds->GetType(i) != VTYPE_INT) {
+            continue;
+        }
+        JavascriptCallbackMap::iterator it = g_jsCallbackMap.find(
+                callbackIds->GetInt(i));
+        if (it != g_jsCallbackMap.end()) {
+            EraseJavascriptCallback(it);
+            g_jsCallbacksReleased++;
+        }
+    }
+}
+
+CefRefPtr<CefDictionaryValue> GetJavascriptCallbackStats() {
+    // Counters are for the whole renderer process, which may host
+    // more than one browser.
+    CefRefPtr<CefDictionaryValue> stats = CefDictionaryValue::Create();
+    stats->SetInt("live", static_cast<int>(g_jsCallbackMap.size()));
+    stats->SetInt("frames", static_cast<int>(g_jsCallbackFrameMap.size()));
+    stats->SetInt("created", g_jsCallbacksCreated);
+    stats->SetInt("released", g_jsCallbacksReleased);
+    stats->SetInt("released_with_frame", g_jsCallbacksReleasedWithFrame);
+    stats->SetInt("evicted", g_jsCallbacksEvicted);
+    stats->SetInt("limit", GetJavascriptCallbacksLimit());
+    return stats;
+}
+
+void RemoveJavascriptCallbacksForFrame(CefRefPtr<CefFrame> frame) {
+    JavascriptCallbackFrameMap::iterator bucket = \
+            g_jsCallbackFrameMap.find(frame->GetIdentifier());
+    if (bucket == g_jsCallbackFrameMap.end()) {
+        return;
+    }
+    std::set<int>::const_iterator it = bucket->second.begin();
+    for (; it != bucket->second.end(); ++it) {
+        g_jsCallbackMap.erase(*it);
     }
+    g_jsCallbacksReleasedWithFrame += static_cast<int>(
+            bucket->second.size());
+    LOG(INFO) << "[Renderer process] RemoveJavascriptCallbacksForFrame():"
+                 " removed js callbacks from the map";
+    g_jsCallbackFrameMap.erase(bucket);
 }
@@ -4,10 +4,26 @@
 
 #pragma once
 #include "include/cef_v8.h"
+#include "include/cef_values.h"
 
 CefString PutJavascriptCallback(
         CefRefPtr<CefFrame> frame, CefRefPtr<CefV8Value> jsCallback);
 
 bool ExecuteJavascriptCallback(int callbackId, CefRefPtr<CefListValue> args);
 
+bool ExecuteJavascriptCallbackWithReply(CefRefPtr<CefBrowser> browser,
+                                        int callbackId, int replyId,
+                                        CefRefPtr<CefListValue> args);
+
+void ReleaseJavascriptCallbacks(CefRefPtr<CefListValue> callbackIds);
+
+CefRefPtr<CefDictionaryValue> GetJavascriptCallbackStats();
+
+void SendJavascriptCallbackReply(CefRefPtr<CefBrowser> browser,
+                                 int replyId, bool success,
+                                 CefRefPtr<CefListValue> value);
+
+void SendJavascriptCallbackError(CefRefPtr<CefBrowser> browser,
+                                 int replyId, const CefString& error);
+
 void RemoveJavascriptCallbacksForFrame(CefRefPtr<CefFrame> frame);
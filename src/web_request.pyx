@@ -8,6 +8,12 @@ import weakref
 cdef object g_pyWebRequests = weakref.WeakValueDictionary()
 cdef int g_webRequestMaxId = 0
 
+cdef tuple g_webRequestDownloadModes = ("string", "bytes", "buffer", "file")
+# [webRequestId] = SpoolFile, see PyRequest.SetPostDataStream(). The
+# file is kept until the request completes, even when the WebRequest
+# object was destroyed.
+cdef dict g_webRequestSpoolFiles = {}
+
 # -----------------------------------------------------------------------------
 # WebRequest
 # -----------------------------------------------------------------------------
@@ -42,20 +48,38 @@ class WebRequest:
                         "%s" % method)
 
     @staticmethod
-    def Create(request, webRequestClient):
+    def Create(request, webRequestClient, download_mode="string",
+               download_file=None, progress_interval=0, progress_step=0,
+               upload_progress_step=0):
+        # upload_progress_step is deprecated, use progress_step instead.
+        # It throttles only upload progress, the same as before
+        # progress_step was added.
         if not isinstance(request, PyRequest):
             raise Exception("Invalid request object")
+        if download_mode not in g_webRequestDownloadModes:
+            raise Exception("Invalid download mode: %s" % download_mode)
+        if (download_mode == "file") != (download_file is not None):
+            raise Exception("download_file must be set only with"
+                            " the \"file\" download mode")
         WebRequest.ValidateClient(webRequestClient)
-        return CreatePyWebRequest(request, webRequestClient)
+        return CreatePyWebRequest(request, webRequestClient, download_mode,
+                                  download_file, progress_interval,
+                                  progress_step, upload_progress_step)
 
 # -----------------------------------------------------------------------------
 # PyWebRequest
 # -----------------------------------------------------------------------------
 
 cdef PyWebRequest CreatePyWebRequest(PyRequest request, 
-        object webRequestClient):
+        object webRequestClient, str downloadMode="string",
+        object downloadFile=None, int64 progressInterval=0,
+        int64 progressStep=0, int64 uploadProgressStep=0):
     global g_pyWebRequests
-    cdef PyWebRequest webRequest = PyWebRequest(request, webRequestClient)
+    cdef PyWebRequest webRequest = PyWebRequest(request, webRequestClient,
+                                                downloadMode, downloadFile,
+                                                progressInterval,
+                                                progressStep,
+                                                uploadProgressStep)
     assert webRequest.webRequestId, "webRequest.webRequestId empty"
     g_pyWebRequests[webRequest.webRequestId] = webRequest
     return webRequest
@@ -70,16 +94,50 @@ cdef class PyWebRequest:
     cdef object __weakref__ # see g_pyWebRequests
     cdef int webRequestId
     cdef CefRefPtr[CefURLRequest] cefWebRequest
+    cdef CefRefPtr[WebRequestClient] cppWebRequestClient
     cdef object pyWebRequestClient
+    cdef py_bool bytesChunks
+    # Response body of a completed request in the "buffer" mode
+    cdef bytes downloadData
 
-    def __init__(self, PyRequest pyRequest, object pyWebRequestClient):
+    def __init__(self, PyRequest pyRequest, object pyWebRequestClient,
+                 str downloadMode="string", object downloadFile=None,
+                 int64 progressInterval=0, int64 progressStep=0,
+                 int64 uploadProgressStep=0):
         global g_webRequestMaxId
+        cdef CefString cefPath
         g_webRequestMaxId += 1
         self.webRequestId = g_webRequestMaxId
         cdef CefRefPtr[WebRequestClient] cppWebRequestClient = (
                 <CefRefPtr[WebRequestClient]?>new WebRequestClient(
                         self.webRequestId))
+        # In "buffer" and "file" modes chunks of data are not passed
+        # to Python, OnDownloadData is not called.
+        self.bytesChunks = downloadMode == "bytes"
+        if downloadMode == "buffer":
+            cppWebRequestClient.get().SetDownloadBuffer()
+        elif downloadMode == "file":
+            if isinstance(downloadFile, int):
+                if not cppWebRequestClient.get().SetDownloadFileDescriptor(
+                        downloadFile):
+                    raise Exception("WebRequest: invalid file descriptor:"
+                                    " %s" % downloadFile)
+            else:
+                PyToCefString(downloadFile, cefPath)
+                if not cppWebRequestClient.get().SetDownloadFile(cefPath):
+                    raise Exception("WebRequest: cannot open file for"
+                                    " writing: %s" % downloadFile)
+        # Throttled progress events don't acquire the GIL
+        cppWebRequestClient.get().SetProgressThrottle(progressInterval,
+                                                      progressStep)
+        if uploadProgressStep > 0:
+            cppWebRequestClient.get().SetUploadProgressThrottle(
+                    progressInterval, uploadProgressStep)
+        self.cppWebRequestClient = cppWebRequestClient
         self.pyWebRequestClient = pyWebRequestClient
+        spoolFile = pyRequest.GetSpoolFile()
+        if spoolFile is not None:
+            g_webRequestSpoolFiles[self.webRequestId] = spoolFile
         self.cefWebRequest = <CefRefPtr[CefURLRequest]?>(CefURLRequest_Create(
                 pyRequest.cefRequest,
                 <CefRefPtr[CefURLRequestClient]?>cppWebRequestClient,
@@ -115,6 +173,30 @@ cdef class PyWebRequest:
     cpdef py_void Cancel(self):
         self.cefWebRequest.get().Cancel()
 
+    cpdef bytes GetDownloadData(self):
+        # Body of a completed request is moved out of the C++ buffer
+        # once, later calls return the same bytes object. While the
+        # request is pending a copy of data received so far is made.
+        cdef WebRequestClient* client
+        cdef bytes data
+        cdef int status
+        if self.downloadData is not None:
+            return self.downloadData
+        client = self.cppWebRequestClient.get()
+        data = client.GetDownloadData()[:client.GetDownloadDataSize()]
+        status = self.cefWebRequest.get().GetRequestStatus()
+        if (status != cef_types.UR_UNKNOWN
+                and status != cef_types.UR_IO_PENDING):
+            self.downloadData = data
+            client.ClearDownloadData()
+        return data
+
+    cpdef int64 GetDownloadSize(self) except *:
+        return self.cppWebRequestClient.get().GetDownloadSize()
+
+    cpdef py_bool HasWriteFailed(self):
+        return self.cppWebRequestClient.get().HasWriteFailed()
+
 # -----------------------------------------------------------------------------
 # WebRequestClient
 # -----------------------------------------------------------------------------
@@ -173,7 +255,11 @@ cdef public void WebRequestClient_OnDownloadData(
         webRequest = GetPyWebRequest(webRequestId)
         if webRequest:
             userCallback = webRequest.GetCallback("OnDownloadData")
-            if userCallback:
+            if userCallback and webRequest.bytesChunks:
+                userCallback(
+                        web_request=webRequest,
+                        data=VoidPtrToBytes(data, dataLength))
+            elif userCallback:
                 userCallback(
                         web_request=webRequest,
                         data=VoidPtrToString(data, dataLength))
@@ -188,6 +274,7 @@ cdef public void WebRequestClient_OnRequestComplete(
     cdef PyWebRequest webRequest
     cdef object userCallback
     try:
+        g_webRequestSpoolFiles.pop(webRequestId, None)
         webRequest = GetPyWebRequest(webRequestId)
         if webRequest:
             userCallback = webRequest.GetCallback("OnRequestComplete")
@@ -0,0 +1,199 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+# WebRequestPool issues many CefURLRequests concurrently and returns
+# a Future for each request. Requests over the concurrency limit are
+# queued. Response body is buffered in C++ (WebRequestPoolClient) so
+# Python is called only once per request. All methods must be called
+# on the UI thread, futures are resolved on the UI thread.
+
+include "cefpython.pyx"
+
+from collections import deque
+
+# [requestId] = PooledWebRequest, while the request is active
+cdef dict g_pooledWebRequests = {}
+cdef int g_pooledWebRequestMaxId = 0
+
+cdef class WebRequestPool
+
+
+class WebRequestError(Exception):
+    # error_code is one of the cef.ERR_* network error codes.
+    def __init__(self, message, error_code=0):
+        super(WebRequestError, self).__init__(message)
+        self.error_code = error_code
+
+
+cdef class PooledWebRequest:
+    cdef int requestId
+    cdef py_bool finished
+    cdef WebRequestPool pool
+    cdef PyRequest pyRequest
+    cdef SpoolFile spoolFile
+    cdef Future future
+    cdef CefRefPtr[CefURLRequest] cefWebRequest
+
+    def _OnFutureDone(self, future):
+        # Future was cancelled or timed out
+        if self.finished:
+            return
+        if self.requestId:
+            self.cefWebRequest.get().Cancel()
+        else:
+            self.pool.RemoveQueued(self)
+            self.spoolFile = None
+
+
+cdef class WebRequestPool:
+    cdef int maxConcurrent
+    cdef CefRefPtr[CefRequestContext] cefRequestContext
+    cdef object queue
+    cdef dict active
+
+    def __init__(self, int max_concurrent=6, PyBrowser browser=None):
+        # Requests use the request context of the browser when given,
+        # otherwise the context shared by browsers or the global
+        # context. The same context is reused for all requests.
+        if max_concurrent < 1:
+            raise Exception("WebRequestPool: max_concurrent must be"
+                            " greater than 0")
+        self.maxConcurrent = max_concurrent
+        self.queue = deque()
+        self.active = {}
+        if browser is not None:
+            self.cefRequestContext = browser.GetCefBrowserHost().get()\
+                    .GetRequestContext()
+        elif g_shared_request_context.get():
+            self.cefRequestContext.Assign(g_shared_request_context.get())
+        else:
+            self.cefRequestContext = CefRequestContext.GetGlobalContext()
+
+    cpdef Future Submit(self, PyRequest request):
+        cdef PooledWebRequest pooledRequest
+        if not IsThread(TID_UI):
+            raise Exception("WebRequestPool.Submit() may only be called"
+                            " on the UI thread")
+        pooledRequest = PooledWebRequest()
+        pooledRequest.pool = self
+        pooledRequest.pyRequest = request
+        pooledRequest.spoolFile = request.GetSpoolFile()
+        pooledRequest.future = Future()
+        pooledRequest.future.AddDoneCallback(pooledRequest._OnFutureDone)
+        self.queue.append(pooledRequest)
+        self.StartQueued()
+        return pooledRequest.future
+
+    def Fetch(self, py_string url, py_string method="GET",
+              object headers=None, object post_data=None, int flags=0):
+        cdef PyRequest request = CreatePyRequest(CefRequest_Create())
+        request.SetUrl(url)
+        request.SetMethod(method)
+        if headers:
+            if isinstance(headers, dict):
+                request.SetHeaderMap(headers)
+            else:
+                request.SetHeaderMultimap(headers)
+        if post_data:
+            request.SetPostData(post_data)
+        if flags:
+            request.SetFlags(flags)
+        return self.Submit(request)
+
+    cpdef int GetActiveCount(self) except *:
+        return len(self.active)
+
+    cpdef int GetQueuedCount(self) except *:
+        return len(self.queue)
+
+    cpdef py_void SetMaxConcurrent(self, int max_concurrent):
+        if max_concurrent < 1:
+            raise Exception("WebRequestPool.SetMaxConcurrent() failed:"
+                            " max_concurrent must be greater than 0")
+        self.maxConcurrent = max_concurrent
+        self.StartQueued()
+
+    cpdef py_void CancelAll(self):
+        cdef PooledWebRequest pooledRequest
+        for pooledRequest in list(self.queue) + list(self.active.values()):
+            pooledRequest.future.Cancel()
+
+    cdef void StartQueued(self) except *:
+        global g_pooledWebRequestMaxId
+        cdef PooledWebRequest pooledRequest
+        cdef CefRefPtr[WebRequestPoolClient] client
+        while self.queue and len(self.active) < self.maxConcurrent:
+            pooledRequest = self.queue.popleft()
+            g_pooledWebRequestMaxId += 1
+            pooledRequest.requestId = g_pooledWebRequestMaxId
+            self.active[pooledRequest.requestId] = pooledRequest
+            g_pooledWebRequests[pooledRequest.requestId] = pooledRequest
+            client = <CefRefPtr[WebRequestPoolClient]?>new \
+                    WebRequestPoolClient(pooledRequest.requestId)
+            pooledRequest.cefWebRequest = CefURLRequest_Create(
+                    pooledRequest.pyRequest.cefRequest,
+                    <CefRefPtr[CefURLRequestClient]?>client,
+                    self.cefRequestContext)
+            if not pooledRequest.cefWebRequest.get():
+                g_pooledWebRequests.pop(pooledRequest.requestId, None)
+                self.OnRequestComplete(pooledRequest, b"")
+
+    cdef void RemoveQueued(self, PooledWebRequest pooledRequest) except *:
+        try:
+            self.queue.remove(pooledRequest)
+        except ValueError:
+            pass
+
+    cdef void OnRequestComplete(self, PooledWebRequest pooledRequest,
+                                bytes data) except *:
+        cdef CefRefPtr[CefURLRequest] cefWebRequest = \
+                pooledRequest.cefWebRequest
+        cdef CefRefPtr[CefResponse] cefResponse
+        cdef PyResponse response
+        cdef int status = cef_types.UR_FAILED
+        cdef int error = cef_types.ERR_FAILED
+        if cefWebRequest.get():
+            status = cefWebRequest.get().GetRequestStatus()
+            error = cefWebRequest.get().GetRequestError()
+        self.active.pop(pooledRequest.requestId, None)
+        pooledRequest.requestId = 0
+        pooledRequest.finished = True
+        pooledRequest.cefWebRequest.Assign(NULL)
+        pooledRequest.spoolFile = None
+        if not pooledRequest.future.IsDone():
+            if status == cef_types.UR_SUCCESS:
+                cefResponse = cefWebRequest.get().GetResponse()
+                response = CreatePyResponse(cefResponse)
+                pooledRequest.future.SetResult({
+                    "url": pooledRequest.pyRequest.GetUrl(),
+                    "status": response.GetStatus(),
+                    "status_text": response.GetStatusText(),
+                    "mime_type": response.GetMimeType(),
+                    "headers": response.GetHeaderMap(),
+                    "header_multimap": response.GetHeaderMultimap(),
+                    "data": data,
+                })
+            else:
+                pooledRequest.future.SetException(WebRequestError(
+                        "Request failed with error {error}: {url}".format(
+                                error=error,
+                                url=pooledRequest.pyRequest.GetUrl()),
+                        error))
+
+
+cdef public void WebRequestPool_OnRequestComplete(
+        int requestId,
+        CefRefPtr[CefURLRequest] cefWebRequest,
+        const cpp_string& data
+        ) except * with gil:
+    cdef PooledWebRequest pooledRequest
+    try:
+        pooledRequest = g_pooledWebRequests.pop(requestId, None)
+        if pooledRequest is not None:
+            pooledRequest.pool.OnRequestComplete(
+                    pooledRequest, data.data()[:data.size()])
+            pooledRequest.pool.StartQueued()
+    except:
+        (exc_type, exc_value, exc_trace) = sys.exc_info()
+        sys.excepthook(exc_type, exc_value, exc_trace)
@@ -0,0 +1,231 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+"""Integration with asyncio. Requires Python 3.5+.
+
+CEF message loop work is scheduled from an asyncio event loop that
+runs on the main thread. The event loop thread is then the CEF UI
+thread, so coroutines can call CEF functions directly and CEF
+callbacks can resolve asyncio futures without thread hopping.
+
+    from cefpython3 import cefpython as cef
+    from cefpython3 import aio
+
+    async def py_fetch(url):
+        ...
+        return data
+
+    aio.initialize()
+    browser = cef.CreateBrowserSync(url="...")
+    bindings = cef.JavascriptBindings()
+    aio.bind_coroutine(bindings, "py_fetch", py_fetch)
+    browser.SetJavascriptBindings(bindings)
+    asyncio.get_event_loop().run_forever()
+    aio.shutdown()
+
+In javascript a bound coroutine function is called with an optional
+callback as the last argument. The callback is called with two
+arguments (error, result) when the coroutine completes:
+
+    py_fetch("https://...", function(error, result) {...});
+
+Javascript callbacks can be awaited in Python:
+
+    result = await aio.call(js_callback, "arg", timeout_ms=5000)
+
+Requests issued by cef.WebRequestPool can be awaited as well:
+
+    pool = cef.WebRequestPool(max_concurrent=8)
+    results = await asyncio.gather(*[aio.fetch(pool, url)
+                                     for url in urls])
+"""
+
+import asyncio
+import inspect
+import sys
+
+from . import cefpython as cef
+
+__all__ = ["MessagePump", "initialize", "shutdown", "wrap_future", "call",
+           "fetch", "coroutine_function", "bind_coroutine", "bind_object"]
+
+# Max. delay between calls to MessageLoopWork(). Not all of CEF's work
+# is scheduled with OnScheduleMessagePumpWork. The same value is used
+# by the native external message pump.
+MAX_TIMER_DELAY = 1.0 / 30
+
+# Message pump created by initialize()
+g_message_pump = None
+
+
+class MessagePump(object):
+    """Calls cef.MessageLoopWork() from an asyncio event loop when CEF
+    requests it through the OnScheduleMessagePumpWork callback."""
+
+    def __init__(self, loop=None):
+        self.loop = loop or asyncio.get_event_loop()
+        self.timer = None
+        self.timer_when = None
+        self.stopped = True
+
+    def start(self):
+        """Must be called after cef.Initialize()."""
+        self.stopped = False
+        self.schedule(MAX_TIMER_DELAY)
+
+    def stop(self):
+        """Must be called before cef.Shutdown()."""
+        self.stopped = True
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+            self.timer_when = None
+
+    def OnScheduleMessagePumpWork(self, delay_ms, **_):
+        """Global client callback, called by CEF on any thread."""
+        if self.stopped:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.schedule, delay_ms / 1000.0)
+        except RuntimeError:
+            # Event loop is closed
+            pass
+
+    def schedule(self, delay):
+        if self.stopped:
+            return
+        delay = min(max(delay, 0), MAX_TIMER_DELAY)
+        when = self.loop.time() + delay
+        if self.timer:
+            if self.timer_when <= when:
+                return
+            self.timer.cancel()
+        self.timer_when = when
+        self.timer = self.loop.call_at(when, self.do_work)
+
+    def do_work(self):
+        self.timer = None
+        self.timer_when = None
+        if self.stopped:
+            return
+        cef.MessageLoopWork()
+        # Work requested during MessageLoopWork() will be scheduled
+        # with a shorter delay.
+        self.schedule(MAX_TIMER_DELAY)
+
+
+def initialize(settings=None, switches=None, loop=None):
+    """Call instead of cef.Initialize() to drive CEF message loop from
+    an asyncio event loop. Enables the "external_message_pump" setting.
+    Don't call cef.MessageLoop() nor cef.MessageLoopWork() yourself."""
+    global g_message_pump
+    settings = dict(settings or {})
+    settings["external_message_pump"] = True
+    g_message_pump = MessagePump(loop)
+    cef.SetGlobalClientCallback("OnScheduleMessagePumpWork",
+                                g_message_pump.OnScheduleMessagePumpWork)
+    ret = cef.Initialize(settings, switches)
+    g_message_pump.start()
+    return ret
+
+
+def shutdown():
+    """Call instead of cef.Shutdown()."""
+    global g_message_pump
+    if g_message_pump:
+        g_message_pump.stop()
+        g_message_pump = None
+    cef.Shutdown()
+
+
+def wrap_future(future, loop=None):
+    """Wrap cef.Future in an asyncio future. Cancelling the asyncio
+    future cancels the cef.Future as well."""
+    loop = loop or asyncio.get_event_loop()
+    aio_future = loop.create_future()
+
+    def on_cef_future_done(_):
+        loop.call_soon_threadsafe(_copy_future_state, future, aio_future)
+
+    def on_aio_future_done(_):
+        if aio_future.cancelled():
+            future.Cancel()
+
+    aio_future.add_done_callback(on_aio_future_done)
+    future.AddDoneCallback(on_cef_future_done)
+    return aio_future
+
+
+def _copy_future_state(future, aio_future):
+    if aio_future.done():
+        return
+    if future.IsCancelled():
+        aio_future.cancel()
+    elif future.GetException() is not None:
+        aio_future.set_exception(future.GetException())
+    else:
+        aio_future.set_result(future.GetResult())
+
+
+async def call(js_callback, *args, timeout_ms=0):
+    """Call javascript callback and await its return value, see
+    JavascriptCallback.CallAsync()."""
+    return await wrap_future(js_callback.CallAsync(*args,
+                                                   timeout_ms=timeout_ms))
+
+
+async def fetch(pool, url, **kwargs):
+    """Fetch url using cef.WebRequestPool and await the result, see
+    WebRequestPool.Fetch()."""
+    return await wrap_future(pool.Fetch(url, **kwargs))
+
+
+def coroutine_function(func, loop=None):
+    """Wrap a coroutine function so that it can be bound with
+    cef.JavascriptBindings. Each call from javascript runs in a new
+    task. If the last argument is a javascript function then it is
+    called with (error, result) when the task completes."""
+
+    def wrapper(*args):
+        callback = None
+        if args and isinstance(args[-1], cef.JavascriptCallback):
+            callback = args[-1]
+            args = args[:-1]
+        task = asyncio.ensure_future(func(*args),
+                                     loop=loop or asyncio.get_event_loop())
+        task.add_done_callback(lambda _: _reply(callback, task))
+
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+def _reply(callback, task):
+    if task.cancelled():
+        if callback:
+            callback.Call("Task was cancelled", None)
+        return
+    exc = task.exception()
+    if exc is not None:
+        if callback:
+            callback.Call(str(exc) or type(exc).__name__, None)
+        else:
+            sys.excepthook(type(exc), exc, exc.__traceback__)
+    elif callback:
+        callback.Call(None, task.result())
+
+
+def bind_coroutine(bindings, name, func, loop=None):
+    """Same as bindings.SetFunction(), accepts coroutine functions."""
+    bindings.SetFunction(name, coroutine_function(func, loop))
+
+
+def bind_object(bindings, name, obj, loop=None):
+    """Same as bindings.SetObject(), coroutine methods are wrapped
+    with coroutine_function()."""
+    bindings.SetObject(name, obj)
+    methods = bindings.GetObjects()[name]
+    for key, method in methods.items():
+        if inspect.iscoroutinefunction(method):
+            methods[key] = coroutine_function(method, loop)
@@ -32,11 +32,13 @@ import sysconfig
 # and Wheels can be created only with setuptools.
 try:
     from setuptools import setup
+    from setuptools.command.build_py import build_py
     from setuptools.command.install import install
     from setuptools.dist import Distribution
     print("[setup.py] Using setuptools")
 except ImportError:
     from distutils.core import setup
+    from distutils.command.build_py import build_py
     from distutils.command.install import install
     from distutils.dist import Distribution
     print("[setup.py] Using distutils")
@@ -57,6 +59,13 @@ EXECUTABLES_NOEXT = [
     "subprocess",
 ]
 
+# Modules that use syntax not supported by older Python versions are
+# not installed there, otherwise byte-compiling them fails. Package may
+# include cefpython modules built for several Python versions.
+MIN_PYTHON_VERSIONS = {
+    "aio": (3, 5),
+}
+
 
 class custom_install(install):
     def __init__(self, *args, **kwargs):
@@ -67,10 +76,17 @@ class custom_install(install):
         post_install_hook()
 
 
+class custom_build_py(build_py):
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        excluded = get_excluded_modules()
+        return [module for module in modules if module[1] not in excluded]
+
+
 # Provide a custom install command
 print("[setup.py] Overload install command to enable execution of"
       " post install hook")
-cmdclass = {"install": custom_install}
+cmdclass = {"install": custom_install, "build_py": custom_build_py}
 
 # Fix platform tag in wheel package
 if "bdist_wheel" in sys.argv:
@@ -165,10 +181,18 @@ def main():
 
 
 def get_package_data():
-    package_data = {"cefpython3": get_package_files()}
+    excluded = [module + ".py" for module in get_excluded_modules()]
+    package_data = {"cefpython3": [fpath for fpath in get_package_files()
+                                   if os.path.normpath(fpath)
+                                   not in excluded]}
     return package_data
 
 
+def get_excluded_modules():
+    return [module for module, version in MIN_PYTHON_VERSIONS.items()
+            if sys.version_info[:2] < version]
+
+
 def get_package_files(relative_dir=".", recursive=False):
     """Finds files recursively in the cefpython3/ local directory.
     Includes only files and their paths are relative to the cefpython3/
@@ -165,6 +165,12 @@ def copy_tools_installer_files(setup_dir, pkg_dir):
         os.path.join(pkg_dir, "__init__.py"),
         variables)
 
+    # Requires Python 3.5+, setup.py doesn't install it for older
+    # versions, see MIN_PYTHON_VERSIONS.
+    shutil.copy(
+        os.path.join(INSTALLER_DIR, "cefpython3.aio.py"),
+        os.path.join(pkg_dir, "aio.py"))
+
 
 def copy_template_file(src, dst, variables):
     """Copy file and replaces template variables in that file."""
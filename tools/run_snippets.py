@@ -21,6 +21,11 @@ def main():
     succeeded = []
     failed = []
     for snippet in snippets_iter:
+        if os.path.basename(snippet) == "asyncio_.py"\
+                and sys.version_info[:2] < (3, 5):
+            print("[run_snippets.py] Skipping '{snippet}', requires"
+                  " Python 3.5+".format(snippet=os.path.basename(snippet)))
+            continue
         print("[run_snippets.py] Running '{snippet}'..."
               .format(snippet=os.path.basename(snippet)))
         retcode = subprocess.call([sys.executable, snippet])
@@ -0,0 +1,91 @@
+# Copyright (c) 2018 CEF Python, see the Authors file.
+# All rights reserved. Licensed under BSD 3-clause license.
+# Project website: https://github.com/cztomczak/cefpython
+
+"""Tests of the cefpython3.aio module, requires Python 3.5+."""
+
+import unittest
+# noinspection PyUnresolvedReferences
+import _test_runner
+from _common import *
+
+from cefpython3 import cefpython as cef
+
+import sys
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "asyncio requires Python 3.5+")
+class AioTest_IsolatedTest(unittest.TestCase):
+    def test_aio(self):
+        """Main entry point. All the code must run inside one
+        single test, otherwise strange things happen."""
+
+        import asyncio
+        from cefpython3 import aio
+
+        print("")
+        print("CEF Python {ver}".format(ver=cef.__version__))
+        print("Python {ver}".format(ver=sys.version[:6]))
+
+        settings = {
+            "debug": False,
+            "log_severity": cef.LOGSEVERITY_ERROR,
+            "log_file": "",
+        }
+        if "--debug" in sys.argv:
+            settings["debug"] = True
+            settings["log_severity"] = cef.LOGSEVERITY_INFO
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        # Message loop work is scheduled from the event loop
+        aio.initialize(settings, loop=loop)
+        self.assertIsInstance(aio.g_message_pump, aio.MessagePump)
+        self.assertFalse(aio.g_message_pump.stopped)
+        subtest_message("aio.initialize() ok")
+
+        # Tasks posted to the UI thread run when the pump does work
+        task_future = loop.create_future()
+        cef.PostTask(cef.TID_UI, lambda: loop.call_soon(
+                task_future.set_result, True))
+        self.assertTrue(loop.run_until_complete(
+                asyncio.wait_for(task_future, 5)))
+        subtest_message("aio.MessagePump ok")
+
+        # Result and exception of cef.Future are copied
+        future = cef.Future()
+        cef.PostTask(cef.TID_UI, future.SetResult, 42)
+        self.assertEqual(loop.run_until_complete(
+                asyncio.wait_for(aio.wrap_future(future, loop), 5)), 42)
+        future = cef.Future()
+        cef.PostTask(cef.TID_UI, future.SetException, ValueError("error"))
+        self.assertRaises(ValueError, loop.run_until_complete,
+                          asyncio.wait_for(aio.wrap_future(future, loop), 5))
+
+        # Cancelling the asyncio future cancels cef.Future
+        future = cef.Future()
+        aio_future = aio.wrap_future(future, loop)
+        aio_future.cancel()
+        loop.run_until_complete(asyncio.sleep(0.1))
+        self.assertTrue(future.IsCancelled())
+
+        # Cancelled cef.Future cancels the asyncio future
+        future = cef.Future()
+        aio_future = aio.wrap_future(future, loop)
+        future.Cancel()
+        loop.run_until_complete(asyncio.sleep(0.1))
+        self.assertTrue(aio_future.cancelled())
+        subtest_message("aio.wrap_future() ok")
+
+        # Test shutdown of CEF
+        aio.shutdown()
+        self.assertIsNone(aio.g_message_pump)
+        loop.close()
+        subtest_message("aio.shutdown() ok")
+
+        # Display summary
+        show_test_summary(__file__)
+
+
+if __name__ == "__main__":
+    _test_runner.main(os.path.basename(__file__))
@@ -13,7 +13,12 @@ from cefpython3 import cefpython as cef
 
 import glob
 import os
+import shutil
 import sys
+import tempfile
+import threading
+import weakref
+import zipfile
 
 
 g_datauri_data = """
@@ -93,6 +98,60 @@ g_datauri_data = """
             print("py_callback() ok");
         });
 
+        // Test calling js callback asynchronously with a return value
+        external.test_call_async(function(number) {
+            return number * 2;
+        });
+
+        // Test javascript_callbacks_limit setting. Six functions are
+        // passed to Python in a single task, only the last four are
+        // kept by the renderer. Run later, so that evicting callbacks
+        // doesn't affect the tests above.
+        setTimeout(function() {
+            for (var i = 0; i < 6; i++) {
+                external.test_callbacks_limit(function(number) {
+                    return number * 10;
+                });
+            }
+        }, 300);
+
+        // Test channel
+        var channel = cefpython.channel("test_channel");
+        channel.onmessage = function(message) {
+            if (message == "Message sent from Python") {
+                print("channel.onmessage() ok");
+                channel.send("Message sent from Javascript");
+            } else {
+                throw new Error("channel.onmessage(): invalid message");
+            }
+        };
+
+        // Test channel with a Python handler that raises. Both messages
+        // are sent in one batch. The last message is sent only when
+        // the batch was acknowledged, as window size is 1.
+        var raise_channel = cefpython.channel("raise_channel");
+        raise_channel.send("Raise");
+        raise_channel.send("After raise");
+        setTimeout(function() {
+            raise_channel.send("After ack");
+        }, 200);
+
+        // Test script served from resource cache, the router doesn't
+        // intercept it
+        var cached_script = document.createElement("script");
+        cached_script.src = "http://cache.cefpython.test/cached.js";
+        document.head.appendChild(cached_script);
+
+        // Test response filters, responses are served in chunks
+        ["replace", "regex", "python"].forEach(function(name) {
+            var xhr = new XMLHttpRequest();
+            xhr.onload = function() {
+                external.test_response_filter(name, xhr.responseText);
+            };
+            xhr.open("GET", "http://filter.cefpython.test/" + name);
+            xhr.send();
+        });
+
         // Test popup
         window.open("about:blank");
 
@@ -113,6 +172,8 @@ g_datauri_data = """
 </html>
 """
 g_datauri = cef.GetDataUrl(g_datauri_data)
+g_served_data = b"0123456789" * 10000
+g_filter_data = b"aaa foo bar bbb fo"
 
 
 class MainTest_IsolatedTest(unittest.TestCase):
@@ -140,6 +201,18 @@ class MainTest_IsolatedTest(unittest.TestCase):
         if "--debug-warning" in sys.argv:
             settings["debug"] = True
             settings["log_severity"] = cef.LOGSEVERITY_WARNING
+        # Invalid custom schemes are rejected before CEF is initialized
+        self.assertRaises(Exception, cef.Initialize,
+                          {"custom_schemes": [{"name": "1invalid"}]})
+        self.assertRaises(Exception, cef.Initialize,
+                          {"custom_schemes": [{"name": "cefpython-test",
+                                               "invalid": True}]})
+        settings["custom_schemes"] = [{"name": "cefpython-test",
+                                       "standard": True,
+                                       "cors_enabled": True}]
+        # Passed to the renderer as the "javascript-callbacks-limit"
+        # switch, see External.test_callbacks_limit()
+        settings["javascript_callbacks_limit"] = 4
         cef.Initialize(settings)
         subtest_message("cef.Initialize() ok")
 
@@ -179,6 +252,386 @@ class MainTest_IsolatedTest(unittest.TestCase):
             self.assertGreater(cef.DpiAware.Scale(800), 0)
             subtest_message("cef.DpiAware ok")
 
+        # Resource router
+        route_id = cef.ResourceRouter.AddRoute(
+                "http://cefpython.test/*.txt",
+                cef.BytesResourceHandler(b"ok", mime_type="text/plain"),
+                match="glob")
+        self.assertEqual(cef.ResourceRouter.GetRoutesCount(), 1)
+        self.assertTrue(cef.ResourceRouter.RemoveRoute(route_id))
+        self.assertFalse(cef.ResourceRouter.RemoveRoute(route_id))
+        self.assertEqual(cef.ResourceRouter.GetRoutesCount(), 0)
+        subtest_message("cef.ResourceRouter ok")
+
+        # Response filters, responses are checked after message loop
+        # has run, see FilterRequestHandler.
+        self.assertRaises(Exception, cef.ReplaceResponseFilter, [("", "x")])
+        self.assertRaises(Exception, cef.RegexResponseFilter, "(", "")
+
+        # Resource cache
+        cef.ResourceCache.Enable(serve_cached=False)
+        self.assertTrue(cef.ResourceCache.Put(
+                "http://cefpython.test/cached.txt", b"ok",
+                mime_type="text/plain",
+                headers={"Cache-Control": "max-age=60", "ETag": "\"1\""}))
+        self.assertFalse(cef.ResourceCache.Put(
+                "http://cefpython.test/nostore.txt", b"ok",
+                headers={"Cache-Control": "no-store"}))
+        self.assertIsNotNone(cef.ResourceCache.Get(
+                "http://cefpython.test/cached.txt"))
+        self.assertEqual(cef.ResourceCache.GetValidators(
+                "http://cefpython.test/cached.txt"),
+                {"If-None-Match": "\"1\""})
+        self.assertTrue(cef.ResourceCache.Remove(
+                "http://cefpython.test/cached.txt"))
+        self.assertEqual(cef.ResourceCache.GetMemorySize(), 0)
+        cef.ResourceCache.Disable()
+        subtest_message("cef.ResourceCache ok")
+
+        # Resource cache serves requests that the router doesn't
+        # intercept when Python fallback is disabled. Cached script
+        # is loaded by the page.
+        cef.ResourceCache.Enable()
+        self.assertTrue(cef.ResourceCache.Put(
+                "http://cache.cefpython.test/cached.js",
+                b"external.test_resource_cache();",
+                mime_type="application/javascript",
+                headers={"Cache-Control": "max-age=600"}))
+        cef.ResourceRouter.SetPythonFallback(False)
+
+        # Request filter
+        self.assertEqual(cef.RequestFilter.LoadRules(
+                ["||ads.cefpython.test^", "@@||ok.ads.cefpython.test^"]), 2)
+        self.assertEqual(cef.RequestFilter.Match(
+                "http://x.ads.cefpython.test/"), "block")
+        self.assertEqual(cef.RequestFilter.Match(
+                "http://ok.ads.cefpython.test/"), "allow")
+        self.assertEqual(cef.RequestFilter.Match(
+                "http://cefpython.test/"), "defer")
+        cef.RequestFilter.ClearRules()
+        subtest_message("cef.RequestFilter ok")
+
+        # Public suffixes, sites under "co.uk" are different parties
+        self.assertEqual(cef.RequestFilter.GetBaseDomain("www.a.co.uk"),
+                         "a.co.uk")
+        self.assertEqual(cef.RequestFilter.GetBaseDomain("co.uk"), "co.uk")
+        self.assertEqual(cef.RequestFilter.GetBaseDomain("x.a.github.io"),
+                         "a.github.io")
+        self.assertEqual(cef.RequestFilter.GetBaseDomain("127.0.0.1"),
+                         "127.0.0.1")
+        self.assertEqual(cef.RequestFilter.LoadPublicSuffixList(
+                ["// comment", "*.ck", "!www.ck", "cefpython.test"]), 3)
+        self.assertEqual(cef.RequestFilter.GetBaseDomain("a.b.ck"),
+                         "a.b.ck")
+        self.assertEqual(cef.RequestFilter.GetBaseDomain("a.www.ck"),
+                         "www.ck")
+        self.assertEqual(cef.RequestFilter.GetBaseDomain(
+                "a.b.cefpython.test"), "b.cefpython.test")
+        cef.RequestFilter.ClearPublicSuffixList()
+        self.assertEqual(cef.RequestFilter.GetBaseDomain(
+                "a.b.cefpython.test"), "cefpython.test")
+        cef.RequestFilter.LoadRules(["||tracker.co.uk^$third-party"])
+        self.assertEqual(cef.RequestFilter.Match(
+                "http://tracker.co.uk/", "http://a.co.uk/"), "block")
+        self.assertEqual(cef.RequestFilter.Match(
+                "http://tracker.co.uk/", "http://www.tracker.co.uk/"),
+                "defer")
+        cef.RequestFilter.ClearRules()
+        subtest_message("cef.RequestFilter.GetBaseDomain() ok")
+
+        # Header rules and single header access
+        rule_id = cef.HeaderRules.AddRule("http://cefpython.test/", "set",
+                                          "X-Test", "1")
+        self.assertEqual(cef.HeaderRules.GetRulesCount(), 1)
+        self.assertTrue(cef.HeaderRules.RemoveRule(rule_id))
+        request = cef.Request.CreateRequest()
+        request.SetHeader("X-Test", "1")
+        self.assertEqual(request.GetHeader("x-test"), "1")
+        request.SetHeader("X-Test", "2", overwrite=False)
+        self.assertEqual(request.GetHeader("X-Test"), "1")
+        self.assertTrue(request.RemoveHeader("X-Test"))
+        self.assertEqual(request.GetHeader("X-Test"), "")
+        subtest_message("cef.HeaderRules ok")
+
+        # Cookie policy
+        cef.CookiePolicy.AddRule(".tracker.cefpython.test", "block")
+        cef.CookiePolicy.AddRule("ok.tracker.cefpython.test", "allow",
+                                 party="first-party")
+        cef.CookiePolicy.SetThirdPartyVerdict("block")
+        self.assertEqual(cef.CookiePolicy.GetRulesCount(), 2)
+        self.assertEqual(cef.CookiePolicy.Match(
+                "x.tracker.cefpython.test"), "block")
+        self.assertEqual(cef.CookiePolicy.Match(
+                "ok.tracker.cefpython.test",
+                "http://www.cefpython.test/"), "allow")
+        self.assertEqual(cef.CookiePolicy.Match(
+                "ads.test", "http://www.cefpython.test/"), "block")
+        self.assertEqual(cef.CookiePolicy.Match(
+                "cefpython.test", "http://www.cefpython.test/"), "defer")
+        self.assertEqual(cef.CookiePolicy.Match(
+                "b.co.uk", "http://a.co.uk/"), "block")
+        cef.CookiePolicy.ClearRules()
+        cef.CookiePolicy.SetThirdPartyVerdict("defer")
+        subtest_message("cef.CookiePolicy ok")
+
+        # Streaming post data is spooled to a file
+        request.SetPostDataStream(chunk for chunk in [b"ab", b"cd"])
+        post_data = request.GetPostData()
+        self.assertEqual(len(post_data), 1)
+        spool_path = post_data[0][1:].decode()
+        with open(spool_path, "rb") as spool_file:
+            self.assertEqual(spool_file.read(), b"abcd")
+        # Spool file of a request that wasn't sent is removed when
+        # post data is set again
+        request.SetPostData({})
+        self.assertFalse(os.path.exists(spool_path))
+        subtest_message("Request.SetPostDataStream() ok")
+
+        # Web request pool
+        pool = cef.WebRequestPool(max_concurrent=2)
+        self.assertEqual(pool.GetActiveCount(), 0)
+        self.assertEqual(pool.GetQueuedCount(), 0)
+        self.assertRaises(Exception, pool.SetMaxConcurrent, 0)
+        self.assertRaises(Exception, cef.WebRequest.Create,
+                          cef.Request.CreateRequest(), None,
+                          download_mode="invalid")
+        self.assertRaises(Exception, cef.WebRequest.Create,
+                          cef.Request.CreateRequest(), None,
+                          download_mode="file")
+        subtest_message("cef.WebRequestPool ok")
+
+        # Request context pool
+        cef.RequestContextPool.Create("tenant", settings={
+            "persist_session_cookies": False,
+        })
+        self.assertTrue(cef.RequestContextPool.Has("tenant"))
+        self.assertEqual(cef.RequestContextPool.GetNames(), ["tenant"])
+        self.assertEqual(cef.RequestContextPool.GetCachePath("tenant"), "")
+        self.assertEqual(cef.RequestContextPool.GetBrowserCount("tenant"), 0)
+        self.assertIsInstance(
+                cef.RequestContextPool.GetCookieManager("tenant"),
+                cef.PyCookieManager)
+        self.assertRaises(Exception, cef.RequestContextPool.Create,
+                          "tenant")
+        self.assertRaises(Exception, cef.RequestContextPool.Create,
+                          "invalid", settings={"invalid": True})
+        self.assertRaises(Exception, cef.RequestContextPool.SetPreference,
+                          "tenant", "cefpython.invalid", 1)
+        self.assertRaises(Exception, cef.CreateBrowserSync,
+                          url=g_datauri, request_context="missing")
+        self.assertTrue(cef.RequestContextPool.Remove("tenant"))
+        self.assertFalse(cef.RequestContextPool.Has("tenant"))
+        subtest_message("cef.RequestContextPool ok")
+
+        # Served responses. Requests issued by a web request pool are
+        # served by scheme handler factories, results are checked after
+        # message loop has run.
+        served_pool = cef.WebRequestPool(max_concurrent=4)
+        served = {}
+        served_handlers = []
+
+        def fetch(key, url, headers=None):
+            served[key] = served_pool.Fetch(url, headers=headers)
+
+        def readinto_factory(request, **_):
+            headers = None
+            if "cached" in request.GetUrl():
+                headers = {"Cache-Control": "max-age=600"}
+            handler = ReadIntoResourceHandler(
+                    g_served_data, keep_buffer="keep" in request.GetUrl(),
+                    headers=headers)
+            served_handlers.append(handler)
+            return handler
+
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", readinto_factory, "readinto.cefpython.test"))
+        fetch("readinto", "http://readinto.cefpython.test/")
+        fetch("readinto_keep", "http://readinto.cefpython.test/keep")
+        fetch("readinto_cached", "http://readinto.cefpython.test/cached")
+
+        # Web request pool with more requests than max_concurrent.
+        # A queued request and an active request are cancelled, the
+        # rest completes. Counts are recorded when a request completes,
+        # before the next queued request is started.
+        def pool_factory(request, **_):
+            handler = ReadIntoResourceHandler(
+                    request.GetUrl().encode("utf-8"))
+            served_handlers.append(handler)
+            return handler
+
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", pool_factory, "pool.cefpython.test"))
+        limited_pool = cef.WebRequestPool(max_concurrent=2)
+        pool_urls = ["http://pool.cefpython.test/%d" % i for i in range(5)]
+        pool_futures = [limited_pool.Fetch(url) for url in pool_urls]
+        self.assertEqual(limited_pool.GetActiveCount(), 2)
+        self.assertEqual(limited_pool.GetQueuedCount(), 3)
+        pool_counts = []
+        for pool_future in pool_futures[1:4]:
+            pool_future.AddDoneCallback(
+                    lambda _: pool_counts.append(
+                            (limited_pool.GetActiveCount(),
+                             limited_pool.GetQueuedCount())))
+        # Queued request is removed from the queue immediately
+        pool_futures[4].Cancel()
+        self.assertEqual(limited_pool.GetQueuedCount(), 2)
+        # Active request is cancelled in CEF, a queued request is
+        # started when it completes.
+        pool_futures[0].Cancel()
+
+        # WebRequest download modes, body is kept in C++ and is not
+        # passed to Python in chunks.
+        download_file = os.path.join(tempfile.gettempdir(),
+                                     "cefpython_test_download.bin")
+        downloads = {}
+        download_clients = {}
+        for mode in ("buffer", "file"):
+            download_request = cef.Request.CreateRequest()
+            download_request.SetUrl("http://readinto.cefpython.test/"
+                                    + mode)
+            download_clients[mode] = DownloadClient()
+            downloads[mode] = cef.WebRequest.Create(
+                    download_request, download_clients[mode],
+                    download_mode=mode,
+                    download_file=download_file if mode == "file" else None)
+        # Progress throttled by interval, only the first event and the
+        # event for completed transfer are passed to Python.
+        download_request = cef.Request.CreateRequest()
+        download_request.SetUrl("http://readinto.cefpython.test/throttled")
+        throttled_client = DownloadClient()
+        downloads["throttled"] = cef.WebRequest.Create(
+                download_request, throttled_client, download_mode="buffer",
+                progress_interval=60*60*1000)
+
+        chunked = cef.ChunkedResourceHandler(mime_type="text/plain")
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", chunked, "chunked.cefpython.test"))
+        self.assertTrue(chunked.Write(b"first,"))
+        self.assertEqual(chunked.GetQueuedSize(), 6)
+        chunked_thread = threading.Thread(
+                target=lambda: (chunked.Write(u"second"), chunked.Finish()))
+        chunked_thread.start()
+        fetch("chunked", "http://chunked.cefpython.test/")
+
+        # Bytes are served natively, status, mime type and headers
+        # passed to the handler are served with them.
+        bytes_handler = cef.BytesResourceHandler(
+                u"bytes \u0105", mime_type="text/plain", status_code=201,
+                status_text="Created",
+                headers=[("X-Test", "bytes"), ("X-Repeated", "1"),
+                         ("X-Repeated", "2")])
+        self.assertEqual(bytes_handler.GetSize(), 8)
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", bytes_handler, "bytes.cefpython.test"))
+        fetch("bytes", "http://bytes.cefpython.test/")
+        fetch("bytes_again", "http://bytes.cefpython.test/again")
+
+        # Files are served natively with range requests. Directory
+        # handler doesn't serve files outside of its directory.
+        files_dir = tempfile.mkdtemp(prefix="cefpython_test_")
+        os.mkdir(os.path.join(files_dir, "static"))
+        with open(os.path.join(files_dir, "secret.txt"), "wb") as f:
+            f.write(b"secret")
+        with open(os.path.join(files_dir, "static", "index.html"),
+                  "wb") as f:
+            f.write(b"<p>index</p>")
+        file_path = os.path.join(files_dir, "static", "data.bin")
+        with open(file_path, "wb") as f:
+            f.write(g_served_data[:100])
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", cef.FileResourceHandler(
+                        file_path, mime_type="application/octet-stream"),
+                "file.cefpython.test"))
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", cef.FileResourceHandler(file_path, use_mmap=True),
+                "mmap.cefpython.test"))
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", cef.FileResourceHandler(file_path, offset=10,
+                                                length=20),
+                "slice.cefpython.test"))
+        fetch("file", "http://file.cefpython.test/")
+        fetch("file_range", "http://file.cefpython.test/",
+              {"Range": "bytes=10-19"})
+        fetch("file_suffix", "http://file.cefpython.test/",
+              {"Range": "bytes=-5"})
+        fetch("file_416", "http://file.cefpython.test/",
+              {"Range": "bytes=200-"})
+        fetch("mmap_range", "http://mmap.cefpython.test/",
+              {"Range": "bytes=90-"})
+        fetch("slice", "http://slice.cefpython.test/")
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", cef.DirectoryResourceHandler(
+                        os.path.join(files_dir, "static"),
+                        "http://dir.cefpython.test/static/"),
+                "dir.cefpython.test"))
+        fetch("dir_index", "http://dir.cefpython.test/static/")
+        fetch("dir_file", "http://dir.cefpython.test/static/data.bin",
+              {"Range": "bytes=0-9"})
+        fetch("dir_parent", "http://dir.cefpython.test/static/../secret.txt")
+        fetch("dir_encoded",
+              "http://dir.cefpython.test/static/%2e%2e/secret.txt")
+        fetch("dir_separator",
+              "http://dir.cefpython.test/static/..%2Fsecret.txt")
+
+        # Files of a zip archive are decompressed on demand and cached
+        zip_path = os.path.join(files_dir, "archive.zip")
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("index.html", "<p>zip index</p>")
+            archive.writestr("css/", "")
+            archive.writestr("css/style.css", "body { color: red; }")
+        zip_handler = cef.ZipResourceHandler(zip_path,
+                                             "http://zip.cefpython.test/")
+        self.assertEqual(zip_handler.GetFileCount(), 2)
+        self.assertEqual(zip_handler.GetCacheSize(), 0)
+        self.assertRaises(Exception, cef.ZipResourceHandler,
+                          os.path.join(files_dir, "missing.zip"),
+                          "http://zip.cefpython.test/")
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", zip_handler, "zip.cefpython.test"))
+        fetch("zip_index", "http://zip.cefpython.test/")
+        fetch("zip_css", "http://zip.cefpython.test/css/style.css")
+        fetch("zip_range", "http://zip.cefpython.test/css/style.css",
+              {"Range": "bytes=0-3"})
+        fetch("zip_missing", "http://zip.cefpython.test/missing.css")
+
+        # Responses loaded by the page are filtered. They are served in
+        # chunks of six bytes, so that filters hold back data between
+        # chunks and at the end of the response.
+        def filter_factory(request, **_):
+            handler = ReadIntoResourceHandler(
+                    g_filter_data, chunk_size=6,
+                    headers={"Access-Control-Allow-Origin": "*"})
+            served_handlers.append(handler)
+            return handler
+
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", filter_factory, "filter.cefpython.test"))
+
+        custom_scheme = cef.BytesResourceHandler(b"custom scheme",
+                                                 mime_type="text/plain")
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "cefpython-test", custom_scheme, "app"))
+        fetch("custom_scheme", "cefpython-test://app/index.txt")
+        # Re-registering for the same scheme and domain releases the
+        # previous factory.
+        class ReplacedFactory(object):
+            def __call__(self, **_):
+                return None
+        replaced_factory = ReplacedFactory()
+        replaced_ref = weakref.ref(replaced_factory)
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", replaced_factory, "replaced.cefpython.test"))
+        del replaced_factory
+        self.assertIsNotNone(replaced_ref())
+        self.assertTrue(cef.RegisterSchemeHandlerFactory(
+                "http", custom_scheme, "REPLACED.cefpython.test"))
+        self.assertIsNone(replaced_ref())
+        self.assertRaises(Exception, cef.RegisterSchemeHandlerFactory,
+                          "http", "not a handler")
+        self.assertRaises(Exception, cef.RegisterSchemeHandlerFactory,
+                          "http", None, "invalid.cefpython.test")
+        subtest_message("cef.RegisterSchemeHandlerFactory() ok")
+
         # Global handler
         global_handler = GlobalHandler(self)
         cef.SetGlobalClientCallback("OnAfterCreated",
@@ -197,9 +650,11 @@ class MainTest_IsolatedTest(unittest.TestCase):
 
         # Client handlers
         display_handler2 = DisplayHandler2(self)
-        client_handlers = [LoadHandler(self, g_datauri),
+        filter_handler = FilterRequestHandler()
+        client_handlers = [MainLoadHandler(self, g_datauri),
                            DisplayHandler(self),
-                           display_handler2]
+                           display_handler2,
+                           filter_handler]
         for handler in client_handlers:
             browser.SetClientHandler(handler)
         subtest_message("browser.SetClientHandler() ok")
@@ -223,6 +678,28 @@ class MainTest_IsolatedTest(unittest.TestCase):
         browser.SetJavascriptBindings(bindings)
         subtest_message("browser.SetJavascriptBindings() ok")
 
+        # Channel
+        channel_handler = ChannelHandler(self)
+        channel = browser.GetChannel("test_channel")
+        channel.SetHandler(channel_handler)
+        self.assertTrue(channel.Send("Message sent from Python"))
+        raising_channel_handler = RaisingChannelHandler()
+        browser.GetChannel("raise_channel", options={
+            "batch_interval": 50,
+            "window_size": 1,
+        }).SetHandler(raising_channel_handler)
+        # Errors in a channel handler are passed to sys.excepthook
+        channel_errors = []
+        original_excepthook = sys.excepthook
+
+        def channel_excepthook(exc_type, exc_value, exc_trace):
+            if exc_type is ChannelTestError:
+                channel_errors.append(exc_value)
+            else:
+                original_excepthook(exc_type, exc_value, exc_trace)
+        sys.excepthook = channel_excepthook
+        subtest_message("browser.GetChannel() ok")
+
         # Set auto resize. Call it after js bindings were set.
         browser.SetAutoResizeEnabled(enabled=True,
                                      min_size=[800, 600],
@@ -249,8 +726,19 @@ class MainTest_IsolatedTest(unittest.TestCase):
         req.SetMethod("POST")
         req.SetPostData(req_data)
         self.assertEqual(req_data, req.GetPostData())
+        self.assertEqual(req.GetPostDataView().tobytes(), b"key=value")
+        req.SetPostData({b"key": b"other"})
+        self.assertEqual(req.GetPostDataView().tobytes(), b"key=other")
         subtest_message("cef.Request.SetPostData(dict) ok")
 
+        # Cached header views are updated by setters
+        req.SetHeaderMap({"X-Test": "1"})
+        self.assertEqual(req.GetHeaderMap()["X-Test"], "1")
+        req.SetHeader("X-Test", "2")
+        self.assertEqual(req.GetHeader("x-test"), "2")
+        self.assertEqual(req.GetHeaderMultimap(), [("X-Test", "2")])
+        subtest_message("cef.Request header views ok")
+
         # Cookie manager
         self.assertIsInstance(cef.CookieManager.CreateManager(path=""),
                               cef.PyCookieManager)
@@ -260,6 +748,58 @@ class MainTest_IsolatedTest(unittest.TestCase):
                               cef.PyCookieManager)
         subtest_message("cef.CookieManager ok")
 
+        # Bulk cookies, results are checked after message loop has run
+        cookie_manager = cef.CookieManager.CreateManager(path="")
+        cookie_results = {}
+        cookies_file = os.path.join(tempfile.gettempdir(),
+                                    "cefpython_test_cookies.bin")
+
+        def on_cookies_set(future):
+            cookie_results["set"] = future.GetResult()
+            cookie_manager.GetAllCookies().AddDoneCallback(on_cookies_got)
+
+        def on_cookies_got(future):
+            cookie_results["got"] = [cookie.GetName()
+                                     for cookie in future.GetResult()]
+            cookie_manager.SaveCookies(cookies_file) \
+                .AddDoneCallback(on_cookies_saved)
+
+        def on_cookies_saved(future):
+            cookie_results["saved"] = future.GetResult()
+            cef.CookieManager.CreateManager(path="") \
+                .LoadCookies(cookies_file).AddDoneCallback(on_cookies_loaded)
+
+        def on_cookies_loaded(future):
+            cookie_results["loaded"] = future.GetResult()
+            os.remove(cookies_file)
+
+        cookie_manager.SetCookies([{"name": "bulk", "value": "1",
+                                    "domain": "cefpython.test",
+                                    "path": "/"}]) \
+            .AddDoneCallback(on_cookies_set)
+
+        # Cookie cache, lookups are synchronous. Cookies are cached
+        # when CEF has set them, cache is checked after message loop
+        # has run.
+        cache_manager = cef.CookieManager.CreateManager(path="")
+        cef.CookieCache.Enable(cache_manager).AddDoneCallback(
+                lambda future: cookie_results.update(primed=True))
+        self.assertTrue(cef.CookieCache.IsEnabled())
+        cookie = cef.Cookie()
+        cookie.Set({"name": "session", "value": "abc", "path": "/app"})
+        cache_manager.SetCookie("http://cefpython.test/app", cookie)
+        # Rejected by CEF, ';' is not allowed in a value
+        invalid_cookie = cef.Cookie()
+        invalid_cookie.Set({"name": "invalid", "value": "a;b",
+                            "path": "/app"})
+        cache_manager.SetCookie("http://cefpython.test/app",
+                                invalid_cookie)
+        # Cookies of other cookie managers are not cached
+        other_cookie = cef.Cookie()
+        other_cookie.Set({"name": "other", "value": "1", "path": "/app"})
+        cef.CookieManager.GetGlobalManager().SetCookie(
+                "http://cefpython.test/app", other_cookie)
+
         # Window Utils
         if WINDOWS:
             hwnd = 1  # When using 0 getting issues with OnautoResize
@@ -288,6 +828,179 @@ class MainTest_IsolatedTest(unittest.TestCase):
         self.assertIsNone(cef.GetBrowserByIdentifier(POPUP_BROWSER_ID))
         subtest_message("cef.GetBrowserByIdentifier() ok")
 
+        # Bulk cookies were set and read
+        self.assertEqual(cookie_results.get("set"), 1)
+        self.assertEqual(cookie_results.get("got"), ["bulk"])
+        self.assertEqual(cookie_results.get("saved"), 1)
+        self.assertEqual(cookie_results.get("loaded"), 1)
+        subtest_message("CookieManager.SetCookies/GetAllCookies() ok")
+
+        # Resource cache and router. Fresh response of a Python resource
+        # handler was stored, responses without freshness weren't.
+        cef.ResourceRouter.SetPythonFallback(True)
+        self.assertIsNotNone(cef.ResourceCache.Get(
+                "http://readinto.cefpython.test/cached"))
+        self.assertIsNone(cef.ResourceCache.Get(
+                "http://readinto.cefpython.test/"))
+        cef.ResourceCache.Disable()
+        subtest_message("ResourceCache stores responses ok")
+
+        # Channel handler raised, the rest of the batch was delivered
+        # and the batch was acknowledged
+        sys.excepthook = original_excepthook
+        self.assertEqual(raising_channel_handler.messages,
+                         ["Raise", "After raise", "After ack"])
+        self.assertEqual(len(channel_errors), 1)
+        subtest_message("Channel handler error ok")
+
+        # Served responses
+        chunked_thread.join()
+        self.assertEqual(served["readinto"].GetResult()["data"],
+                         g_served_data)
+        self.assertEqual(served["readinto_keep"].GetResult()["data"], b"")
+        self.assertEqual(served["readinto_cached"].GetResult()["data"],
+                         g_served_data)
+        self.assertTrue(pool_futures[0].IsCancelled())
+        self.assertTrue(pool_futures[4].IsCancelled())
+        self.assertIsInstance(pool_futures[4].GetException(),
+                              cef.FutureCancelledError)
+        for url, pool_future in zip(pool_urls[1:4], pool_futures[1:4]):
+            self.assertEqual(pool_future.GetResult()["data"],
+                             url.encode("utf-8"))
+        self.assertEqual(len(pool_counts), 3)
+        self.assertTrue(all(active < 2 for active, _ in pool_counts))
+        self.assertEqual([queued for _, queued in pool_counts],
+                         sorted([queued for _, queued in pool_counts],
+                                reverse=True))
+        self.assertEqual(limited_pool.GetActiveCount(), 0)
+        self.assertEqual(limited_pool.GetQueuedCount(), 0)
+        subtest_message("WebRequestPool queue ok")
+        for mode in ("buffer", "file"):
+            self.assertEqual(downloads[mode].GetRequestStatus(),
+                             cef.WebRequest.Status["Success"])
+            self.assertEqual(downloads[mode].GetDownloadSize(),
+                             len(g_served_data))
+        download_data = downloads["buffer"].GetDownloadData()
+        self.assertEqual(download_data, g_served_data)
+        self.assertIs(downloads["buffer"].GetDownloadData(), download_data)
+        self.assertEqual(downloads["file"].GetDownloadData(), b"")
+        self.assertFalse(downloads["file"].HasWriteFailed())
+        buffer_progress = download_clients["buffer"].progress
+        self.assertGreater(len(buffer_progress), 2)
+        self.assertEqual(len(throttled_client.progress), 2)
+        self.assertEqual(throttled_client.progress[-1],
+                         buffer_progress[-1])
+        self.assertEqual(downloads["throttled"].GetDownloadData(),
+                         g_served_data)
+        subtest_message("WebRequest progress throttle ok")
+        with open(download_file, "rb") as downloaded:
+            self.assertEqual(downloaded.read(), g_served_data)
+        os.remove(download_file)
+        subtest_message("WebRequest download modes ok")
+        self.assertEqual(served["chunked"].GetResult()["data"],
+                         b"first,second")
+        self.assertFalse(chunked.IsCancelled())
+        self.assertEqual(served["custom_scheme"].GetResult()["data"],
+                         b"custom scheme")
+        for key in ("bytes", "bytes_again"):
+            result = served[key].GetResult()
+            self.assertEqual(result["data"], u"bytes \u0105".encode("utf-8"))
+            self.assertEqual(result["status"], 201)
+            self.assertEqual(result["status_text"], "Created")
+            self.assertEqual(result["mime_type"], "text/plain")
+            self.assertEqual(result["headers"].get("X-Test"), "bytes")
+            self.assertEqual([value for (name, value)
+                              in result["header_multimap"]
+                              if name == "X-Repeated"], ["1", "2"])
+        subtest_message("cef.BytesResourceHandler ok")
+        result = served["file"].GetResult()
+        self.assertEqual(result["status"], 200)
+        self.assertEqual(result["data"], g_served_data[:100])
+        self.assertEqual(result["mime_type"], "application/octet-stream")
+        self.assertEqual(result["headers"].get("Accept-Ranges"), "bytes")
+        result = served["file_range"].GetResult()
+        self.assertEqual(result["status"], 206)
+        self.assertEqual(result["data"], g_served_data[10:20])
+        self.assertEqual(result["headers"].get("Content-Range"),
+                         "bytes 10-19/100")
+        result = served["file_suffix"].GetResult()
+        self.assertEqual(result["status"], 206)
+        self.assertEqual(result["data"], g_served_data[95:100])
+        result = served["file_416"].GetResult()
+        self.assertEqual(result["status"], 416)
+        self.assertEqual(result["data"], b"")
+        self.assertEqual(result["headers"].get("Content-Range"),
+                         "bytes */100")
+        result = served["mmap_range"].GetResult()
+        self.assertEqual(result["status"], 206)
+        self.assertEqual(result["data"], g_served_data[90:100])
+        self.assertEqual(served["slice"].GetResult()["data"],
+                         g_served_data[10:30])
+        subtest_message("cef.FileResourceHandler ok")
+        result = served["dir_index"].GetResult()
+        self.assertEqual(result["data"], b"<p>index</p>")
+        self.assertEqual(result["mime_type"], "text/html")
+        result = served["dir_file"].GetResult()
+        self.assertEqual(result["status"], 206)
+        self.assertEqual(result["data"], g_served_data[:10])
+        for key in ("dir_parent", "dir_encoded", "dir_separator"):
+            result = served[key].GetResult()
+            self.assertEqual(result["status"], 404)
+            self.assertNotEqual(result["data"], b"secret")
+        subtest_message("cef.DirectoryResourceHandler ok")
+        result = served["zip_index"].GetResult()
+        self.assertEqual(result["data"], b"<p>zip index</p>")
+        self.assertEqual(result["mime_type"], "text/html")
+        result = served["zip_css"].GetResult()
+        self.assertEqual(result["status"], 200)
+        self.assertEqual(result["data"], b"body { color: red; }")
+        self.assertEqual(result["mime_type"], "text/css")
+        result = served["zip_range"].GetResult()
+        self.assertEqual(result["status"], 206)
+        self.assertEqual(result["data"], b"body")
+        self.assertEqual(served["zip_missing"].GetResult()["status"], 404)
+        self.assertEqual(zip_handler.GetCacheSize(),
+                         len("<p>zip index</p>body { color: red; }"))
+        shutil.rmtree(files_dir)
+        subtest_message("cef.ZipResourceHandler ok")
+        # Replaced string spans chunks, the first chunk is replaced by
+        # the regex filter on its own. Data held back at the end of the
+        # response was written.
+        self.assertEqual(external.response_filters, {
+            "replace": "aaa X bbb fo",
+            "regex": "aaa foo bbb bar fo",
+            "python": "AAA FOO BAR BBB FO",
+        })
+        self.assertEqual([python_filter.eof for python_filter
+                          in filter_handler.python_filters], [True])
+        subtest_message("cef.ResponseFilter ok")
+        subtest_message("ResourceHandler.ReadResponseInto() ok")
+        subtest_message("cef.ChunkedResourceHandler ok")
+        subtest_message("ApplicationSettings.custom_schemes ok")
+        self.assertTrue(cef.ClearSchemeHandlerFactories())
+        subtest_message("cef.ClearSchemeHandlerFactories() ok")
+
+        # Cookie cache was primed
+        self.assertTrue(cookie_results.get("primed"))
+        self.assertTrue(cef.CookieCache.IsReady())
+        cached = cef.CookieCache.GetCookie("http://cefpython.test/app/x",
+                                           "session")
+        self.assertEqual(cached.GetValue(), "abc")
+        self.assertIsNone(cef.CookieCache.GetCookie(
+                "http://cefpython.test/other", "session"))
+        self.assertIsNone(cef.CookieCache.GetCookie(
+                "http://sub.cefpython.test/app", "session"))
+        self.assertIsNone(cef.CookieCache.GetCookie(
+                "http://cefpython.test/app", "invalid"))
+        self.assertIsNone(cef.CookieCache.GetCookie(
+                "http://cefpython.test/app", "other"))
+        cache_manager.DeleteCookies("http://cefpython.test/app", "session")
+        do_message_loop_work(25)
+        self.assertEqual(cef.CookieCache.GetCookies(
+                "http://cefpython.test/app"), [])
+        subtest_message("cef.CookieCache ok")
+        cef.CookieCache.Disable()
+
         # Close browser and clean reference
         browser.CloseBrowser(True)
         del browser
@@ -303,7 +1016,8 @@ class MainTest_IsolatedTest(unittest.TestCase):
         # noinspection PyTypeChecker
         check_auto_asserts(self, [] + client_handlers
                                     + [global_handler,
-                                       external])
+                                       external,
+                                       channel_handler])
 
         # Test shutdown of CEF
         cef.Shutdown()
@@ -314,6 +1028,25 @@ class MainTest_IsolatedTest(unittest.TestCase):
         sys.stdout.flush()
 
 
+class MainLoadHandler(LoadHandler):
+    """LoadHandler with checks that only apply to the main test."""
+
+    def __init__(self, test_case, datauri):
+        super(MainLoadHandler, self).__init__(test_case, datauri)
+        self.ExtractElements_True = False
+
+    def OnLoadEnd(self, browser, frame, **kwargs):
+        super(MainLoadHandler, self).OnLoadEnd(browser=browser, frame=frame,
+                                               **kwargs)
+
+        def on_extract_elements(future):
+            self.test_case.assertEqual(len(future.GetResult()[0]), 1)
+            self.ExtractElements_True = True
+        frame.ExtractElements([{"selector": "body", "limit": 1}],
+                              timeout_ms=5000)\
+            .AddDoneCallback(on_extract_elements)
+
+
 class DisplayHandler2(object):
     def __init__(self, test_case):
         self.test_case = test_case
@@ -336,6 +1069,33 @@ class DisplayHandler2(object):
         self.OnLoadingProgressChange_Progress = progress
 
 
+class ChannelHandler(object):
+    def __init__(self, test_case):
+        self.test_case = test_case
+        # Asserts for True/False will be checked just before shutdown
+        self.test_for_True = True  # Test whether asserts are working correctly
+        self.OnMessage_True = False
+
+    def OnMessage(self, channel, message, **_):
+        self.OnMessage_True = True
+        self.test_case.assertEqual(channel.GetName(), "test_channel")
+        self.test_case.assertEqual(message, "Message sent from Javascript")
+
+
+class ChannelTestError(Exception):
+    pass
+
+
+class RaisingChannelHandler(object):
+    def __init__(self):
+        self.messages = []
+
+    def OnMessage(self, message, **_):
+        self.messages.append(message)
+        if message == "Raise":
+            raise ChannelTestError("Raised by channel handler")
+
+
 class External(object):
     """Javascript 'window.external' object."""
 
@@ -353,6 +1113,12 @@ class External(object):
         self.test_property3_function_True = False
         self.test_callbacks_True = False
         self.py_callback_True = False
+        self.test_call_async_True = False
+        self.test_callbacks_limit_True = False
+        self.test_callbacks_release_True = False
+        self.limit_callbacks = []
+        self.test_resource_cache_True = False
+        self.response_filters = {}
 
     def test_function(self):
         """Test binding function to the 'window' object."""
@@ -371,6 +1137,160 @@ class External(object):
         self.test_callbacks_True = True
         js_callback.Call("String sent from Python", py_callback)
 
+    def test_call_async(self, js_callback):
+        """Test reply value from javascript callback."""
+        def on_done(future):
+            self.test_case.assertEqual(future.GetResult(), 42)
+            self.test_call_async_True = True
+        js_callback.CallAsync(21, timeout_ms=5000).AddDoneCallback(on_done)
+
+    def test_callbacks_limit(self, js_callback):
+        """Test javascript_callbacks_limit setting and releasing
+        callbacks that were garbage collected."""
+        self.limit_callbacks.append(js_callback)
+        if len(self.limit_callbacks) < 6:
+            return
+        browser = js_callback.GetFrame().GetBrowser()
+
+        def on_evicted(future):
+            # The oldest callback was released by the renderer
+            self.test_case.assertIsInstance(future.GetException(),
+                                            cef.JavascriptError)
+            self.limit_callbacks[-1].CallAsync(5, timeout_ms=5000)\
+                .AddDoneCallback(on_kept)
+
+        def on_kept(future):
+            self.test_case.assertEqual(future.GetResult(), 50)
+            self.test_callbacks_limit_True = True
+            browser.GetJavascriptCallbackStats().AddDoneCallback(
+                    on_stats_before_release)
+
+        def on_stats_before_release(future):
+            # Counters are for the whole renderer, other callbacks may
+            # be created or released meanwhile, so only the callbacks
+            # of this test are checked.
+            before = future.GetResult()
+            self.test_case.assertEqual(before["limit"], 4)
+            self.test_case.assertGreaterEqual(before["evicted"], 2)
+            # Ids of garbage collected callbacks are sent to the
+            # renderer before the stats are requested.
+            del self.limit_callbacks[:]
+            browser.GetJavascriptCallbackStats().AddDoneCallback(
+                    lambda future: on_stats(before, future.GetResult()))
+
+        def on_stats(before, after):
+            # Four callbacks were kept by the limit and released now
+            self.test_case.assertGreaterEqual(
+                    after["released"] - before["released"], 4)
+            self.test_callbacks_release_True = True
+
+        self.limit_callbacks[0].CallAsync(0, timeout_ms=5000)\
+            .AddDoneCallback(on_evicted)
+
+    def test_resource_cache(self):
+        """Called by a script served from resource cache."""
+        self.test_resource_cache_True = True
+
+    def test_response_filter(self, name, text):
+        """Called with a filtered response."""
+        self.response_filters[name] = text
+
+
+class FilterRequestHandler(object):
+    """Returns response filters for responses loaded by the page."""
+
+    def __init__(self):
+        self.replace_filter = cef.ReplaceResponseFilter([("foo bar", "X")])
+        self.regex_filter = cef.RegexResponseFilter("(bar) (b+)", "$2 $1")
+        self.python_filters = []
+
+    def GetResourceResponseFilter(self, request, **_):
+        url = request.GetUrl()
+        if url == "http://filter.cefpython.test/replace":
+            return self.replace_filter
+        if url == "http://filter.cefpython.test/regex":
+            return self.regex_filter
+        if url == "http://filter.cefpython.test/python":
+            python_filter = UpperResponseFilter()
+            self.python_filters.append(python_filter)
+            return python_filter
+        return None
+
+
+class UpperResponseFilter(object):
+    """Python response filter."""
+
+    def __init__(self):
+        self.eof = False
+
+    def Filter(self, data, eof):
+        if eof:
+            self.eof = True
+        return data.upper()
+
+
+class DownloadClient(object):
+    """WebRequest client, data isn't passed to OnDownloadData in the
+    "buffer" and "file" modes."""
+
+    def __init__(self):
+        self.progress = []
+
+    def OnDownloadProgress(self, current, total, **_):
+        self.progress.append((current, total))
+
+    def OnDownloadData(self, **_):
+        raise AssertionError("OnDownloadData called")
+
+    def OnRequestComplete(self, **_):
+        pass
+
+
+class ReadIntoResourceHandler(object):
+    """Resource handler writing into the buffer passed by CEF."""
+
+    def __init__(self, data, keep_buffer=False, headers=None,
+                 chunk_size=None):
+        self.data = data
+        self.offset = 0
+        self.chunk_size = chunk_size
+        # Keeping a slice of the buffer cancels the response
+        self.keep_buffer = keep_buffer
+        self.kept = []
+        self.headers = headers
+
+    def ProcessRequest(self, callback, **_):
+        callback.Continue()
+        return True
+
+    def GetResponseHeaders(self, response, response_length_out, *_):
+        response.SetStatus(200)
+        response.SetMimeType("application/octet-stream")
+        if self.headers:
+            response.SetHeaderMap(self.headers)
+        if not self.keep_buffer:
+            response_length_out[0] = len(self.data)
+
+    def ReadResponseInto(self, buffer, **_):
+        size = len(buffer)
+        if self.chunk_size:
+            size = min(size, self.chunk_size)
+        chunk = self.data[self.offset:self.offset+size]
+        buffer[:len(chunk)] = chunk
+        self.offset += len(chunk)
+        if self.keep_buffer:
+            self.kept.append(buffer[:1])
+        return len(chunk)
+
+    def CanGetCookie(self, **_):
+        return True
+
+    def CanSetCookie(self, **_):
+        return True
+
+    def Cancel(self, **_):
+        pass
+
 
 if __name__ == "__main__":
     _test_runner.main(os.path.basename(__file__))